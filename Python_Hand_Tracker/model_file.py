@@ -0,0 +1,126 @@
+"""
+Reader/writer for the versioned model container (see RA8D1_Simulation/model_file.h).
+
+Layout, little-endian:
+    [header 64 B][class names: num_classes x 32 B][tensor table: num_tensors x 64 B][tensor data]
+Every tensor starts on a 64-byte boundary, so ModelFile exposes
+np.memmap views into the file instead of copies.
+"""
+import struct
+import zlib
+
+import numpy as np
+
+MAGIC = b'TCNM'
+VERSION = 1
+ALIGN = 64
+MAX_CLASSES = 16 # Must match MAX_CLASSES in training_logic.h
+CLASS_NAME_LEN = 32
+TENSOR_NAME_LEN = 32
+MAX_DIMS = 4
+
+KIND_DENSE, KIND_DWS, KIND_INT8, KIND_PRUNED = 0, 1, 2, 3
+DTYPES = {0: np.dtype('<f4'), 1: np.dtype('i1'), 2: np.dtype('<i4')}
+DTYPE_CODES = {dtype: code for code, dtype in DTYPES.items()}
+
+# magic, version, kind, input_size, sequence_length, tcn_channels, kernel_size,
+# dilation, num_classes, num_tensors, file_size, checksum, reserved
+HEADER = struct.Struct('<4sHH9I20x')
+# name, dtype, ndim, reserved, shape[4], offset, nbytes, reserved
+TENSOR_ENTRY = struct.Struct('<32sBBH4III4x')
+CHECKSUM_OFFSET = 40
+assert HEADER.size == 64 and TENSOR_ENTRY.size == 64
+
+
+def _align(offset):
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _checksum(data):
+    """CRC-32 of the file with its checksum field zeroed (same as the C crc32)."""
+    crc = zlib.crc32(data[:CHECKSUM_OFFSET])
+    crc = zlib.crc32(b'\0\0\0\0', crc)
+    return zlib.crc32(data[CHECKSUM_OFFSET + 4:], crc)
+
+
+def is_model_file(path):
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def write_model_file(path, kind, dims, class_names, tensors):
+    """
+    dims: (input_size, sequence_length, tcn_channels, kernel_size, dilation).
+    tensors: [(name, array)] in file order; arrays are stored with their own shape.
+    """
+    if not 1 <= len(class_names) <= MAX_CLASSES:
+        raise ValueError(f"{len(class_names)} classes given; a model file holds 1-{MAX_CLASSES}")
+    arrays = []
+    for name, array in tensors:
+        array = np.ascontiguousarray(array)
+        dtype = array.dtype.newbyteorder('<') if array.dtype.itemsize > 1 else array.dtype
+        arrays.append((name, array.astype(dtype, copy=False)))
+
+    offset = _align(HEADER.size + len(class_names) * CLASS_NAME_LEN + len(arrays) * TENSOR_ENTRY.size)
+    table = []
+    for name, array in arrays:
+        shape = list(array.shape) + [1] * (MAX_DIMS - array.ndim)
+        table.append((TENSOR_ENTRY.pack(name.encode()[:TENSOR_NAME_LEN - 1], DTYPE_CODES[array.dtype],
+                                        array.ndim, 0, *shape, offset, array.nbytes), offset))
+        offset = _align(offset + array.nbytes)
+
+    data = bytearray(offset)
+    struct.pack_into(HEADER.format, data, 0, MAGIC, VERSION, kind, *dims, len(class_names), len(arrays), offset, 0)
+    position = HEADER.size
+    for name in class_names:
+        data[position:position + CLASS_NAME_LEN] = name.encode()[:CLASS_NAME_LEN - 1].ljust(CLASS_NAME_LEN, b'\0')
+        position += CLASS_NAME_LEN
+    for (entry, tensor_offset), (_, array) in zip(table, arrays):
+        data[position:position + TENSOR_ENTRY.size] = entry
+        position += TENSOR_ENTRY.size
+        data[tensor_offset:tensor_offset + array.nbytes] = array.tobytes()
+    struct.pack_into('<I', data, CHECKSUM_OFFSET, _checksum(data))
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+class ModelFile:
+    """A validated model container; tensors are read-only np.memmap views into the file."""
+    def __init__(self, path):
+        self.path = path
+        self.data = np.memmap(path, dtype=np.uint8, mode='r')
+        if len(self.data) < HEADER.size:
+            raise ValueError(f"{path} is too small to be a model file")
+        (magic, version, self.kind, input_size, sequence_length, tcn_channels, kernel_size, dilation,
+         num_classes, num_tensors, file_size, checksum) = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a model container")
+        if version != VERSION:
+            raise ValueError(f"{path} has container version {version}, expected {VERSION}")
+        if file_size != len(self.data):
+            raise ValueError(f"{path} is truncated ({len(self.data)} of {file_size} bytes)")
+        if not 1 <= num_classes <= MAX_CLASSES:
+            raise ValueError(f"{path} declares {num_classes} classes")
+        if _checksum(memoryview(self.data)) != checksum:
+            raise ValueError(f"{path} failed its checksum (corrupt file)")
+        self.dims = (input_size, sequence_length, tcn_channels, kernel_size, dilation)
+
+        position = HEADER.size
+        self.class_names = []
+        for _ in range(num_classes):
+            raw = bytes(self.data[position:position + CLASS_NAME_LEN])
+            self.class_names.append(raw.split(b'\0', 1)[0].decode())
+            position += CLASS_NAME_LEN
+        self.tensors = {}
+        for _ in range(num_tensors):
+            name, dtype, ndim, _, *shape, offset, nbytes = TENSOR_ENTRY.unpack_from(self.data, position)
+            position += TENSOR_ENTRY.size
+            name = name.split(b'\0', 1)[0].decode()
+            shape = tuple(shape[:ndim])
+            if offset % ALIGN or offset + nbytes > len(self.data) or nbytes != int(np.prod(shape)) * DTYPES[dtype].itemsize:
+                raise ValueError(f"{path}: tensor {name} is misaligned or out of bounds")
+            self.tensors[name] = np.ndarray(shape, dtype=DTYPES[dtype], buffer=self.data, offset=offset)
+
+    @property
+    def num_classes(self):
+        return len(self.class_names)
@@ -1,120 +1,276 @@
-import numpy as np
-import pandas as pd
-import tensorflow as tf
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder, StandardScaler
-from tensorflow.keras.models import Model, Sequential
-from tensorflow.keras.callbacks import CSVLogger
-from tensorflow.keras.layers import Dense, Dropout, Input
+import argparse
+import json
 import os
-import tf2onnx
-import onnx
+import time
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from model_file import KIND_DENSE, MAX_CLASSES, ModelFile, is_model_file, write_model_file
 
 # --- Constants ---
 # Get the absolute path of the script's directory
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, '..'))
 # Construct absolute paths for data and model output
-DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'models', 'data')
-SAVED_MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'models', 'saved_model')
-HISTORY_PATH = os.path.join(os.path.dirname(__file__), '..', 'models', 'training_history.csv')
-ONNX_MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'models', 'model.onnx')
-GESTURES = ['fist', 'palm', 'pointing']
-NUM_LANDMARKS = 6
-NUM_COORDS = 3
-INPUT_SHAPE = (NUM_LANDMARKS * NUM_COORDS,)
+DATA_DIR = os.path.join(PROJECT_ROOT, 'models', 'data')
+MODEL_PATH = os.path.join(PROJECT_ROOT, 'models', 'c_model.bin')
+GESTURES_FILE = os.path.join(PROJECT_ROOT, 'gui_app', 'gestures.json')
+DEFAULT_GESTURES = ["wave", "swipe_left", "swipe_right"]
+
+# Model dimensions. Must match training_logic.h.
+NUM_LANDMARKS = 21
+INPUT_SIZE = NUM_LANDMARKS * 3
+LEGACY_NUM_CLASSES = 3 # NUM_CLASSES of the raw files written before the container format
+SEQUENCE_LENGTH = 20
+TCN_CHANNELS = 8
+TCN_KERNEL_SIZE = 3
+TCN_DILATION = 1
+WINDOW_STRIDE = 5 # Must match WINDOW_STRIDE in training_logic.c
+MODEL_DIMS = (INPUT_SIZE, SEQUENCE_LENGTH, TCN_CHANNELS, TCN_KERNEL_SIZE, TCN_DILATION)
+
+# Training hyperparameters. Defaults match train_in_c.c.
+NUM_EPOCHS = 150
+LEARNING_RATE = 0.001
+BETA1 = 0.9
+BETA2 = 0.999
+EPSILON = 1e-8
+CLIP_THRESHOLD = 1.0 # Global-norm clipping, as in update_weights
+TRAIN_SPLIT = 0.8
+LEAKY_SLOPE = 0.01
 
 # --- 1. Load and Preprocess Data ---
-def load_data():
-    print(f"--- Loading data from: {os.path.abspath(DATA_DIR)} ---")
-    data = []
-    labels = []
-    for i, gesture in enumerate(GESTURES):
-        file_path = os.path.join(DATA_DIR, f'{gesture}.csv')
-        print(f"Checking for: {file_path}")
-        if not os.path.exists(file_path):
-            print(f"[WARNING] Data file not found at {file_path}")
+def load_gestures():
+    """Read the gesture list saved by the GUI, falling back to the C defaults."""
+    try:
+        with open(GESTURES_FILE, 'r') as f:
+            gestures = json.load(f)
+        if isinstance(gestures, list) and all(isinstance(g, str) for g in gestures):
+            return gestures
+    except (OSError, json.JSONDecodeError):
+        pass
+    return list(DEFAULT_GESTURES)
+
+def load_temporal_data(data_dir, gestures):
+    """
+    Load models/data/<g>/<g>.csv and cut it into overlapping windows,
+    exactly like load_temporal_data in training_logic.c.
+    Returns (windows[N, SEQUENCE_LENGTH, INPUT_SIZE], labels[N]).
+    """
+    windows, labels = [], []
+    for label, gesture in enumerate(gestures):
+        path = os.path.join(data_dir, gesture, f'{gesture}.csv')
+        if not os.path.exists(path):
+            print(f"Info: No data file for gesture '{gesture}'. Skipping.")
             continue
-        print(f"[SUCCESS] Found and loading {gesture}.csv")
-        df = pd.read_csv(file_path, header=None)
-        data.append(df.values)
-        labels.extend([gesture] * len(df))
-
-    if not data:
-        print("[FAILURE] No data was loaded. Please ensure CSV files exist and are not empty.")
-        return None, None, None
-
-    X = np.vstack(data)
-    y = np.array(labels)
-
-    # Encode labels
-    encoder = LabelEncoder()
-    y_encoded = encoder.fit_transform(y)
-
-    return X, y_encoded, encoder.classes_
-
-# --- 2. Build the Model ---
-def build_model(num_classes):
-    inputs = Input(shape=INPUT_SHAPE, name='input')
-    x = Dense(64, activation='relu')(inputs)
-    x = Dropout(0.5)(x)
-    x = Dense(32, activation='relu')(x)
-    x = Dropout(0.5)(x)
-    outputs = Dense(num_classes, activation='softmax', name='output')(x)
-    model = Model(inputs=inputs, outputs=outputs)
-
-    model.compile(optimizer='adam',
-                  loss='sparse_categorical_crossentropy',
-                  metrics=['accuracy'])
-    return model
+        frames = np.loadtxt(path, delimiter=',', skiprows=1, usecols=range(INPUT_SIZE),
+                            dtype=np.float32, ndmin=2)
+        if len(frames) < SEQUENCE_LENGTH:
+            continue
+        # (num_windows, INPUT_SIZE, SEQUENCE_LENGTH) -> (num_windows, SEQUENCE_LENGTH, INPUT_SIZE)
+        gesture_windows = sliding_window_view(frames, SEQUENCE_LENGTH, axis=0)[::WINDOW_STRIDE]
+        windows.append(gesture_windows.transpose(0, 2, 1))
+        labels.append(np.full(len(gesture_windows), label, dtype=np.int64))
+
+    if not windows:
+        return None, None
+    return np.ascontiguousarray(np.concatenate(windows)), np.concatenate(labels)
+
+def split_data(num_sequences, train_split, rng):
+    """Shuffle and split window indices into train/val sets."""
+    indices = rng.permutation(num_sequences)
+    num_train = int(num_sequences * train_split)
+    return indices[:num_train], indices[num_train:]
+
+# --- 2. Model ---
+def init_params(rng, num_classes):
+    """He-initialized weights, zero biases (see init_model in training_logic.c)."""
+    def he(shape, fan_in):
+        return (rng.standard_normal(shape) * np.sqrt(2.0 / fan_in)).astype(np.float32)
+    return {
+        'tcn_w': he((TCN_CHANNELS, INPUT_SIZE, TCN_KERNEL_SIZE), INPUT_SIZE * TCN_KERNEL_SIZE),
+        'tcn_b': np.zeros(TCN_CHANNELS, dtype=np.float32),
+        'out_w': he((num_classes, TCN_CHANNELS), TCN_CHANNELS),
+        'out_b': np.zeros(num_classes, dtype=np.float32),
+    }
+
+def conv_windows(x):
+    """
+    View a batch of sequences as causal dilated conv taps without copying.
+    x: [B, T, F] -> [B, T, F, K], where tap k reads t + (k - (K-1)) * dilation.
+    """
+    span = (TCN_KERNEL_SIZE - 1) * TCN_DILATION + 1
+    padded = np.pad(x, ((0, 0), (span - 1, 0), (0, 0)))
+    return sliding_window_view(padded, span, axis=1)[..., ::TCN_DILATION]
+
+def softmax(logits):
+    shifted = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return shifted / shifted.sum(axis=1, keepdims=True)
+
+def forward(params, x):
+    """Batched forward pass. Returns class probabilities and the cache for backward()."""
+    taps = conv_windows(x)
+    pre_act = np.einsum('btfk,cfk->btc', taps, params['tcn_w'], optimize=True) + params['tcn_b']
+    act = np.where(pre_act > 0, pre_act, LEAKY_SLOPE * pre_act)
+    pooled = act.mean(axis=1)
+    probs = softmax(pooled @ params['out_w'].T + params['out_b'])
+    return probs, (taps, pre_act, pooled)
+
+def backward(params, probs, labels, cache):
+    """Cross-entropy gradients averaged over the batch."""
+    taps, pre_act, pooled = cache
+    batch_size = len(labels)
+
+    grad_logits = probs.copy()
+    grad_logits[np.arange(batch_size), labels] -= 1.0
+    grad_logits /= batch_size
+
+    grad_pooled = grad_logits @ params['out_w']
+    grad_pre_act = (grad_pooled[:, None, :] / SEQUENCE_LENGTH) * np.where(pre_act > 0, 1.0, LEAKY_SLOPE)
+    return {
+        'tcn_w': np.einsum('btc,btfk->cfk', grad_pre_act, taps, optimize=True),
+        'tcn_b': grad_pre_act.sum(axis=(0, 1)),
+        'out_w': grad_logits.T @ pooled,
+        'out_b': grad_logits.sum(axis=0),
+    }
+
+class Adam:
+    """Adam with global-norm gradient clipping, mirroring update_weights()."""
+    def __init__(self, params, learning_rate=LEARNING_RATE, beta1=BETA1, beta2=BETA2, epsilon=EPSILON):
+        self.learning_rate = learning_rate
+        self.beta1 = beta1
+        self.beta2 = beta2
+        self.epsilon = epsilon
+        self.timestep = 0
+        self.m = {name: np.zeros_like(p) for name, p in params.items()}
+        self.v = {name: np.zeros_like(p) for name, p in params.items()}
+
+    def step(self, params, grads):
+        self.timestep += 1
+        lr_t = self.learning_rate * np.sqrt(1.0 - self.beta2 ** self.timestep) / (1.0 - self.beta1 ** self.timestep)
+
+        grad_norm = np.sqrt(sum(float(np.sum(g * g)) for g in grads.values()))
+        scale = CLIP_THRESHOLD / grad_norm if grad_norm > CLIP_THRESHOLD else 1.0
+
+        for name, param in params.items():
+            grad = grads[name] * scale
+            self.m[name] = self.beta1 * self.m[name] + (1 - self.beta1) * grad
+            self.v[name] = self.beta2 * self.v[name] + (1 - self.beta2) * grad * grad
+            param -= (lr_t * self.m[name] / (np.sqrt(self.v[name]) + self.epsilon)).astype(np.float32)
+
+def evaluate(params, x, y, batch_size=1024):
+    """Mean loss and accuracy of params over (x, y)."""
+    total_loss, correct = 0.0, 0
+    for start in range(0, len(y), batch_size):
+        probs, _ = forward(params, x[start:start + batch_size])
+        labels = y[start:start + batch_size]
+        total_loss += float(-np.log(np.maximum(probs[np.arange(len(labels)), labels], 1e-9)).sum())
+        correct += int((probs.argmax(axis=1) == labels).sum())
+    return total_loss / len(y), correct / len(y)
+
+# --- 3. c_model.bin I/O ---
+# Tensor names match save_model/load_inference_model in training_logic.c.
+TENSOR_NAMES = {'tcn_w': 'tcn_weights', 'tcn_b': 'tcn_biases', 'out_w': 'output_weights', 'out_b': 'output_biases'}
+
+def save_model(params, class_names, path):
+    """Writes a dense model container; the C server takes its class count from the header."""
+    write_model_file(path, KIND_DENSE, MODEL_DIMS, class_names,
+                     [(tensor, params[name].astype(np.float32)) for name, tensor in TENSOR_NAMES.items()])
+    print(f"Model saved to {path}.")
+
+def load_model(path):
+    """Returns (params, class names) from a container or a legacy raw float32 file."""
+    if is_model_file(path):
+        model = ModelFile(path)
+        if model.kind != KIND_DENSE or model.dims != MODEL_DIMS:
+            raise ValueError(f"{path} is not a dense model with dims {MODEL_DIMS}")
+        # Views into the mapped file; evaluation only reads them
+        return {name: model.tensors[tensor] for name, tensor in TENSOR_NAMES.items()}, model.class_names
+
+    # Legacy: TCN weights [C][F][K], TCN biases [C], output weights [3][C], output biases [3]
+    shapes = {
+        'tcn_w': (TCN_CHANNELS, INPUT_SIZE, TCN_KERNEL_SIZE),
+        'tcn_b': (TCN_CHANNELS,),
+        'out_w': (LEGACY_NUM_CLASSES, TCN_CHANNELS),
+        'out_b': (LEGACY_NUM_CLASSES,),
+    }
+    expected = sum(int(np.prod(s)) for s in shapes.values())
+    flat = np.fromfile(path, dtype='<f4')
+    if flat.size != expected:
+        raise ValueError(f"{path} holds {flat.size} floats, expected {expected}")
+    params, offset = {}, 0
+    for name, shape in shapes.items():
+        size = int(np.prod(shape))
+        params[name] = flat[offset:offset + size].reshape(shape).astype(np.float32)
+        offset += size
+    return params, [f"class_{j}" for j in range(LEGACY_NUM_CLASSES)]
+
+# --- 4. Training ---
+def train(x, y, train_idx, val_idx, num_classes, epochs, batch_size, learning_rate, rng):
+    params = init_params(rng, num_classes)
+    optimizer = Adam(params, learning_rate=learning_rate)
+    x_train, y_train = x[train_idx], y[train_idx]
+    x_val, y_val = x[val_idx], y[val_idx]
+
+    print(f"Hyperparameters: Epochs={epochs}, LR={learning_rate:.4f}, Batch={batch_size}, "
+          f"Train/Val Split={TRAIN_SPLIT * 100:.0f}/{(1 - TRAIN_SPLIT) * 100:.0f}")
+    for epoch in range(epochs):
+        order = rng.permutation(len(y_train))
+        total_train_loss = 0.0
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            probs, cache = forward(params, x_train[batch])
+            labels = y_train[batch]
+            total_train_loss += float(-np.log(np.maximum(probs[np.arange(len(labels)), labels], 1e-9)).sum())
+            optimizer.step(params, backward(params, probs, labels, cache))
+
+        if (epoch + 1) % 10 == 0:
+            val_loss, val_acc = evaluate(params, x_val, y_val) if len(y_val) else (0.0, 0.0)
+            print(f"Epoch {epoch + 1:4d}/{epochs} | Train Loss: {total_train_loss / len(y_train):.4f} | "
+                  f"Val Loss: {val_loss:.4f} | Val Acc: {val_acc * 100:.2f}%", flush=True)
+    return params
 
 # --- Main Execution ---
 if __name__ == '__main__':
-    print("Starting model training process...")
-
-    # 1. Load Data
-    X, y, classes = load_data()
-    if X is None:
-        print("Exiting due to data loading failure.")
-        exit()
-
-    print(f"Loaded {X.shape[0]} samples for {len(classes)} gestures: {classes}")
-
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
-    )
-
-    # 2. Build and Train Model
-    num_classes = len(classes)
-    model = build_model(num_classes)
-    print("\nModel Summary:")
-    model.summary()
-
-    print("\nTraining model...")
-    # Setup CSVLogger to save history after each epoch
-    csv_logger = CSVLogger(HISTORY_PATH, append=False)
-
-    history = model.fit(X_train, y_train,
-                        epochs=50,
-                        batch_size=32,
-                        validation_data=(X_test, y_test),
-                        callbacks=[csv_logger],
-                        verbose=1)
-
-    # 3. Evaluate Model
-    print("\nEvaluating model...")
-    loss, accuracy = model.evaluate(X_test, y_test, verbose=0)
-    print(f'Test Accuracy: {accuracy:.4f}')
-    print(f'Test Loss: {loss:.4f}')
-
-    # 4. Save Model
-    print(f"\nSaving model to {os.path.abspath(SAVED_MODEL_PATH)}...")
-    model.export(SAVED_MODEL_PATH)
-    print(f"The model is saved at: {os.path.abspath(SAVED_MODEL_PATH)}")
-
-    # 5. Convert to ONNX
-    print(f"\nConverting model to ONNX and saving to {os.path.abspath(ONNX_MODEL_PATH)}...")
-    input_signature = [tf.TensorSpec(model.input_shape, tf.float32, name='input')]
-    onnx_model, _ = tf2onnx.convert.from_keras(model, input_signature=input_signature, opset=13)
-    onnx.save(onnx_model, ONNX_MODEL_PATH)
-    print("Model converted to ONNX successfully.")
-    print("\nModel training complete!")
+    parser = argparse.ArgumentParser(description='Vectorized NumPy trainer for the C TCN model.')
+    parser.add_argument('gestures', nargs='*', help='Gesture names in class order (default: gui_app/gestures.json).')
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--output', default=MODEL_PATH, help='Where to write c_model.bin.')
+    parser.add_argument('--epochs', type=int, default=NUM_EPOCHS)
+    parser.add_argument('--batch-size', type=int, default=32,
+                        help='Windows per Adam step. 1 reproduces the per-sample schedule of train_c.')
+    parser.add_argument('--lr', type=float, default=LEARNING_RATE)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--evaluate', metavar='MODEL',
+                        help='Only score an existing c_model.bin (e.g. one written by train_c) on the data.')
+    args = parser.parse_args()
+
+    gestures = args.gestures or load_gestures()
+    if len(gestures) > MAX_CLASSES:
+        parser.error(f"{len(gestures)} gestures given, but a model file holds at most {MAX_CLASSES} classes.")
+    rng = np.random.default_rng(args.seed)
+
+    print(f"--- Loading data from: {os.path.abspath(args.data_dir)} ---")
+    x, y = load_temporal_data(args.data_dir, gestures)
+    if x is None:
+        print("[FAILURE] No sequences found. Check data directories and file contents.")
+        raise SystemExit(1)
+    print(f"Loaded {len(y)} windows for {len(gestures)} gestures: {gestures}")
+
+    if args.evaluate:
+        params, class_names = load_model(args.evaluate)
+        if len(gestures) > len(class_names):
+            parser.error(f"{len(gestures)} gestures given, but {args.evaluate} has {len(class_names)} classes.")
+        print(f"Model classes: {class_names}")
+        loss, accuracy = evaluate(params, x, y)
+        print(f"{args.evaluate}: Loss {loss:.4f} | Accuracy {accuracy * 100:.2f}% over all windows")
+        raise SystemExit(0)
+
+    train_idx, val_idx = split_data(len(y), TRAIN_SPLIT, rng)
+    print(f"Split data into {len(train_idx)} training and {len(val_idx)} validation samples.")
+
+    start_time = time.perf_counter()
+    params = train(x, y, train_idx, val_idx, len(gestures), args.epochs, args.batch_size, args.lr, rng)
+    print(f"\nTraining Complete in {time.perf_counter() - start_time:.1f}s")
+
+    save_model(params, gestures, args.output)
@@ -0,0 +1,67 @@
+import argparse
+import json
+import os
+import shutil
+
+# --- Constants ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(SCRIPT_DIR, 'bench_baseline.json')
+DEFAULT_THRESHOLD = 0.10 # Flag kernels more than 10% slower than the baseline
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(results, baseline, threshold):
+    """Print a per-kernel comparison; returns the names of regressed kernels."""
+    regressions = []
+    print(f"{'Kernel':<24} {'baseline ns/op':>16} {'current ns/op':>16} {'change':>8}")
+    for name, current in results['kernels'].items():
+        reference = baseline['kernels'].get(name)
+        if reference is None:
+            print(f"{name:<24} {'-':>16} {current['ns_per_op']:>16.1f} {'new':>8}")
+            continue
+        change = current['ns_per_op'] / reference['ns_per_op'] - 1.0
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print(f"{name:<24} {reference['ns_per_op']:>16.1f} {current['ns_per_op']:>16.1f} {change * 100:>+7.1f}%{flag}")
+    for name in baseline['kernels'].keys() - results['kernels'].keys():
+        print(f"{name:<24} {baseline['kernels'][name]['ns_per_op']:>16.1f} {'-':>16} {'missing':>8}")
+    return regressions
+
+
+# --- Main Execution ---
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare kernel_bench JSON results against a stored baseline.')
+    parser.add_argument('results', help='JSON written by kernel_bench --json.')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Relative slowdown in ns/op that counts as a regression (default: 0.10).')
+    parser.add_argument('--update-baseline', action='store_true', help='Store the results as the new baseline.')
+    args = parser.parse_args()
+
+    results = load_results(args.results)
+    if args.update_baseline:
+        shutil.copyfile(args.results, args.baseline)
+        print(f"Baseline written to {args.baseline}")
+        raise SystemExit(0)
+    if not os.path.exists(args.baseline):
+        print(f"[FAILURE] No baseline at {args.baseline}. Record one on this machine with 'make bench-baseline' "
+              f"(or pass --update-baseline), then rerun.")
+        raise SystemExit(1)
+
+    baseline = load_results(args.baseline)
+    if baseline.get('seed') != results.get('seed'):
+        print(f"Warning: baseline seed {baseline.get('seed')} differs from {results.get('seed')}; inputs are not comparable.")
+    if abs(baseline['cpu_mhz'] - results['cpu_mhz']) > 0.05 * baseline['cpu_mhz']:
+        print(f"Warning: baseline was measured at {baseline['cpu_mhz']:.0f} MHz, these results at {results['cpu_mhz']:.0f} MHz.")
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n[FAILURE] {len(regressions)} kernel(s) regressed by more than {args.threshold * 100:.0f}%: {', '.join(regressions)}")
+        raise SystemExit(1)
+    print(f"\nNo kernel regressed by more than {args.threshold * 100:.0f}%.")
@@ -0,0 +1,146 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+#include "training_logic.h"
+
+// Constants
+#define DATA_DIR "../models/data"
+#define DEFAULT_FLOAT_MODEL "../models/c_model.bin"
+#define DEFAULT_QUANTIZED_MODEL "c_model_quantized.bin"
+#define BENCH_REPEATS 50 // Passes over the dataset per kernel
+
+typedef void (*forward_fn)(const void* model, const float* input, float* output);
+
+static void run_float(const void* model, const float* input, float* output) {
+    forward_pass_inference((const InferenceModel*)model, input, output);
+}
+
+static void run_float_unfused(const void* model, const float* input, float* output) {
+    forward_pass_inference_unfused((const InferenceModel*)model, input, output);
+}
+
+static void run_dws(const void* model, const float* input, float* output) {
+    forward_pass_dws_inference((const InferenceDWSModel*)model, input, output);
+}
+
+static void run_quantized(const void* model, const float* input, float* output) {
+    forward_pass_quantized((const QuantizedModel*)model, input, output);
+}
+
+static int argmax(const float* values, int size) {
+    int best = 0;
+    for (int i = 1; i < size; ++i) if (values[i] > values[best]) best = i;
+    return best;
+}
+
+// Mean latency in microseconds per window; predictions[] gets the top-1 class of each window.
+static double bench_kernel(forward_fn forward, const void* model, const float* windows, int num_windows, int* predictions) {
+    float output[MAX_CLASSES] = {0}; // Softmax outputs are positive, so the unused tail never wins argmax
+    struct timespec start, end;
+    volatile float sink = 0.0f; // Keeps the optimizer from dropping the loop
+
+    clock_gettime(CLOCK_MONOTONIC, &start);
+    for (int r = 0; r < BENCH_REPEATS; ++r) {
+        for (int i = 0; i < num_windows; ++i) {
+            forward(model, &windows[(size_t)i * SEQUENCE_LENGTH * INPUT_SIZE], output);
+            sink += output[0];
+        }
+    }
+    clock_gettime(CLOCK_MONOTONIC, &end);
+
+    for (int i = 0; i < num_windows; ++i) {
+        forward(model, &windows[(size_t)i * SEQUENCE_LENGTH * INPUT_SIZE], output);
+        predictions[i] = argmax(output, MAX_CLASSES);
+    }
+
+    double total_us = (end.tv_sec - start.tv_sec) * 1e6 + (end.tv_nsec - start.tv_nsec) / 1e3;
+    return total_us / ((double)BENCH_REPEATS * num_windows);
+}
+
+// One benchmarked kernel and its results
+typedef struct {
+    const char* name;
+    forward_fn forward;
+    const void* model;
+    long macs;
+    double latency_us;
+    int* predictions;
+} BenchEntry;
+
+// Loads a float model of either TCN variant into the given storage
+static int load_float_entry(const char* path, InferenceModel* dense, InferenceDWSModel* dws, BenchEntry* entry) {
+    TCNVariant variant = detect_model_variant(path);
+    if (variant == TCN_VARIANT_DWS) {
+        if (!load_dws_inference_model(dws, path)) return 0;
+        *entry = (BenchEntry){"forward_pass_dws_inference", run_dws, dws, model_macs(TCN_VARIANT_DWS), 0.0, NULL};
+        return 1;
+    }
+    if (!load_inference_model(dense, path)) return 0;
+    *entry = (BenchEntry){"forward_pass_inference", run_float, dense, model_macs(TCN_VARIANT_DENSE), 0.0, NULL};
+    return 1;
+}
+
+int main(int argc, char* argv[]) {
+    const char* compare_path = NULL;
+    int arg = 3;
+    if (argc > arg + 1 && strcmp(argv[arg], "--compare") == 0) {
+        compare_path = argv[arg + 1];
+        arg += 2;
+    }
+    if (argc <= arg) {
+        fprintf(stderr, "Usage: %s <float_model> <quantized_model> [--compare <float_model>] <gesture> [gesture ...]\n", argv[0]);
+        fprintf(stderr, "Example: %s %s %s wave circle pointing\n", argv[0], DEFAULT_FLOAT_MODEL, DEFAULT_QUANTIZED_MODEL);
+        fprintf(stderr, "Float models may be the dense or the depthwise-separable variant (detected by file size).\n");
+        return 1;
+    }
+    const char** gestures = (const char**)&argv[arg];
+    int num_gestures = argc - arg;
+
+    static InferenceModel dense_models[2];
+    static InferenceDWSModel dws_models[2];
+    static QuantizedModel quantized_model;
+    BenchEntry entries[4];
+    int num_entries = 0;
+
+    if (!load_float_entry(argv[1], &dense_models[0], &dws_models[0], &entries[num_entries++])) return 1;
+    if (entries[0].forward == run_float) {
+        // Reference for the fused dense kernel
+        entries[num_entries++] = (BenchEntry){"forward_pass_inference_unfused", run_float_unfused, &dense_models[0], model_macs(TCN_VARIANT_DENSE), 0.0, NULL};
+    }
+    if (compare_path) {
+        if (!load_float_entry(compare_path, &dense_models[1], &dws_models[1], &entries[num_entries++])) return 1;
+    }
+    if (!load_quantized_model(&quantized_model, argv[2])) return 1;
+    entries[num_entries++] = (BenchEntry){"forward_pass_quantized", run_quantized, &quantized_model, model_macs(TCN_VARIANT_DENSE), 0.0, NULL};
+
+    float* windows = NULL;
+    int* labels = NULL;
+    int num_windows = 0;
+    if (load_temporal_data(DATA_DIR, gestures, num_gestures, &windows, &labels, &num_windows) != 0 || num_windows == 0) {
+        fprintf(stderr, "Error: No benchmark data found in %s\n", DATA_DIR);
+        return 1;
+    }
+
+    for (int e = 0; e < num_entries; ++e) {
+        entries[e].predictions = (int*)malloc(num_windows * sizeof(int));
+        entries[e].latency_us = bench_kernel(entries[e].forward, entries[e].model, windows, num_windows, entries[e].predictions);
+    }
+
+    printf("\n[BENCHMARK] %d windows x %d repeats\n", num_windows, BENCH_REPEATS);
+    for (int e = 0; e < num_entries; ++e) {
+        int correct = 0, agree = 0;
+        for (int i = 0; i < num_windows; ++i) {
+            correct += (entries[e].predictions[i] == labels[i]);
+            agree += (entries[e].predictions[i] == entries[0].predictions[i]);
+        }
+        printf("[BENCHMARK] %-30s %8.2f us/window  %6ld MACs  accuracy %6.2f%%  agreement %6.2f%%  speedup %.2fx\n",
+               entries[e].name, entries[e].latency_us, entries[e].macs, 100.0 * correct / num_windows,
+               100.0 * agree / num_windows, entries[0].latency_us / entries[e].latency_us);
+    }
+
+    free(windows);
+    free(labels);
+    for (int e = 0; e < num_entries; ++e) free(entries[e].predictions);
+    return 0;
+}
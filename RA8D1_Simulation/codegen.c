@@ -0,0 +1,402 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <ctype.h>
+#include "training_logic.h"
+#include "model_file.h"
+
+// Model-to-C Code Generator
+// Emits a self-contained <prefix>.c/.h pair for one trained dense model (FP32 or
+// INT8): the weights become const tables, every dimension is a compile-time
+// constant, the causal-padding edge steps are peeled so the steady-state loop
+// has no bounds checks, and the kernel taps are unrolled. All channels are
+// computed together as independent lanes (weights stored [k][c_in][c_out]), so
+// the inner loop vectorizes while each channel still accumulates in the generic
+// kernel's order: the output is bit-identical to forward_pass_inference /
+// forward_pass_quantized (see codegen_check.c).
+
+#define VALUES_PER_LINE 8
+#define INT8_VALUES_PER_LINE 16
+#define EDGE_STEPS ((TCN_KERNEL_SIZE - 1) * TCN_DILATION) // Steps whose first taps fall before t = 0
+
+static_assert(SEQUENCE_LENGTH > EDGE_STEPS, "Error: The window must be longer than the causal padding!");
+
+// Everything the emitters need to know about the output
+typedef struct {
+    FILE* source;
+    FILE* header;
+    char symbol[64]; // Lowercase C identifier used for functions and tables, e.g. model_gen
+    char macro[64];  // Uppercase form used for macros, e.g. MODEL_GEN
+    const char* model_path;
+    const ClassNames* classes;
+    int quantized;
+} CodegenOutput;
+
+// Symbol from the output file name: "generated/model-gen" -> "model_gen", "4class" -> "model_4class"
+static void make_symbols(const char* out_prefix, CodegenOutput* out) {
+    const char* base = strrchr(out_prefix, '/');
+    base = base ? base + 1 : out_prefix;
+    size_t n = 0;
+    if (isdigit((unsigned char)base[0])) n = (size_t)snprintf(out->symbol, sizeof(out->symbol), "model_");
+    for (; *base && n < sizeof(out->symbol) - 1; ++base) {
+        out->symbol[n++] = isalnum((unsigned char)*base) ? (char)tolower((unsigned char)*base) : '_';
+    }
+    out->symbol[n] = '\0';
+    for (size_t i = 0; i <= n; ++i) out->macro[i] = (char)toupper((unsigned char)out->symbol[i]);
+}
+
+// %.8e keeps 9 significant digits, which round-trips every float exactly
+static void emit_floats(FILE* fp, const char* indent, const float* values, int count) {
+    for (int i = 0; i < count; ++i) {
+        if (i % VALUES_PER_LINE == 0) fprintf(fp, "%s", indent);
+        fprintf(fp, "%.8ef,", values[i]);
+        fprintf(fp, (i % VALUES_PER_LINE == VALUES_PER_LINE - 1 || i == count - 1) ? "\n" : " ");
+    }
+}
+
+static void emit_ints(FILE* fp, const char* indent, const int32_t* values, int count, int per_line) {
+    for (int i = 0; i < count; ++i) {
+        if (i % per_line == 0) fprintf(fp, "%s", indent);
+        fprintf(fp, "%d,", values[i]);
+        fprintf(fp, (i % per_line == per_line - 1 || i == count - 1) ? "\n" : " ");
+    }
+}
+
+static void emit_int8s(FILE* fp, const char* indent, const int8_t* values, int count) {
+    int32_t widened[INPUT_SIZE > TCN_CHANNELS ? INPUT_SIZE : TCN_CHANNELS];
+    for (int i = 0; i < count; ++i) widened[i] = values[i];
+    emit_ints(fp, indent, widened, count, INT8_VALUES_PER_LINE);
+}
+
+static void emit_header(const CodegenOutput* out) {
+    FILE* fp = out->header;
+    const char* m = out->macro;
+    fprintf(fp, "#ifndef %s_H\n#define %s_H\n\n", m, m);
+    fprintf(fp, "// Generated by codegen from %s; do not edit.\n", out->model_path);
+    fprintf(fp, "// %s dense TCN specialized for these weights and dimensions.\n\n",
+            out->quantized ? "INT8" : "FP32");
+    fprintf(fp, "#define %s_INPUT_SIZE %d\n", m, INPUT_SIZE);
+    fprintf(fp, "#define %s_SEQUENCE_LENGTH %d\n", m, SEQUENCE_LENGTH);
+    fprintf(fp, "#define %s_TCN_CHANNELS %d\n", m, TCN_CHANNELS);
+    fprintf(fp, "#define %s_KERNEL_SIZE %d\n", m, TCN_KERNEL_SIZE);
+    fprintf(fp, "#define %s_DILATION %d\n", m, TCN_DILATION);
+    fprintf(fp, "#define %s_NUM_CLASSES %d\n", m, out->classes->count);
+    fprintf(fp, "#define %s_QUANTIZED %d\n\n", m, out->quantized);
+    fprintf(fp, "extern const char* const %s_class_names[%s_NUM_CLASSES];\n\n", out->symbol, m);
+    fprintf(fp, "// input: [%s_SEQUENCE_LENGTH][%s_INPUT_SIZE] features of one full window\n", m, m);
+    fprintf(fp, "// output: %s_NUM_CLASSES class probabilities\n", m);
+    fprintf(fp, "void %s_forward(const float* input, float* output);\n\n", out->symbol);
+    fprintf(fp, "// Prefix-free names, so a harness can include any generated header\n");
+    fprintf(fp, "#define GENERATED_MODEL_FORWARD %s_forward\n", out->symbol);
+    fprintf(fp, "#define GENERATED_MODEL_FORWARD_NAME \"%s_forward\"\n", out->symbol);
+    fprintf(fp, "#define GENERATED_MODEL_CLASS_NAMES %s_class_names\n", out->symbol);
+    fprintf(fp, "#define GENERATED_MODEL_INPUT_SIZE %s_INPUT_SIZE\n", m);
+    fprintf(fp, "#define GENERATED_MODEL_SEQUENCE_LENGTH %s_SEQUENCE_LENGTH\n", m);
+    fprintf(fp, "#define GENERATED_MODEL_TCN_CHANNELS %s_TCN_CHANNELS\n", m);
+    fprintf(fp, "#define GENERATED_MODEL_KERNEL_SIZE %s_KERNEL_SIZE\n", m);
+    fprintf(fp, "#define GENERATED_MODEL_DILATION %s_DILATION\n", m);
+    fprintf(fp, "#define GENERATED_MODEL_NUM_CLASSES %s_NUM_CLASSES\n", m);
+    fprintf(fp, "#define GENERATED_MODEL_QUANTIZED %s_QUANTIZED\n\n", m);
+    fprintf(fp, "#endif // %s_H\n", m);
+}
+
+static void emit_preamble(const CodegenOutput* out, const char* header_name) {
+    FILE* fp = out->source;
+    fprintf(fp, "// Generated by codegen from %s; do not edit.\n", out->model_path);
+    fprintf(fp, "// Causal conv (kernel %d, dilation %d) -> Leaky ReLU -> GAP -> dense -> softmax,\n",
+            TCN_KERNEL_SIZE, TCN_DILATION);
+    fprintf(fp, "// with the same arithmetic, in the same order, as the generic %s kernel.\n\n",
+            out->quantized ? "forward_pass_quantized" : "forward_pass_inference");
+    fprintf(fp, "#include <math.h>\n#include <stdint.h>\n#include \"%s\"\n\n", header_name);
+    fprintf(fp, "#define INPUT_SIZE %s_INPUT_SIZE\n", out->macro);
+    fprintf(fp, "#define SEQUENCE_LENGTH %s_SEQUENCE_LENGTH\n", out->macro);
+    fprintf(fp, "#define TCN_CHANNELS %s_TCN_CHANNELS\n", out->macro);
+    fprintf(fp, "#define KERNEL_SIZE %s_KERNEL_SIZE\n", out->macro);
+    fprintf(fp, "#define NUM_CLASSES %s_NUM_CLASSES\n\n", out->macro);
+
+    fprintf(fp, "const char* const %s_class_names[NUM_CLASSES] = {", out->symbol);
+    for (int j = 0; j < out->classes->count; ++j) {
+        fprintf(fp, "%s\"", j ? ", " : "");
+        for (const char* c = out->classes->names[j]; *c; ++c) {
+            if (*c == '"' || *c == '\\') fputc('\\', fp);
+            fputc(*c, fp);
+        }
+        fputc('"', fp);
+    }
+    fprintf(fp, "};\n\n");
+}
+
+// One output step for all channels: the biases plus every tap whose input step exists.
+// step < 0 writes the steady-state body, indexed by the loop variable t.
+static void emit_step(FILE* fp, int step, const char* indent, const char* start, const char* accumulate, const char* finish) {
+    fprintf(fp, "%s%s\n", indent, start);
+    for (int k = 0; k < TCN_KERNEL_SIZE; ++k) {
+        int offset = (TCN_KERNEL_SIZE - 1 - k) * TCN_DILATION;
+        if (step >= 0) {
+            if (step - offset < 0) continue;
+            fprintf(fp, "%s%s(sums, &x[%d * INPUT_SIZE], tcn_weights[%d]);\n", indent, accumulate, step - offset, k);
+        } else if (offset == 0) {
+            fprintf(fp, "%s%s(sums, &x[t * INPUT_SIZE], tcn_weights[%d]);\n", indent, accumulate, k);
+        } else {
+            fprintf(fp, "%s%s(sums, &x[(t - %d) * INPUT_SIZE], tcn_weights[%d]);\n", indent, accumulate, offset, k);
+        }
+    }
+    fprintf(fp, "%s%s\n", indent, finish);
+}
+
+// The time loop: peeled edge steps, then the branch-free steady state
+static void emit_time_loop(FILE* fp, const char* start, const char* accumulate, const char* finish) {
+    for (int t = 0; t < EDGE_STEPS; ++t) {
+        fprintf(fp, "    // t = %d: taps before the window start are causal padding\n", t);
+        emit_step(fp, t, "    ", start, accumulate, finish);
+    }
+    fprintf(fp, "    for (int t = %d; t < SEQUENCE_LENGTH; ++t) {\n", EDGE_STEPS);
+    emit_step(fp, -1, "        ", start, accumulate, finish);
+    fprintf(fp, "    }\n");
+}
+
+static void emit_float_model(const CodegenOutput* out, const InferenceModel* model) {
+    FILE* fp = out->source;
+    const int num_classes = out->classes->count;
+
+    // Conv weights repacked to [k][c_in][c_out]: one row of channel lanes per input feature
+    fprintf(fp, "static const float tcn_weights[KERNEL_SIZE][INPUT_SIZE][TCN_CHANNELS] = {\n");
+    for (int k = 0; k < TCN_KERNEL_SIZE; ++k) {
+        fprintf(fp, "    {\n");
+        for (int i = 0; i < INPUT_SIZE; ++i) {
+            float lanes[TCN_CHANNELS];
+            for (int c = 0; c < TCN_CHANNELS; ++c) lanes[c] = model->tcn_block.weights[c * (INPUT_SIZE * TCN_KERNEL_SIZE) + i * TCN_KERNEL_SIZE + k];
+            fprintf(fp, "        {\n");
+            emit_floats(fp, "            ", lanes, TCN_CHANNELS);
+            fprintf(fp, "        },\n");
+        }
+        fprintf(fp, "    },\n");
+    }
+    fprintf(fp, "};\n\nstatic const float tcn_biases[TCN_CHANNELS] = {\n");
+    emit_floats(fp, "    ", model->tcn_block.biases, TCN_CHANNELS);
+    fprintf(fp, "};\n\nstatic const float output_weights[NUM_CLASSES][TCN_CHANNELS] = {\n");
+    for (int j = 0; j < num_classes; ++j) {
+        fprintf(fp, "    {\n");
+        emit_floats(fp, "        ", &model->output_layer.weights[j * TCN_CHANNELS], TCN_CHANNELS);
+        fprintf(fp, "    },\n");
+    }
+    fprintf(fp, "};\n\nstatic const float output_biases[NUM_CLASSES] = {\n");
+    emit_floats(fp, "    ", model->output_layer.biases, num_classes);
+    fprintf(fp, "};\n\n");
+
+    fprintf(fp,
+        "// One tap for every channel: sums[c] += x[i] * w[i][c] in index order, so each\n"
+        "// channel accumulates exactly like the generic kernel (no reassociation)\n"
+        "static inline void accumulate_tap(float* sums, const float* x, const float (*w)[TCN_CHANNELS]) {\n"
+        "    for (int i = 0; i < INPUT_SIZE; ++i) {\n"
+        "        for (int c = 0; c < TCN_CHANNELS; ++c) sums[c] += x[i] * w[i][c];\n"
+        "    }\n"
+        "}\n\n"
+        "static inline float leaky_relu(float x) {\n"
+        "    return x > 0 ? x : 0.01f * x;\n"
+        "}\n\n"
+        "void %s_forward(const float* x, float* output) {\n"
+        "    float pooled_sums[TCN_CHANNELS] = {0};\n"
+        "    float sums[TCN_CHANNELS];\n", out->symbol);
+    emit_time_loop(fp, "for (int c = 0; c < TCN_CHANNELS; ++c) sums[c] = tcn_biases[c];", "accumulate_tap",
+                   "for (int c = 0; c < TCN_CHANNELS; ++c) pooled_sums[c] += leaky_relu(sums[c]);");
+    fprintf(fp,
+        "    float pooled[TCN_CHANNELS];\n"
+        "    for (int c = 0; c < TCN_CHANNELS; ++c) pooled[c] = pooled_sums[c] / SEQUENCE_LENGTH;\n\n"
+        "    float logits[NUM_CLASSES];\n"
+        "    for (int j = 0; j < NUM_CLASSES; ++j) {\n"
+        "        float sum = output_biases[j];\n"
+        "        for (int c = 0; c < TCN_CHANNELS; ++c) sum += pooled[c] * output_weights[j][c];\n"
+        "        logits[j] = sum;\n"
+        "    }\n\n"
+        "    float max_logit = logits[0];\n"
+        "    for (int j = 1; j < NUM_CLASSES; ++j) if (logits[j] > max_logit) max_logit = logits[j];\n"
+        "    float sum_exp = 0.0f;\n"
+        "    for (int j = 0; j < NUM_CLASSES; ++j) {\n"
+        "        output[j] = expf(logits[j] - max_logit);\n"
+        "        sum_exp += output[j];\n"
+        "    }\n"
+        "    for (int j = 0; j < NUM_CLASSES; ++j) output[j] /= sum_exp;\n"
+        "}\n");
+}
+
+static void emit_quantized_model(const CodegenOutput* out, const QuantizedModel* model) {
+    FILE* fp = out->source;
+    const int num_classes = out->classes->count;
+
+    // 1.0f / input_scale, the same float quantized_forward computes at run time
+    fprintf(fp, "#define INV_INPUT_SCALE %.8ef\n", 1.0f / model->input_scale);
+    fprintf(fp, "#define SOFTMAX_FRAC_BITS %d\n#define SOFTMAX_LUT_SIZE %d\n\n", SOFTMAX_FRAC_BITS, SOFTMAX_LUT_SIZE);
+
+    // INT8 values held in int16 lanes: an int8 x int8 product fits in 16 bits, so a
+    // whole row of channels is one 16-bit vector multiply (widened when accumulated)
+    fprintf(fp, "static const int16_t tcn_weights[KERNEL_SIZE][INPUT_SIZE][TCN_CHANNELS] = {\n");
+    for (int k = 0; k < TCN_KERNEL_SIZE; ++k) {
+        fprintf(fp, "    {\n");
+        for (int i = 0; i < INPUT_SIZE; ++i) {
+            int8_t lanes[TCN_CHANNELS];
+            for (int c = 0; c < TCN_CHANNELS; ++c) lanes[c] = model->tcn_packed_weights[(c * TCN_KERNEL_SIZE + k) * QUANT_INPUT_STRIDE + i];
+            fprintf(fp, "        {\n");
+            emit_int8s(fp, "            ", lanes, TCN_CHANNELS);
+            fprintf(fp, "        },\n");
+        }
+        fprintf(fp, "    },\n");
+    }
+    fprintf(fp, "};\n\n");
+
+    const struct { const char* name; const int32_t* values; } channel_tables[] = {
+        {"tcn_biases", model->tcn_block_biases},
+        {"tcn_multipliers", model->tcn_multipliers},
+        {"tcn_shifts", model->tcn_shifts},
+        {"tcn_negative_multipliers", model->tcn_negative_multipliers},
+        {"tcn_negative_shifts", model->tcn_negative_shifts},
+    };
+    for (size_t i = 0; i < sizeof(channel_tables) / sizeof(channel_tables[0]); ++i) {
+        fprintf(fp, "static const int32_t %s[TCN_CHANNELS] = {\n", channel_tables[i].name);
+        emit_ints(fp, "    ", channel_tables[i].values, TCN_CHANNELS, VALUES_PER_LINE);
+        fprintf(fp, "};\n\n");
+    }
+
+    fprintf(fp, "static const int8_t output_weights[NUM_CLASSES][TCN_CHANNELS] = {\n");
+    for (int j = 0; j < num_classes; ++j) {
+        fprintf(fp, "    {\n");
+        emit_int8s(fp, "        ", &model->output_layer_weights[j * TCN_CHANNELS], TCN_CHANNELS);
+        fprintf(fp, "    },\n");
+    }
+    fprintf(fp, "};\n\n");
+    const struct { const char* name; const int32_t* values; } class_tables[] = {
+        {"output_biases", model->output_layer_biases},
+        {"output_multipliers", model->output_multipliers},
+        {"output_shifts", model->output_shifts},
+    };
+    for (size_t i = 0; i < sizeof(class_tables) / sizeof(class_tables[0]); ++i) {
+        fprintf(fp, "static const int32_t %s[NUM_CLASSES] = {\n", class_tables[i].name);
+        emit_ints(fp, "    ", class_tables[i].values, num_classes, VALUES_PER_LINE);
+        fprintf(fp, "};\n\n");
+    }
+
+    int32_t lut[SOFTMAX_LUT_SIZE];
+    for (int i = 0; i < SOFTMAX_LUT_SIZE; ++i) lut[i] = softmax_exp_lut[i];
+    fprintf(fp, "// exp(-i / 16) in Q15\nstatic const uint16_t softmax_exp_lut[SOFTMAX_LUT_SIZE] = {\n");
+    emit_ints(fp, "    ", lut, SOFTMAX_LUT_SIZE, INT8_VALUES_PER_LINE);
+    fprintf(fp, "};\n\n");
+
+    fprintf(fp,
+        "// One tap for every channel; integer sums are exact in any order\n"
+        "static inline void accumulate_tap(int32_t* sums, const int16_t* x, const int16_t (*w)[TCN_CHANNELS]) {\n"
+        "    for (int i = 0; i < INPUT_SIZE; ++i) {\n"
+        "        for (int c = 0; c < TCN_CHANNELS; ++c) sums[c] += (int32_t)x[i] * w[i][c];\n"
+        "    }\n"
+        "}\n\n"
+        "static inline int32_t requantize(int32_t acc, int32_t multiplier, int32_t shift) {\n"
+        "    int64_t product = (int64_t)acc * multiplier;\n"
+        "    return (int32_t)((product + ((int64_t)1 << (shift - 1))) >> shift);\n"
+        "}\n\n"
+        "// Leaky ReLU by multiplier choice, saturated to int8\n"
+        "static inline int32_t activate(int32_t acc, int c) {\n"
+        "    int32_t activation = (acc >= 0)\n"
+        "        ? requantize(acc, tcn_multipliers[c], tcn_shifts[c])\n"
+        "        : requantize(acc, tcn_negative_multipliers[c], tcn_negative_shifts[c]);\n"
+        "    if (activation > 127) activation = 127;\n"
+        "    if (activation < -128) activation = -128;\n"
+        "    return activation;\n"
+        "}\n\n"
+        "void %s_forward(const float* input, float* output) {\n"
+        "    int16_t x[SEQUENCE_LENGTH * INPUT_SIZE]; // INT8 range\n"
+        "    for (int i = 0; i < SEQUENCE_LENGTH * INPUT_SIZE; ++i) {\n"
+        "        float q = roundf(input[i] * INV_INPUT_SCALE);\n"
+        "        x[i] = (int16_t)(q > 127.0f ? 127.0f : (q < -128.0f ? -128.0f : q));\n"
+        "    }\n\n"
+        "    int32_t pooled_sum[TCN_CHANNELS] = {0};\n"
+        "    int32_t sums[TCN_CHANNELS];\n", out->symbol);
+    emit_time_loop(fp, "for (int c = 0; c < TCN_CHANNELS; ++c) sums[c] = tcn_biases[c];", "accumulate_tap",
+                   "for (int c = 0; c < TCN_CHANNELS; ++c) pooled_sum[c] += activate(sums[c], c);");
+    fprintf(fp,
+        "\n"
+        "    int32_t logits[NUM_CLASSES];\n"
+        "    for (int j = 0; j < NUM_CLASSES; ++j) {\n"
+        "        int32_t acc = output_biases[j];\n"
+        "        for (int c = 0; c < TCN_CHANNELS; ++c) acc += pooled_sum[c] * output_weights[j][c];\n"
+        "        logits[j] = requantize(acc, output_multipliers[j], output_shifts[j]);\n"
+        "    }\n\n"
+        "    int32_t max_logit = logits[0];\n"
+        "    for (int j = 1; j < NUM_CLASSES; ++j) if (logits[j] > max_logit) max_logit = logits[j];\n"
+        "    uint32_t exps[NUM_CLASSES];\n"
+        "    uint32_t sum_exp = 0;\n"
+        "    for (int j = 0; j < NUM_CLASSES; ++j) {\n"
+        "        int32_t index = (max_logit - logits[j]) >> (SOFTMAX_FRAC_BITS - 4);\n"
+        "        exps[j] = index < SOFTMAX_LUT_SIZE ? softmax_exp_lut[index] : 0;\n"
+        "        sum_exp += exps[j];\n"
+        "    }\n"
+        "    for (int j = 0; j < NUM_CLASSES; ++j) {\n"
+        "        uint32_t probability_q15 = (exps[j] << 15) / sum_exp;\n"
+        "        output[j] = (float)probability_q15 / 32768.0f;\n"
+        "    }\n"
+        "}\n");
+}
+
+static FILE* open_output(const char* out_prefix, const char* extension, char* path, size_t path_size) {
+    snprintf(path, path_size, "%s%s", out_prefix, extension);
+    FILE* fp = fopen(path, "w");
+    if (!fp) perror(path);
+    return fp;
+}
+
+int main(int argc, char* argv[]) {
+    if (argc != 3) {
+        fprintf(stderr, "Usage: %s <model.bin> <out_prefix>\n", argv[0]);
+        fprintf(stderr, "Example: %s ../models/c_model.bin generated/model_gen  (writes model_gen.c and model_gen.h)\n", argv[0]);
+        fprintf(stderr, "INT8 models are detected by their header or a _quantized.bin name.\n");
+        return 1;
+    }
+    const char* model_path = argv[1];
+    const char* out_prefix = argv[2];
+
+    static InferenceModel float_model;
+    static QuantizedModel quantized_model;
+    CodegenOutput out = {0};
+    out.model_path = model_path;
+    out.quantized = strstr(model_path, "_quantized.bin") != NULL || model_file_kind(model_path) == MODEL_KIND_INT8;
+    if (out.quantized) {
+        if (!load_quantized_model(&quantized_model, model_path)) return 1;
+        out.classes = &quantized_model.classes;
+    } else {
+        if (detect_model_variant(model_path) == TCN_VARIANT_DWS) {
+            fprintf(stderr, "Error: %s is a depthwise-separable model; codegen supports the dense FP32 and INT8 models.\n", model_path);
+            return 1;
+        }
+        if (!load_inference_model(&float_model, model_path)) return 1;
+        out.classes = &float_model.classes;
+    }
+    make_symbols(out_prefix, &out);
+    if (out.symbol[0] == '\0') {
+        fprintf(stderr, "Error: Cannot derive a C symbol from %s.\n", out_prefix);
+        return 1;
+    }
+
+    char source_path[512], header_path[512];
+    out.header = open_output(out_prefix, ".h", header_path, sizeof(header_path));
+    if (!out.header) return 1;
+    out.source = open_output(out_prefix, ".c", source_path, sizeof(source_path));
+    if (!out.source) {
+        fclose(out.header);
+        return 1;
+    }
+
+    const char* header_name = strrchr(header_path, '/');
+    header_name = header_name ? header_name + 1 : header_path;
+    emit_header(&out);
+    emit_preamble(&out, header_name);
+    if (out.quantized) emit_quantized_model(&out, &quantized_model);
+    else emit_float_model(&out, &float_model);
+
+    int success = fclose(out.header) == 0;
+    success &= fclose(out.source) == 0;
+    if (!success) {
+        fprintf(stderr, "Error: Failed to write %s / %s.\n", source_path, header_path);
+        return 1;
+    }
+    printf("[CODEGEN] %s (%s, %d classes) -> %s, %s; entry point %s_forward()\n", model_path,
+           out.quantized ? "INT8" : "FP32", out.classes->count, source_path, header_path, out.symbol);
+    return 0;
+}
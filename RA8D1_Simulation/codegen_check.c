@@ -0,0 +1,155 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+#include "training_logic.h"
+#include "model_file.h"
+
+// Parity + speed check for a generated model (see codegen.c). Build with
+// -DGENERATED_MODEL_HEADER='"generated/model_gen.h"' and link the generated .c;
+// 'make codegen-check' does both.
+#ifndef GENERATED_MODEL_HEADER
+#error "Define GENERATED_MODEL_HEADER to the header written by codegen"
+#endif
+#include GENERATED_MODEL_HEADER
+
+static_assert(GENERATED_MODEL_INPUT_SIZE == INPUT_SIZE && GENERATED_MODEL_SEQUENCE_LENGTH == SEQUENCE_LENGTH
+              && GENERATED_MODEL_TCN_CHANNELS == TCN_CHANNELS && GENERATED_MODEL_KERNEL_SIZE == TCN_KERNEL_SIZE
+              && GENERATED_MODEL_DILATION == TCN_DILATION,
+              "Error: The generated model was built for different dimensions!");
+
+#define DATA_DIR "../models/data"
+#define RANDOM_WINDOWS 256  // Seeded windows, including values that saturate the INT8 input
+#define RANDOM_SEED 1234
+#define CHECK_REPEATS 50    // Timed passes over all windows per kernel
+
+typedef void (*forward_fn)(const void* model, const float* input, float* output);
+
+static void run_float(const void* model, const float* input, float* output) {
+    forward_pass_inference((const InferenceModel*)model, input, output);
+}
+
+static void run_quantized(const void* model, const float* input, float* output) {
+    forward_pass_quantized((const QuantizedModel*)model, input, output);
+}
+
+static void run_generated(const void* model, const float* input, float* output) {
+    (void)model;
+    GENERATED_MODEL_FORWARD(input, output);
+}
+
+// Mean latency in microseconds per window
+static double time_kernel(forward_fn forward, const void* model, const float* windows, int num_windows) {
+    float output[MAX_CLASSES];
+    struct timespec start, end;
+    volatile float sink = 0.0f; // Keeps the optimizer from dropping the loop
+
+    clock_gettime(CLOCK_MONOTONIC, &start);
+    for (int r = 0; r < CHECK_REPEATS; ++r) {
+        for (int i = 0; i < num_windows; ++i) {
+            forward(model, &windows[(size_t)i * SEQUENCE_LENGTH * INPUT_SIZE], output);
+            sink += output[0];
+        }
+    }
+    clock_gettime(CLOCK_MONOTONIC, &end);
+
+    double total_us = (end.tv_sec - start.tv_sec) * 1e6 + (end.tv_nsec - start.tv_nsec) / 1e3;
+    return total_us / ((double)CHECK_REPEATS * num_windows);
+}
+
+int main(int argc, char* argv[]) {
+    if (argc < 2) {
+        fprintf(stderr, "Usage: %s <model.bin> [gesture ...]\n", argv[0]);
+        fprintf(stderr, "The model must be the one %s was generated from; gestures add their recorded windows to the seeded ones.\n",
+                GENERATED_MODEL_FORWARD_NAME);
+        return 1;
+    }
+    const char* model_path = argv[1];
+    const char** gestures = (const char**)&argv[2];
+    int num_gestures = argc - 2;
+
+    static InferenceModel float_model;
+    static QuantizedModel quantized_model;
+    forward_fn generic;
+    const void* model;
+    const char* generic_name;
+    int num_classes;
+    int quantized = strstr(model_path, "_quantized.bin") != NULL || model_file_kind(model_path) == MODEL_KIND_INT8;
+    if (quantized != GENERATED_MODEL_QUANTIZED) {
+        fprintf(stderr, "Error: %s is %s, but %s was generated from %s model.\n", model_path,
+                quantized ? "INT8" : "FP32", GENERATED_MODEL_FORWARD_NAME, GENERATED_MODEL_QUANTIZED ? "an INT8" : "an FP32");
+        return 1;
+    }
+    if (quantized) {
+        if (!load_quantized_model(&quantized_model, model_path)) return 1;
+        generic = run_quantized;
+        model = &quantized_model;
+        generic_name = "forward_pass_quantized";
+        num_classes = quantized_model.classes.count;
+    } else {
+        if (!load_inference_model(&float_model, model_path)) return 1;
+        generic = run_float;
+        model = &float_model;
+        generic_name = "forward_pass_inference";
+        num_classes = float_model.classes.count;
+    }
+    if (num_classes != GENERATED_MODEL_NUM_CLASSES) {
+        fprintf(stderr, "Error: %s has %d classes, but %s was generated for %d.\n",
+                model_path, num_classes, GENERATED_MODEL_FORWARD_NAME, GENERATED_MODEL_NUM_CLASSES);
+        return 1;
+    }
+
+    // Seeded windows first, then the recorded ones (if gestures were given)
+    float* dataset = NULL;
+    int* labels = NULL;
+    int num_dataset = 0;
+    if (num_gestures > 0 && (load_temporal_data(DATA_DIR, gestures, num_gestures, &dataset, &labels, &num_dataset) != 0 || num_dataset == 0)) {
+        fprintf(stderr, "Error: No data found in %s for the given gestures\n", DATA_DIR);
+        return 1;
+    }
+    const size_t window_size = SEQUENCE_LENGTH * INPUT_SIZE;
+    int num_windows = RANDOM_WINDOWS + num_dataset;
+    float* windows = (float*)malloc((size_t)num_windows * window_size * sizeof(float));
+    if (!windows) {
+        fprintf(stderr, "Error: Failed to allocate %d windows\n", num_windows);
+        return 1;
+    }
+    srand(RANDOM_SEED);
+    for (size_t i = 0; i < RANDOM_WINDOWS * window_size; ++i) {
+        windows[i] = 2.0f * rand() / (float)RAND_MAX - 1.0f;
+    }
+    if (num_dataset > 0) memcpy(&windows[RANDOM_WINDOWS * window_size], dataset, (size_t)num_dataset * window_size * sizeof(float));
+    free(dataset);
+    free(labels);
+
+    // Parity: every output float must match bit for bit
+    int mismatches = 0;
+    for (int i = 0; i < num_windows; ++i) {
+        const float* window = &windows[(size_t)i * window_size];
+        float expected[MAX_CLASSES], actual[MAX_CLASSES];
+        generic(model, window, expected);
+        GENERATED_MODEL_FORWARD(window, actual);
+        if (memcmp(expected, actual, num_classes * sizeof(float)) == 0) continue;
+        if (mismatches++ == 0) {
+            fprintf(stderr, "[CODEGEN] First mismatch at window %d:\n", i);
+            for (int j = 0; j < num_classes; ++j) {
+                fprintf(stderr, "[CODEGEN]   %-16s generic %.9g  generated %.9g\n", GENERATED_MODEL_CLASS_NAMES[j], expected[j], actual[j]);
+            }
+        }
+    }
+
+    double generic_us = time_kernel(generic, model, windows, num_windows);
+    double generated_us = time_kernel(run_generated, NULL, windows, num_windows);
+    free(windows);
+
+    printf("\n[CODEGEN] %s (%s, %d classes): %d windows (%d seeded + %d recorded) x %d repeats\n", model_path,
+           quantized ? "INT8" : "FP32", num_classes, num_windows, RANDOM_WINDOWS, num_dataset, CHECK_REPEATS);
+    printf("[CODEGEN] Parity: %d/%d windows bit-identical\n", num_windows - mismatches, num_windows);
+    printf("[CODEGEN] %-26s %8.2f us/window\n", generic_name, generic_us);
+    printf("[CODEGEN] %-26s %8.2f us/window  speedup %.2fx\n", GENERATED_MODEL_FORWARD_NAME, generated_us, generic_us / generated_us);
+    if (mismatches) {
+        fprintf(stderr, "[CODEGEN] FAILED: %d windows differ from %s\n", mismatches, generic_name);
+        return 1;
+    }
+    return 0;
+}
@@ -0,0 +1,172 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include "training_logic.h"
+#include "model_file.h"
+
+// Replays the recorded gesture streams as if a hand appeared every ONSET_SPACING
+// frames and measures the frames until the first accepted correct prediction,
+// with full windows only vs. with early partial windows.
+// The client policy mirrors GesturePredictor in gui_app/logic.py.
+
+#define DATA_DIR "../models/data"
+#define WINDOW_STRIDE 5              // GesturePredictor.window_stride
+#define CONFIDENCE_THRESHOLD 0.5f    // GesturePredictor.confidence_threshold
+#define EARLY_CONFIDENCE_THRESHOLD 0.9f // GesturePredictor.early_confidence_threshold
+#define ONSET_SPACING 30             // Frames between simulated hand onsets
+#define REPLAY_HORIZON 60            // Frames after an onset before it counts as a miss
+#define FRAME_RATE 30.0              // Camera frames per second, for the ms column
+
+typedef struct {
+    int onsets;
+    int misses;
+    long frames_to_correct; // Summed over onsets with a correct prediction
+    int early_wrong;        // Accepted partial-window predictions with the wrong class
+} ReplayStats;
+
+static const InferenceModel* g_float_model;
+static const QuantizedModel* g_quantized_model;
+
+static float threshold_for_length(int num_frames) {
+    if (num_frames >= SEQUENCE_LENGTH) return CONFIDENCE_THRESHOLD;
+    float progress = (float)(num_frames - MIN_PREFIX_FRAMES) / (SEQUENCE_LENGTH - MIN_PREFIX_FRAMES);
+    return EARLY_CONFIDENCE_THRESHOLD + progress * (CONFIDENCE_THRESHOLD - EARLY_CONFIDENCE_THRESHOLD);
+}
+
+// Runs the loaded model on num_frames frames; returns the top class and its probability
+static int predict(const float* frames, int num_frames, float* confidence) {
+    float output[MAX_CLASSES];
+    int num_classes;
+    if (g_quantized_model) {
+        forward_pass_quantized_prefix(g_quantized_model, frames, num_frames, output);
+        num_classes = g_quantized_model->classes.count;
+    } else {
+        forward_pass_inference_prefix(g_float_model, frames, num_frames, output);
+        num_classes = g_float_model->classes.count;
+    }
+    int best = 0;
+    for (int i = 1; i < num_classes; ++i) if (output[i] > output[best]) best = i;
+    *confidence = output[best];
+    return best;
+}
+
+// Frames from onset until the first accepted correct prediction, or -1 if none within the horizon
+static int replay_onset(const float* stream, int label, int early, ReplayStats* stats) {
+    for (int n = early ? MIN_PREFIX_FRAMES : SEQUENCE_LENGTH; n <= REPLAY_HORIZON; ++n) {
+        float confidence;
+        int prediction;
+        if (n < SEQUENCE_LENGTH) {
+            prediction = predict(stream, n, &confidence);
+        } else if ((n - SEQUENCE_LENGTH) % WINDOW_STRIDE == 0) {
+            prediction = predict(&stream[(n - SEQUENCE_LENGTH) * INPUT_SIZE], SEQUENCE_LENGTH, &confidence);
+        } else {
+            continue;
+        }
+        if (confidence < threshold_for_length(n)) continue;
+        if (prediction == label) return n;
+        if (n < SEQUENCE_LENGTH) stats->early_wrong++;
+    }
+    return -1;
+}
+
+// Reads every frame of a gesture's CSV; returns the frame count (0 if missing)
+static int load_stream(const char* gesture, float** out_frames) {
+    char path[1024];
+    snprintf(path, sizeof(path), "%s/%s/%s.csv", DATA_DIR, gesture, gesture);
+    FILE* file = fopen(path, "r");
+    if (!file) return 0;
+
+    char line[4096];
+    int capacity = 1024, count = 0;
+    float* frames = (float*)malloc((size_t)capacity * INPUT_SIZE * sizeof(float));
+    fgets(line, sizeof(line), file); // Skip header
+    while (fgets(line, sizeof(line), file)) {
+        if (count == capacity) {
+            capacity *= 2;
+            frames = (float*)realloc(frames, (size_t)capacity * INPUT_SIZE * sizeof(float));
+        }
+        char* token = strtok(line, ",");
+        for (int f = 0; f < INPUT_SIZE; ++f) {
+            frames[(size_t)count * INPUT_SIZE + f] = token ? (float)atof(token) : 0.0f;
+            if (token) token = strtok(NULL, ",");
+        }
+        count++;
+    }
+    fclose(file);
+    *out_frames = frames;
+    return count;
+}
+
+static void print_stats(const char* name, const ReplayStats* full, const ReplayStats* early) {
+    int full_hits = full->onsets - full->misses, early_hits = early->onsets - early->misses;
+    double full_mean = full_hits ? (double)full->frames_to_correct / full_hits : 0.0;
+    double early_mean = early_hits ? (double)early->frames_to_correct / early_hits : 0.0;
+    printf("%-12s | %6d | %6.1f fr %7.1f ms %3d miss | %6.1f fr %7.1f ms %3d miss %3d wrong\n",
+           name, full->onsets, full_mean, 1000.0 * full_mean / FRAME_RATE, full->misses,
+           early_mean, 1000.0 * early_mean / FRAME_RATE, early->misses, early->early_wrong);
+}
+
+int main(int argc, char* argv[]) {
+    if (argc < 3) {
+        fprintf(stderr, "Usage: %s <model_path> <gesture> [gesture ...]\n", argv[0]);
+        fprintf(stderr, "Float or *_quantized.bin models. Measures time to the first correct prediction.\n");
+        return 1;
+    }
+    const char** gestures = (const char**)&argv[2];
+    int num_gestures = argc - 2;
+
+    static InferenceModel float_model;
+    static QuantizedModel quantized_model;
+    int num_classes;
+    if (strstr(argv[1], "_quantized.bin") != NULL || model_file_kind(argv[1]) == MODEL_KIND_INT8) {
+        if (!load_quantized_model(&quantized_model, argv[1])) return 1;
+        g_quantized_model = &quantized_model;
+        num_classes = quantized_model.classes.count;
+    } else {
+        if (!load_inference_model(&float_model, argv[1])) return 1;
+        g_float_model = &float_model;
+        num_classes = float_model.classes.count;
+    }
+    if (num_gestures > num_classes) {
+        fprintf(stderr, "Error: %d gestures given, but the model has %d classes.\n", num_gestures, num_classes);
+        return 1;
+    }
+
+    printf("Onsets every %d frames, %d-frame horizon, early windows from %d frames\n\n",
+           ONSET_SPACING, REPLAY_HORIZON, MIN_PREFIX_FRAMES);
+    printf("%-12s | %6s | %-30s | %s\n", "Gesture", "Onsets", "Full windows (first correct)", "Early windows (first correct)");
+
+    ReplayStats total_full = {0}, total_early = {0};
+    for (int g = 0; g < num_gestures; ++g) {
+        float* frames = NULL;
+        int num_frames = load_stream(gestures[g], &frames);
+        if (num_frames == 0) {
+            printf("Info: No data file for gesture '%s'. Skipping.\n", gestures[g]);
+            continue;
+        }
+
+        ReplayStats full = {0}, early = {0};
+        for (int onset = 0; onset + REPLAY_HORIZON <= num_frames; onset += ONSET_SPACING) {
+            const float* stream = &frames[(size_t)onset * INPUT_SIZE];
+            ReplayStats* modes[2] = {&full, &early};
+            for (int m = 0; m < 2; ++m) {
+                int latency = replay_onset(stream, g, m, modes[m]);
+                modes[m]->onsets++;
+                if (latency < 0) modes[m]->misses++;
+                else modes[m]->frames_to_correct += latency;
+            }
+        }
+        print_stats(gestures[g], &full, &early);
+
+        total_full.onsets += full.onsets;
+        total_full.misses += full.misses;
+        total_full.frames_to_correct += full.frames_to_correct;
+        total_early.onsets += early.onsets;
+        total_early.misses += early.misses;
+        total_early.frames_to_correct += early.frames_to_correct;
+        total_early.early_wrong += early.early_wrong;
+        free(frames);
+    }
+    print_stats("all", &total_full, &total_early);
+    return 0;
+}
@@ -0,0 +1,326 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+#include <unistd.h>
+#include <fcntl.h>
+#include <sys/stat.h>
+#include "training_logic.h"
+
+// Kernel micro-benchmarks on fixed, seeded inputs (no trained model or
+// recorded data needed), so results only change when the code does.
+// Each kernel is run in timed rounds of at least MIN_ROUND_NS and the fastest
+// round is reported. Compare with bench_compare.py against a stored baseline.
+
+#define DEFAULT_SEED 1234
+#define NUM_WINDOWS 64           // Distinct input windows cycled through by the window kernels
+#define ROUNDS 20
+#define MIN_ROUND_NS 25000000LL // 25 ms
+#define LOAD_FRAMES 2000         // Frames per synthetic gesture CSV for load_temporal_data
+#define LOAD_GESTURES 3
+
+typedef struct {
+    Model model;
+    InferenceModel inference_model;
+    QuantizedModel quantized_model;
+    float windows[NUM_WINDOWS * SEQUENCE_LENGTH * INPUT_SIZE];
+    int labels[NUM_WINDOWS];
+    char data_dir[256];
+    const char* gestures[LOAD_GESTURES];
+    float grad_weights[TCN_CHANNELS * INPUT_SIZE * TCN_KERNEL_SIZE]; // Seeded gradients fed to every update_weights
+    float output_grad_weights[MAX_CLASSES * TCN_CHANNELS];
+    int timestep;
+    volatile float sink; // Keeps the optimizer from dropping results
+} BenchState;
+
+typedef struct {
+    const char* name;
+    void (*run)(BenchState* state, int i); // One op on window i
+    long macs;                             // Per op; 0 if the kernel is not MAC-bound
+    int windows_per_op;
+} KernelBench;
+
+static uint32_t g_rng_state;
+
+// xorshift32, so the inputs are the same on every platform
+static float seeded_uniform(float low, float high) {
+    g_rng_state ^= g_rng_state << 13;
+    g_rng_state ^= g_rng_state >> 17;
+    g_rng_state ^= g_rng_state << 5;
+    return low + (high - low) * (g_rng_state / 4294967296.0f);
+}
+
+static long long now_ns(void) {
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return (long long)ts.tv_sec * 1000000000LL + ts.tv_nsec;
+}
+
+// Kernels
+
+static void run_forward_pass_inference(BenchState* state, int i) {
+    float output[MAX_CLASSES];
+    forward_pass_inference(&state->inference_model, &state->windows[(size_t)i * SEQUENCE_LENGTH * INPUT_SIZE], output);
+    state->sink += output[0];
+}
+
+static void run_forward_pass_quantized(BenchState* state, int i) {
+    float output[MAX_CLASSES];
+    forward_pass_quantized(&state->quantized_model, &state->windows[(size_t)i * SEQUENCE_LENGTH * INPUT_SIZE], output);
+    state->sink += output[0];
+}
+
+static void run_forward_pass(BenchState* state, int i) {
+    forward_pass(&state->model, &state->windows[(size_t)i * SEQUENCE_LENGTH * INPUT_SIZE], 0, i);
+    state->sink += state->model.output_layer.output[0];
+}
+
+// Uses the activations of the previous forward_pass on the same model; the cost does not depend on them
+static void run_backward_pass(BenchState* state, int i) {
+    backward_pass(&state->model, &state->windows[(size_t)i * SEQUENCE_LENGTH * INPUT_SIZE], &state->labels[i], 1, 0, i);
+    state->sink += state->model.tcn_block.grad_weights[0];
+}
+
+// update_weights zeroes the gradients, so each op restores the seeded ones
+// (otherwise the Adam moments decay into denormals and the timing drifts)
+static void run_update_weights(BenchState* state, int i) {
+    (void)i;
+    memcpy(state->model.tcn_block.grad_weights, state->grad_weights, sizeof(state->grad_weights));
+    memcpy(state->model.output_layer.grad_weights, state->output_grad_weights, sizeof(state->output_grad_weights));
+    update_weights(&state->model, 0.001f, 0.9f, 0.999f, 1e-8f, ++state->timestep);
+    state->sink += state->model.tcn_block.weights[0];
+}
+
+static void run_load_temporal_data(BenchState* state, int i) {
+    (void)i;
+    float* data = NULL;
+    int* labels = NULL;
+    int num_sequences = 0;
+    load_temporal_data(state->data_dir, state->gestures, LOAD_GESTURES, &data, &labels, &num_sequences);
+    state->sink += data[0];
+    free(data);
+    free(labels);
+}
+
+// Setup
+
+static void init_models(BenchState* state) {
+    memset(&state->model, 0, sizeof(state->model));
+    state->model.output_layer.num_classes = NUM_CLASSES;
+    const int fan_in = INPUT_SIZE * TCN_KERNEL_SIZE;
+    for (int i = 0; i < TCN_CHANNELS * fan_in; ++i) state->model.tcn_block.weights[i] = seeded_uniform(-0.2f, 0.2f);
+    for (int i = 0; i < TCN_CHANNELS; ++i) state->model.tcn_block.biases[i] = seeded_uniform(-0.05f, 0.05f);
+    for (int i = 0; i < NUM_CLASSES * TCN_CHANNELS; ++i) state->model.output_layer.weights[i] = seeded_uniform(-0.5f, 0.5f);
+    for (int i = 0; i < TCN_CHANNELS * fan_in; ++i) state->grad_weights[i] = seeded_uniform(-0.01f, 0.01f);
+    for (int i = 0; i < NUM_CLASSES * TCN_CHANNELS; ++i) state->output_grad_weights[i] = seeded_uniform(-0.1f, 0.1f);
+    memcpy(state->inference_model.tcn_block.weights, state->model.tcn_block.weights, sizeof(state->inference_model.tcn_block.weights));
+    memcpy(state->inference_model.tcn_block.biases, state->model.tcn_block.biases, sizeof(state->inference_model.tcn_block.biases));
+    memcpy(state->inference_model.output_layer.weights, state->model.output_layer.weights, sizeof(state->model.output_layer.weights));
+    memcpy(state->inference_model.output_layer.biases, state->model.output_layer.biases, sizeof(state->model.output_layer.biases));
+    state->inference_model.classes.count = NUM_CLASSES;
+
+    // Random INT8 weights with plausible scales; only the cost of the integer kernel matters here
+    QuantizedModel* q = &state->quantized_model;
+    memset(q, 0, sizeof(*q));
+    q->classes.count = NUM_CLASSES;
+    q->input_scale = 1.0f / 127.0f;
+    q->activation_scale = 1.0f / 127.0f;
+    for (int c = 0; c < TCN_CHANNELS; ++c) {
+        q->tcn_weight_scales[c] = 0.2f / 127.0f;
+        for (int i = 0; i < fan_in; ++i) q->tcn_block_weights[c * fan_in + i] = (int8_t)seeded_uniform(-127.0f, 127.0f);
+        double multiplier = (double)q->input_scale * q->tcn_weight_scales[c] / q->activation_scale;
+        quantize_multiplier(multiplier, &q->tcn_multipliers[c], &q->tcn_shifts[c]);
+        quantize_multiplier(multiplier * -leaky_relu(-1.0f), &q->tcn_negative_multipliers[c], &q->tcn_negative_shifts[c]);
+    }
+    for (int j = 0; j < NUM_CLASSES; ++j) {
+        q->output_weight_scales[j] = 0.5f / 127.0f;
+        for (int c = 0; c < TCN_CHANNELS; ++c) q->output_layer_weights[j * TCN_CHANNELS + c] = (int8_t)seeded_uniform(-127.0f, 127.0f);
+    }
+    prepare_quantized_model(q);
+}
+
+// Writes LOAD_GESTURES CSVs of LOAD_FRAMES seeded frames in the layout load_temporal_data reads
+static int write_load_data(BenchState* state) {
+    static const char* names[LOAD_GESTURES] = {"bench_a", "bench_b", "bench_c"};
+    snprintf(state->data_dir, sizeof(state->data_dir), "/tmp/kernel_bench_data_%d", (int)getpid());
+    mkdir(state->data_dir, 0755);
+    for (int g = 0; g < LOAD_GESTURES; ++g) {
+        char path[512];
+        state->gestures[g] = names[g];
+        snprintf(path, sizeof(path), "%s/%s", state->data_dir, names[g]);
+        mkdir(path, 0755);
+        snprintf(path, sizeof(path), "%s/%s/%s.csv", state->data_dir, names[g], names[g]);
+        FILE* file = fopen(path, "w");
+        if (!file) {
+            perror("Failed to write benchmark data");
+            return 0;
+        }
+        for (int f = 0; f < INPUT_SIZE; ++f) fprintf(file, "%sf%d", f ? "," : "", f);
+        fprintf(file, "\n");
+        for (int t = 0; t < LOAD_FRAMES; ++t) {
+            for (int f = 0; f < INPUT_SIZE; ++f) fprintf(file, "%s%.6f", f ? "," : "", seeded_uniform(-1.0f, 1.0f));
+            fprintf(file, "\n");
+        }
+        fclose(file);
+    }
+    return 1;
+}
+
+static void remove_load_data(const BenchState* state) {
+    char path[512];
+    for (int g = 0; g < LOAD_GESTURES; ++g) {
+        snprintf(path, sizeof(path), "%s/%s/%s.csv", state->data_dir, state->gestures[g], state->gestures[g]);
+        remove(path);
+        snprintf(path, sizeof(path), "%s/%s", state->data_dir, state->gestures[g]);
+        rmdir(path);
+    }
+    rmdir(state->data_dir);
+}
+
+static int silence_stdout(void) {
+    fflush(stdout);
+    int saved = dup(STDOUT_FILENO);
+    int null_fd = open("/dev/null", O_WRONLY);
+    dup2(null_fd, STDOUT_FILENO);
+    close(null_fd);
+    return saved;
+}
+
+static void restore_stdout(int saved) {
+    fflush(stdout);
+    dup2(saved, STDOUT_FILENO);
+    close(saved);
+}
+
+// Cycles per nanosecond from a dependent add chain (about one add per cycle on
+// current cores). Only used for MACs/cycle when --cpu-mhz is not given.
+static double estimate_cpu_ghz(void) {
+    const long iterations = 200000000L;
+    long long start = now_ns();
+    unsigned long x = 1;
+    for (long i = 0; i < iterations; ++i) {
+        x += (unsigned long)i;
+        __asm__ volatile("" : "+r"(x));
+    }
+    long long elapsed = now_ns() - start;
+    return elapsed > 0 ? (double)iterations / elapsed : 0.0;
+}
+
+// Fastest-round ns per op
+static double bench_kernel(const KernelBench* kernel, BenchState* state) {
+    double best = 0.0;
+    for (int round = 0; round < ROUNDS; ++round) {
+        long long ops = 0, start = now_ns(), elapsed;
+        do {
+            kernel->run(state, (int)(ops % NUM_WINDOWS));
+            ops++;
+            elapsed = now_ns() - start;
+        } while (elapsed < MIN_ROUND_NS);
+        double ns_per_op = (double)elapsed / ops;
+        if (round == 0 || ns_per_op < best) best = ns_per_op;
+    }
+    return best;
+}
+
+int main(int argc, char* argv[]) {
+    const char* json_path = NULL;
+    const char* filter = NULL;
+    unsigned seed = DEFAULT_SEED;
+    double cpu_mhz = 0.0;
+    for (int arg = 1; arg < argc; arg += 2) {
+        if (arg + 1 >= argc) {
+            fprintf(stderr, "Usage: %s [--json <path>] [--seed N] [--cpu-mhz MHZ] [--filter <substring>]\n", argv[0]);
+            return 1;
+        }
+        if (strcmp(argv[arg], "--json") == 0) json_path = argv[arg + 1];
+        else if (strcmp(argv[arg], "--seed") == 0) seed = (unsigned)atoi(argv[arg + 1]);
+        else if (strcmp(argv[arg], "--cpu-mhz") == 0) cpu_mhz = atof(argv[arg + 1]);
+        else if (strcmp(argv[arg], "--filter") == 0) filter = argv[arg + 1];
+        else {
+            fprintf(stderr, "Unknown option: %s\n", argv[arg]);
+            return 1;
+        }
+    }
+
+    static BenchState state;
+    g_rng_state = seed ? seed : 1;
+    init_models(&state);
+    for (int i = 0; i < NUM_WINDOWS * SEQUENCE_LENGTH * INPUT_SIZE; ++i) state.windows[i] = seeded_uniform(-1.0f, 1.0f);
+    for (int i = 0; i < NUM_WINDOWS; ++i) state.labels[i] = i % NUM_CLASSES;
+    if (!write_load_data(&state)) return 1;
+    forward_pass(&state.model, state.windows, 0, 0); // Activations for the first backward_pass
+
+    // One untimed load gives the window count per op (and warms the page cache)
+    float* loaded = NULL;
+    int* loaded_labels = NULL;
+    int windows_per_load = 0;
+    int saved_stdout = silence_stdout();
+    load_temporal_data(state.data_dir, state.gestures, LOAD_GESTURES, &loaded, &loaded_labels, &windows_per_load);
+    restore_stdout(saved_stdout);
+    free(loaded);
+    free(loaded_labels);
+    long dense_macs = model_macs(TCN_VARIANT_DENSE);
+    const KernelBench kernels[] = {
+        {"forward_pass_inference", run_forward_pass_inference, dense_macs, 1},
+        {"forward_pass_quantized", run_forward_pass_quantized, dense_macs, 1},
+        {"forward_pass", run_forward_pass, dense_macs, 1},
+        {"backward_pass", run_backward_pass, dense_macs + (long)NUM_CLASSES * TCN_CHANNELS, 1}, // Weight grads + head input grad
+        {"update_weights", run_update_weights, 0, 1},
+        {"load_temporal_data", run_load_temporal_data, 0, windows_per_load},
+    };
+    const int num_kernels = (int)(sizeof(kernels) / sizeof(kernels[0]));
+
+    const char* cpu_mhz_source = "--cpu-mhz";
+    if (cpu_mhz <= 0.0) {
+        cpu_mhz = estimate_cpu_ghz() * 1000.0;
+        cpu_mhz_source = "estimated";
+    }
+
+    double ns_per_op[sizeof(kernels) / sizeof(kernels[0])] = {0};
+    int measured[sizeof(kernels) / sizeof(kernels[0])] = {0};
+    for (int k = 0; k < num_kernels; ++k) {
+        if (filter && !strstr(kernels[k].name, filter)) continue;
+        // load_temporal_data prints progress; keep it out of the table
+        int saved_stdout = silence_stdout();
+        ns_per_op[k] = bench_kernel(&kernels[k], &state);
+        restore_stdout(saved_stdout);
+        measured[k] = 1;
+    }
+    remove_load_data(&state);
+
+    printf("[KERNEL BENCH] seed %u, CPU %.0f MHz (%s), fastest of %d rounds\n", seed, cpu_mhz, cpu_mhz_source, ROUNDS);
+    printf("%-24s %14s %14s %10s %10s\n", "Kernel", "ns/op", "windows/s", "MACs/op", "MACs/cycle");
+    for (int k = 0; k < num_kernels; ++k) {
+        if (!measured[k]) continue;
+        double windows_per_sec = 1e9 * kernels[k].windows_per_op / ns_per_op[k];
+        if (kernels[k].macs > 0) {
+            printf("%-24s %14.1f %14.0f %10ld %10.3f\n", kernels[k].name, ns_per_op[k], windows_per_sec, kernels[k].macs,
+                   kernels[k].macs / (ns_per_op[k] * cpu_mhz / 1000.0));
+        } else {
+            printf("%-24s %14.1f %14.0f %10s %10s\n", kernels[k].name, ns_per_op[k], windows_per_sec, "-", "-");
+        }
+    }
+
+    if (json_path) {
+        FILE* file = fopen(json_path, "w");
+        if (!file) {
+            perror("Failed to open JSON output");
+            return 1;
+        }
+        fprintf(file, "{\n  \"seed\": %u,\n  \"cpu_mhz\": %.1f,\n  \"cpu_mhz_source\": \"%s\",\n  \"kernels\": {", seed, cpu_mhz, cpu_mhz_source);
+        int first = 1;
+        for (int k = 0; k < num_kernels; ++k) {
+            if (!measured[k]) continue;
+            double windows_per_sec = 1e9 * kernels[k].windows_per_op / ns_per_op[k];
+            fprintf(file, "%s\n    \"%s\": {\"ns_per_op\": %.1f, \"windows_per_sec\": %.1f, \"macs_per_op\": %ld, \"macs_per_cycle\": ",
+                    first ? "" : ",", kernels[k].name, ns_per_op[k], windows_per_sec, kernels[k].macs);
+            if (kernels[k].macs > 0) fprintf(file, "%.4f}", kernels[k].macs / (ns_per_op[k] * cpu_mhz / 1000.0));
+            else fprintf(file, "null}");
+            first = 0;
+        }
+        fprintf(file, "\n  }\n}\n");
+        fclose(file);
+        printf("Results written to %s\n", json_path);
+    }
+    return 0;
+}
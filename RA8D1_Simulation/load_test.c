@@ -0,0 +1,188 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+#include <pthread.h>
+#include <unistd.h>
+#include <sys/socket.h>
+#include <netinet/in.h>
+#include <netinet/tcp.h>
+#include <arpa/inet.h>
+#include "training_logic.h"
+
+// Synthetic multi-client load against a running ra8d1_sim.
+// Each client thread keeps up to --depth requests in flight on its own
+// connection, replaying the recorded windows, and times every request.
+
+#define DATA_DIR "../models/data"
+#define SERVER_PORT 65432
+#define DEFAULT_CLIENTS 4
+#define DEFAULT_REQUESTS 2000 // Per client
+#define DEFAULT_DEPTH 2       // Requests in flight per client (GesturePredictor.max_in_flight)
+#define DEFAULT_SLO_US 5000
+#define MAX_DEPTH 64
+
+typedef struct {
+    int id;
+    int num_requests;
+    int depth;
+    const float* windows;
+    const int* labels;
+    int num_windows;
+    uint64_t* latencies_us; // One per request
+    int correct;
+    int failed;
+} ClientThread;
+
+static uint64_t now_us(void) {
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return (uint64_t)ts.tv_sec * 1000000u + ts.tv_nsec / 1000;
+}
+
+static int recv_fully(int fd, void* buffer, size_t len) {
+    size_t total = 0;
+    while (total < len) {
+        ssize_t n = recv(fd, (char*)buffer + total, len - total, 0);
+        if (n <= 0) return 0;
+        total += n;
+    }
+    return 1;
+}
+
+static int send_window(int fd, uint32_t request_id, const float* window) {
+    uint32_t frame[2 + SEQUENCE_LENGTH * INPUT_SIZE];
+    frame[0] = htonl(SEQUENCE_LENGTH * INPUT_SIZE * sizeof(float));
+    frame[1] = htonl(request_id);
+    for (int i = 0; i < SEQUENCE_LENGTH * INPUT_SIZE; ++i) {
+        uint32_t bits;
+        memcpy(&bits, &window[i], sizeof(bits));
+        frame[2 + i] = htonl(bits);
+    }
+    return send(fd, frame, sizeof(frame), 0) == (ssize_t)sizeof(frame);
+}
+
+static void* run_client(void* arg) {
+    ClientThread* client = (ClientThread*)arg;
+    int fd = socket(AF_INET, SOCK_STREAM, 0);
+    struct sockaddr_in address = {0};
+    address.sin_family = AF_INET;
+    address.sin_port = htons(SERVER_PORT);
+    inet_pton(AF_INET, "127.0.0.1", &address.sin_addr);
+    if (fd < 0 || connect(fd, (struct sockaddr*)&address, sizeof(address)) < 0) {
+        perror("connect");
+        client->failed = client->num_requests;
+        return NULL;
+    }
+    int one = 1;
+    setsockopt(fd, IPPROTO_TCP, TCP_NODELAY, &one, sizeof(one));
+
+    uint64_t sent_us[MAX_DEPTH];
+    int sent = 0, received = 0;
+    while (received < client->num_requests) {
+        // Keep the pipeline full; responses come back in request order
+        while (sent < client->num_requests && sent - received < client->depth) {
+            int w = (client->id * 7919 + sent) % client->num_windows;
+            sent_us[sent % MAX_DEPTH] = now_us();
+            if (!send_window(fd, (uint32_t)sent, &client->windows[(size_t)w * SEQUENCE_LENGTH * INPUT_SIZE])) break;
+            sent++;
+        }
+
+        uint32_t header[2];
+        char text[128];
+        if (!recv_fully(fd, header, sizeof(header))) break;
+        uint32_t text_len = ntohl(header[0]), request_id = ntohl(header[1]);
+        if (text_len >= sizeof(text) || !recv_fully(fd, text, text_len)) break;
+        text[text_len] = '\0';
+
+        client->latencies_us[received] = now_us() - sent_us[request_id % MAX_DEPTH];
+        int w = (client->id * 7919 + (int)request_id) % client->num_windows;
+        client->correct += (atoi(text) == client->labels[w]);
+        received++;
+    }
+    client->failed = client->num_requests - received;
+    close(fd);
+    return NULL;
+}
+
+static int compare_u64(const void* a, const void* b) {
+    uint64_t x = *(const uint64_t*)a, y = *(const uint64_t*)b;
+    return (x > y) - (x < y);
+}
+
+int main(int argc, char* argv[]) {
+    int num_clients = DEFAULT_CLIENTS, num_requests = DEFAULT_REQUESTS, depth = DEFAULT_DEPTH, slo_us = DEFAULT_SLO_US;
+    int arg = 1;
+    while (arg + 1 < argc && strncmp(argv[arg], "--", 2) == 0) {
+        int value = atoi(argv[arg + 1]);
+        if (strcmp(argv[arg], "--clients") == 0) num_clients = value;
+        else if (strcmp(argv[arg], "--requests") == 0) num_requests = value;
+        else if (strcmp(argv[arg], "--depth") == 0) depth = value;
+        else if (strcmp(argv[arg], "--slo-us") == 0) slo_us = value;
+        else {
+            fprintf(stderr, "Unknown option: %s\n", argv[arg]);
+            return 1;
+        }
+        arg += 2;
+    }
+    if (argc <= arg || num_clients < 1 || num_requests < 1 || depth < 1 || depth > MAX_DEPTH) {
+        fprintf(stderr, "Usage: %s [--clients N] [--requests R] [--depth D] [--slo-us U] <gesture> [gesture ...]\n", argv[0]);
+        fprintf(stderr, "Start the server first, e.g. ./ra8d1_sim --batch-max 8 --batch-wait-us 200 ../models/c_model.bin > /dev/null\n");
+        return 1;
+    }
+
+    float* windows = NULL;
+    int* labels = NULL;
+    int num_windows = 0;
+    if (load_temporal_data(DATA_DIR, (const char**)&argv[arg], argc - arg, &windows, &labels, &num_windows) != 0 || num_windows == 0) {
+        fprintf(stderr, "Error: No load test data found in %s\n", DATA_DIR);
+        return 1;
+    }
+
+    ClientThread* clients = (ClientThread*)calloc(num_clients, sizeof(ClientThread));
+    pthread_t* threads = (pthread_t*)malloc(num_clients * sizeof(pthread_t));
+    uint64_t* latencies = (uint64_t*)malloc((size_t)num_clients * num_requests * sizeof(uint64_t));
+    uint64_t start_us = now_us();
+    for (int c = 0; c < num_clients; ++c) {
+        clients[c] = (ClientThread){c, num_requests, depth, windows, labels, num_windows, &latencies[(size_t)c * num_requests], 0, 0};
+        pthread_create(&threads[c], NULL, run_client, &clients[c]);
+    }
+    int correct = 0, failed = 0;
+    for (int c = 0; c < num_clients; ++c) {
+        pthread_join(threads[c], NULL);
+        correct += clients[c].correct;
+        failed += clients[c].failed;
+    }
+    double elapsed_s = (now_us() - start_us) / 1e6;
+
+    // Compact the completed latencies of every client
+    size_t completed = 0;
+    for (int c = 0; c < num_clients; ++c) {
+        int done = num_requests - clients[c].failed;
+        memmove(&latencies[completed], clients[c].latencies_us, done * sizeof(uint64_t));
+        completed += done;
+    }
+    if (completed == 0) {
+        fprintf(stderr, "Error: No request completed. Is ra8d1_sim running?\n");
+        return 1;
+    }
+    qsort(latencies, completed, sizeof(uint64_t), compare_u64);
+    size_t within_slo = 0;
+    while (within_slo < completed && latencies[within_slo] <= (uint64_t)slo_us) within_slo++;
+
+    printf("[LOAD] %d clients x %d requests, depth %d: %zu completed, %d failed in %.2f s\n",
+           num_clients, num_requests, depth, completed, failed, elapsed_s);
+    printf("[LOAD] throughput %.0f windows/s  latency p50 %llu us  p95 %llu us  p99 %llu us  max %llu us\n",
+           completed / elapsed_s, (unsigned long long)latencies[completed / 2],
+           (unsigned long long)latencies[completed * 95 / 100], (unsigned long long)latencies[completed * 99 / 100],
+           (unsigned long long)latencies[completed - 1]);
+    printf("[LOAD] within %d us SLO %.2f%% (%.0f windows/s goodput)  accuracy %.2f%%\n",
+           slo_us, 100.0 * within_slo / completed, within_slo / elapsed_s, 100.0 * correct / completed);
+
+    free(windows);
+    free(labels);
+    free(clients);
+    free(threads);
+    free(latencies);
+    return 0;
+}
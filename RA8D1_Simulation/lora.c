@@ -0,0 +1,260 @@
+#include "lora.h"
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <math.h>
+
+// Private Helper Functions
+
+// Zero-mean Gaussian initialization (Box-Muller)
+static void initialize_gaussian(float* weights, size_t num_weights, float std_dev) {
+    for (size_t i = 0; i < num_weights; ++i) {
+        float u1 = (float)rand() / RAND_MAX;
+        float u2 = (float)rand() / RAND_MAX;
+        const float epsilon = 1e-9;
+        float z = sqrtf(-2.0f * logf(u1 + epsilon)) * cosf(2.0f * M_PI * u2);
+        weights[i] = z * std_dev;
+    }
+}
+
+// Rank projections s[t][r] = lora_a[r] . taps(t), reading the same causal taps as the base conv
+static void lora_project(const ClassAdapter* adapter, const float* input_data, float* projection) {
+    for (int t = 0; t < SEQUENCE_LENGTH; ++t) {
+        for (int r = 0; r < LORA_RANK; ++r) {
+            const float* a_row = &adapter->lora_a[r * LORA_CONV_FAN_IN];
+            float sum = 0.0f;
+            for (int k = 0; k < TCN_KERNEL_SIZE; ++k) {
+                int t_in = t + (k - (TCN_KERNEL_SIZE - 1)) * TCN_DILATION;
+                if (t_in < 0) continue;
+                for (int c_in = 0; c_in < INPUT_SIZE; ++c_in) {
+                    sum += input_data[t_in * INPUT_SIZE + c_in] * a_row[c_in * TCN_KERNEL_SIZE + k];
+                }
+            }
+            projection[t * LORA_RANK + r] = sum;
+        }
+    }
+}
+
+// Adapter Init/IO
+
+void init_class_adapter(ClassAdapter* adapter) {
+    // Standard LoRA init: random down-projection, zero up-projection, so the
+    // adapted conv starts out identical to the frozen base.
+    initialize_gaussian(adapter->lora_a, LORA_RANK * LORA_CONV_FAN_IN, sqrtf(1.0f / LORA_CONV_FAN_IN));
+    memset(adapter->lora_b, 0, sizeof(adapter->lora_b));
+    initialize_gaussian(adapter->out_weights, TCN_CHANNELS, sqrtf(2.0f / TCN_CHANNELS));
+    adapter->out_bias = 0.0f;
+}
+
+int save_class_adapter(const ClassAdapter* adapter, const char* file_path) {
+    FILE* fp = fopen(file_path, "wb");
+    if (!fp) {
+        perror("Error opening adapter file for writing");
+        return 0;
+    }
+
+    // Field-by-field writing to prevent padding issues.
+    fwrite(adapter->lora_a, sizeof(adapter->lora_a), 1, fp);
+    fwrite(adapter->lora_b, sizeof(adapter->lora_b), 1, fp);
+    fwrite(adapter->out_weights, sizeof(adapter->out_weights), 1, fp);
+    fwrite(&adapter->out_bias, sizeof(adapter->out_bias), 1, fp);
+
+    fclose(fp);
+    printf("Adapter saved to %s.\n", file_path);
+    return 1;
+}
+
+int load_class_adapter(ClassAdapter* adapter, const char* file_path) {
+    FILE* fp = fopen(file_path, "rb");
+    if (!fp) {
+        perror("Failed to open adapter file");
+        return 0;
+    }
+
+    size_t a_read = fread(adapter->lora_a, sizeof(adapter->lora_a), 1, fp);
+    size_t b_read = fread(adapter->lora_b, sizeof(adapter->lora_b), 1, fp);
+    size_t w_read = fread(adapter->out_weights, sizeof(adapter->out_weights), 1, fp);
+    size_t bias_read = fread(&adapter->out_bias, sizeof(adapter->out_bias), 1, fp);
+
+    fclose(fp);
+
+    int success = (a_read == 1 && b_read == 1 && w_read == 1 && bias_read == 1);
+    if (!success) {
+        fprintf(stderr, "Error: Failed to read all components of the adapter file %s.\n", file_path);
+    }
+    return success;
+}
+
+int load_lora_model(LoRAModel* model, const char* base_path, const char* adapter_dir, const char** class_names, int num_classes) {
+    if (num_classes < 1 || num_classes > LORA_MAX_CLASSES) {
+        fprintf(stderr, "Error: LoRA model supports 1-%d classes, got %d.\n", LORA_MAX_CLASSES, num_classes);
+        return 0;
+    }
+
+    InferenceModel base_model;
+    if (!load_inference_model(&base_model, base_path)) {
+        return 0;
+    }
+    model->base = base_model.tcn_block;
+
+    char path[1024];
+    for (int i = 0; i < num_classes; ++i) {
+        snprintf(path, sizeof(path), "%s/%s.bin", adapter_dir, class_names[i]);
+        if (!load_class_adapter(&model->adapters[i], path)) {
+            return 0;
+        }
+    }
+    model->num_classes = num_classes;
+    return 1;
+}
+
+// Forward Pass
+
+void lora_base_conv(const InferenceTCNBlock* base, const float* input_data, float* base_out) {
+    for (int t = 0; t < SEQUENCE_LENGTH; ++t) {
+        for (int c_out = 0; c_out < TCN_CHANNELS; ++c_out) {
+            float sum = base->biases[c_out];
+            for (int k = 0; k < TCN_KERNEL_SIZE; ++k) {
+                int t_in = t + (k - (TCN_KERNEL_SIZE - 1)) * TCN_DILATION;
+                if (t_in < 0) continue;
+                for (int c_in = 0; c_in < INPUT_SIZE; ++c_in) {
+                    sum += input_data[t_in * INPUT_SIZE + c_in] * base->weights[c_out * LORA_CONV_FAN_IN + c_in * TCN_KERNEL_SIZE + k];
+                }
+            }
+            base_out[t * TCN_CHANNELS + c_out] = sum;
+        }
+    }
+}
+
+float lora_class_logit(const ClassAdapter* adapter, const float* input_data, const float* base_out,
+                       float* projection_out, float* pre_activation_out) {
+    // Low-rank delta costs T * r * (F * K + C) MACs instead of a second full conv.
+    float projection[SEQUENCE_LENGTH * LORA_RANK];
+    lora_project(adapter, input_data, projection);
+
+    float pooled[TCN_CHANNELS] = {0};
+    for (int t = 0; t < SEQUENCE_LENGTH; ++t) {
+        for (int c = 0; c < TCN_CHANNELS; ++c) {
+            float u = base_out[t * TCN_CHANNELS + c];
+            for (int r = 0; r < LORA_RANK; ++r) {
+                u += adapter->lora_b[c * LORA_RANK + r] * projection[t * LORA_RANK + r];
+            }
+            if (pre_activation_out) pre_activation_out[t * TCN_CHANNELS + c] = u;
+            pooled[c] += leaky_relu(u);
+        }
+    }
+
+    float logit = adapter->out_bias;
+    for (int c = 0; c < TCN_CHANNELS; ++c) {
+        logit += adapter->out_weights[c] * (pooled[c] / SEQUENCE_LENGTH);
+    }
+
+    if (projection_out) memcpy(projection_out, projection, sizeof(projection));
+    return logit;
+}
+
+void forward_pass_lora(const LoRAModel* model, const float* input_data, float* final_output) {
+    // The frozen base conv is shared by every class; only the deltas are per class.
+    float base_out[SEQUENCE_LENGTH * TCN_CHANNELS];
+    lora_base_conv(&model->base, input_data, base_out);
+
+    float logits[LORA_MAX_CLASSES];
+    for (int i = 0; i < model->num_classes; ++i) {
+        logits[i] = lora_class_logit(&model->adapters[i], input_data, base_out, NULL, NULL);
+    }
+    softmax(logits, final_output, model->num_classes);
+}
+
+// Adapter Training
+
+void init_adapter_trainer(AdapterTrainer* trainer) {
+    init_class_adapter(&trainer->params);
+    memset(&trainer->grads, 0, sizeof(trainer->grads));
+    memset(&trainer->m, 0, sizeof(trainer->m));
+    memset(&trainer->v, 0, sizeof(trainer->v));
+}
+
+float lora_backward_pass(AdapterTrainer* trainer, const float* input_data, const float* base_out,
+                         const float* frozen_logits, int num_frozen, int target, float* logit_out) {
+    const ClassAdapter* p = &trainer->params;
+    ClassAdapter* g = &trainer->grads;
+    memset(g, 0, sizeof(*g));
+
+    float projection[SEQUENCE_LENGTH * LORA_RANK];
+    float pre_activation[SEQUENCE_LENGTH * TCN_CHANNELS];
+    float logit = lora_class_logit(p, input_data, base_out, projection, pre_activation);
+    if (logit_out) *logit_out = logit;
+
+    // 1. Softmax over [background (0), frozen..., new]; only dL/dlogit_new is needed
+    float logits[LORA_MAX_CLASSES + 2];
+    float probs[LORA_MAX_CLASSES + 2];
+    logits[0] = 0.0f;
+    for (int i = 0; i < num_frozen; ++i) logits[i + 1] = frozen_logits[i];
+    logits[num_frozen + 1] = logit;
+    softmax(logits, probs, num_frozen + 2);
+
+    float grad_logit = probs[num_frozen + 1] - (target == num_frozen ? 1.0f : 0.0f);
+    float loss = -logf(fmaxf(probs[target + 1], 1e-9f));
+
+    // 2. Output row (needs the pooled activations again)
+    float grad_pooled[TCN_CHANNELS];
+    for (int c = 0; c < TCN_CHANNELS; ++c) {
+        float pooled = 0.0f;
+        for (int t = 0; t < SEQUENCE_LENGTH; ++t) pooled += leaky_relu(pre_activation[t * TCN_CHANNELS + c]);
+        g->out_weights[c] = grad_logit * (pooled / SEQUENCE_LENGTH);
+        grad_pooled[c] = grad_logit * p->out_weights[c];
+    }
+    g->out_bias = grad_logit;
+
+    // 3. GAP + Leaky ReLU, then the low-rank factors. The base weights stay frozen.
+    float grad_projection[SEQUENCE_LENGTH * LORA_RANK] = {0};
+    for (int t = 0; t < SEQUENCE_LENGTH; ++t) {
+        for (int c = 0; c < TCN_CHANNELS; ++c) {
+            float grad_u = grad_pooled[c] / SEQUENCE_LENGTH * leaky_relu_derivative(pre_activation[t * TCN_CHANNELS + c]);
+            for (int r = 0; r < LORA_RANK; ++r) {
+                g->lora_b[c * LORA_RANK + r] += grad_u * projection[t * LORA_RANK + r];
+                grad_projection[t * LORA_RANK + r] += grad_u * p->lora_b[c * LORA_RANK + r];
+            }
+        }
+    }
+
+    for (int t = 0; t < SEQUENCE_LENGTH; ++t) {
+        for (int k = 0; k < TCN_KERNEL_SIZE; ++k) {
+            int t_in = t + (k - (TCN_KERNEL_SIZE - 1)) * TCN_DILATION;
+            if (t_in < 0) continue;
+            for (int r = 0; r < LORA_RANK; ++r) {
+                float grad_s = grad_projection[t * LORA_RANK + r];
+                if (grad_s == 0.0f) continue;
+                float* a_grad_row = &g->lora_a[r * LORA_CONV_FAN_IN];
+                for (int c_in = 0; c_in < INPUT_SIZE; ++c_in) {
+                    a_grad_row[c_in * TCN_KERNEL_SIZE + k] += grad_s * input_data[t_in * INPUT_SIZE + c_in];
+                }
+            }
+        }
+    }
+
+    return loss;
+}
+
+void lora_update_weights(AdapterTrainer* trainer, float learning_rate, float beta1, float beta2, float epsilon, int timestep) {
+    ClassAdapter* p = &trainer->params;
+    ClassAdapter* g = &trainer->grads;
+    ClassAdapter* m = &trainer->m;
+    ClassAdapter* v = &trainer->v;
+
+    float lr_t = adam_learning_rate(learning_rate, beta1, beta2, timestep);
+
+    // --- Gradient Clipping ---
+    float scale = gradient_clip_scale(sum_squares(g->lora_a, LORA_RANK * LORA_CONV_FAN_IN) +
+                                      sum_squares(g->lora_b, TCN_CHANNELS * LORA_RANK) +
+                                      sum_squares(g->out_weights, TCN_CHANNELS) +
+                                      g->out_bias * g->out_bias);
+
+    // --- Update Weights ---
+    adam_step(p->lora_a, g->lora_a, m->lora_a, v->lora_a, LORA_RANK * LORA_CONV_FAN_IN, scale, lr_t, beta1, beta2, epsilon);
+    adam_step(p->lora_b, g->lora_b, m->lora_b, v->lora_b, TCN_CHANNELS * LORA_RANK, scale, lr_t, beta1, beta2, epsilon);
+    adam_step(p->out_weights, g->out_weights, m->out_weights, v->out_weights, TCN_CHANNELS, scale, lr_t, beta1, beta2, epsilon);
+    adam_step(&p->out_bias, &g->out_bias, &m->out_bias, &v->out_bias, 1, scale, lr_t, beta1, beta2, epsilon);
+
+    memset(g, 0, sizeof(*g));
+}
@@ -0,0 +1,76 @@
+#ifndef LORA_H
+#define LORA_H
+
+#include "training_logic.h"
+
+// Per-Class Low-Rank Adapters
+// The base TCN block (c_model.bin) is frozen. Each class owns a rank-r
+// delta on the TCN conv weights plus its own output row, stored in its own
+// file so classes can be added or removed without touching the others:
+//   W_class = W_base + lora_b * lora_a
+//   logit   = out_weights . GAP(leaky_relu(conv(x; W_class) + b_base)) + out_bias
+
+#define LORA_RANK 2
+#define LORA_MAX_CLASSES MAX_CLASSES
+#define LORA_CONV_FAN_IN (INPUT_SIZE * TCN_KERNEL_SIZE) // Same flattening as TCN weight rows
+
+typedef struct {
+    float lora_a[LORA_RANK * LORA_CONV_FAN_IN]; // Down-projection [r][c_in * K + k]
+    float lora_b[TCN_CHANNELS * LORA_RANK];     // Up-projection [c_out][r]
+    float out_weights[TCN_CHANNELS];
+    float out_bias;
+} ClassAdapter;
+
+// Frozen base block plus one adapter per class, in class order
+typedef struct {
+    InferenceTCNBlock base;
+    int num_classes;
+    ClassAdapter adapters[LORA_MAX_CLASSES];
+} LoRAModel;
+
+static_assert(sizeof(LoRAModel) < APP_SRAM_LIMIT, "Error: LoRA model size exceeds SRAM budget!");
+
+// Adapter Init/IO
+void init_class_adapter(ClassAdapter* adapter);
+int save_class_adapter(const ClassAdapter* adapter, const char* file_path);
+int load_class_adapter(ClassAdapter* adapter, const char* file_path);
+
+// Loads the base model and "<adapter_dir>/<class>.bin" for each class, in order.
+int load_lora_model(LoRAModel* model, const char* base_path, const char* adapter_dir, const char** class_names, int num_classes);
+
+// Forward Pass
+// Frozen base conv (bias included) for one window: base_out[t * TCN_CHANNELS + c]
+void lora_base_conv(const InferenceTCNBlock* base, const float* input_data, float* base_out);
+
+// Per-class logit on top of a precomputed base conv. The optional buffers receive
+// the rank projections [t * LORA_RANK + r] and pre-activations [t * TCN_CHANNELS + c]
+// needed for backpropagation.
+float lora_class_logit(const ClassAdapter* adapter, const float* input_data, const float* base_out,
+                       float* projection_out, float* pre_activation_out);
+
+// Inference forward pass over all loaded classes (softmax over num_classes)
+void forward_pass_lora(const LoRAModel* model, const float* input_data, float* final_output);
+
+// Adapter Training
+// A new adapter is trained against the logits of the adapters that already
+// exist (kept frozen) plus a constant zero "background" logit, so only the
+// new class's parameters ever receive gradients.
+typedef struct {
+    ClassAdapter params;
+    ClassAdapter grads;
+    ClassAdapter m; // Adam first moment
+    ClassAdapter v; // Adam second moment
+} AdapterTrainer;
+
+void init_adapter_trainer(AdapterTrainer* trainer);
+
+// Forward + backward for one window; returns the cross-entropy loss over
+// [background, frozen_logits..., new]. target is an index into frozen_logits,
+// num_frozen for the new class, or -1 for background. Stores the new logit.
+float lora_backward_pass(AdapterTrainer* trainer, const float* input_data, const float* base_out,
+                         const float* frozen_logits, int num_frozen, int target, float* logit_out);
+
+// Adam step with the same bias correction and global-norm clipping as update_weights()
+void lora_update_weights(AdapterTrainer* trainer, float learning_rate, float beta1, float beta2, float epsilon, int timestep);
+
+#endif // LORA_H
@@ -1,34 +1,451 @@
 #include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
+#include <ctype.h>
+#include <errno.h>
 #include <unistd.h>
+#include <time.h>
+#include <signal.h>
+#include <sys/select.h>
 #include <sys/socket.h>
 #include <netinet/in.h>
+#include <netinet/tcp.h>
 #include <arpa/inet.h>
 #include "training_logic.h"
+#include "model_file.h"
+#include "lora.h"
+#include "pruning.h"
 #include "mcu_constraints.h"
+#include "metrics.h"
 
 #define SERVER_PORT 65432
 #define INPUT_BUFFER_SIZE (SEQUENCE_LENGTH * INPUT_SIZE)
+#define FRAME_BYTES (INPUT_SIZE * sizeof(float))
+#define REQUEST_HEADER_BYTES (2 * sizeof(uint32_t))
+#define MAX_CLIENTS 8
+#define DEFAULT_BATCH_MAX 8
+#define DEFAULT_BATCH_WAIT_US 0 // Run whatever is queued as soon as no socket has more to read
+#define STATS_TEXT_MAX 4096 // Metrics plus up to MAX_CLASSES escaped class names
+#define CLIENT_OUTPUT_BYTES (16 * 1024) // Unsent responses per client; a client that lets this fill up is dropped
+
+// Log levels: per-request diagnostics go through a pipe into the GUI console, so they are off by default
+typedef enum { LOG_QUIET, LOG_INFO, LOG_DEBUG } LogLevel;
+#define LOG_AT(level, ...) do { if (g_log_level >= (level)) printf(__VA_ARGS__); } while (0)
 
 // Globals
 InferenceModel g_float_model;
 QuantizedModel g_quantized_model;
+LoRAModel g_lora_model;
+PrunedModel g_pruned_model;
+InferenceDWSModel g_dws_model;
 int g_model_loaded = 0;
 int g_is_quantized = 0; // Flag to check if the loaded model is quantized
-float g_hand_landmark_data[SEQUENCE_LENGTH * INPUT_SIZE]; // Inference data buffer
-const char* g_gesture_labels[NUM_CLASSES] = {"wave", "swipe_left", "swipe_right"};
+int g_is_lora = 0; // Flag for base model + per-class adapters
+int g_is_pruned = 0; // Flag for a structurally pruned model
+int g_is_dws = 0; // Flag for the depthwise-separable float variant
+ClassNames g_classes; // Outputs of the loaded model (from its file header), reported in stats replies
+LogLevel g_log_level = LOG_INFO;
+
+
+// Protocol (network byte order)
+//   Request:  [u32 payload length][u32 request id][payload: frames x INPUT_SIZE floats]
+//   Response: [u32 text length][u32 request id][text "<class>,<confidence>,<read>,<decode>,<queue>,<forward>"]
+//             with the request's server-side stage times in ns; rejected requests get "-1,0.0"
+// Requests are answered in order per connection, so a client may pipeline several of them.
+// A request with an empty payload is a stats query, answered with space-separated
+// key=value pairs (see server_metrics_format), ending with the model's
+// "classes=<name>,<name>,..." in output order, each name percent-encoded. Stats queries and rejected requests
+// are answered without queueing, so the connection's queued windows are run first.
+// Responses are written without blocking: each client has an output buffer that
+// drains as its socket becomes writable, so a stalled reader never holds up the others.
+
+// Micro-batching
+// Complete requests from all connections are queued and run together once
+// g_batch_max windows are waiting or the oldest has waited g_batch_wait_us.
+typedef struct {
+    int fd;              // -1 when the slot is free
+    unsigned generation; // Bumped on every accept, so queued results never reach a newer client in the same slot
+    uint8_t buffer[REQUEST_HEADER_BYTES + INPUT_BUFFER_SIZE * sizeof(float)];
+    size_t received;     // Bytes of the current request read so far
+    uint64_t read_start_ns;
+    uint8_t output[CLIENT_OUTPUT_BYTES]; // Framed responses not yet accepted by the socket
+    size_t output_len;
+} ClientConnection;
+
+typedef struct {
+    int client;
+    unsigned generation;
+    uint32_t request_id;
+    int num_frames;
+    uint64_t enqueue_ns;
+    uint64_t read_ns;
+    uint64_t decode_ns;
+} QueuedRequest;
+
+static ClientConnection g_clients[MAX_CLIENTS];
+static QueuedRequest g_queue[MAX_INFERENCE_BATCH];
+static float g_batch_inputs[MAX_INFERENCE_BATCH * INPUT_BUFFER_SIZE]; // Inference data buffer, one window per queued request
+static float g_batch_outputs[MAX_INFERENCE_BATCH * MAX_CLASSES];
+static int g_queue_count = 0;
+static int g_batch_max = DEFAULT_BATCH_MAX;
+static int g_batch_wait_us = DEFAULT_BATCH_WAIT_US;
+
+static ServerMetrics g_metrics = SERVER_METRICS_INIT;
+static volatile sig_atomic_t g_dump_requested = 0; // Set by SIGUSR1, handled in the server loop
+
+static void on_sigusr1(int signum) {
+    (void)signum;
+    g_dump_requested = 1;
+}
+
+static uint64_t now_ns(void) {
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return (uint64_t)ts.tv_sec * 1000000000u + ts.tv_nsec;
+}
+
+static void print_class_names(const ClassNames* classes) {
+    printf("[DIAGNOSTIC] %d classes:", classes->count);
+    for (int j = 0; j < classes->count; ++j) printf(" %d=%s", j, classes->names[j]);
+    printf("\n");
+}
+
+static void close_client(int slot) {
+    LOG_AT(LOG_INFO, "[SERVER] Closing client socket %d.\n", g_clients[slot].fd);
+    close(g_clients[slot].fd);
+    g_clients[slot].fd = -1;
+    g_clients[slot].output_len = 0;
+
+    int connected = 0;
+    for (int i = 0; i < MAX_CLIENTS; ++i) connected += (g_clients[i].fd >= 0);
+    if (connected == 0 && g_log_level >= LOG_INFO) {
+        printf("[SERVER] All clients disconnected. Metrics so far:\n");
+        server_metrics_print(&g_metrics, stdout);
+    }
+}
+
+// Writes as much of the client's pending output as the socket takes without blocking;
+// returns 0 if the connection failed (SIGPIPE is ignored, so a closed peer shows up as EPIPE).
+static int flush_client(int slot) {
+    ClientConnection* client = &g_clients[slot];
+    size_t sent = 0;
+    while (sent < client->output_len) {
+        ssize_t n = send(client->fd, client->output + sent, client->output_len - sent, MSG_DONTWAIT);
+        if (n < 0) {
+            if (errno == EINTR) continue;
+            if (errno == EAGAIN || errno == EWOULDBLOCK) break;
+            LOG_AT(LOG_INFO, "[SERVER] Write to socket %d failed: %s\n", client->fd, strerror(errno));
+            return 0;
+        }
+        sent += (size_t)n;
+    }
+    memmove(client->output, client->output + sent, client->output_len - sent);
+    client->output_len -= sent;
+    return 1;
+}
+
+// Queues one framed response and sends what the socket accepts; the client is
+// closed if the write fails or it has stopped reading its responses.
+static void send_response(int slot, uint32_t request_id, const char* text) {
+    uint64_t start_ns = now_ns();
+    ClientConnection* client = &g_clients[slot];
+    uint32_t text_len = (uint32_t)strlen(text);
+    if (client->output_len + REQUEST_HEADER_BYTES + text_len > sizeof(client->output)) {
+        fprintf(stderr, "[SERVER] Client on socket %d is not reading its responses. Closing connection.\n", client->fd);
+        close_client(slot);
+        return;
+    }
+    uint32_t header[2] = {htonl(text_len), htonl(request_id)};
+    memcpy(client->output + client->output_len, header, sizeof(header));
+    memcpy(client->output + client->output_len + sizeof(header), text, text_len);
+    client->output_len += sizeof(header) + text_len;
+    if (!flush_client(slot)) close_client(slot);
+    histogram_record(&g_metrics.write_ns, now_ns() - start_ns);
+}
+
+static void run_batch(void);
+
+// Answers a request without queueing it, after the connection's queued windows so responses stay in order
+static void answer_now(int slot, uint32_t request_id, const char* text) {
+    for (int i = 0; i < g_queue_count; ++i) {
+        if (g_queue[i].client == slot && g_queue[i].generation == g_clients[slot].generation) {
+            run_batch();
+            break;
+        }
+    }
+    if (g_clients[slot].fd >= 0) send_response(slot, request_id, text);
+}
+
+static void reject_request(int slot, uint32_t request_id) {
+    g_metrics.rejected++;
+    answer_now(slot, request_id, "-1,0.0");
+}
+
+// Runs every queued window through the loaded model and answers each request.
+static void run_batch(void) {
+    if (g_queue_count == 0) return;
+    uint64_t start_ns = now_ns();
+    int num_frames[MAX_INFERENCE_BATCH];
+    for (int i = 0; i < g_queue_count; ++i) {
+        num_frames[i] = g_queue[i].num_frames;
+        histogram_record(&g_metrics.queue_wait_ns, start_ns - g_queue[i].enqueue_ns);
+    }
+    histogram_record(&g_metrics.batch_size, g_queue_count);
+    g_metrics.batches++;
+
+    // Use the appropriate forward pass based on the loaded model type.
+    // The dense float model has a batched kernel; the others run window by window.
+    if (g_is_lora) {
+        LOG_AT(LOG_DEBUG, "[DIAGNOSTIC] Running LoRA forward pass on %d window(s)...\n", g_queue_count);
+        for (int i = 0; i < g_queue_count; ++i) {
+            forward_pass_lora(&g_lora_model, &g_batch_inputs[i * INPUT_BUFFER_SIZE], &g_batch_outputs[i * MAX_CLASSES]);
+        }
+    } else if (g_is_dws) {
+        LOG_AT(LOG_DEBUG, "[DIAGNOSTIC] Running DEPTHWISE-SEPARABLE forward pass on %d window(s)...\n", g_queue_count);
+        for (int i = 0; i < g_queue_count; ++i) {
+            forward_pass_dws_inference(&g_dws_model, &g_batch_inputs[i * INPUT_BUFFER_SIZE], &g_batch_outputs[i * MAX_CLASSES]);
+        }
+    } else if (g_is_pruned) {
+        LOG_AT(LOG_DEBUG, "[DIAGNOSTIC] Running PRUNED forward pass on %d window(s)...\n", g_queue_count);
+        for (int i = 0; i < g_queue_count; ++i) {
+            forward_pass_pruned(&g_pruned_model, &g_batch_inputs[i * INPUT_BUFFER_SIZE], &g_batch_outputs[i * MAX_CLASSES]);
+        }
+    } else if (g_is_quantized) {
+        LOG_AT(LOG_DEBUG, "[DIAGNOSTIC] Running QUANTIZED forward pass on %d window(s)...\n", g_queue_count);
+        for (int i = 0; i < g_queue_count; ++i) {
+            forward_pass_quantized_prefix(&g_quantized_model, &g_batch_inputs[i * INPUT_BUFFER_SIZE], num_frames[i],
+                                          &g_batch_outputs[i * MAX_CLASSES]);
+        }
+    } else {
+        LOG_AT(LOG_DEBUG, "[DIAGNOSTIC] Running FLOAT forward pass on %d window(s)...\n", g_queue_count);
+        forward_pass_inference_batch(&g_float_model, g_batch_inputs, num_frames, g_queue_count, g_batch_outputs);
+    }
+
+    uint64_t forward_ns = (now_ns() - start_ns) / g_queue_count;
+    histogram_record(&g_metrics.forward_ns, forward_ns);
+
+    int num_outputs = g_classes.count;
+    for (int i = 0; i < g_queue_count; ++i) {
+        const float* prediction_output = &g_batch_outputs[i * MAX_CLASSES];
+
+        // Diagnostic: Print raw output
+        if (g_log_level >= LOG_DEBUG) {
+            printf("[DIAGNOSTIC] Raw inference output: ");
+            for (int j = 0; j < num_outputs; ++j) {
+                printf("class_%d=%.6f ", j, prediction_output[j]);
+            }
+            printf("\n");
+        }
+
+        // Find best prediction
+        int prediction = 0;
+        float confidence = 0.0f;
+        for (int j = 0; j < num_outputs; ++j) {
+            if (prediction_output[j] > confidence) {
+                confidence = prediction_output[j];
+                prediction = j;
+            }
+        }
+
+        LOG_AT(LOG_DEBUG, "[DIAGNOSTIC] Final prediction: class_%d with confidence %.6f\n", prediction, confidence);
+
+        // Send Response (the client may have gone away while the request was queued)
+        const ClientConnection* client = &g_clients[g_queue[i].client];
+        if (client->fd < 0 || client->generation != g_queue[i].generation) continue;
+        char send_buffer[128];
+        snprintf(send_buffer, sizeof(send_buffer), "%d,%.4f,%llu,%llu,%llu,%llu", prediction, confidence,
+                 (unsigned long long)g_queue[i].read_ns, (unsigned long long)g_queue[i].decode_ns,
+                 (unsigned long long)(start_ns - g_queue[i].enqueue_ns), (unsigned long long)forward_ns);
+        send_response(g_queue[i].client, g_queue[i].request_id, send_buffer);
+    }
+    g_queue_count = 0;
+}
+
+// " classes=<name>,..." with every byte outside [A-Za-z0-9_.-] written as %XX
+static void format_class_names(const ClassNames* classes, char* text, size_t size) {
+    size_t used = snprintf(text, size, " classes=");
+    for (int j = 0; j < classes->count && used < size; ++j) {
+        if (j > 0) used += snprintf(text + used, size - used, ",");
+        for (const unsigned char* c = (const unsigned char*)classes->names[j]; *c && used < size; ++c) {
+            if (isalnum(*c) || *c == '_' || *c == '.' || *c == '-') {
+                used += snprintf(text + used, size - used, "%c", *c);
+            } else {
+                used += snprintf(text + used, size - used, "%%%02X", *c);
+            }
+        }
+    }
+}
+
+// Validates a fully received request and queues it (or answers it directly).
+static void handle_request(int slot, uint64_t read_ns) {
+    ClientConnection* client = &g_clients[slot];
+    uint32_t header[2];
+    memcpy(header, client->buffer, sizeof(header));
+    uint32_t msg_len = ntohl(header[0]);
+    uint32_t request_id = ntohl(header[1]);
+
+    if (msg_len == 0) {
+        char stats[STATS_TEXT_MAX];
+        g_metrics.stats_requests++;
+        int used = server_metrics_format(&g_metrics, stats, sizeof(stats));
+        format_class_names(&g_classes, stats + used, sizeof(stats) - used);
+        answer_now(slot, request_id, stats);
+        return;
+    }
+
+    // The length field doubles as the frame count: a full window, or an
+    // early partial window of at least MIN_PREFIX_FRAMES frames.
+    if (msg_len % FRAME_BYTES != 0 || msg_len < MIN_PREFIX_FRAMES * FRAME_BYTES) {
+        fprintf(stderr, "[SERVER] Invalid message length: %u, expected a multiple of %zu between %zu and %zu\n",
+                msg_len, FRAME_BYTES, MIN_PREFIX_FRAMES * FRAME_BYTES, INPUT_BUFFER_SIZE * sizeof(float));
+        reject_request(slot, request_id);
+        return;
+    }
+    int num_frames = (int)(msg_len / FRAME_BYTES);
+
+    // Run inference only if a model is loaded
+    if (!g_model_loaded) {
+        reject_request(slot, request_id);
+        LOG_AT(LOG_DEBUG, "[SERVER] Sent 'no model' response to client.\n");
+        return;
+    }
+    // Partial windows are only supported by the dense float and quantized kernels
+    if (num_frames < SEQUENCE_LENGTH && (g_is_lora || g_is_dws || g_is_pruned)) {
+        reject_request(slot, request_id);
+        LOG_AT(LOG_DEBUG, "[SERVER] Partial window not supported by the loaded model.\n");
+        return;
+    }
+
+    // Network to host byte order
+    uint64_t decode_start_ns = now_ns();
+    float* window = &g_batch_inputs[g_queue_count * INPUT_BUFFER_SIZE];
+    const uint32_t* payload = (const uint32_t*)(client->buffer + REQUEST_HEADER_BYTES);
+    for (int i = 0; i < num_frames * INPUT_SIZE; i++) {
+        uint32_t host_val = ntohl(payload[i]);
+        memcpy(&window[i], &host_val, sizeof(float));
+    }
+    uint64_t decode_ns = now_ns() - decode_start_ns;
+    histogram_record(&g_metrics.decode_ns, decode_ns);
+
+    // Diagnostic: Print received data
+    if (g_log_level >= LOG_DEBUG) {
+        printf("[DIAGNOSTIC] Received %d/%d frames. First 10 values: ", num_frames, SEQUENCE_LENGTH);
+        for (int i = 0; i < 10; ++i) {
+            printf("%.3f ", window[i]);
+        }
+        printf("\n");
+    }
+
+    g_metrics.requests++;
+    g_queue[g_queue_count] = (QueuedRequest){slot, client->generation, request_id, num_frames, now_ns(), read_ns, decode_ns};
+    if (++g_queue_count >= g_batch_max) run_batch();
+}
+
+// Reads up to one complete request from a client socket without blocking; returns 0 if it closed.
+static int read_client(int slot) {
+    ClientConnection* client = &g_clients[slot];
+    while (1) {
+        // Header first, then as many payload bytes as it announces
+        size_t wanted = REQUEST_HEADER_BYTES;
+        if (client->received >= REQUEST_HEADER_BYTES) {
+            uint32_t msg_len;
+            memcpy(&msg_len, client->buffer, sizeof(msg_len));
+            msg_len = ntohl(msg_len);
+            if (msg_len > INPUT_BUFFER_SIZE * sizeof(float)) {
+                fprintf(stderr, "[SERVER] Invalid message length: %u. Closing connection.\n", msg_len);
+                return 0;
+            }
+            wanted += msg_len;
+            if (client->received == wanted) {
+                // One request per client per pass, so a busy connection can't starve the others
+                uint64_t read_ns = now_ns() - client->read_start_ns;
+                histogram_record(&g_metrics.read_ns, read_ns);
+                handle_request(slot, read_ns);
+                client->received = 0;
+                return 1;
+            }
+        }
+
+        ssize_t n = recv(client->fd, client->buffer + client->received, wanted - client->received, MSG_DONTWAIT);
+        if (n == 0) {
+            LOG_AT(LOG_INFO, "[SERVER] Client disconnected.\n");
+            return 0;
+        }
+        if (n < 0) {
+            if (errno == EAGAIN || errno == EWOULDBLOCK || errno == EINTR) return 1;
+            perror("[SERVER] Read failed");
+            return 0;
+        }
+        if (client->received == 0) client->read_start_ns = now_ns();
+        client->received += n;
+    }
+}
 
 // Main
 int main(int argc, char* argv[]) {
+    // Leading options: [--batch-max N] [--batch-wait-us U] [--log-level quiet|info|debug]
+    int arg = 1;
+    while (arg + 1 < argc && strncmp(argv[arg], "--", 2) == 0) {
+        if (strcmp(argv[arg], "--batch-max") == 0) {
+            g_batch_max = atoi(argv[arg + 1]);
+        } else if (strcmp(argv[arg], "--batch-wait-us") == 0) {
+            g_batch_wait_us = atoi(argv[arg + 1]);
+        } else if (strcmp(argv[arg], "--log-level") == 0) {
+            const char* levels[] = {"quiet", "info", "debug"};
+            int level = -1;
+            for (int i = 0; i < 3; ++i) if (strcmp(argv[arg + 1], levels[i]) == 0) level = i;
+            if (level < 0) {
+                fprintf(stderr, "Unknown log level: %s (use quiet, info or debug)\n", argv[arg + 1]);
+                return 1;
+            }
+            g_log_level = (LogLevel)level;
+        } else {
+            fprintf(stderr, "Unknown option: %s\n", argv[arg]);
+            return 1;
+        }
+        arg += 2;
+    }
+    if (g_batch_max < 1) g_batch_max = 1;
+    if (g_batch_max > MAX_INFERENCE_BATCH) g_batch_max = MAX_INFERENCE_BATCH;
+    if (g_batch_wait_us < 0) g_batch_wait_us = 0;
+
+    // Output goes through a pipe to the GUI; with per-request logs off, line buffering is cheap
+    setvbuf(stdout, NULL, _IOLBF, 0);
     printf("Initializing C model...\n");
 
     // Determine model path: use argument or default
-    const char* model_path = (argc > 1) ? argv[1] : "../models/c_model.bin";
+    const char* model_path = (argc > arg) ? argv[arg] : "../models/c_model.bin";
     printf("Loading model from: %s\n", model_path);
 
-    // Check model type and load accordingly
-    if (strstr(model_path, "_quantized.bin") != NULL) {
+    // Optional per-class adapters: <model> --lora <adapter_dir> <class> [<class> ...]
+    if (argc > arg + 2 && strcmp(argv[arg + 1], "--lora") == 0) {
+        const char* adapter_dir = argv[arg + 2];
+        int num_classes = argc - arg - 3;
+        printf("Loading LoRA Model with %d class adapters from %s...\n", num_classes, adapter_dir);
+        if (!load_lora_model(&g_lora_model, model_path, adapter_dir, (const char**)&argv[arg + 3], num_classes)) {
+            fprintf(stderr, "[SERVER WARNING] LoRA model could not be loaded. Server running without a model.\n");
+            g_model_loaded = 0;
+        } else {
+            g_model_loaded = 1;
+            g_is_lora = 1;
+            set_class_names(&g_classes, (const char**)&argv[arg + 3], num_classes, g_lora_model.num_classes);
+            printf("[DIAGNOSTIC] LoRA model loaded successfully (rank %d).\n", LORA_RANK);
+        }
+    } else if (is_pruned_model_file(model_path)) {
+        printf("Loading Pruned Model...\n");
+        if (!load_pruned_model(&g_pruned_model, model_path)) {
+            fprintf(stderr, "[SERVER WARNING] Pruned model could not be loaded. Server running without a model.\n");
+            g_model_loaded = 0;
+        } else {
+            g_model_loaded = 1;
+            g_is_pruned = 1;
+            g_classes = g_pruned_model.classes;
+            print_class_names(&g_classes);
+            printf("[DIAGNOSTIC] Pruned model loaded successfully: %d/%d channels, %d/%d input features, %ld MACs/window.\n",
+                   g_pruned_model.num_channels, TCN_CHANNELS, g_pruned_model.num_features, INPUT_SIZE,
+                   pruned_model_macs(&g_pruned_model));
+        }
+    } else if (strstr(model_path, "_quantized.bin") != NULL || model_file_kind(model_path) == MODEL_KIND_INT8) {
         printf("Loading Quantized Model...\n");
         if (!load_quantized_model(&g_quantized_model, model_path)) {
             fprintf(stderr, "[SERVER WARNING] Quantized model file not found. Server running without a model.\n");
@@ -36,11 +453,26 @@ int main(int argc, char* argv[]) {
         } else {
             g_model_loaded = 1;
             g_is_quantized = 1;
-            printf("[DIAGNOSTIC] Quantized model loaded successfully. Sample weights:\n");
+            g_classes = g_quantized_model.classes;
+            print_class_names(&g_classes);
+            printf("[DIAGNOSTIC] Quantized model loaded successfully. Scales: input %.6f, activation %.6f\n",
+                   g_quantized_model.input_scale, g_quantized_model.activation_scale);
             printf("[DIAGNOSTIC] TCN weight[0]: %d\n", g_quantized_model.tcn_block_weights[0]);
-            printf("[DIAGNOSTIC] TCN bias[0]: %d\n", g_quantized_model.tcn_block_biases[0]);
+            printf("[DIAGNOSTIC] TCN bias[0]: %d (int32)\n", g_quantized_model.tcn_block_biases[0]);
             printf("[DIAGNOSTIC] Output weight[0]: %d\n", g_quantized_model.output_layer_weights[0]);
-            printf("[DIAGNOSTIC] Output bias[0]: %d\n", g_quantized_model.output_layer_biases[0]);
+            printf("[DIAGNOSTIC] Output bias[0]: %d (int32)\n", g_quantized_model.output_layer_biases[0]);
+        }
+    } else if (detect_model_variant(model_path) == TCN_VARIANT_DWS) {
+        printf("Loading Depthwise-Separable Float Model...\n");
+        if (!load_dws_inference_model(&g_dws_model, model_path)) {
+            fprintf(stderr, "[SERVER WARNING] Depthwise-separable model could not be loaded. Server running without a model.\n");
+            g_model_loaded = 0;
+        } else {
+            g_model_loaded = 1;
+            g_is_dws = 1;
+            g_classes = g_dws_model.classes;
+            print_class_names(&g_classes);
+            printf("[DIAGNOSTIC] Depthwise-separable model loaded successfully (%ld MACs/window).\n", model_macs(TCN_VARIANT_DWS));
         }
     } else {
         printf("Loading Float Model...\n");
@@ -50,6 +482,8 @@ int main(int argc, char* argv[]) {
         } else {
             g_model_loaded = 1;
             g_is_quantized = 0;
+            g_classes = g_float_model.classes;
+            print_class_names(&g_classes);
             printf("[DIAGNOSTIC] Float model loaded successfully. Sample weights:\n");
             printf("[DIAGNOSTIC] TCN weight[0]: %.6f\n", g_float_model.tcn_block.weights[0]);
             printf("[DIAGNOSTIC] TCN bias[0]: %.6f\n", g_float_model.tcn_block.biases[0]);
@@ -58,7 +492,7 @@ int main(int argc, char* argv[]) {
         }
     }
 
-    int server_fd, new_socket;
+    int server_fd;
     struct sockaddr_in address;
     int opt = 1;
     int addrlen = sizeof(address);
@@ -73,109 +507,90 @@ int main(int argc, char* argv[]) {
     address.sin_port = htons(SERVER_PORT);
 
     if (bind(server_fd, (struct sockaddr *)&address, sizeof(address))<0) { perror("bind failed"); exit(EXIT_FAILURE); }
-    if (listen(server_fd, 3) < 0) { perror("listen"); exit(EXIT_FAILURE); }
-    
-    printf("Server listening on port %d\n", SERVER_PORT);
-    while(1) { // Accept new connections
-        printf("[SERVER] Waiting for client connection...\n");
-        if ((new_socket = accept(server_fd, (struct sockaddr *)&address, (socklen_t*)&addrlen))<0) { 
-            perror("accept"); 
-            continue; // Wait for next connection
-        }
-        printf("[SERVER] Client connected on socket %d. Handling persistently.\n", new_socket);
-
-        // Handle single client connection
-        while(1) {
-            char send_buffer[64];
-            uint32_t msg_len_net;
-            ssize_t header_read = read(new_socket, &msg_len_net, sizeof(uint32_t));
-
-            if (header_read <= 0) {
-                if (header_read < 0) perror("[SERVER] Read header failed");
-                printf("[SERVER] Client disconnected.\n");
-                break; // Client disconnected, close socket
-            }
+    if (listen(server_fd, MAX_CLIENTS) < 0) { perror("listen"); exit(EXIT_FAILURE); }
 
-            uint32_t msg_len = ntohl(msg_len_net);
-            size_t expected_len = sizeof(g_hand_landmark_data);
-            if (msg_len != expected_len) {
-                fprintf(stderr, "[SERVER] Invalid message length: %u, expected %zu\n", msg_len, expected_len);
-                continue; // Wait for next message
-            }
+    // A client that disconnects with responses pending must not kill the server
+    signal(SIGPIPE, SIG_IGN);
 
-            // Read data into temp buffer
-            char temp_buffer[sizeof(g_hand_landmark_data)];
-            ssize_t total_read = 0;
-            while (total_read < msg_len) {
-                ssize_t payload_read = read(new_socket, temp_buffer + total_read, msg_len - total_read);
-                if (payload_read <= 0) {
-                    if (payload_read < 0) perror("[SERVER] Read payload failed");
-                    printf("[SERVER] Client disconnected during payload read.\n");
-                    goto close_client_socket; // Cleanup and close socket
-                }
-                total_read += payload_read;
-            }
-            
-            // Network to host byte order
-            uint32_t* temp_uint32 = (uint32_t*)temp_buffer;
-            for (int i = 0; i < (SEQUENCE_LENGTH * INPUT_SIZE); i++) {
-                uint32_t net_val = temp_uint32[i];
-                uint32_t host_val = ntohl(net_val);
-                g_hand_landmark_data[i] = *(float*)&host_val;
-            }
+    // SIGUSR1 dumps the metrics; no SA_RESTART, so it also wakes select()
+    struct sigaction dump_action;
+    memset(&dump_action, 0, sizeof(dump_action));
+    dump_action.sa_handler = on_sigusr1;
+    sigaction(SIGUSR1, &dump_action, NULL);
 
-            // Diagnostic: Print received data
-            printf("[DIAGNOSTIC] Received data. First 10 values: ");
-            for (int i = 0; i < 10; ++i) {
-                printf("%.3f ", g_hand_landmark_data[i]);
-            }
-            printf("\n");
-            
-            // Run inference only if a model is loaded
-            float prediction_output[NUM_CLASSES] = {0};
-            if (!g_model_loaded) {
-                snprintf(send_buffer, sizeof(send_buffer), "-1,0.0");
-                write(new_socket, send_buffer, strlen(send_buffer));
-                printf("[SERVER] Sent 'no model' response to client.\n");
-                continue;
-            }
+    for (int i = 0; i < MAX_CLIENTS; ++i) g_clients[i].fd = -1;
+    printf("Server listening on port %d (up to %d clients, batches of up to %d windows, %d us max wait)\n",
+           SERVER_PORT, MAX_CLIENTS, g_batch_max, g_batch_wait_us);
 
-            // Use the appropriate forward pass based on the loaded model type
-            if (g_is_quantized) {
-                printf("[DIAGNOSTIC] Running QUANTIZED forward pass...\n");
-                forward_pass_quantized(&g_quantized_model, (float*)g_hand_landmark_data, prediction_output);
-            } else {
-                printf("[DIAGNOSTIC] Running FLOAT forward pass...\n");
-                forward_pass_inference(&g_float_model, (float*)g_hand_landmark_data, prediction_output);
-            }
+    while (1) {
+        fd_set read_fds, write_fds;
+        FD_ZERO(&read_fds);
+        FD_ZERO(&write_fds);
+        FD_SET(server_fd, &read_fds);
+        int max_fd = server_fd;
+        for (int i = 0; i < MAX_CLIENTS; ++i) {
+            if (g_clients[i].fd < 0) continue;
+            FD_SET(g_clients[i].fd, &read_fds);
+            if (g_clients[i].output_len > 0) FD_SET(g_clients[i].fd, &write_fds);
+            if (g_clients[i].fd > max_fd) max_fd = g_clients[i].fd;
+        }
 
-            // Diagnostic: Print raw output
-            printf("[DIAGNOSTIC] Raw inference output: ");
-            for (int i = 0; i < NUM_CLASSES; ++i) {
-                printf("class_%d=%.6f ", i, prediction_output[i]);
-            }
-            printf("\n");
+        // Block until there is input, or until the oldest queued request is due
+        struct timeval timeout, *timeout_ptr = NULL;
+        if (g_queue_count > 0) {
+            uint64_t waited_us = (now_ns() - g_queue[0].enqueue_ns) / 1000;
+            uint64_t remaining = waited_us >= (uint64_t)g_batch_wait_us ? 0 : g_batch_wait_us - waited_us;
+            timeout.tv_sec = remaining / 1000000;
+            timeout.tv_usec = remaining % 1000000;
+            timeout_ptr = &timeout;
+        }
+        int ready = select(max_fd + 1, &read_fds, &write_fds, NULL, timeout_ptr);
+        if (g_dump_requested) {
+            g_dump_requested = 0;
+            server_metrics_print(&g_metrics, stdout);
+        }
+        if (ready < 0) {
+            if (errno == EINTR) continue;
+            perror("select");
+            break;
+        }
 
-            // Find best prediction
-            int prediction = 0;
-            float confidence = 0.0f;
-            for (int i = 0; i < NUM_CLASSES; ++i) {
-                if (prediction_output[i] > confidence) {
-                    confidence = prediction_output[i];
-                    prediction = i;
+        if (FD_ISSET(server_fd, &read_fds)) { // Accept new connections
+            int new_socket = accept(server_fd, (struct sockaddr *)&address, (socklen_t*)&addrlen);
+            if (new_socket < 0) {
+                perror("accept");
+            } else {
+                int slot = -1;
+                for (int i = 0; i < MAX_CLIENTS && slot < 0; ++i) if (g_clients[i].fd < 0) slot = i;
+                if (slot < 0) {
+                    fprintf(stderr, "[SERVER] Too many clients (max %d). Rejecting socket %d.\n", MAX_CLIENTS, new_socket);
+                    close(new_socket);
+                } else {
+                    // Several responses may go out back to back; don't let Nagle hold the later ones
+                    setsockopt(new_socket, IPPROTO_TCP, TCP_NODELAY, &opt, sizeof(opt));
+                    g_clients[slot].fd = new_socket;
+                    g_clients[slot].generation++;
+                    g_clients[slot].received = 0;
+                    g_clients[slot].output_len = 0;
+                    g_metrics.connections++;
+                    LOG_AT(LOG_INFO, "[SERVER] Client connected on socket %d. Handling persistently.\n", new_socket);
                 }
             }
+        }
 
-            printf("[DIAGNOSTIC] Final prediction: class_%d with confidence %.6f\n", prediction, confidence);
-
-            // Send Response 
-            snprintf(send_buffer, sizeof(send_buffer), "%d,%.4f", prediction, confidence);
-            write(new_socket, send_buffer, strlen(send_buffer));
+        for (int i = 0; i < MAX_CLIENTS; ++i) {
+            if (g_clients[i].fd >= 0 && FD_ISSET(g_clients[i].fd, &write_fds) && !flush_client(i)) {
+                close_client(i);
+            }
+            if (g_clients[i].fd >= 0 && FD_ISSET(g_clients[i].fd, &read_fds) && !read_client(i)) {
+                close_client(i);
+            }
         }
 
-    close_client_socket:
-        printf("[SERVER] Closing client socket %d.\n", new_socket);
-        close(new_socket);
+        // Nothing more to read right now: run the batch once it is due
+        if (g_queue_count > 0 && now_ns() - g_queue[0].enqueue_ns >= (uint64_t)g_batch_wait_us * 1000) {
+            run_batch();
+        }
     }
     close(server_fd);
     // No free_model needed with static allocation.
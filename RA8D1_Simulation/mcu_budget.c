@@ -0,0 +1,70 @@
+#include <stdio.h>
+#include "mcu_budget.h"
+
+#define FIELD_SIZE(type, field) sizeof(((type*)0)->field)
+
+static void add_layer(InferenceBudget* budget, const char* name, long macs, size_t weight_bytes) {
+    budget->layers[budget->num_layers++] = (LayerBudget){name, macs, weight_bytes};
+    budget->macs += macs;
+    budget->flash_bytes += weight_bytes;
+}
+
+void compute_inference_budget(TCNVariant variant, int quantized, int num_classes, InferenceBudget* budget) {
+    *budget = (InferenceBudget){0};
+    const long taps = valid_causal_taps();
+    const long head_macs = (long)num_classes * TCN_CHANNELS;
+    const size_t float_head_bytes = (size_t)num_classes * (TCN_CHANNELS + 1) * sizeof(float);
+
+    if (quantized) {
+        // INT8 kernels are dense only; every row is padded to QUANT_INPUT_STRIDE
+        budget->name = "INT8 dense TCN";
+        add_layer(budget, "tcn_conv", taps * QUANT_INPUT_STRIDE * TCN_CHANNELS,
+                  FIELD_SIZE(QuantizedModel, tcn_block_weights) + FIELD_SIZE(QuantizedModel, tcn_block_biases)
+                  + FIELD_SIZE(QuantizedModel, tcn_weight_scales) + FIELD_SIZE(QuantizedModel, tcn_multipliers)
+                  + FIELD_SIZE(QuantizedModel, tcn_shifts) + FIELD_SIZE(QuantizedModel, tcn_negative_multipliers)
+                  + FIELD_SIZE(QuantizedModel, tcn_negative_shifts) + FIELD_SIZE(QuantizedModel, input_scale)
+                  + FIELD_SIZE(QuantizedModel, activation_scale));
+        add_layer(budget, "output", head_macs,
+                  (size_t)num_classes * (TCN_CHANNELS * sizeof(int8_t) + sizeof(int32_t) + sizeof(float)));
+        budget->activation_bytes = INT8_ACTIVATION_BYTES(num_classes);
+        budget->derived_bytes = INT8_DERIVED_BYTES(num_classes);
+    } else if (variant == TCN_VARIANT_DWS) {
+        budget->name = "FP32 depthwise-separable TCN";
+        add_layer(budget, "depthwise", taps * INPUT_SIZE, FIELD_SIZE(InferenceDWSBlock, dw_weights));
+        add_layer(budget, "pointwise", (long)SEQUENCE_LENGTH * INPUT_SIZE * TCN_CHANNELS,
+                  FIELD_SIZE(InferenceDWSBlock, pw_weights) + FIELD_SIZE(InferenceDWSBlock, pw_biases));
+        add_layer(budget, "output", head_macs, float_head_bytes);
+        budget->activation_bytes = DWS_ACTIVATION_BYTES(num_classes);
+    } else {
+        budget->name = "FP32 dense TCN";
+        add_layer(budget, "tcn_conv", taps * INPUT_SIZE * TCN_CHANNELS, sizeof(InferenceTCNBlock));
+        add_layer(budget, "output", head_macs, float_head_bytes);
+        budget->activation_bytes = FLOAT_ACTIVATION_BYTES(num_classes);
+    }
+
+    budget->input_bytes = INFERENCE_INPUT_BYTES;
+    budget->sram_bytes = budget->input_bytes + budget->activation_bytes + budget->derived_bytes;
+    int macs_per_cycle = quantized ? RA8D1_INT8_MACS_PER_CYCLE : RA8D1_FLOAT_MACS_PER_CYCLE;
+    budget->latency_us = (double)budget->macs / macs_per_cycle / RA8D1_CPU_MHZ;
+}
+
+int print_inference_budget(const InferenceBudget* budget) {
+    const size_t sram_limit = (size_t)RA8D1_SRAM_BUDGET_KB * 1024;
+    const size_t flash_limit = (size_t)RA8D1_FLASH_BUDGET_KB * 1024;
+
+    printf("[BUDGET] %s on RA8D1 (%d MHz)\n", budget->name, RA8D1_CPU_MHZ);
+    for (int i = 0; i < budget->num_layers; ++i) {
+        printf("[BUDGET]   %-10s %7ld MACs %7zu B weights\n",
+               budget->layers[i].name, budget->layers[i].macs, budget->layers[i].weight_bytes);
+    }
+    printf("[BUDGET]   Flash: %zu B of %d KB (%.2f%%)\n",
+           budget->flash_bytes, RA8D1_FLASH_BUDGET_KB, 100.0 * budget->flash_bytes / flash_limit);
+    printf("[BUDGET]   SRAM: %zu B input + %zu B activations + %zu B derived = %zu B of %d KB (%.2f%%)\n",
+           budget->input_bytes, budget->activation_bytes, budget->derived_bytes, budget->sram_bytes,
+           RA8D1_SRAM_BUDGET_KB, 100.0 * budget->sram_bytes / sram_limit);
+    printf("[BUDGET]   Compute: %ld MACs/window, ~%.1f us at %d MHz\n", budget->macs, budget->latency_us, RA8D1_CPU_MHZ);
+
+    int fits = budget->flash_bytes <= flash_limit && budget->sram_bytes <= sram_limit;
+    if (!fits) printf("[BUDGET]   WARNING: %s exceeds the RA8D1 memory budget\n", budget->name);
+    return fits ? 0 : 1;
+}
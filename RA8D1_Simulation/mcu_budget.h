@@ -0,0 +1,57 @@
+#ifndef MCU_BUDGET_H
+#define MCU_BUDGET_H
+
+#include <assert.h>
+#include <stddef.h>
+#include "training_logic.h"
+#include "mcu_constraints.h"
+
+// RA8D1 Inference Budget
+// Static per-window compute and memory of the float and INT8 inference paths.
+// Weights and quantization parameters live in flash. SRAM holds the input
+// window, the kernel's working buffers and, for INT8, the tables that
+// prepare_quantized_model() derives at load time.
+
+// Working buffers of each kernel for n classes (keep in sync with the locals in training_logic.c)
+#define INFERENCE_INPUT_BYTES (SEQUENCE_LENGTH * INPUT_SIZE * sizeof(float))
+#define FLOAT_ACTIVATION_BYTES(n) ((TCN_CHANNELS + 2 * (n)) * sizeof(float)) // pooled, logits, probabilities
+#define DWS_ACTIVATION_BYTES(n) (SEQUENCE_LENGTH * INPUT_SIZE * sizeof(float) + FLOAT_ACTIVATION_BYTES(n)) // + dw_output
+#define INT8_ACTIVATION_BYTES(n) (SEQUENCE_LENGTH * QUANT_INPUT_STRIDE * sizeof(int8_t) \
+                                  + (TCN_CHANNELS + (n)) * sizeof(int32_t) + (n) * sizeof(float))
+#define INT8_DERIVED_BYTES(n) (TCN_CHANNELS * TCN_KERNEL_SIZE * QUANT_INPUT_STRIDE * sizeof(int8_t) \
+                               + 2 * (n) * sizeof(int32_t))
+
+// Checked at the largest head a model file may declare
+static_assert(INFERENCE_INPUT_BYTES + DWS_ACTIVATION_BYTES(MAX_CLASSES) < RA8D1_SRAM_BUDGET_KB * 1024,
+              "Error: Float inference buffers exceed the RA8D1 SRAM budget!");
+static_assert(INFERENCE_INPUT_BYTES + INT8_ACTIVATION_BYTES(MAX_CLASSES) + INT8_DERIVED_BYTES(MAX_CLASSES) < RA8D1_SRAM_BUDGET_KB * 1024,
+              "Error: INT8 inference buffers exceed the RA8D1 SRAM budget!");
+static_assert(DENSE_MODEL_FILE_SIZE < RA8D1_FLASH_BUDGET_KB * 1024, "Error: Model weights exceed the RA8D1 flash budget!");
+
+#define MAX_BUDGET_LAYERS 3
+
+typedef struct {
+    const char* name;
+    long macs;           // Per window, as executed (INT8 rows include their zero padding)
+    size_t weight_bytes; // Weights, biases and quantization parameters
+} LayerBudget;
+
+typedef struct {
+    const char* name;
+    LayerBudget layers[MAX_BUDGET_LAYERS];
+    int num_layers;
+    long macs;
+    size_t flash_bytes;
+    size_t input_bytes;
+    size_t activation_bytes;
+    size_t derived_bytes;
+    size_t sram_bytes;
+    double latency_us; // Compute only, at RA8D1_CPU_MHZ
+} InferenceBudget;
+
+// num_classes sizes the output layer (the model file's class count)
+void compute_inference_budget(TCNVariant variant, int quantized, int num_classes, InferenceBudget* budget);
+// Prints the report as [BUDGET] lines; returns 0 if it fits the RA8D1 budgets
+int print_inference_budget(const InferenceBudget* budget);
+
+#endif // MCU_BUDGET_H
@@ -5,6 +5,11 @@
 #define RA8D1_SRAM_BUDGET_KB 1024
 #define RA8D1_FLASH_BUDGET_KB 2048
 
+// RA8D1 core (Cortex-M85) throughput assumed by the latency estimates
+#define RA8D1_CPU_MHZ 480
+#define RA8D1_FLOAT_MACS_PER_CYCLE 1 // Scalar single-precision FMA
+#define RA8D1_INT8_MACS_PER_CYCLE 4  // 4-wide int8 dot products (dot_s8x4)
+
 // App's SRAM limit for simulation
 #define APP_SRAM_LIMIT (1024 * 1024) // 1 MB (1024 KB)
 
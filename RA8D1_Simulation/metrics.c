@@ -0,0 +1,90 @@
+#include "metrics.h"
+#include <string.h>
+
+static int bucket_index(uint64_t value) {
+    int index = 0;
+    while (value > 0 && index < HISTOGRAM_BUCKETS - 1) {
+        value >>= 1;
+        index++;
+    }
+    return index;
+}
+
+// Smallest value of a bucket and the first value past it
+static uint64_t bucket_low(int index) { return index == 0 ? 0 : (uint64_t)1 << (index - 1); }
+static uint64_t bucket_high(int index) { return (uint64_t)1 << index; }
+
+void histogram_record(Histogram* histogram, uint64_t value) {
+    histogram->buckets[bucket_index(value)]++;
+    histogram->count++;
+    histogram->sum += value;
+    if (value > histogram->max) histogram->max = value;
+}
+
+void histogram_reset(Histogram* histogram) {
+    memset(histogram->buckets, 0, sizeof(histogram->buckets));
+    histogram->count = 0;
+    histogram->sum = 0;
+    histogram->max = 0;
+}
+
+uint64_t histogram_quantile(const Histogram* histogram, double quantile) {
+    if (histogram->count == 0) return 0;
+    uint64_t target = (uint64_t)(quantile * histogram->count);
+    if (target >= histogram->count) target = histogram->count - 1;
+    uint64_t seen = 0;
+    for (int i = 0; i < HISTOGRAM_BUCKETS; ++i) {
+        seen += histogram->buckets[i];
+        if (seen > target) {
+            if (i == HISTOGRAM_BUCKETS - 1) return histogram->max; // Open-ended: max is the only bound
+            uint64_t high = bucket_high(i) - 1;
+            return high < histogram->max ? high : histogram->max;
+        }
+    }
+    return histogram->max;
+}
+
+void histogram_print(const Histogram* histogram, FILE* out) {
+    fprintf(out, "%s (%s): n=%llu mean=%.1f p50<=%llu p99<=%llu max=%llu\n", histogram->name, histogram->unit,
+            (unsigned long long)histogram->count, histogram->count ? (double)histogram->sum / histogram->count : 0.0,
+            (unsigned long long)histogram_quantile(histogram, 0.50), (unsigned long long)histogram_quantile(histogram, 0.99),
+            (unsigned long long)histogram->max);
+    for (int i = 0; i < HISTOGRAM_BUCKETS; ++i) {
+        if (histogram->buckets[i] == 0) continue;
+        fprintf(out, "  [%llu, %llu%s %llu\n", (unsigned long long)bucket_low(i), (unsigned long long)bucket_high(i),
+                i == HISTOGRAM_BUCKETS - 1 ? "+)" : ")", (unsigned long long)histogram->buckets[i]);
+    }
+}
+
+static const Histogram* server_histograms(const ServerMetrics* metrics, int index) {
+    const Histogram* histograms[] = {&metrics->read_ns, &metrics->decode_ns, &metrics->queue_wait_ns,
+                                     &metrics->forward_ns, &metrics->write_ns, &metrics->batch_size};
+    return index < (int)(sizeof(histograms) / sizeof(histograms[0])) ? histograms[index] : NULL;
+}
+
+int server_metrics_format(const ServerMetrics* metrics, char* text, size_t size) {
+    size_t used = snprintf(text, size, "connections=%llu requests=%llu rejected=%llu batches=%llu stats_requests=%llu",
+                           (unsigned long long)metrics->connections, (unsigned long long)metrics->requests,
+                           (unsigned long long)metrics->rejected, (unsigned long long)metrics->batches,
+                           (unsigned long long)metrics->stats_requests);
+    const Histogram* histogram;
+    for (int i = 0; (histogram = server_histograms(metrics, i)) != NULL && used < size; ++i) {
+        used += snprintf(text + used, size - used, " %s_%s_p50=%llu %s_%s_p99=%llu %s_%s_max=%llu",
+                         histogram->name, histogram->unit, (unsigned long long)histogram_quantile(histogram, 0.50),
+                         histogram->name, histogram->unit, (unsigned long long)histogram_quantile(histogram, 0.99),
+                         histogram->name, histogram->unit, (unsigned long long)histogram->max);
+    }
+    return used < size ? (int)used : (int)size - 1;
+}
+
+void server_metrics_print(const ServerMetrics* metrics, FILE* out) {
+    fprintf(out, "[METRICS] connections %llu, requests %llu, rejected %llu, batches %llu, stats requests %llu\n",
+            (unsigned long long)metrics->connections, (unsigned long long)metrics->requests,
+            (unsigned long long)metrics->rejected, (unsigned long long)metrics->batches,
+            (unsigned long long)metrics->stats_requests);
+    const Histogram* histogram;
+    for (int i = 0; (histogram = server_histograms(metrics, i)) != NULL; ++i) {
+        histogram_print(histogram, out);
+    }
+    fflush(out);
+}
@@ -0,0 +1,54 @@
+#ifndef METRICS_H
+#define METRICS_H
+
+#include <stdint.h>
+#include <stdio.h>
+
+// Server Metrics
+// Fixed-size histograms with power-of-two buckets: recording a sample is an
+// increment, so they can stay on for every request.
+
+#define HISTOGRAM_BUCKETS 24 // Bucket 0 holds 0, bucket i holds [2^(i-1), 2^i); the last one is open-ended
+
+typedef struct {
+    const char* name;
+    const char* unit;
+    uint64_t buckets[HISTOGRAM_BUCKETS];
+    uint64_t count;
+    uint64_t sum;
+    uint64_t max;
+} Histogram;
+
+void histogram_record(Histogram* histogram, uint64_t value);
+void histogram_reset(Histogram* histogram);
+// Upper bound of the bucket holding the given quantile (0..1); max for the open-ended last bucket
+uint64_t histogram_quantile(const Histogram* histogram, double quantile);
+// One summary line plus one line per non-empty bucket
+void histogram_print(const Histogram* histogram, FILE* out);
+
+// Inference server counters and per-stage latencies. The server loop is
+// single-threaded and the SIGUSR1 handler only sets a flag, so plain
+// increments are enough: no locks or atomics on the request path.
+typedef struct {
+    uint64_t connections;    // Accepted clients
+    uint64_t requests;       // Windows queued for inference
+    uint64_t rejected;       // Requests answered with -1 (bad length, no model, unsupported window)
+    uint64_t batches;
+    uint64_t stats_requests;
+    Histogram read_ns;       // First byte of a request until it is complete
+    Histogram decode_ns;     // Network to host byte order
+    Histogram queue_wait_ns; // Queued until its batch starts
+    Histogram forward_ns;    // Kernel time per window (batch time / batch size)
+    Histogram write_ns;      // Sending one response
+    Histogram batch_size;
+} ServerMetrics;
+
+#define SERVER_METRICS_INIT { .read_ns = {"read", "ns"}, .decode_ns = {"decode", "ns"}, .queue_wait_ns = {"queue_wait", "ns"}, \
+                              .forward_ns = {"forward", "ns"}, .write_ns = {"write", "ns"}, .batch_size = {"batch_size", "windows"} }
+
+// Space-separated key=value pairs (counters, then <name>_<unit>_p50/_p99/_max per histogram); returns the length
+int server_metrics_format(const ServerMetrics* metrics, char* text, size_t size);
+// Counters plus every histogram with its buckets
+void server_metrics_print(const ServerMetrics* metrics, FILE* out);
+
+#endif // METRICS_H
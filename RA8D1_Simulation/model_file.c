@@ -0,0 +1,255 @@
+#include "model_file.h"
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <fcntl.h>
+#include <unistd.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+
+#define ALIGN_UP(value) (((value) + MODEL_FILE_ALIGN - 1) & ~(size_t)(MODEL_FILE_ALIGN - 1))
+
+static const size_t dtype_sizes[] = {sizeof(float), sizeof(int8_t), sizeof(int32_t)};
+
+// CRC-32 (IEEE 802.3, reflected), the same as zlib.crc32 on the Python side
+static uint32_t crc32_update(uint32_t crc, const uint8_t* data, size_t len) {
+    static uint32_t table[256];
+    if (table[1] == 0) {
+        for (uint32_t i = 0; i < 256; ++i) {
+            uint32_t c = i;
+            for (int k = 0; k < 8; ++k) c = (c & 1) ? 0xEDB88320u ^ (c >> 1) : c >> 1;
+            table[i] = c;
+        }
+    }
+    crc = ~crc;
+    for (size_t i = 0; i < len; ++i) crc = table[(crc ^ data[i]) & 0xFF] ^ (crc >> 8);
+    return ~crc;
+}
+
+// CRC of a whole file image with its checksum field read as zero
+static uint32_t file_checksum(const uint8_t* data, size_t size) {
+    ModelFileHeader header;
+    memcpy(&header, data, sizeof(header));
+    header.checksum = 0;
+    uint32_t crc = crc32_update(0, (const uint8_t*)&header, sizeof(header));
+    return crc32_update(crc, data + sizeof(header), size - sizeof(header));
+}
+
+void set_class_names(ClassNames* classes, const char** names, int num_names, int num_classes) {
+    memset(classes, 0, sizeof(*classes));
+    classes->count = num_classes;
+    for (int j = 0; j < num_classes; ++j) {
+        if (j < num_names && names && names[j]) {
+            snprintf(classes->names[j], CLASS_NAME_LEN, "%s", names[j]);
+        } else {
+            snprintf(classes->names[j], CLASS_NAME_LEN, "class_%d", j);
+        }
+    }
+}
+
+// Reading
+
+int is_model_file(const char* file_path) {
+    return model_file_kind(file_path) >= 0;
+}
+
+int model_file_kind(const char* file_path) {
+    FILE* fp = fopen(file_path, "rb");
+    if (!fp) return -1;
+    ModelFileHeader header;
+    size_t read = fread(&header, sizeof(header), 1, fp);
+    fclose(fp);
+    if (read != 1 || memcmp(header.magic, MODEL_FILE_MAGIC, 4) != 0) return -1;
+    return header.kind;
+}
+
+static int check_dim(const char* file_path, const char* name, uint32_t value, uint32_t expected) {
+    if (value == expected) return 1;
+    fprintf(stderr, "Error: %s has %s %u, but this build expects %u.\n", file_path, name, value, expected);
+    return 0;
+}
+
+int model_file_open(ModelFile* file, const char* file_path) {
+    memset(file, 0, sizeof(*file));
+    int fd = open(file_path, O_RDONLY);
+    if (fd < 0) {
+        perror("Failed to open model file");
+        return 0;
+    }
+    struct stat st;
+    if (fstat(fd, &st) != 0 || (size_t)st.st_size < sizeof(ModelFileHeader)) {
+        fprintf(stderr, "Error: %s is too small to be a model file.\n", file_path);
+        close(fd);
+        return 0;
+    }
+    void* mapping = mmap(NULL, st.st_size, PROT_READ, MAP_PRIVATE, fd, 0);
+    close(fd); // The mapping stays valid
+    if (mapping == MAP_FAILED) {
+        perror("Failed to map model file");
+        return 0;
+    }
+    file->data = (const uint8_t*)mapping;
+    file->size = st.st_size;
+    file->header = (const ModelFileHeader*)file->data;
+
+    const ModelFileHeader* header = file->header;
+    const char* error = NULL;
+    size_t names_end = sizeof(ModelFileHeader) + (size_t)header->num_classes * CLASS_NAME_LEN;
+    size_t table_end = names_end + (size_t)header->num_tensors * sizeof(ModelTensorEntry);
+    if (memcmp(header->magic, MODEL_FILE_MAGIC, 4) != 0) error = "not a model container";
+    else if (header->version != MODEL_FILE_VERSION) error = "unsupported container version";
+    else if (header->file_size != file->size) error = "truncated (size differs from header)";
+    else if (header->num_classes < 1 || header->num_classes > MAX_CLASSES) error = "class count outside 1..MAX_CLASSES";
+    else if (header->num_tensors > MODEL_FILE_MAX_TENSORS || table_end > file->size) error = "tensor table out of bounds";
+    else if (file_checksum(file->data, file->size) != header->checksum) error = "checksum mismatch (corrupt file)";
+    if (error) {
+        fprintf(stderr, "Error: %s: %s.\n", file_path, error);
+        model_file_close(file);
+        return 0;
+    }
+
+    file->class_names = (const char (*)[CLASS_NAME_LEN])(file->data + sizeof(ModelFileHeader));
+    file->tensors = (const ModelTensorEntry*)(file->data + names_end);
+    for (uint32_t i = 0; i < header->num_tensors; ++i) {
+        const ModelTensorEntry* tensor = &file->tensors[i];
+        if (tensor->offset % MODEL_FILE_ALIGN != 0 || tensor->offset < table_end
+            || (size_t)tensor->offset + tensor->nbytes > file->size || tensor->dtype > MODEL_DTYPE_I32) {
+            fprintf(stderr, "Error: %s: tensor %.*s is misaligned or out of bounds.\n",
+                    file_path, MODEL_TENSOR_NAME_LEN, tensor->name);
+            model_file_close(file);
+            return 0;
+        }
+    }
+
+    // The kernels are compiled for one architecture; only the class count is free
+    if (!check_dim(file_path, "input size", header->input_size, INPUT_SIZE)
+        || !check_dim(file_path, "sequence length", header->sequence_length, SEQUENCE_LENGTH)
+        || !check_dim(file_path, "TCN channels", header->tcn_channels, TCN_CHANNELS)
+        || !check_dim(file_path, "kernel size", header->kernel_size, TCN_KERNEL_SIZE)
+        || !check_dim(file_path, "dilation", header->dilation, TCN_DILATION)) {
+        model_file_close(file);
+        return 0;
+    }
+    return 1;
+}
+
+int model_file_open_kind(ModelFile* file, const char* file_path, ModelKind kind) {
+    if (!model_file_open(file, file_path)) return 0;
+    if (file->header->kind != kind) {
+        static const char* kind_names[] = {"dense float", "depthwise-separable float", "INT8", "pruned float"};
+        fprintf(stderr, "Error: %s holds a %s model; this tool needs a %s model.\n", file_path,
+                file->header->kind <= MODEL_KIND_PRUNED ? kind_names[file->header->kind] : "unknown", kind_names[kind]);
+        model_file_close(file);
+        return 0;
+    }
+    return 1;
+}
+
+void model_file_close(ModelFile* file) {
+    if (file->data) munmap((void*)file->data, file->size);
+    memset(file, 0, sizeof(*file));
+}
+
+const void* model_file_tensor(const ModelFile* file, const char* name, ModelDType dtype, size_t count) {
+    for (uint32_t i = 0; i < file->header->num_tensors; ++i) {
+        const ModelTensorEntry* tensor = &file->tensors[i];
+        if (strncmp(tensor->name, name, MODEL_TENSOR_NAME_LEN) != 0) continue;
+        if (tensor->dtype != dtype || tensor->nbytes != count * dtype_sizes[dtype]) {
+            fprintf(stderr, "Error: Model tensor %s has dtype %u and %u bytes, expected dtype %d and %zu bytes.\n",
+                    name, tensor->dtype, tensor->nbytes, dtype, count * dtype_sizes[dtype]);
+            return NULL;
+        }
+        return file->data + tensor->offset;
+    }
+    fprintf(stderr, "Error: Model file has no tensor %s.\n", name);
+    return NULL;
+}
+
+void model_file_classes(const ModelFile* file, ClassNames* classes) {
+    memset(classes, 0, sizeof(*classes));
+    classes->count = file->header->num_classes;
+    for (int j = 0; j < classes->count; ++j) {
+        memcpy(classes->names[j], file->class_names[j], CLASS_NAME_LEN);
+        classes->names[j][CLASS_NAME_LEN - 1] = '\0';
+    }
+}
+
+// Writing
+
+void model_file_writer_init(ModelFileWriter* writer, ModelKind kind, const ClassNames* classes) {
+    memset(writer, 0, sizeof(*writer));
+    memcpy(writer->header.magic, MODEL_FILE_MAGIC, 4);
+    writer->header.version = MODEL_FILE_VERSION;
+    writer->header.kind = (uint16_t)kind;
+    writer->header.input_size = INPUT_SIZE;
+    writer->header.sequence_length = SEQUENCE_LENGTH;
+    writer->header.tcn_channels = TCN_CHANNELS;
+    writer->header.kernel_size = TCN_KERNEL_SIZE;
+    writer->header.dilation = TCN_DILATION;
+    writer->header.num_classes = classes->count;
+    writer->classes = *classes;
+}
+
+void model_file_add_tensor(ModelFileWriter* writer, const char* name, ModelDType dtype, const void* data,
+                           int ndim, const uint32_t* shape) {
+    if (writer->header.num_tensors >= MODEL_FILE_MAX_TENSORS || ndim < 1 || ndim > MODEL_TENSOR_MAX_DIMS) {
+        fprintf(stderr, "Error: Cannot add tensor %s to the model file.\n", name);
+        return;
+    }
+    ModelTensorEntry* tensor = &writer->tensors[writer->header.num_tensors];
+    memset(tensor, 0, sizeof(*tensor));
+    snprintf(tensor->name, MODEL_TENSOR_NAME_LEN, "%s", name);
+    tensor->dtype = (uint8_t)dtype;
+    tensor->ndim = (uint8_t)ndim;
+    size_t count = 1;
+    for (int d = 0; d < MODEL_TENSOR_MAX_DIMS; ++d) {
+        tensor->shape[d] = d < ndim ? shape[d] : 1;
+        count *= tensor->shape[d];
+    }
+    tensor->nbytes = (uint32_t)(count * dtype_sizes[dtype]);
+    writer->tensor_data[writer->header.num_tensors++] = data;
+}
+
+int model_file_write(ModelFileWriter* writer, const char* file_path) {
+    ModelFileHeader* header = &writer->header;
+    size_t offset = ALIGN_UP(sizeof(ModelFileHeader) + (size_t)header->num_classes * CLASS_NAME_LEN
+                             + (size_t)header->num_tensors * sizeof(ModelTensorEntry));
+    for (uint32_t i = 0; i < header->num_tensors; ++i) {
+        writer->tensors[i].offset = (uint32_t)offset;
+        offset = ALIGN_UP(offset + writer->tensors[i].nbytes);
+    }
+    header->file_size = (uint32_t)offset;
+    header->checksum = 0;
+
+    // Assembled in memory (a few KB) so the checksum covers exactly what is written
+    uint8_t* image = (uint8_t*)calloc(1, offset);
+    if (!image) {
+        perror("Failed to allocate model file");
+        return 0;
+    }
+    size_t pos = 0;
+    memcpy(image, header, sizeof(*header));
+    pos += sizeof(*header);
+    for (uint32_t j = 0; j < header->num_classes; ++j) {
+        strncpy((char*)image + pos, writer->classes.names[j], CLASS_NAME_LEN - 1);
+        pos += CLASS_NAME_LEN;
+    }
+    memcpy(image + pos, writer->tensors, header->num_tensors * sizeof(ModelTensorEntry));
+    for (uint32_t i = 0; i < header->num_tensors; ++i) {
+        memcpy(image + writer->tensors[i].offset, writer->tensor_data[i], writer->tensors[i].nbytes);
+    }
+    header->checksum = file_checksum(image, offset);
+    memcpy(image + offsetof(ModelFileHeader, checksum), &header->checksum, sizeof(header->checksum));
+
+    FILE* fp = fopen(file_path, "wb");
+    if (!fp) {
+        perror("Error opening file for writing");
+        free(image);
+        return 0;
+    }
+    int success = fwrite(image, offset, 1, fp) == 1;
+    success &= fclose(fp) == 0;
+    free(image);
+    if (!success) fprintf(stderr, "Error: Failed to write %s.\n", file_path);
+    return success;
+}
@@ -0,0 +1,106 @@
+#ifndef MODEL_FILE_H
+#define MODEL_FILE_H
+
+#include <stddef.h>
+#include <stdint.h>
+#include "training_logic.h"
+
+// Model Container
+// A versioned, little-endian file shared with Python_Hand_Tracker/model_file.py:
+//   [header 64 B][class names: num_classes x CLASS_NAME_LEN][tensor table: num_tensors x 64 B][tensor data]
+// Every tensor starts on a MODEL_FILE_ALIGN boundary, so a mapped file can be
+// read in place. The checksum is the CRC-32 of the whole file with the
+// checksum field zeroed. The architecture dims must match this build; the
+// class count may be anything up to MAX_CLASSES.
+
+#define MODEL_FILE_MAGIC "TCNM"
+#define MODEL_FILE_VERSION 1
+#define MODEL_FILE_ALIGN 64
+#define MODEL_FILE_MAX_TENSORS 16
+#define MODEL_TENSOR_NAME_LEN 32
+#define MODEL_TENSOR_MAX_DIMS 4
+
+typedef enum {
+    MODEL_KIND_DENSE = 0, // FP32 dense TCN
+    MODEL_KIND_DWS = 1,   // FP32 depthwise-separable TCN
+    MODEL_KIND_INT8 = 2,  // INT8 dense TCN with its scales and requantization parameters
+    MODEL_KIND_PRUNED = 3 // FP32 dense TCN with only the kept channels/features plus index maps (pruning.h)
+} ModelKind;
+
+typedef enum {
+    MODEL_DTYPE_F32 = 0,
+    MODEL_DTYPE_I8 = 1,
+    MODEL_DTYPE_I32 = 2
+} ModelDType;
+
+typedef struct {
+    char magic[4];
+    uint16_t version;
+    uint16_t kind;            // ModelKind
+    uint32_t input_size;
+    uint32_t sequence_length;
+    uint32_t tcn_channels;
+    uint32_t kernel_size;
+    uint32_t dilation;
+    uint32_t num_classes;
+    uint32_t num_tensors;
+    uint32_t file_size;
+    uint32_t checksum;
+    uint8_t reserved[20];
+} ModelFileHeader;
+
+typedef struct {
+    char name[MODEL_TENSOR_NAME_LEN];
+    uint8_t dtype;            // ModelDType
+    uint8_t ndim;
+    uint16_t reserved;
+    uint32_t shape[MODEL_TENSOR_MAX_DIMS]; // Unused dims are 1
+    uint32_t offset;          // From the start of the file
+    uint32_t nbytes;
+    uint32_t reserved2;
+} ModelTensorEntry;
+
+static_assert(sizeof(ModelFileHeader) == 64, "Error: Model file header must be 64 bytes!");
+static_assert(sizeof(ModelTensorEntry) == 64, "Error: Model tensor entry must be 64 bytes!");
+
+// A validated, read-only mapping of a model file
+typedef struct {
+    const uint8_t* data;
+    size_t size;
+    const ModelFileHeader* header;
+    const char (*class_names)[CLASS_NAME_LEN];
+    const ModelTensorEntry* tensors;
+} ModelFile;
+
+// 1 if the file starts with MODEL_FILE_MAGIC (legacy raw models do not)
+int is_model_file(const char* file_path);
+// ModelKind from the header, or -1 if the file is not a container
+int model_file_kind(const char* file_path);
+
+// Maps and validates the file (magic, version, size, checksum, dims, tensor bounds); 0 with a message on failure
+int model_file_open(ModelFile* file, const char* file_path);
+// model_file_open() plus a check that the file holds the given kind of model
+int model_file_open_kind(ModelFile* file, const char* file_path, ModelKind kind);
+void model_file_close(ModelFile* file);
+// The named tensor's data inside the mapping, or NULL with a message if it is
+// missing or its dtype or element count differ
+const void* model_file_tensor(const ModelFile* file, const char* name, ModelDType dtype, size_t count);
+void model_file_classes(const ModelFile* file, ClassNames* classes);
+
+// Writing: tensors are referenced, not copied, until model_file_write()
+typedef struct {
+    ModelFileHeader header;
+    ClassNames classes;
+    ModelTensorEntry tensors[MODEL_FILE_MAX_TENSORS];
+    const void* tensor_data[MODEL_FILE_MAX_TENSORS];
+} ModelFileWriter;
+
+void model_file_writer_init(ModelFileWriter* writer, ModelKind kind, const ClassNames* classes);
+void model_file_add_tensor(ModelFileWriter* writer, const char* name, ModelDType dtype, const void* data,
+                           int ndim, const uint32_t* shape);
+int model_file_write(ModelFileWriter* writer, const char* file_path);
+
+// Names for the first num_classes outputs; missing or NULL names become class_<j>
+void set_class_names(ClassNames* classes, const char** names, int num_names, int num_classes);
+
+#endif // MODEL_FILE_H
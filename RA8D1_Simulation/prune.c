@@ -0,0 +1,187 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <math.h>
+#include <time.h>
+#include "training_logic.h"
+#include "pruning.h"
+
+// Constants
+#define DATA_DIR "../models/data"
+#define MODELS_DIR "../models"
+
+// Fine-tune Hyperparameters
+#define FINETUNE_EPOCHS 15
+#define LEARNING_RATE 0.001f
+#define BETA1 0.9f
+#define BETA2 0.999f
+#define EPSILON 1e-8f
+
+#define TRAIN_SPLIT 0.8f
+#define SALIENCY_WINDOWS 128 // Training windows used for gradient saliency
+
+// Fraction of channels and input features removed at each level
+static const int SPARSITY_LEVELS[] = {25, 50, 75};
+#define NUM_SPARSITY_LEVELS (int)(sizeof(SPARSITY_LEVELS) / sizeof(SPARSITY_LEVELS[0]))
+
+static int argmax(const float* values, int size) {
+    int best = 0;
+    for (int i = 1; i < size; ++i) if (values[i] > values[best]) best = i;
+    return best;
+}
+
+static int keep_count(int total, int sparsity_pct) {
+    int keep = (int)lroundf(total * (100 - sparsity_pct) / 100.0f);
+    return keep < 1 ? 1 : keep;
+}
+
+// Validation accuracy (%) and mean latency (us) of the compact kernel
+static float evaluate_pruned(const PrunedModel* model, const float* data, const int* labels,
+                             const int* indices, int num_indices, double* latency_us) {
+    float output[MAX_CLASSES];
+    int correct = 0;
+    struct timespec start, end;
+    clock_gettime(CLOCK_MONOTONIC, &start);
+    for (int i = 0; i < num_indices; ++i) {
+        int idx = indices[i];
+        forward_pass_pruned(model, &data[(size_t)idx * SEQUENCE_LENGTH * INPUT_SIZE], output);
+        correct += (argmax(output, model->classes.count) == labels[idx]);
+    }
+    clock_gettime(CLOCK_MONOTONIC, &end);
+    *latency_us = ((end.tv_sec - start.tv_sec) * 1e6 + (end.tv_nsec - start.tv_nsec) / 1e3) / num_indices;
+    return 100.0f * correct / num_indices;
+}
+
+static void fine_tune(Model* model, const PruneMask* mask, const float* data, const int* labels,
+                      int* train_indices, int num_train) {
+    int timestep = 0;
+    for (int epoch = 0; epoch < FINETUNE_EPOCHS; ++epoch) {
+        shuffle_indices(train_indices, num_train);
+        for (int i = 0; i < num_train; ++i) {
+            timestep++;
+            int idx = train_indices[i];
+            const float* input = &data[(size_t)idx * SEQUENCE_LENGTH * INPUT_SIZE];
+            forward_pass(model, input, epoch, idx);
+            backward_pass(model, input, &labels[idx], 1, epoch, idx);
+            mask_gradients(model, mask);
+            update_weights(model, LEARNING_RATE, BETA1, BETA2, EPSILON, timestep);
+        }
+    }
+}
+
+// Dense weights into a fresh Model (zeroed gradients and Adam state)
+static void reset_model(Model* model, const InferenceModel* dense) {
+    memset(model, 0, sizeof(*model));
+    memcpy(model->tcn_block.weights, dense->tcn_block.weights, sizeof(dense->tcn_block.weights));
+    memcpy(model->tcn_block.biases, dense->tcn_block.biases, sizeof(dense->tcn_block.biases));
+    model->output_layer.num_classes = dense->classes.count;
+    memcpy(model->output_layer.weights, dense->output_layer.weights, sizeof(model->output_layer.weights));
+    memcpy(model->output_layer.biases, dense->output_layer.biases, sizeof(model->output_layer.biases));
+}
+
+int main(int argc, char* argv[]) {
+    SaliencyMethod saliency = SALIENCY_MAGNITUDE;
+    int arg = 1;
+    if (arg + 1 < argc && strcmp(argv[arg], "--saliency") == 0) {
+        if (strcmp(argv[arg + 1], "gradient") == 0) {
+            saliency = SALIENCY_GRADIENT;
+        } else if (strcmp(argv[arg + 1], "magnitude") != 0) {
+            fprintf(stderr, "Error: Unknown saliency '%s' (use magnitude or gradient).\n", argv[arg + 1]);
+            return 1;
+        }
+        arg += 2;
+    }
+    if (argc - arg < 2) {
+        fprintf(stderr, "Usage: %s [--saliency magnitude|gradient] <model_path> <gesture> [gesture ...]\n", argv[0]);
+        fprintf(stderr, "Writes %s/c_model_pruned_<sparsity>.bin for each sparsity level.\n", MODELS_DIR);
+        return 1;
+    }
+    const char* model_path = argv[arg];
+    const char** gestures = (const char**)&argv[arg + 1];
+    int num_gestures = argc - arg - 1;
+
+    printf("--- C Structured Pruning Started ---\n");
+    srand(time(NULL));
+
+    InferenceModel dense;
+    if (!load_inference_model(&dense, model_path)) {
+        fprintf(stderr, "Error: A trained model is required at %s.\n", model_path);
+        return 1;
+    }
+    if (num_gestures > dense.classes.count) {
+        fprintf(stderr, "Error: %d gestures given, but %s has %d classes.\n", num_gestures, model_path, dense.classes.count);
+        return 1;
+    }
+
+    float* data = NULL;
+    int* labels = NULL;
+    int num_sequences = 0;
+    if (load_temporal_data(DATA_DIR, gestures, num_gestures, &data, &labels, &num_sequences) != 0 || num_sequences == 0) {
+        fprintf(stderr, "Failed to load data. Exiting.\n");
+        return 1;
+    }
+
+    int num_train = 0, num_val = 0;
+    int* train_indices = (int*)malloc(num_sequences * sizeof(int));
+    int* val_indices = (int*)malloc(num_sequences * sizeof(int));
+    split_data(num_sequences, TRAIN_SPLIT, train_indices, &num_train, val_indices, &num_val);
+
+    // Saliency is scored once on the dense model
+    static Model model;
+    float channel_scores[TCN_CHANNELS], feature_scores[INPUT_SIZE];
+    reset_model(&model, &dense);
+    if (saliency == SALIENCY_GRADIENT) {
+        score_gradient(&model, data, labels, train_indices, num_train < SALIENCY_WINDOWS ? num_train : SALIENCY_WINDOWS,
+                       channel_scores, feature_scores);
+    } else {
+        score_magnitude(&model, channel_scores, feature_scores);
+    }
+    printf("Saliency: %s\n", saliency == SALIENCY_GRADIENT ? "gradient (first-order Taylor)" : "weight magnitude");
+
+    // Dense baseline through the same kernel (nothing pruned)
+    static PrunedModel pruned;
+    PruneMask mask;
+    memset(&mask, 1, sizeof(mask));
+    build_pruned_model(&model, &mask, &pruned);
+    double latency_us;
+    float accuracy = evaluate_pruned(&pruned, data, labels, val_indices, num_val, &latency_us);
+
+    printf("\n%-8s | %-8s | %-8s | %-7s | %-6s | %-11s | %-11s | %s\n",
+           "Sparsity", "Channels", "Features", "MACs", "Bytes", "Acc (prune)", "Acc (tuned)", "Latency");
+    printf("%7d%% | %8d | %8d | %7ld | %6zu | %10s  | %10.2f%% | %.2f us\n",
+           0, pruned.num_channels, pruned.num_features, pruned_model_macs(&pruned), pruned_model_bytes(&pruned),
+           "-", accuracy, latency_us);
+    fflush(stdout);
+
+    for (int level = 0; level < NUM_SPARSITY_LEVELS; ++level) {
+        int sparsity = SPARSITY_LEVELS[level];
+        reset_model(&model, &dense);
+        select_mask(channel_scores, feature_scores, keep_count(TCN_CHANNELS, sparsity), keep_count(INPUT_SIZE, sparsity), &mask);
+        apply_mask(&model, &mask);
+
+        build_pruned_model(&model, &mask, &pruned);
+        float pruned_accuracy = evaluate_pruned(&pruned, data, labels, val_indices, num_val, &latency_us);
+
+        fine_tune(&model, &mask, data, labels, train_indices, num_train);
+        build_pruned_model(&model, &mask, &pruned);
+        float tuned_accuracy = evaluate_pruned(&pruned, data, labels, val_indices, num_val, &latency_us);
+
+        printf("%7d%% | %8d | %8d | %7ld | %6zu | %10.2f%% | %10.2f%% | %.2f us\n",
+               sparsity, pruned.num_channels, pruned.num_features, pruned_model_macs(&pruned), pruned_model_bytes(&pruned),
+               pruned_accuracy, tuned_accuracy, latency_us);
+        fflush(stdout);
+
+        char output_path[1024];
+        snprintf(output_path, sizeof(output_path), "%s/c_model_pruned_%d.bin", MODELS_DIR, sparsity);
+        save_pruned_model(&pruned, gestures, num_gestures, output_path);
+    }
+
+    printf("\nPruned models saved to %s/c_model_pruned_<sparsity>.bin\n", MODELS_DIR);
+
+    free(data);
+    free(labels);
+    free(train_indices);
+    free(val_indices);
+    printf("--- C Structured Pruning Finished ---\n");
+    return 0;
+}
@@ -0,0 +1,305 @@
+#include "pruning.h"
+#include "model_file.h"
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <math.h>
+
+#define CONV_FAN_IN (INPUT_SIZE * TCN_KERNEL_SIZE)
+
+// Saliency Scores
+
+void score_magnitude(const Model* model, float* channel_scores, float* feature_scores) {
+    // Channel: conv row norm times its output column norm (a channel the head ignores is cheap to drop)
+    for (int c = 0; c < TCN_CHANNELS; ++c) {
+        float conv_norm = 0.0f, out_norm = 0.0f;
+        for (int i = 0; i < CONV_FAN_IN; ++i) conv_norm += model->tcn_block.weights[c * CONV_FAN_IN + i] * model->tcn_block.weights[c * CONV_FAN_IN + i];
+        for (int j = 0; j < model->output_layer.num_classes; ++j) out_norm += model->output_layer.weights[j * TCN_CHANNELS + c] * model->output_layer.weights[j * TCN_CHANNELS + c];
+        channel_scores[c] = sqrtf(conv_norm) * sqrtf(out_norm);
+    }
+    // Feature: norm of its column across all channels and taps
+    for (int f = 0; f < INPUT_SIZE; ++f) {
+        float norm = 0.0f;
+        for (int c = 0; c < TCN_CHANNELS; ++c) {
+            for (int k = 0; k < TCN_KERNEL_SIZE; ++k) {
+                float w = model->tcn_block.weights[c * CONV_FAN_IN + f * TCN_KERNEL_SIZE + k];
+                norm += w * w;
+            }
+        }
+        feature_scores[f] = sqrtf(norm);
+    }
+}
+
+void score_gradient(Model* model, const float* data, const int* labels, const int* indices, int num_indices,
+                    float* channel_scores, float* feature_scores) {
+    memset(channel_scores, 0, TCN_CHANNELS * sizeof(float));
+    memset(feature_scores, 0, INPUT_SIZE * sizeof(float));
+
+    for (int n = 0; n < num_indices; ++n) {
+        int idx = indices[n];
+        forward_pass(model, &data[(size_t)idx * SEQUENCE_LENGTH * INPUT_SIZE], 0, idx);
+        backward_pass(model, &data[(size_t)idx * SEQUENCE_LENGTH * INPUT_SIZE], &labels[idx], 1, 0, idx);
+
+        const float* w = model->tcn_block.weights;
+        const float* g = model->tcn_block.grad_weights;
+        for (int c = 0; c < TCN_CHANNELS; ++c) {
+            float taylor = model->tcn_block.biases[c] * model->tcn_block.grad_biases[c];
+            for (int i = 0; i < CONV_FAN_IN; ++i) taylor += w[c * CONV_FAN_IN + i] * g[c * CONV_FAN_IN + i];
+            for (int j = 0; j < model->output_layer.num_classes; ++j) {
+                taylor += model->output_layer.weights[j * TCN_CHANNELS + c] * model->output_layer.grad_weights[j * TCN_CHANNELS + c];
+            }
+            channel_scores[c] += fabsf(taylor);
+        }
+        for (int f = 0; f < INPUT_SIZE; ++f) {
+            float taylor = 0.0f;
+            for (int c = 0; c < TCN_CHANNELS; ++c) {
+                for (int k = 0; k < TCN_KERNEL_SIZE; ++k) {
+                    int i = c * CONV_FAN_IN + f * TCN_KERNEL_SIZE + k;
+                    taylor += w[i] * g[i];
+                }
+            }
+            feature_scores[f] += fabsf(taylor);
+        }
+    }
+}
+
+// Marks the `keep` highest scores in kept[]
+static void keep_top(const float* scores, int size, int keep, uint8_t* kept) {
+    memset(kept, 0, size);
+    for (int n = 0; n < keep && n < size; ++n) {
+        int best = -1;
+        for (int i = 0; i < size; ++i) {
+            if (!kept[i] && (best < 0 || scores[i] > scores[best])) best = i;
+        }
+        kept[best] = 1;
+    }
+}
+
+void select_mask(const float* channel_scores, const float* feature_scores, int keep_channels, int keep_features, PruneMask* mask) {
+    keep_top(channel_scores, TCN_CHANNELS, keep_channels, mask->channel_kept);
+    keep_top(feature_scores, INPUT_SIZE, keep_features, mask->feature_kept);
+}
+
+void apply_mask(Model* model, const PruneMask* mask) {
+    for (int c = 0; c < TCN_CHANNELS; ++c) {
+        for (int f = 0; f < INPUT_SIZE; ++f) {
+            if (mask->channel_kept[c] && mask->feature_kept[f]) continue;
+            for (int k = 0; k < TCN_KERNEL_SIZE; ++k) model->tcn_block.weights[c * CONV_FAN_IN + f * TCN_KERNEL_SIZE + k] = 0.0f;
+        }
+        if (!mask->channel_kept[c]) {
+            model->tcn_block.biases[c] = 0.0f;
+            for (int j = 0; j < model->output_layer.num_classes; ++j) model->output_layer.weights[j * TCN_CHANNELS + c] = 0.0f;
+        }
+    }
+}
+
+void mask_gradients(Model* model, const PruneMask* mask) {
+    for (int c = 0; c < TCN_CHANNELS; ++c) {
+        for (int f = 0; f < INPUT_SIZE; ++f) {
+            if (mask->channel_kept[c] && mask->feature_kept[f]) continue;
+            for (int k = 0; k < TCN_KERNEL_SIZE; ++k) model->tcn_block.grad_weights[c * CONV_FAN_IN + f * TCN_KERNEL_SIZE + k] = 0.0f;
+        }
+        if (!mask->channel_kept[c]) {
+            model->tcn_block.grad_biases[c] = 0.0f;
+            for (int j = 0; j < model->output_layer.num_classes; ++j) model->output_layer.grad_weights[j * TCN_CHANNELS + c] = 0.0f;
+        }
+    }
+}
+
+// Compact Model
+
+void build_pruned_model(const Model* model, const PruneMask* mask, PrunedModel* pruned) {
+    memset(pruned, 0, sizeof(*pruned));
+    pruned->classes.count = model->output_layer.num_classes;
+    for (int c = 0; c < TCN_CHANNELS; ++c) if (mask->channel_kept[c]) pruned->channel_index[pruned->num_channels++] = (uint8_t)c;
+    for (int f = 0; f < INPUT_SIZE; ++f) if (mask->feature_kept[f]) pruned->feature_index[pruned->num_features++] = (uint8_t)f;
+
+    for (int c = 0; c < pruned->num_channels; ++c) {
+        int dense_c = pruned->channel_index[c];
+        for (int f = 0; f < pruned->num_features; ++f) {
+            int dense_f = pruned->feature_index[f];
+            for (int k = 0; k < TCN_KERNEL_SIZE; ++k) {
+                pruned->weights[(c * pruned->num_features + f) * TCN_KERNEL_SIZE + k] =
+                    model->tcn_block.weights[dense_c * CONV_FAN_IN + dense_f * TCN_KERNEL_SIZE + k];
+            }
+        }
+        pruned->biases[c] = model->tcn_block.biases[dense_c];
+        for (int j = 0; j < pruned->classes.count; ++j) {
+            pruned->output_weights[j * pruned->num_channels + c] = model->output_layer.weights[j * TCN_CHANNELS + dense_c];
+        }
+    }
+    memcpy(pruned->output_biases, model->output_layer.biases, sizeof(pruned->output_biases));
+}
+
+long pruned_model_macs(const PrunedModel* model) {
+    return valid_causal_taps() * model->num_channels * model->num_features + (long)model->classes.count * model->num_channels;
+}
+
+size_t pruned_model_bytes(const PrunedModel* model) {
+    return 2 * sizeof(int32_t) + model->num_channels + model->num_features
+         + sizeof(float) * ((size_t)model->num_channels * model->num_features * TCN_KERNEL_SIZE
+                            + model->num_channels + (size_t)model->classes.count * model->num_channels + model->classes.count);
+}
+
+// Stored as a MODEL_KIND_PRUNED container: "pruned_dims" = {num_channels, num_features}
+// sizes the other tensors, and the index maps are int32 (the container has no uint8 dtype).
+int save_pruned_model(const PrunedModel* model, const char** class_names, int num_names, const char* file_path) {
+    ClassNames classes;
+    set_class_names(&classes, class_names, num_names, model->classes.count);
+    const uint32_t num_channels = model->num_channels, num_features = model->num_features, num_classes = model->classes.count;
+    int32_t dims[2] = {model->num_channels, model->num_features};
+    int32_t channel_index[TCN_CHANNELS], feature_index[INPUT_SIZE];
+    for (int c = 0; c < model->num_channels; ++c) channel_index[c] = model->channel_index[c];
+    for (int f = 0; f < model->num_features; ++f) feature_index[f] = model->feature_index[f];
+
+    ModelFileWriter writer;
+    model_file_writer_init(&writer, MODEL_KIND_PRUNED, &classes);
+    model_file_add_tensor(&writer, "pruned_dims", MODEL_DTYPE_I32, dims, 1, (uint32_t[]){2});
+    model_file_add_tensor(&writer, "channel_index", MODEL_DTYPE_I32, channel_index, 1, &num_channels);
+    model_file_add_tensor(&writer, "feature_index", MODEL_DTYPE_I32, feature_index, 1, &num_features);
+    model_file_add_tensor(&writer, "tcn_weights", MODEL_DTYPE_F32, model->weights, 3,
+                          (uint32_t[]){num_channels, num_features, TCN_KERNEL_SIZE});
+    model_file_add_tensor(&writer, "tcn_biases", MODEL_DTYPE_F32, model->biases, 1, &num_channels);
+    model_file_add_tensor(&writer, "output_weights", MODEL_DTYPE_F32, model->output_weights, 2,
+                          (uint32_t[]){num_classes, num_channels});
+    model_file_add_tensor(&writer, "output_biases", MODEL_DTYPE_F32, model->output_biases, 1, &num_classes);
+    return model_file_write(&writer, file_path);
+}
+
+static int valid_pruned_dims(int32_t num_channels, int32_t num_features) {
+    return num_channels > 0 && num_channels <= TCN_CHANNELS && num_features > 0 && num_features <= INPUT_SIZE;
+}
+
+static int load_pruned_container(PrunedModel* model, const char* file_path) {
+    ModelFile file;
+    if (!model_file_open_kind(&file, file_path, MODEL_KIND_PRUNED)) return 0;
+    model_file_classes(&file, &model->classes);
+    const int num_classes = model->classes.count;
+    const int32_t* dims = model_file_tensor(&file, "pruned_dims", MODEL_DTYPE_I32, 2);
+    int success = dims && valid_pruned_dims(dims[0], dims[1]);
+    if (success) {
+        model->num_channels = dims[0];
+        model->num_features = dims[1];
+        size_t num_weights = (size_t)model->num_channels * model->num_features * TCN_KERNEL_SIZE;
+        const int32_t* channel_index = model_file_tensor(&file, "channel_index", MODEL_DTYPE_I32, model->num_channels);
+        const int32_t* feature_index = model_file_tensor(&file, "feature_index", MODEL_DTYPE_I32, model->num_features);
+        const float* weights = model_file_tensor(&file, "tcn_weights", MODEL_DTYPE_F32, num_weights);
+        const float* biases = model_file_tensor(&file, "tcn_biases", MODEL_DTYPE_F32, model->num_channels);
+        const float* output_weights = model_file_tensor(&file, "output_weights", MODEL_DTYPE_F32, (size_t)num_classes * model->num_channels);
+        const float* output_biases = model_file_tensor(&file, "output_biases", MODEL_DTYPE_F32, num_classes);
+        success = channel_index && feature_index && weights && biases && output_weights && output_biases;
+        for (int c = 0; success && c < model->num_channels; ++c) {
+            success = channel_index[c] >= 0 && channel_index[c] < TCN_CHANNELS;
+            model->channel_index[c] = (uint8_t)channel_index[c];
+        }
+        for (int f = 0; success && f < model->num_features; ++f) {
+            success = feature_index[f] >= 0 && feature_index[f] < INPUT_SIZE;
+            model->feature_index[f] = (uint8_t)feature_index[f];
+        }
+        if (success) {
+            memcpy(model->weights, weights, num_weights * sizeof(float));
+            memcpy(model->biases, biases, model->num_channels * sizeof(float));
+            memcpy(model->output_weights, output_weights, (size_t)num_classes * model->num_channels * sizeof(float));
+            memcpy(model->output_biases, output_biases, num_classes * sizeof(float));
+        }
+    }
+    model_file_close(&file);
+    return success;
+}
+
+// Raw layout written before the container: int32 dims[2], uint8 index maps, then the floats
+static int load_pruned_legacy(PrunedModel* model, const char* file_path) {
+    FILE* file = fopen(file_path, "rb");
+    if (!file) {
+        perror("Failed to open pruned model file");
+        return 0;
+    }
+    set_class_names(&model->classes, NULL, 0, NUM_CLASSES);
+    int32_t dims[2];
+    int success = fread(dims, sizeof(dims), 1, file) == 1 && valid_pruned_dims(dims[0], dims[1]);
+    if (success) {
+        model->num_channels = dims[0];
+        model->num_features = dims[1];
+        size_t num_weights = (size_t)model->num_channels * model->num_features * TCN_KERNEL_SIZE;
+        success = fread(model->channel_index, 1, model->num_channels, file) == (size_t)model->num_channels
+               && fread(model->feature_index, 1, model->num_features, file) == (size_t)model->num_features
+               && fread(model->weights, sizeof(float), num_weights, file) == num_weights
+               && fread(model->biases, sizeof(float), model->num_channels, file) == (size_t)model->num_channels
+               && fread(model->output_weights, sizeof(float), (size_t)NUM_CLASSES * model->num_channels, file) == (size_t)NUM_CLASSES * model->num_channels
+               && fread(model->output_biases, sizeof(float), NUM_CLASSES, file) == NUM_CLASSES;
+        for (int c = 0; success && c < model->num_channels; ++c) success = model->channel_index[c] < TCN_CHANNELS;
+        for (int f = 0; success && f < model->num_features; ++f) success = model->feature_index[f] < INPUT_SIZE;
+    }
+    fclose(file);
+    return success;
+}
+
+int load_pruned_model(PrunedModel* model, const char* file_path) {
+    memset(model, 0, sizeof(*model));
+    int success = is_model_file(file_path) ? load_pruned_container(model, file_path) : load_pruned_legacy(model, file_path);
+    if (!success) {
+        fprintf(stderr, "Error: Failed to read all components of the pruned model file.\n");
+    }
+    return success;
+}
+
+int is_pruned_model_file(const char* file_path) {
+    int kind = model_file_kind(file_path);
+    if (kind >= 0) return kind == MODEL_KIND_PRUNED;
+
+    // Legacy raw file: plausible dims, and exactly the size those dims imply
+    FILE* file = fopen(file_path, "rb");
+    if (!file) return 0;
+    int32_t dims[2];
+    int plausible = fread(dims, sizeof(dims), 1, file) == 1 && valid_pruned_dims(dims[0], dims[1]);
+    long size = (fseek(file, 0, SEEK_END) == 0) ? ftell(file) : -1;
+    fclose(file);
+    if (!plausible) return 0;
+    PrunedModel dims_only = {.num_channels = dims[0], .num_features = dims[1], .classes.count = NUM_CLASSES};
+    return size == (long)pruned_model_bytes(&dims_only);
+}
+
+// Forward Pass
+
+void forward_pass_pruned(const PrunedModel* model, const float* input_data, float* final_output) {
+    // Gather the kept features once so the conv reads contiguous rows
+    float gathered[SEQUENCE_LENGTH * INPUT_SIZE];
+    const int num_features = model->num_features;
+    for (int t = 0; t < SEQUENCE_LENGTH; ++t) {
+        for (int f = 0; f < num_features; ++f) {
+            gathered[t * num_features + f] = input_data[t * INPUT_SIZE + model->feature_index[f]];
+        }
+    }
+
+    // Conv + Leaky ReLU + GAP over kept channels only
+    float pooled_output[TCN_CHANNELS];
+    for (int c = 0; c < model->num_channels; ++c) {
+        const float* channel_weights = &model->weights[c * num_features * TCN_KERNEL_SIZE];
+        float pooled = 0.0f;
+        for (int t = 0; t < SEQUENCE_LENGTH; ++t) {
+            float sum = model->biases[c];
+            for (int k = 0; k < TCN_KERNEL_SIZE; ++k) {
+                int t_in = t + (k - (TCN_KERNEL_SIZE - 1)) * TCN_DILATION;
+                if (t_in < 0) continue;
+                const float* row = &gathered[t_in * num_features];
+                for (int f = 0; f < num_features; ++f) {
+                    sum += row[f] * channel_weights[f * TCN_KERNEL_SIZE + k];
+                }
+            }
+            pooled += leaky_relu(sum);
+        }
+        pooled_output[c] = pooled / SEQUENCE_LENGTH;
+    }
+
+    // Output Layer
+    float output_logits[MAX_CLASSES];
+    for (int j = 0; j < model->classes.count; ++j) {
+        float sum = model->output_biases[j];
+        for (int c = 0; c < model->num_channels; ++c) {
+            sum += pooled_output[c] * model->output_weights[j * model->num_channels + c];
+        }
+        output_logits[j] = sum;
+    }
+
+    softmax(output_logits, final_output, model->classes.count);
+}
@@ -0,0 +1,62 @@
+#ifndef PRUNING_H
+#define PRUNING_H
+
+#include "training_logic.h"
+
+// Structured Pruning
+// Whole TCN output channels and whole input-feature columns are removed.
+// The compact model stores only the surviving rows/columns plus index maps
+// back to the dense layout, so the inference kernel never visits pruned work.
+
+typedef enum {
+    SALIENCY_MAGNITUDE, // L2 norm of the group's weights
+    SALIENCY_GRADIENT   // First-order Taylor: |sum(w * dL/dw)| over the group, summed over windows
+} SaliencyMethod;
+
+// Which channels/features survive (1 = kept), in dense order
+typedef struct {
+    uint8_t channel_kept[TCN_CHANNELS];
+    uint8_t feature_kept[INPUT_SIZE];
+} PruneMask;
+
+typedef struct {
+    int num_channels; // Kept TCN output channels
+    int num_features; // Kept input features
+    uint8_t channel_index[TCN_CHANNELS]; // Dense index of each kept channel
+    uint8_t feature_index[INPUT_SIZE];   // Dense index of each kept feature
+    float weights[TCN_CHANNELS * INPUT_SIZE * TCN_KERNEL_SIZE]; // [c][f][k] over kept channels/features
+    float biases[TCN_CHANNELS];
+    float output_weights[MAX_CLASSES * TCN_CHANNELS];           // [j][c] over kept channels
+    float output_biases[MAX_CLASSES];
+    ClassNames classes;                                         // classes.count outputs
+} PrunedModel;
+
+// Saliency Scores (higher = more important)
+void score_magnitude(const Model* model, float* channel_scores, float* feature_scores);
+void score_gradient(Model* model, const float* data, const int* labels, const int* indices, int num_indices,
+                    float* channel_scores, float* feature_scores);
+
+// Keeps the top-scoring channels and features
+void select_mask(const float* channel_scores, const float* feature_scores, int keep_channels, int keep_features, PruneMask* mask);
+
+// Zeroes pruned weights (and the output columns of pruned channels) in the dense model
+void apply_mask(Model* model, const PruneMask* mask);
+// Zeroes gradients of pruned weights so fine-tuning keeps them at zero
+void mask_gradients(Model* model, const PruneMask* mask);
+
+// Compact Model
+void build_pruned_model(const Model* model, const PruneMask* mask, PrunedModel* pruned);
+long pruned_model_macs(const PrunedModel* model);
+// Size of the weights and index maps (the payload of a legacy raw file, which has NUM_CLASSES outputs)
+size_t pruned_model_bytes(const PrunedModel* model);
+// Writes a MODEL_KIND_PRUNED container; missing names become class_<j>
+int save_pruned_model(const PrunedModel* model, const char** class_names, int num_names, const char* file_path);
+// Reads a pruned container or a legacy raw pruned file
+int load_pruned_model(PrunedModel* model, const char* file_path);
+// 1 for a pruned container, or a legacy raw file whose size matches the dims in its first 8 bytes
+int is_pruned_model_file(const char* file_path);
+
+// Inference over kept channels/features only
+void forward_pass_pruned(const PrunedModel* model, const float* input_data, float* final_output);
+
+#endif // PRUNING_H
@@ -0,0 +1,224 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <math.h>
+#include <time.h>
+#include "training_logic.h"
+
+// Compares the FP32 and INT8 forward passes layer by layer over the dataset windows.
+// Lines starting with [SUMMARY] are picked up by the GUI's Quantization page.
+
+#define DATA_DIR "../models/data"
+
+// Accumulated error of one layer (reference = FP32)
+typedef struct {
+    const char* name;
+    double signal_energy;
+    double noise_energy;
+    double max_abs_error;
+} LayerError;
+
+static void accumulate_error(LayerError* layer, const float* reference, const float* quantized, int size) {
+    for (int i = 0; i < size; ++i) {
+        double error = (double)quantized[i] - reference[i];
+        layer->signal_energy += (double)reference[i] * reference[i];
+        layer->noise_energy += error * error;
+        if (fabs(error) > layer->max_abs_error) layer->max_abs_error = fabs(error);
+    }
+}
+
+static double sqnr_db(double signal_energy, double noise_energy) {
+    if (noise_energy <= 0.0) return INFINITY;
+    return 10.0 * log10(signal_energy / noise_energy);
+}
+
+// Counts weights whose unclamped quantized value falls outside int8 and accumulates the rounding error.
+static int weight_saturation(const float* weights, const int8_t* quantized, const float* row_scales,
+                             int rows, int row_length, LayerError* error) {
+    int saturated = 0;
+    for (int r = 0; r < rows; ++r) {
+        for (int i = 0; i < row_length; ++i) {
+            float w = weights[r * row_length + i];
+            float q = roundf(w / row_scales[r]);
+            saturated += (q > 127.0f || q < -128.0f);
+            float dequantized = quantized[r * row_length + i] * row_scales[r];
+            accumulate_error(error, &w, &dequantized, 1);
+        }
+    }
+    return saturated;
+}
+
+static int argmax(const float* values, int size) {
+    int best = 0;
+    for (int i = 1; i < size; ++i) if (values[i] > values[best]) best = i;
+    return best;
+}
+
+static int compare_doubles(const void* a, const void* b) {
+    double x = *(const double*)a, y = *(const double*)b;
+    return (x > y) - (x < y);
+}
+
+static double elapsed_us(const struct timespec* start, const struct timespec* end) {
+    return (end->tv_sec - start->tv_sec) * 1e6 + (end->tv_nsec - start->tv_nsec) / 1e3;
+}
+
+// Sorts latencies in place and prints mean / p50 / p95 / max.
+static double print_latency(const char* name, double* latencies_us, int n) {
+    double total = 0.0;
+    for (int i = 0; i < n; ++i) total += latencies_us[i];
+    qsort(latencies_us, n, sizeof(double), compare_doubles);
+    double mean = total / n;
+    printf("  %-6s mean %7.2f us | p50 %7.2f us | p95 %7.2f us | max %7.2f us\n",
+           name, mean, latencies_us[n / 2], latencies_us[(int)(0.95 * (n - 1))], latencies_us[n - 1]);
+    return mean;
+}
+
+int main(int argc, char* argv[]) {
+    if (argc < 4) {
+        fprintf(stderr, "Usage: %s <float_model> <quantized_model> <gesture> [gesture ...]\n", argv[0]);
+        return 1;
+    }
+    const char** gestures = (const char**)&argv[3];
+    int num_gestures = argc - 3;
+
+    InferenceModel float_model;
+    static QuantizedModel quantized_model;
+    if (!load_inference_model(&float_model, argv[1]) || !load_quantized_model(&quantized_model, argv[2])) {
+        return 1;
+    }
+    const int num_classes = float_model.classes.count;
+    if (quantized_model.classes.count != num_classes) {
+        fprintf(stderr, "Error: The float model has %d classes but the quantized model has %d.\n",
+                num_classes, quantized_model.classes.count);
+        return 1;
+    }
+    if (num_gestures > num_classes) {
+        fprintf(stderr, "Error: %d gestures given, but the model has %d classes.\n", num_gestures, num_classes);
+        return 1;
+    }
+
+    float* windows = NULL;
+    int* labels = NULL;
+    int num_windows = 0;
+    if (load_temporal_data(DATA_DIR, gestures, num_gestures, &windows, &labels, &num_windows) != 0 || num_windows == 0) {
+        fprintf(stderr, "Error: No data found in %s\n", DATA_DIR);
+        return 1;
+    }
+
+    // --- Weights ---
+    LayerError tcn_weight_error = {"tcn_weights", 0, 0, 0};
+    LayerError out_weight_error = {"out_weights", 0, 0, 0};
+    int tcn_saturated = weight_saturation(float_model.tcn_block.weights, quantized_model.tcn_block_weights,
+                                          quantized_model.tcn_weight_scales, TCN_CHANNELS, INPUT_SIZE * TCN_KERNEL_SIZE, &tcn_weight_error);
+    int out_saturated = weight_saturation(float_model.output_layer.weights, quantized_model.output_layer_weights,
+                                          quantized_model.output_weight_scales, num_classes, TCN_CHANNELS, &out_weight_error);
+
+    // --- Activations ---
+    LayerError layers[] = {
+        {"input", 0, 0, 0},
+        {"tcn_output", 0, 0, 0},
+        {"pooled", 0, 0, 0},
+        {"logits", 0, 0, 0},
+        {"softmax", 0, 0, 0},
+    };
+    const int num_layers = sizeof(layers) / sizeof(layers[0]);
+
+    static LayerActivations float_trace, quantized_trace;
+    float float_output[MAX_CLASSES], quantized_output[MAX_CLASSES];
+    double* float_latency = (double*)malloc(num_windows * sizeof(double));
+    double* quantized_latency = (double*)malloc(num_windows * sizeof(double));
+    int class_total[MAX_CLASSES] = {0}, float_class_correct[MAX_CLASSES] = {0}, quantized_class_correct[MAX_CLASSES] = {0};
+    long input_saturated = 0, activation_saturated = 0;
+    int agree = 0;
+    struct timespec start, end;
+
+    for (int i = 0; i < num_windows; ++i) {
+        const float* window = &windows[(size_t)i * SEQUENCE_LENGTH * INPUT_SIZE];
+
+        // Latency of the untraced kernels, then a traced pass for the comparison
+        clock_gettime(CLOCK_MONOTONIC, &start);
+        forward_pass_inference(&float_model, window, float_output);
+        clock_gettime(CLOCK_MONOTONIC, &end);
+        float_latency[i] = elapsed_us(&start, &end);
+
+        clock_gettime(CLOCK_MONOTONIC, &start);
+        forward_pass_quantized(&quantized_model, window, quantized_output);
+        clock_gettime(CLOCK_MONOTONIC, &end);
+        quantized_latency[i] = elapsed_us(&start, &end);
+
+        forward_pass_inference_traced(&float_model, window, float_output, &float_trace);
+        forward_pass_quantized_traced(&quantized_model, window, quantized_output, &quantized_trace);
+
+        accumulate_error(&layers[0], float_trace.input, quantized_trace.input, SEQUENCE_LENGTH * INPUT_SIZE);
+        accumulate_error(&layers[1], float_trace.tcn_output, quantized_trace.tcn_output, SEQUENCE_LENGTH * TCN_CHANNELS);
+        accumulate_error(&layers[2], float_trace.pooled, quantized_trace.pooled, TCN_CHANNELS);
+        accumulate_error(&layers[3], float_trace.logits, quantized_trace.logits, num_classes);
+        accumulate_error(&layers[4], float_output, quantized_output, num_classes);
+        input_saturated += quantized_trace.input_saturated;
+        activation_saturated += quantized_trace.activation_saturated;
+
+        int float_prediction = argmax(float_output, num_classes);
+        int quantized_prediction = argmax(quantized_output, num_classes);
+        class_total[labels[i]]++;
+        float_class_correct[labels[i]] += (float_prediction == labels[i]);
+        quantized_class_correct[labels[i]] += (quantized_prediction == labels[i]);
+        agree += (float_prediction == quantized_prediction);
+    }
+
+    // --- Report ---
+    printf("\n=== Quantization Analysis (%d windows) ===\n", num_windows);
+
+    printf("\nWeights (per-channel symmetric):\n");
+    printf("  %-12s SQNR %6.2f dB | max abs error %.6f | saturated %d/%d\n", tcn_weight_error.name,
+           sqnr_db(tcn_weight_error.signal_energy, tcn_weight_error.noise_energy), tcn_weight_error.max_abs_error,
+           tcn_saturated, TCN_CHANNELS * INPUT_SIZE * TCN_KERNEL_SIZE);
+    printf("  %-12s SQNR %6.2f dB | max abs error %.6f | saturated %d/%d\n", out_weight_error.name,
+           sqnr_db(out_weight_error.signal_energy, out_weight_error.noise_energy), out_weight_error.max_abs_error,
+           out_saturated, num_classes * TCN_CHANNELS);
+
+    printf("\nActivations (INT8 dequantized vs FP32):\n");
+    double worst_sqnr = INFINITY;
+    const char* worst_layer = layers[0].name;
+    for (int l = 0; l < num_layers; ++l) {
+        double sqnr = sqnr_db(layers[l].signal_energy, layers[l].noise_energy);
+        printf("  %-12s SQNR %6.2f dB | max abs error %.6f\n", layers[l].name, sqnr, layers[l].max_abs_error);
+        if (sqnr < worst_sqnr) { worst_sqnr = sqnr; worst_layer = layers[l].name; }
+    }
+    printf("  Saturated: %ld inputs (of %ld), %ld TCN activations (of %ld)\n",
+           input_saturated, (long)num_windows * SEQUENCE_LENGTH * INPUT_SIZE,
+           activation_saturated, (long)num_windows * SEQUENCE_LENGTH * TCN_CHANNELS);
+
+    printf("\nAccuracy by class:\n");
+    int float_correct = 0, quantized_correct = 0;
+    for (int c = 0; c < num_gestures; ++c) {
+        float_correct += float_class_correct[c];
+        quantized_correct += quantized_class_correct[c];
+        if (class_total[c] == 0) continue;
+        double float_acc = 100.0 * float_class_correct[c] / class_total[c];
+        double quantized_acc = 100.0 * quantized_class_correct[c] / class_total[c];
+        printf("  %-12s FP32 %6.2f%% | INT8 %6.2f%% | delta %+6.2f%% (%d windows)\n",
+               gestures[c], float_acc, quantized_acc, quantized_acc - float_acc, class_total[c]);
+    }
+    double float_accuracy = 100.0 * float_correct / num_windows;
+    double quantized_accuracy = 100.0 * quantized_correct / num_windows;
+
+    printf("\nLatency per window:\n");
+    double float_mean = print_latency("FP32", float_latency, num_windows);
+    double quantized_mean = print_latency("INT8", quantized_latency, num_windows);
+
+    printf("\n[SUMMARY] Top-1 agreement: %.2f%%\n", 100.0 * agree / num_windows);
+    printf("[SUMMARY] Accuracy: FP32 %.2f%% | INT8 %.2f%% (delta %+.2f%%)\n",
+           float_accuracy, quantized_accuracy, quantized_accuracy - float_accuracy);
+    printf("[SUMMARY] Worst layer: %s (SQNR %.2f dB)\n", worst_layer, worst_sqnr);
+    printf("[SUMMARY] Saturation: %d weights, %ld inputs, %ld activations\n",
+           tcn_saturated + out_saturated, input_saturated, activation_saturated);
+    printf("[SUMMARY] Latency: FP32 %.2f us | INT8 %.2f us (%.2fx)\n",
+           float_mean, quantized_mean, float_mean / quantized_mean);
+
+    free(windows);
+    free(labels);
+    free(float_latency);
+    free(quantized_latency);
+    return 0;
+}
@@ -2,53 +2,187 @@
 #include <stdlib.h>
 #include <string.h>
 #include <math.h> // For fmaxf, fminf
+#include <time.h>
 #include <sys/stat.h> // For stat() to get file size
 #include "training_logic.h"
+#include "mcu_budget.h"
+#include "model_file.h"
 
-// Performs simple symmetric quantization on the model weights and biases.
-void quantize_model(const Model* float_model, QuantizedModel* quantized_model) {
-    // Quantize TCN block weights and biases
-    for (size_t i = 0; i < sizeof(float_model->tcn_block.weights) / sizeof(float); ++i) {
-        quantized_model->tcn_block_weights[i] = (int8_t)(fmaxf(-128.0f, fminf(127.0f, float_model->tcn_block.weights[i] * 127.0f)));
+#define DATA_DIR "../models/data"
+#define CALIBRATION_WINDOWS 128 // Evenly spaced windows used to calibrate activation ranges
+
+// Activation ranges observed on the calibration windows
+typedef struct {
+    float max_abs_input;
+    float max_abs_activation; // TCN output after Leaky ReLU
+} CalibrationStats;
+
+// Float TCN block for one window, tracking the largest activations.
+static void observe_window(const InferenceModel* model, const float* input_data, CalibrationStats* stats) {
+    for (int i = 0; i < SEQUENCE_LENGTH * INPUT_SIZE; ++i) {
+        stats->max_abs_input = fmaxf(stats->max_abs_input, fabsf(input_data[i]));
     }
-    for (size_t i = 0; i < sizeof(float_model->tcn_block.biases) / sizeof(float); ++i) {
-        quantized_model->tcn_block_biases[i] = (int8_t)(fmaxf(-128.0f, fminf(127.0f, float_model->tcn_block.biases[i] * 127.0f)));
+    for (int c_out = 0; c_out < TCN_CHANNELS; ++c_out) {
+        for (int t = 0; t < SEQUENCE_LENGTH; ++t) {
+            float sum = model->tcn_block.biases[c_out];
+            for (int k = 0; k < TCN_KERNEL_SIZE; ++k) {
+                int t_in = t + (k - (TCN_KERNEL_SIZE - 1)) * TCN_DILATION;
+                if (t_in >= 0 && t_in < SEQUENCE_LENGTH) {
+                    for (int c_in = 0; c_in < INPUT_SIZE; ++c_in) {
+                        sum += input_data[t_in * INPUT_SIZE + c_in] * model->tcn_block.weights[c_out * (INPUT_SIZE * TCN_KERNEL_SIZE) + c_in * TCN_KERNEL_SIZE + k];
+                    }
+                }
+            }
+            stats->max_abs_activation = fmaxf(stats->max_abs_activation, fabsf(leaky_relu(sum)));
+        }
     }
+}
 
-    // Quantize output layer weights and biases
-    for (size_t i = 0; i < sizeof(float_model->output_layer.weights) / sizeof(float); ++i) {
-        quantized_model->output_layer_weights[i] = (int8_t)(fmaxf(-128.0f, fminf(127.0f, float_model->output_layer.weights[i] * 127.0f)));
+static void calibrate(const InferenceModel* model, const float* windows, int num_windows, CalibrationStats* stats) {
+    stats->max_abs_input = 0.0f;
+    stats->max_abs_activation = 0.0f;
+    int num_samples = num_windows < CALIBRATION_WINDOWS ? num_windows : CALIBRATION_WINDOWS;
+    for (int i = 0; i < num_samples; ++i) {
+        int idx = (int)((long)i * num_windows / num_samples);
+        observe_window(model, &windows[(size_t)idx * SEQUENCE_LENGTH * INPUT_SIZE], stats);
     }
-    for (size_t i = 0; i < sizeof(float_model->output_layer.biases) / sizeof(float); ++i) {
-        quantized_model->output_layer_biases[i] = (int8_t)(fmaxf(-128.0f, fminf(127.0f, float_model->output_layer.biases[i] * 127.0f)));
+    printf("Calibrated on %d windows: max |input| = %.4f, max |activation| = %.4f\n",
+           num_samples, stats->max_abs_input, stats->max_abs_activation);
+}
+
+static int8_t quantize_value(float value, float scale) {
+    return (int8_t)fmaxf(-128.0f, fminf(127.0f, roundf(value / scale)));
+}
+
+// Symmetric scale of one weight row, so that its largest magnitude maps to 127.
+static float row_scale(const float* row, int length) {
+    float max_abs = 0.0f;
+    for (int i = 0; i < length; ++i) max_abs = fmaxf(max_abs, fabsf(row[i]));
+    return max_abs > 0.0f ? max_abs / 127.0f : 1.0f;
+}
+
+// Per-output-channel symmetric quantization with calibrated activation scales.
+void quantize_model(const InferenceModel* float_model, const CalibrationStats* stats, QuantizedModel* quantized_model) {
+    const int fan_in = INPUT_SIZE * TCN_KERNEL_SIZE;
+    quantized_model->input_scale = stats->max_abs_input > 0.0f ? stats->max_abs_input / 127.0f : 1.0f;
+    quantized_model->activation_scale = stats->max_abs_activation > 0.0f ? stats->max_abs_activation / 127.0f : 1.0f;
+
+    // TCN block: int8 weights per output channel, int32 biases at the accumulator scale
+    for (int c = 0; c < TCN_CHANNELS; ++c) {
+        const float* row = &float_model->tcn_block.weights[c * fan_in];
+        float weight_scale = row_scale(row, fan_in);
+        float accumulator_scale = quantized_model->input_scale * weight_scale;
+        quantized_model->tcn_weight_scales[c] = weight_scale;
+        for (int i = 0; i < fan_in; ++i) {
+            quantized_model->tcn_block_weights[c * fan_in + i] = quantize_value(row[i], weight_scale);
+        }
+        quantized_model->tcn_block_biases[c] = (int32_t)lroundf(float_model->tcn_block.biases[c] / accumulator_scale);
+
+        double multiplier = (double)accumulator_scale / quantized_model->activation_scale;
+        quantize_multiplier(multiplier, &quantized_model->tcn_multipliers[c], &quantized_model->tcn_shifts[c]);
+        quantize_multiplier(multiplier * leaky_relu(-1.0f) * -1.0, &quantized_model->tcn_negative_multipliers[c], &quantized_model->tcn_negative_shifts[c]);
+    }
+
+    // Output layer: per-class rows; GAP's 1/SEQUENCE_LENGTH is part of the accumulator scale
+    quantized_model->classes = float_model->classes;
+    for (int j = 0; j < float_model->classes.count; ++j) {
+        const float* row = &float_model->output_layer.weights[j * TCN_CHANNELS];
+        float weight_scale = row_scale(row, TCN_CHANNELS);
+        float accumulator_scale = quantized_model->activation_scale * weight_scale / SEQUENCE_LENGTH;
+        quantized_model->output_weight_scales[j] = weight_scale;
+        for (int i = 0; i < TCN_CHANNELS; ++i) {
+            quantized_model->output_layer_weights[j * TCN_CHANNELS + i] = quantize_value(row[i], weight_scale);
+        }
+        quantized_model->output_layer_biases[j] = (int32_t)lroundf(float_model->output_layer.biases[j] / accumulator_scale);
+    }
+
+    prepare_quantized_model(quantized_model);
+}
+
+static int argmax(const float* values, int size) {
+    int best = 0;
+    for (int i = 1; i < size; ++i) if (values[i] > values[best]) best = i;
+    return best;
+}
+
+static double elapsed_us(const struct timespec* start, const struct timespec* end) {
+    return (end->tv_sec - start->tv_sec) * 1e6 + (end->tv_nsec - start->tv_nsec) / 1e3;
+}
+
+// Accuracy and mean latency of the FP32 and INT8 models over all windows.
+static void report(const InferenceModel* float_model, const QuantizedModel* quantized_model,
+                   const float* windows, const int* labels, int num_windows) {
+    const int num_classes = float_model->classes.count;
+    float output[MAX_CLASSES];
+    int fp32_correct = 0, int8_correct = 0, agree = 0;
+    double fp32_us = 0.0, int8_us = 0.0;
+    struct timespec start, end;
+
+    for (int i = 0; i < num_windows; ++i) {
+        const float* window = &windows[(size_t)i * SEQUENCE_LENGTH * INPUT_SIZE];
+
+        clock_gettime(CLOCK_MONOTONIC, &start);
+        forward_pass_inference(float_model, window, output);
+        clock_gettime(CLOCK_MONOTONIC, &end);
+        fp32_us += elapsed_us(&start, &end);
+        int fp32_prediction = argmax(output, num_classes);
+
+        clock_gettime(CLOCK_MONOTONIC, &start);
+        forward_pass_quantized(quantized_model, window, output);
+        clock_gettime(CLOCK_MONOTONIC, &end);
+        int8_us += elapsed_us(&start, &end);
+        int int8_prediction = argmax(output, num_classes);
+
+        fp32_correct += (fp32_prediction == labels[i]);
+        int8_correct += (int8_prediction == labels[i]);
+        agree += (fp32_prediction == int8_prediction);
     }
+
+    printf("\n[REPORT] %d windows\n", num_windows);
+    printf("[REPORT] FP32: accuracy %.2f%%, %.2f us/window\n", 100.0 * fp32_correct / num_windows, fp32_us / num_windows);
+    printf("[REPORT] INT8: accuracy %.2f%%, %.2f us/window\n", 100.0 * int8_correct / num_windows, int8_us / num_windows);
+    printf("[REPORT] INT8 agrees with FP32 on %.2f%% of windows\n", 100.0 * agree / num_windows);
 }
 
 int main(int argc, char* argv[]) {
-    if (argc != 3) {
-        fprintf(stderr, "Usage: %s <input_model_path> <output_model_path>\n", argv[0]);
+    if (argc < 4) {
+        fprintf(stderr, "Usage: %s <input_model_path> <output_model_path> <gesture> [gesture ...]\n", argv[0]);
+        fprintf(stderr, "Activation ranges are calibrated on the gesture windows in %s.\n", DATA_DIR);
         return 1;
     }
 
     const char* input_path = argv[1];
     const char* output_path = argv[2];
+    const char** gestures = (const char**)&argv[3];
+    int num_gestures = argc - 3;
 
-    InferenceModel temp_inference_model;
-    if (!load_inference_model(&temp_inference_model, input_path)) {
+    InferenceModel float_model;
+    if (!load_inference_model(&float_model, input_path)) {
         fprintf(stderr, "Error: Failed to load model from %s\n", input_path);
         return 1;
     }
+    if (num_gestures > float_model.classes.count) {
+        fprintf(stderr, "Error: %d gestures given, but the model has %d classes.\n", num_gestures, float_model.classes.count);
+        return 1;
+    }
+    if (!is_model_file(input_path)) {
+        // Legacy files carry no names; take them from the command line
+        set_class_names(&float_model.classes, gestures, num_gestures, float_model.classes.count);
+    }
+
+    float* windows = NULL;
+    int* labels = NULL;
+    int num_windows = 0;
+    if (load_temporal_data(DATA_DIR, gestures, num_gestures, &windows, &labels, &num_windows) != 0 || num_windows == 0) {
+        fprintf(stderr, "Error: No calibration data found in %s\n", DATA_DIR);
+        return 1;
+    }
 
-    // The quantize_model function expects a `Model` struct, but we load an `InferenceModel`.
-    // We'll create a dummy `Model` and copy the weights over.
-    Model float_model;
-    memcpy(float_model.tcn_block.weights, temp_inference_model.tcn_block.weights, sizeof(temp_inference_model.tcn_block.weights));
-    memcpy(float_model.tcn_block.biases, temp_inference_model.tcn_block.biases, sizeof(temp_inference_model.tcn_block.biases));
-    memcpy(float_model.output_layer.weights, temp_inference_model.output_layer.weights, sizeof(temp_inference_model.output_layer.weights));
-    memcpy(float_model.output_layer.biases, temp_inference_model.output_layer.biases, sizeof(temp_inference_model.output_layer.biases));
+    CalibrationStats stats;
+    calibrate(&float_model, windows, num_windows, &stats);
 
     QuantizedModel quantized_model;
-    quantize_model(&float_model, &quantized_model);
+    quantize_model(&float_model, &stats, &quantized_model);
 
     save_quantized_model(&quantized_model, output_path);
 
@@ -63,5 +197,18 @@ int main(int argc, char* argv[]) {
         perror("Failed to get file size");
     }
 
+    report(&float_model, &quantized_model, windows, labels, num_windows);
+
+    // Static RA8D1 budget of both inference paths
+    InferenceBudget float_budget, int8_budget;
+    compute_inference_budget(TCN_VARIANT_DENSE, 0, float_model.classes.count, &float_budget);
+    compute_inference_budget(TCN_VARIANT_DENSE, 1, float_model.classes.count, &int8_budget);
+    print_inference_budget(&float_budget);
+    print_inference_budget(&int8_budget);
+    printf("[BUDGET] INT8 vs FP32: %.1fx less flash, ~%.1fx faster compute\n",
+           (double)float_budget.flash_bytes / int8_budget.flash_bytes, float_budget.latency_us / int8_budget.latency_us);
+
+    free(windows);
+    free(labels);
     return 0;
 }
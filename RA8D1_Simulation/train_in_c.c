@@ -1,10 +1,18 @@
 #include <stdio.h>
 #include <stdlib.h>
+#include <string.h>
 #include <math.h>
+#include <time.h>
+#include <inttypes.h>
+#include <sys/stat.h>
+#include <sys/resource.h>
 #include "training_logic.h"
+#include "mcu_budget.h"
 
 // Constants
 #define DATA_DIR "../models/data"
+#define MODEL_PATH "../models/c_model.bin"
+#define FEATURE_CACHE_DIR "../models/cache"
 
 // Training Hyperparameters
 #define NUM_EPOCHS 150
@@ -22,9 +30,9 @@ float calculate_loss(const float* predictions, int target_label) {
     return -logf(predicted_prob);
 }
 
-float calculate_accuracy(const float* predictions, int target_label) {
+float calculate_accuracy(const float* predictions, int num_classes, int target_label) {
     int max_index = 0;
-    for (int i = 1; i < NUM_CLASSES; ++i) {
+    for (int i = 1; i < num_classes; ++i) {
         if (predictions[i] > predictions[max_index]) {
             max_index = i;
         }
@@ -32,15 +40,246 @@ float calculate_accuracy(const float* predictions, int target_label) {
     return (max_index == target_label) ? 1.0f : 0.0f;
 }
 
+static void print_float_budget(TCNVariant variant, int num_classes) {
+    InferenceBudget budget;
+    compute_inference_budget(variant, 0, num_classes, &budget);
+    print_inference_budget(&budget);
+}
+
+static long peak_rss_kb(void) {
+    struct rusage usage;
+    getrusage(RUSAGE_SELF, &usage);
+#ifdef __APPLE__
+    return usage.ru_maxrss / 1024; // bytes on macOS
+#else
+    return usage.ru_maxrss; // kilobytes on Linux
+#endif
+}
+
+// Head-only retraining: the TCN block of the existing model is frozen, its pooled
+// features are cached on disk, and only the output layer is trained on them.
+static int train_head_only(const char** gestures, int num_gestures) {
+    struct timespec start_time, end_time;
+    clock_gettime(CLOCK_MONOTONIC, &start_time);
+
+    InferenceModel base_model;
+    if (!load_inference_model(&base_model, MODEL_PATH)) {
+        fprintf(stderr, "Error: Head-only training needs an existing model at %s.\n", MODEL_PATH);
+        return 1;
+    }
+
+    // Fresh output layer (class set may have changed), frozen TCN block
+    Model model;
+    init_model(&model, num_gestures);
+    memcpy(model.tcn_block.weights, base_model.tcn_block.weights, sizeof(model.tcn_block.weights));
+    memcpy(model.tcn_block.biases, base_model.tcn_block.biases, sizeof(model.tcn_block.biases));
+
+    // Feature cache keyed by model + dataset
+    char cache_path[1024];
+    uint64_t cache_key = hash_feature_inputs(&model, DATA_DIR, gestures, num_gestures);
+    snprintf(cache_path, sizeof(cache_path), "%s/features_%016" PRIx64 ".bin", FEATURE_CACHE_DIR, cache_key);
+
+    float* features = NULL;
+    int* labels = NULL;
+    int num_sequences = 0;
+    if (load_feature_cache(cache_path, &features, &labels, &num_sequences)) {
+        printf("Feature cache hit: %s (%d windows)\n", cache_path, num_sequences);
+    } else {
+        printf("Feature cache miss. Running frozen TCN block over all windows...\n");
+        float* all_data = NULL;
+        if (load_temporal_data(DATA_DIR, gestures, num_gestures, &all_data, &labels, &num_sequences) != 0) {
+            fprintf(stderr, "Failed to load data. Exiting.\n");
+            return 1;
+        }
+        features = (float*)malloc((size_t)num_sequences * TCN_CHANNELS * sizeof(float));
+        if (!features) { perror("Fatal: Failed to allocate feature cache"); return 1; }
+        for (int i = 0; i < num_sequences; ++i) {
+            compute_pooled_features(&model, &all_data[(size_t)i * SEQUENCE_LENGTH * INPUT_SIZE], &features[(size_t)i * TCN_CHANNELS]);
+        }
+        free(all_data);
+
+        mkdir(FEATURE_CACHE_DIR, 0755);
+        if (save_feature_cache(cache_path, features, labels, num_sequences)) {
+            printf("Cached %d feature vectors to %s\n", num_sequences, cache_path);
+        }
+    }
+
+    int num_train = 0, num_val = 0;
+    int* train_indices = (int*)malloc(num_sequences * sizeof(int));
+    int* val_indices = (int*)malloc(num_sequences * sizeof(int));
+    split_data(num_sequences, TRAIN_SPLIT, train_indices, &num_train, val_indices, &num_val);
+    printf("Split data into %d training and %d validation samples.\n", num_train, num_val);
+
+    printf("\nStarting Head-Only Training\n");
+    printf("Hyperparameters: Epochs=%d, LR=%.4f, Train/Val Split=%.0f/%.0f\n", NUM_EPOCHS, LEARNING_RATE, TRAIN_SPLIT*100, (1-TRAIN_SPLIT)*100);
+    fflush(stdout);
+
+    int timestep = 0;
+    for (int epoch = 0; epoch < NUM_EPOCHS; ++epoch) {
+        float total_train_loss = 0.0f;
+        for (int i = 0; i < num_train; ++i) {
+            timestep++;
+            int sample_idx = train_indices[i];
+            forward_pass_head(&model, &features[(size_t)sample_idx * TCN_CHANNELS]);
+            total_train_loss += calculate_loss(model.output_layer.output, labels[sample_idx]);
+            backward_pass_head(&model, labels[sample_idx]);
+            update_weights(&model, LEARNING_RATE, BETA1, BETA2, EPSILON, timestep);
+        }
+
+        float total_val_loss = 0.0f;
+        float total_val_acc = 0.0f;
+        for (int i = 0; i < num_val; ++i) {
+            int sample_idx = val_indices[i];
+            forward_pass_head(&model, &features[(size_t)sample_idx * TCN_CHANNELS]);
+            total_val_loss += calculate_loss(model.output_layer.output, labels[sample_idx]);
+            total_val_acc += calculate_accuracy(model.output_layer.output, num_gestures, labels[sample_idx]);
+        }
+
+        if ((epoch + 1) % 10 == 0) {
+            printf("Epoch %4d/%d | Train Loss: %.4f | Val Loss: %.4f | Val Acc: %.2f%%\n",
+                   epoch + 1, NUM_EPOCHS,
+                   total_train_loss / num_train,
+                   num_val ? total_val_loss / num_val : 0.0f,
+                   num_val ? (total_val_acc / num_val) * 100.0f : 0.0f);
+            fflush(stdout);
+        }
+    }
+
+    clock_gettime(CLOCK_MONOTONIC, &end_time);
+    printf("\nHead-Only Training Complete\n");
+    printf("[BENCHMARK] Head-only training time: %.2f s, peak RSS: %ld KB\n",
+           (end_time.tv_sec - start_time.tv_sec) + (end_time.tv_nsec - start_time.tv_nsec) / 1e9, peak_rss_kb());
+
+    printf("\n[TRAINING] Saving model to %s...\n", MODEL_PATH);
+    save_model(&model, gestures, num_gestures, MODEL_PATH);
+    fflush(stdout);
+
+    free(features);
+    free(labels);
+    free(train_indices);
+    free(val_indices);
+    return 0;
+}
+
+// Full training of the depthwise-separable TCN variant
+static int train_dws(const char** gestures, int num_gestures) {
+    struct timespec start_time, end_time;
+    clock_gettime(CLOCK_MONOTONIC, &start_time);
+
+    float* all_data = NULL;
+    int* all_labels = NULL;
+    int num_sequences = 0;
+    if (load_temporal_data(DATA_DIR, gestures, num_gestures, &all_data, &all_labels, &num_sequences) != 0) {
+        fprintf(stderr, "Failed to load data. Exiting.\n");
+        return 1;
+    }
+    printf("Loaded %d total sequences.\n", num_sequences);
+
+    int num_train = 0, num_val = 0;
+    int* train_indices = (int*)malloc(num_sequences * sizeof(int));
+    int* val_indices = (int*)malloc(num_sequences * sizeof(int));
+    split_data(num_sequences, TRAIN_SPLIT, train_indices, &num_train, val_indices, &num_val);
+    printf("Split data into %d training and %d validation samples.\n", num_train, num_val);
+
+    static DWSModel model;
+    init_dws_model(&model, num_gestures);
+
+    printf("\nStarting Training (depthwise-separable TCN block)\n");
+    printf("Hyperparameters: Epochs=%d, LR=%.4f, Train/Val Split=%.0f/%.0f\n", NUM_EPOCHS, LEARNING_RATE, TRAIN_SPLIT*100, (1-TRAIN_SPLIT)*100);
+    fflush(stdout);
+
+    int timestep = 0;
+    float val_accuracy = 0.0f;
+    for (int epoch = 0; epoch < NUM_EPOCHS; ++epoch) {
+        float total_train_loss = 0.0f;
+        for (int i = 0; i < num_train; ++i) {
+            timestep++;
+            int sample_idx = train_indices[i];
+            const float* input_sequence = &all_data[sample_idx * SEQUENCE_LENGTH * INPUT_SIZE];
+            forward_pass_dws(&model, input_sequence);
+            total_train_loss += calculate_loss(model.output_layer.output, all_labels[sample_idx]);
+            backward_pass_dws(&model, input_sequence, all_labels[sample_idx]);
+            update_weights_dws(&model, LEARNING_RATE, BETA1, BETA2, EPSILON, timestep);
+        }
+
+        float total_val_loss = 0.0f;
+        float total_val_acc = 0.0f;
+        for (int i = 0; i < num_val; ++i) {
+            int sample_idx = val_indices[i];
+            forward_pass_dws(&model, &all_data[sample_idx * SEQUENCE_LENGTH * INPUT_SIZE]);
+            total_val_loss += calculate_loss(model.output_layer.output, all_labels[sample_idx]);
+            total_val_acc += calculate_accuracy(model.output_layer.output, num_gestures, all_labels[sample_idx]);
+        }
+        val_accuracy = num_val ? (total_val_acc / num_val) * 100.0f : 0.0f;
+
+        if ((epoch + 1) % 10 == 0) {
+            printf("Epoch %4d/%d | Train Loss: %.4f | Val Loss: %.4f | Val Acc: %.2f%%\n",
+                   epoch + 1, NUM_EPOCHS,
+                   total_train_loss / num_train,
+                   num_val ? total_val_loss / num_val : 0.0f,
+                   val_accuracy);
+            fflush(stdout);
+        }
+    }
+
+    printf("\nTraining Complete\n");
+    clock_gettime(CLOCK_MONOTONIC, &end_time);
+    printf("[BENCHMARK] Full training time: %.2f s, training state: %zu bytes, peak RSS: %ld KB\n",
+           (end_time.tv_sec - start_time.tv_sec) + (end_time.tv_nsec - start_time.tv_nsec) / 1e9,
+           sizeof(DWSModel), peak_rss_kb());
+    printf("[BENCHMARK] Depthwise-separable block: %ld MACs/window (dense block: %ld), val acc %.2f%%\n",
+           model_macs(TCN_VARIANT_DWS), model_macs(TCN_VARIANT_DENSE), val_accuracy);
+
+    printf("\n[TRAINING] Saving model to %s...\n", MODEL_PATH);
+    fflush(stdout);
+    save_dws_model(&model, gestures, num_gestures, MODEL_PATH);
+    printf("[TRAINING] Model saved successfully.\n");
+    printf("[INFO] Inference model static memory footprint: %zu bytes (%.2f KB)\n",
+           sizeof(InferenceDWSModel), (double)sizeof(InferenceDWSModel) / 1024.0);
+    print_float_budget(TCN_VARIANT_DWS, num_gestures);
+    fflush(stdout);
+
+    free(all_data);
+    free(all_labels);
+    free(train_indices);
+    free(val_indices);
+    return 0;
+}
+
 int main(int argc, char *argv[]) {
+    struct timespec start_time, end_time;
+    clock_gettime(CLOCK_MONOTONIC, &start_time);
+
+    // --- Options ---
+    int head_only = 0;
+    int dws = 0;
+    int first_gesture_arg = 1;
+    while (first_gesture_arg < argc && strncmp(argv[first_gesture_arg], "--", 2) == 0) {
+        if (strcmp(argv[first_gesture_arg], "--head-only") == 0) {
+            head_only = 1;
+        } else if (strcmp(argv[first_gesture_arg], "--dws") == 0) {
+            dws = 1;
+        } else {
+            fprintf(stderr, "Error: Unknown option '%s'.\n", argv[first_gesture_arg]);
+            fprintf(stderr, "Usage: %s [--head-only | --dws] [gesture ...]\n", argv[0]);
+            return 1;
+        }
+        first_gesture_arg++;
+    }
+    if (head_only && dws) {
+        fprintf(stderr, "Error: --head-only retrains the head of an existing dense model and cannot be combined with --dws.\n");
+        return 1;
+    }
+
     // --- Gesture Configuration ---
+    static const char* default_gestures[] = {"wave", "swipe_left", "swipe_right"};
     const char** GESTURES;
     int NUM_GESTURES;
 
-    if (argc > 1) {
+    if (argc > first_gesture_arg) {
         // Use gestures from command-line arguments
-        NUM_GESTURES = argc - 1;
-        GESTURES = (const char**)&argv[1];
+        NUM_GESTURES = argc - first_gesture_arg;
+        GESTURES = (const char**)&argv[first_gesture_arg];
         printf("Received %d gestures from command line:\n", NUM_GESTURES);
         for (int i = 0; i < NUM_GESTURES; ++i) {
             printf("  - %s\n", GESTURES[i]);
@@ -48,10 +287,26 @@ int main(int argc, char *argv[]) {
     } else {
         // Fallback to default gestures
         printf("No command-line gestures provided. Using default gestures.\n");
-        const char* default_gestures[] = {"wave", "swipe_left", "swipe_right"};
         NUM_GESTURES = sizeof(default_gestures) / sizeof(default_gestures[0]);
         GESTURES = default_gestures;
     }
+    if (NUM_GESTURES > MAX_CLASSES) {
+        fprintf(stderr, "Error: %d gestures given, but a model holds at most MAX_CLASSES=%d.\n", NUM_GESTURES, MAX_CLASSES);
+        return 1;
+    }
+
+    if (head_only) {
+        printf("--- C Head-Only Training Started ---\n");
+        int status = train_head_only(GESTURES, NUM_GESTURES);
+        printf("--- C Training Executable Finished ---\n");
+        return status;
+    }
+    if (dws) {
+        printf("--- C Training Executable Started (depthwise-separable) ---\n");
+        int status = train_dws(GESTURES, NUM_GESTURES);
+        printf("--- C Training Executable Finished ---\n");
+        return status;
+    }
     printf("--- C Training Executable Started ---\n");
     printf("C-Based Model Training\n");
 
@@ -73,7 +328,7 @@ int main(int argc, char *argv[]) {
 
     // Init model
     Model model;
-    init_model(&model);
+    init_model(&model, NUM_GESTURES);
     
     // Diagnostic: Initial output layer weights
     printf("[TRAINING DIAGNOSTIC] Output layer weights after initialization:\n");
@@ -117,7 +372,7 @@ int main(int argc, char *argv[]) {
 
             forward_pass(&model, input_sequence, epoch, i);
             total_val_loss += calculate_loss(model.output_layer.output, target_label);
-            total_val_acc += calculate_accuracy(model.output_layer.output, target_label);
+            total_val_acc += calculate_accuracy(model.output_layer.output, NUM_GESTURES, target_label);
         }
 
         if ((epoch + 1) % 10 == 0) {
@@ -131,6 +386,11 @@ int main(int argc, char *argv[]) {
     }
 
     printf("\nTraining Complete\n");
+    clock_gettime(CLOCK_MONOTONIC, &end_time);
+    printf("[BENCHMARK] Full training time: %.2f s, training state: %zu bytes, peak RSS: %ld KB\n",
+           (end_time.tv_sec - start_time.tv_sec) + (end_time.tv_nsec - start_time.tv_nsec) / 1e9,
+           sizeof(Model), peak_rss_kb());
+    printf("[BENCHMARK] Dense TCN block: %ld MACs/window\n", model_macs(TCN_VARIANT_DENSE));
     
     // Diagnostic: Final output layer weights
     printf("[TRAINING DIAGNOSTIC] Output layer weights after training:\n");
@@ -140,12 +400,13 @@ int main(int argc, char *argv[]) {
     printf("  bias[0]: %.6f\n", model.output_layer.biases[0]);
 
     // Save model
-    printf("\n[TRAINING] Saving model to ../models/c_model.bin...\n");
+    printf("\n[TRAINING] Saving model to %s...\n", MODEL_PATH);
     fflush(stdout);
-    save_model(&model, "../models/c_model.bin");
+    save_model(&model, GESTURES, NUM_GESTURES, MODEL_PATH);
     printf("[TRAINING] Model saved successfully.\n");
     printf("[INFO] Inference model static memory footprint: %zu bytes (%.2f KB)\n", 
            sizeof(InferenceModel), (double)sizeof(InferenceModel) / 1024.0);
+    print_float_budget(TCN_VARIANT_DENSE, NUM_GESTURES);
     fflush(stdout);
 
     // Cleanup
@@ -0,0 +1,214 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <math.h>
+#include <time.h>
+#include <sys/stat.h>
+#include <sys/resource.h>
+#include "training_logic.h"
+#include "lora.h"
+
+// Constants
+#define DATA_DIR "../models/data"
+#define BASE_MODEL_PATH "../models/c_model.bin"
+#define ADAPTER_DIR "../models/adapters"
+
+// Training Hyperparameters
+#define NUM_EPOCHS 40
+#define LEARNING_RATE 0.005f
+#define BETA1 0.9f
+#define BETA2 0.999f
+#define EPSILON 1e-8f
+
+#define TRAIN_SPLIT 0.8f
+#define NEGATIVES_PER_CLASS 64 // Replay windows sampled from each other gesture
+
+static double elapsed_seconds(const struct timespec* start) {
+    struct timespec now;
+    clock_gettime(CLOCK_MONOTONIC, &now);
+    return (now.tv_sec - start->tv_sec) + (now.tv_nsec - start->tv_nsec) / 1e9;
+}
+
+static long peak_rss_kb(void) {
+    struct rusage usage;
+    getrusage(RUSAGE_SELF, &usage);
+#ifdef __APPLE__
+    return usage.ru_maxrss / 1024; // bytes on macOS
+#else
+    return usage.ru_maxrss; // kilobytes on Linux
+#endif
+}
+
+// Appends up to max_windows evenly spaced windows of one gesture to the training set.
+static int append_gesture_windows(const char* gesture, int target, int max_windows,
+                                  float** data, int** labels, int* num_windows) {
+    float* gesture_data = NULL;
+    int* gesture_labels = NULL;
+    int gesture_count = 0;
+    if (load_temporal_data(DATA_DIR, &gesture, 1, &gesture_data, &gesture_labels, &gesture_count) != 0) {
+        return 0;
+    }
+
+    int keep = (max_windows > 0 && gesture_count > max_windows) ? max_windows : gesture_count;
+    *data = (float*)realloc(*data, (size_t)(*num_windows + keep) * SEQUENCE_LENGTH * INPUT_SIZE * sizeof(float));
+    *labels = (int*)realloc(*labels, (size_t)(*num_windows + keep) * sizeof(int));
+    for (int i = 0; i < keep; ++i) {
+        int src = (int)((long)i * gesture_count / keep);
+        memcpy(&(*data)[(size_t)(*num_windows + i) * SEQUENCE_LENGTH * INPUT_SIZE],
+               &gesture_data[(size_t)src * SEQUENCE_LENGTH * INPUT_SIZE],
+               SEQUENCE_LENGTH * INPUT_SIZE * sizeof(float));
+        (*labels)[*num_windows + i] = target;
+    }
+    *num_windows += keep;
+
+    free(gesture_data);
+    free(gesture_labels);
+    return keep;
+}
+
+int main(int argc, char* argv[]) {
+    if (argc < 2) {
+        fprintf(stderr, "Usage: %s <new_gesture> [other_gesture ...]\n", argv[0]);
+        fprintf(stderr, "Trains ../models/adapters/<new_gesture>.bin on top of the frozen %s.\n", BASE_MODEL_PATH);
+        return 1;
+    }
+    const char* gesture = argv[1];
+    printf("--- C LoRA Adapter Training Started ---\n");
+    printf("Training adapter for '%s' (rank %d) on frozen base model.\n", gesture, LORA_RANK);
+
+    struct timespec start;
+    clock_gettime(CLOCK_MONOTONIC, &start);
+    srand(time(NULL));
+
+    // Load frozen base
+    InferenceModel base_model;
+    if (!load_inference_model(&base_model, BASE_MODEL_PATH)) {
+        fprintf(stderr, "Error: A trained base model is required at %s. Run a full training first.\n", BASE_MODEL_PATH);
+        return 1;
+    }
+
+    // Existing adapters of the other gestures compete with the new class but stay frozen
+    static ClassAdapter frozen_adapters[LORA_MAX_CLASSES];
+    int frozen_index[argc];
+    int num_frozen = 0;
+    char adapter_path[1024];
+    for (int i = 2; i < argc; ++i) {
+        frozen_index[i] = -1;
+        if (strcmp(argv[i], gesture) == 0 || num_frozen >= LORA_MAX_CLASSES - 1) continue;
+        snprintf(adapter_path, sizeof(adapter_path), "%s/%s.bin", ADAPTER_DIR, argv[i]);
+        FILE* existing = fopen(adapter_path, "rb");
+        if (!existing) continue;
+        fclose(existing);
+        if (load_class_adapter(&frozen_adapters[num_frozen], adapter_path)) {
+            frozen_index[i] = num_frozen++;
+        }
+    }
+    printf("Competing against %d frozen adapters.\n", num_frozen);
+
+    // Load data: all windows of the new class, a bounded replay sample of the others
+    float* all_data = NULL;
+    int* all_labels = NULL; // Index into frozen adapters, num_frozen for the new class, -1 for background
+    int num_sequences = 0;
+    int num_positive = append_gesture_windows(gesture, num_frozen, 0, &all_data, &all_labels, &num_sequences);
+    if (num_positive == 0) {
+        fprintf(stderr, "Failed to load data for '%s'. Exiting.\n", gesture);
+        return 1;
+    }
+    for (int i = 2; i < argc; ++i) {
+        if (strcmp(argv[i], gesture) == 0) continue;
+        append_gesture_windows(argv[i], frozen_index[i], NEGATIVES_PER_CLASS, &all_data, &all_labels, &num_sequences);
+    }
+    int num_negative = num_sequences - num_positive;
+    printf("Loaded %d positive and %d negative windows.\n", num_positive, num_negative);
+    if (num_negative == 0) {
+        printf("Warning: No other gestures given; the adapter only sees positives.\n");
+    }
+
+    // Run the frozen base conv and the frozen adapters once per window
+    float* base_cache = (float*)malloc((size_t)num_sequences * SEQUENCE_LENGTH * TCN_CHANNELS * sizeof(float));
+    float* frozen_logits = (float*)malloc((size_t)num_sequences * (num_frozen + 1) * sizeof(float));
+    if (!base_cache || !frozen_logits) { perror("Fatal: Failed to allocate base feature cache"); return 1; }
+    for (int i = 0; i < num_sequences; ++i) {
+        const float* input = &all_data[(size_t)i * SEQUENCE_LENGTH * INPUT_SIZE];
+        float* base_out = &base_cache[(size_t)i * SEQUENCE_LENGTH * TCN_CHANNELS];
+        lora_base_conv(&base_model.tcn_block, input, base_out);
+        for (int j = 0; j < num_frozen; ++j) {
+            frozen_logits[(size_t)i * (num_frozen + 1) + j] = lora_class_logit(&frozen_adapters[j], input, base_out, NULL, NULL);
+        }
+    }
+
+    // Split data
+    int num_train = 0, num_val = 0;
+    int* train_indices = (int*)malloc(num_sequences * sizeof(int));
+    int* val_indices = (int*)malloc(num_sequences * sizeof(int));
+    split_data(num_sequences, TRAIN_SPLIT, train_indices, &num_train, val_indices, &num_val);
+
+    // Training Loop
+    static AdapterTrainer trainer;
+    init_adapter_trainer(&trainer);
+    printf("Hyperparameters: Epochs=%d, LR=%.4f, Train/Val Split=%.0f/%.0f\n", NUM_EPOCHS, LEARNING_RATE, TRAIN_SPLIT*100, (1-TRAIN_SPLIT)*100);
+    fflush(stdout);
+
+    int timestep = 0;
+    for (int epoch = 0; epoch < NUM_EPOCHS; ++epoch) {
+        shuffle_indices(train_indices, num_train);
+        float total_train_loss = 0.0f;
+        for (int i = 0; i < num_train; ++i) {
+            timestep++;
+            int idx = train_indices[i];
+            total_train_loss += lora_backward_pass(&trainer, &all_data[(size_t)idx * SEQUENCE_LENGTH * INPUT_SIZE],
+                                                   &base_cache[(size_t)idx * SEQUENCE_LENGTH * TCN_CHANNELS],
+                                                   &frozen_logits[(size_t)idx * (num_frozen + 1)], num_frozen,
+                                                   all_labels[idx], NULL);
+            lora_update_weights(&trainer, LEARNING_RATE, BETA1, BETA2, EPSILON, timestep);
+        }
+
+        if ((epoch + 1) % 10 == 0) {
+            int correct = 0;
+            for (int i = 0; i < num_val; ++i) {
+                int idx = val_indices[i];
+                const float* logits = &frozen_logits[(size_t)idx * (num_frozen + 1)];
+                float new_logit = lora_class_logit(&trainer.params, &all_data[(size_t)idx * SEQUENCE_LENGTH * INPUT_SIZE],
+                                                   &base_cache[(size_t)idx * SEQUENCE_LENGTH * TCN_CHANNELS], NULL, NULL);
+                // Argmax over [background (0), frozen..., new]
+                int predicted = -1;
+                float best = 0.0f;
+                for (int j = 0; j < num_frozen; ++j) {
+                    if (logits[j] > best) { best = logits[j]; predicted = j; }
+                }
+                if (new_logit > best) predicted = num_frozen;
+                correct += (predicted == all_labels[idx]);
+            }
+            printf("Epoch %4d/%d | Train Loss: %.4f | Val Acc: %.2f%%\n",
+                   epoch + 1, NUM_EPOCHS, total_train_loss / num_train,
+                   num_val ? 100.0f * correct / num_val : 0.0f);
+            fflush(stdout);
+        }
+    }
+
+    // Save adapter
+    mkdir(ADAPTER_DIR, 0755);
+    snprintf(adapter_path, sizeof(adapter_path), "%s/%s.bin", ADAPTER_DIR, gesture);
+    if (!save_class_adapter(&trainer.params, adapter_path)) {
+        return 1;
+    }
+
+    size_t trainable_params = sizeof(ClassAdapter) / sizeof(float);
+    printf("[BENCHMARK] Adapter training time: %.2f s over %d windows\n", elapsed_seconds(&start), num_sequences);
+    printf("[BENCHMARK] Trainable parameters: %zu (full model: %zu)\n", trainable_params,
+           (sizeof(InferenceModel)) / sizeof(float));
+    printf("[BENCHMARK] Training state: %zu bytes (full Model struct: %zu bytes), peak RSS: %ld KB\n",
+           sizeof(AdapterTrainer), sizeof(Model), peak_rss_kb());
+    printf("[INFO] Adapter file size: %zu bytes\n", sizeof(ClassAdapter));
+
+    // Cleanup
+    free(all_data);
+    free(all_labels);
+    free(base_cache);
+    free(frozen_logits);
+    free(train_indices);
+    free(val_indices);
+
+    printf("--- C LoRA Adapter Training Finished ---\n");
+    return 0;
+}
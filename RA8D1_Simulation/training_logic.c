@@ -1,10 +1,12 @@
 #include "training_logic.h"
+#include "model_file.h"
 #include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
 #include <math.h>
 #include <time.h>
 #include <dirent.h> // For directory traversal
+#include <sys/stat.h>
 
 // Private Helper Functions
 
@@ -22,8 +24,10 @@ static void initialize_weights(float* weights, size_t num_weights, size_t fan_in
 
 // Model Init/Cleanup
 
-void init_model(Model* model) {
+void init_model(Model* model, int num_classes) {
     srand(time(NULL));
+    memset(model, 0, sizeof(*model));
+    model->output_layer.num_classes = num_classes;
 
     // Initialize TCN Block
     initialize_weights(model->tcn_block.weights, sizeof(model->tcn_block.weights)/sizeof(float), INPUT_SIZE * TCN_KERNEL_SIZE);
@@ -36,7 +40,7 @@ void init_model(Model* model) {
     memset(model->tcn_block.v_biases, 0, sizeof(model->tcn_block.biases));
 
     // Initialize Output Layer
-    initialize_weights(model->output_layer.weights, sizeof(model->output_layer.weights)/sizeof(float), TCN_CHANNELS);
+    initialize_weights(model->output_layer.weights, num_classes * TCN_CHANNELS, TCN_CHANNELS);
     memset(model->output_layer.biases, 0, sizeof(model->output_layer.biases));
 
     // Initialize Output Layer Adam state
@@ -46,29 +50,60 @@ void init_model(Model* model) {
     memset(model->output_layer.v_biases, 0, sizeof(model->output_layer.biases));
 }
 
-void save_model(const Model* model, const char* file_path) {
-    FILE* fp = fopen(file_path, "wb");
-    if (!fp) {
-        perror("Error opening file for writing");
-        return;
-    }
+// Legacy raw files hold NUM_CLASSES output rows; containers hold classes.count
+#define OUTPUT_SHAPE(num_classes) ((uint32_t[]){(uint32_t)(num_classes), TCN_CHANNELS})
 
-    // Field-by-field writing to prevent padding issues.
-    // Only save weights/biases for the inference model.
+static void add_output_layer(ModelFileWriter* writer, const float* weights, const float* biases, int num_classes) {
+    model_file_add_tensor(writer, "output_weights", MODEL_DTYPE_F32, weights, 2, OUTPUT_SHAPE(num_classes));
+    model_file_add_tensor(writer, "output_biases", MODEL_DTYPE_F32, biases, 1, (uint32_t[]){(uint32_t)num_classes});
+}
+
+// Copies the output layer of a mapped container into the inference struct
+static int read_output_layer(const ModelFile* file, InferenceOutputLayer* layer, ClassNames* classes) {
+    model_file_classes(file, classes);
+    const float* weights = model_file_tensor(file, "output_weights", MODEL_DTYPE_F32, (size_t)classes->count * TCN_CHANNELS);
+    const float* biases = model_file_tensor(file, "output_biases", MODEL_DTYPE_F32, classes->count);
+    if (!weights || !biases) return 0;
+    memcpy(layer->weights, weights, (size_t)classes->count * TCN_CHANNELS * sizeof(float));
+    memcpy(layer->biases, biases, classes->count * sizeof(float));
+    return 1;
+}
 
-    // Write TCN block weights and biases
-    fwrite(model->tcn_block.weights, sizeof(model->tcn_block.weights), 1, fp);
-    fwrite(model->tcn_block.biases, sizeof(model->tcn_block.biases), 1, fp);
+void save_model(const Model* model, const char** class_names, int num_classes, const char* file_path) {
+    ClassNames classes;
+    set_class_names(&classes, class_names, num_classes, num_classes);
 
-    // Write Output layer weights and biases
-    fwrite(model->output_layer.weights, sizeof(model->output_layer.weights), 1, fp);
-    fwrite(model->output_layer.biases, sizeof(model->output_layer.biases), 1, fp);
-    
-    fclose(fp);
-    printf("Model saved to %s.\n", file_path);
+    // Only the weights/biases needed for inference are saved
+    ModelFileWriter writer;
+    model_file_writer_init(&writer, MODEL_KIND_DENSE, &classes);
+    model_file_add_tensor(&writer, "tcn_weights", MODEL_DTYPE_F32, model->tcn_block.weights, 3,
+                          (uint32_t[]){TCN_CHANNELS, INPUT_SIZE, TCN_KERNEL_SIZE});
+    model_file_add_tensor(&writer, "tcn_biases", MODEL_DTYPE_F32, model->tcn_block.biases, 1, (uint32_t[]){TCN_CHANNELS});
+    add_output_layer(&writer, model->output_layer.weights, model->output_layer.biases, num_classes);
+
+    if (model_file_write(&writer, file_path)) {
+        printf("Model saved to %s.\n", file_path);
+    }
 }
 
 int load_inference_model(InferenceModel* model, const char* file_path) {
+    memset(&model->output_layer, 0, sizeof(model->output_layer));
+    if (is_model_file(file_path)) {
+        ModelFile file;
+        if (!model_file_open_kind(&file, file_path, MODEL_KIND_DENSE)) return 0;
+        // Copied once into the static struct, whose fixed layout the kernels are compiled against
+        const float* weights = model_file_tensor(&file, "tcn_weights", MODEL_DTYPE_F32, TCN_CHANNELS * INPUT_SIZE * TCN_KERNEL_SIZE);
+        const float* biases = model_file_tensor(&file, "tcn_biases", MODEL_DTYPE_F32, TCN_CHANNELS);
+        int success = weights && biases && read_output_layer(&file, &model->output_layer, &model->classes);
+        if (success) {
+            memcpy(model->tcn_block.weights, weights, sizeof(model->tcn_block.weights));
+            memcpy(model->tcn_block.biases, biases, sizeof(model->tcn_block.biases));
+        }
+        model_file_close(&file);
+        return success;
+    }
+
+    // Legacy raw float32 file
     FILE* fp = fopen(file_path, "rb");
     if (!fp) {
         perror("Failed to open model file");
@@ -82,8 +117,8 @@ int load_inference_model(InferenceModel* model, const char* file_path) {
     size_t tcn_biases_read = fread(model->tcn_block.biases, sizeof(model->tcn_block.biases), 1, fp);
 
     // Read Output layer weights and biases
-    size_t out_weights_read = fread(model->output_layer.weights, sizeof(model->output_layer.weights), 1, fp);
-    size_t out_biases_read = fread(model->output_layer.biases, sizeof(model->output_layer.biases), 1, fp);
+    size_t out_weights_read = fread(model->output_layer.weights, NUM_CLASSES * TCN_CHANNELS * sizeof(float), 1, fp);
+    size_t out_biases_read = fread(model->output_layer.biases, NUM_CLASSES * sizeof(float), 1, fp);
 
     fclose(fp);
 
@@ -93,51 +128,161 @@ int load_inference_model(InferenceModel* model, const char* file_path) {
 
     if (!success) {
         fprintf(stderr, "Error: Failed to read all components of the model file.\n");
+        if (detect_model_variant(file_path) == TCN_VARIANT_DWS) {
+            fprintf(stderr, "       %s holds the depthwise-separable variant; this tool needs the dense TCN block.\n", file_path);
+        }
     }
+    set_class_names(&model->classes, NULL, 0, NUM_CLASSES);
 
     return success;
 }
 
 void save_quantized_model(const QuantizedModel *model, const char *file_path) {
-    FILE *file = fopen(file_path, "wb");
-    if (!file) {
-        perror("Failed to open file for writing");
-        return;
+    const int num_classes = model->classes.count;
+    const uint32_t channels[] = {TCN_CHANNELS};
+    const uint32_t scalar[] = {1};
+
+    // Scales first, then the integer tensors in model order
+    ModelFileWriter writer;
+    model_file_writer_init(&writer, MODEL_KIND_INT8, &model->classes);
+    model_file_add_tensor(&writer, "input_scale", MODEL_DTYPE_F32, &model->input_scale, 1, scalar);
+    model_file_add_tensor(&writer, "activation_scale", MODEL_DTYPE_F32, &model->activation_scale, 1, scalar);
+    model_file_add_tensor(&writer, "tcn_weight_scales", MODEL_DTYPE_F32, model->tcn_weight_scales, 1, channels);
+    model_file_add_tensor(&writer, "output_weight_scales", MODEL_DTYPE_F32, model->output_weight_scales, 1,
+                          (uint32_t[]){(uint32_t)num_classes});
+    model_file_add_tensor(&writer, "tcn_block_weights", MODEL_DTYPE_I8, model->tcn_block_weights, 3,
+                          (uint32_t[]){TCN_CHANNELS, INPUT_SIZE, TCN_KERNEL_SIZE});
+    model_file_add_tensor(&writer, "tcn_block_biases", MODEL_DTYPE_I32, model->tcn_block_biases, 1, channels);
+    model_file_add_tensor(&writer, "tcn_multipliers", MODEL_DTYPE_I32, model->tcn_multipliers, 1, channels);
+    model_file_add_tensor(&writer, "tcn_shifts", MODEL_DTYPE_I32, model->tcn_shifts, 1, channels);
+    model_file_add_tensor(&writer, "tcn_negative_multipliers", MODEL_DTYPE_I32, model->tcn_negative_multipliers, 1, channels);
+    model_file_add_tensor(&writer, "tcn_negative_shifts", MODEL_DTYPE_I32, model->tcn_negative_shifts, 1, channels);
+    model_file_add_tensor(&writer, "output_layer_weights", MODEL_DTYPE_I8, model->output_layer_weights, 2, OUTPUT_SHAPE(num_classes));
+    model_file_add_tensor(&writer, "output_layer_biases", MODEL_DTYPE_I32, model->output_layer_biases, 1,
+                          (uint32_t[]){(uint32_t)num_classes});
+
+    if (model_file_write(&writer, file_path)) {
+        printf("Quantized model saved to %s.\n", file_path);
     }
+}
 
-    fwrite(model->tcn_block_weights, sizeof(int8_t), TCN_CHANNELS * INPUT_SIZE * TCN_KERNEL_SIZE, file);
-    fwrite(model->tcn_block_biases, sizeof(int8_t), TCN_CHANNELS, file);
-    fwrite(model->output_layer_weights, sizeof(int8_t), NUM_CLASSES * TCN_CHANNELS, file);
-    fwrite(model->output_layer_biases, sizeof(int8_t), NUM_CLASSES, file);
+// Copies one INT8-model field out of a mapped container
+#define READ_QUANT_FIELD(file, model, field, dtype, count) \
+    copy_tensor(file, #field, dtype, count, sizeof(*(model)->field), (model)->field)
 
-    fclose(file);
-    printf("Quantized model saved to %s.\n", file_path);
+static int copy_tensor(const ModelFile* file, const char* name, ModelDType dtype, size_t count, size_t elem_size, void* dst) {
+    const void* src = model_file_tensor(file, name, dtype, count);
+    if (!src) return 0;
+    memcpy(dst, src, count * elem_size);
+    return 1;
+}
+
+static int load_quantized_container(QuantizedModel* model, const char* file_path) {
+    ModelFile file;
+    if (!model_file_open_kind(&file, file_path, MODEL_KIND_INT8)) return 0;
+    model_file_classes(&file, &model->classes);
+    const size_t num_classes = model->classes.count;
+    int success = copy_tensor(&file, "input_scale", MODEL_DTYPE_F32, 1, sizeof(float), &model->input_scale)
+        && copy_tensor(&file, "activation_scale", MODEL_DTYPE_F32, 1, sizeof(float), &model->activation_scale)
+        && READ_QUANT_FIELD(&file, model, tcn_weight_scales, MODEL_DTYPE_F32, TCN_CHANNELS)
+        && READ_QUANT_FIELD(&file, model, output_weight_scales, MODEL_DTYPE_F32, num_classes)
+        && READ_QUANT_FIELD(&file, model, tcn_block_weights, MODEL_DTYPE_I8, TCN_CHANNELS * INPUT_SIZE * TCN_KERNEL_SIZE)
+        && READ_QUANT_FIELD(&file, model, tcn_block_biases, MODEL_DTYPE_I32, TCN_CHANNELS)
+        && READ_QUANT_FIELD(&file, model, tcn_multipliers, MODEL_DTYPE_I32, TCN_CHANNELS)
+        && READ_QUANT_FIELD(&file, model, tcn_shifts, MODEL_DTYPE_I32, TCN_CHANNELS)
+        && READ_QUANT_FIELD(&file, model, tcn_negative_multipliers, MODEL_DTYPE_I32, TCN_CHANNELS)
+        && READ_QUANT_FIELD(&file, model, tcn_negative_shifts, MODEL_DTYPE_I32, TCN_CHANNELS)
+        && READ_QUANT_FIELD(&file, model, output_layer_weights, MODEL_DTYPE_I8, num_classes * TCN_CHANNELS)
+        && READ_QUANT_FIELD(&file, model, output_layer_biases, MODEL_DTYPE_I32, num_classes);
+    model_file_close(&file);
+    return success;
 }
 
 int load_quantized_model(QuantizedModel* model, const char* file_path) {
+    memset(model, 0, sizeof(*model));
+    if (is_model_file(file_path)) {
+        if (!load_quantized_container(model, file_path)) return 0;
+        prepare_quantized_model(model);
+        return 1;
+    }
+
+    // Legacy raw file: NUM_CLASSES output rows, no names
     FILE* file = fopen(file_path, "rb");
     if (!file) {
         perror("Failed to open quantized model file");
         return 0; // File not found or error
     }
 
-    size_t tcn_weights_read = fread(model->tcn_block_weights, sizeof(model->tcn_block_weights), 1, file);
-    size_t tcn_biases_read = fread(model->tcn_block_biases, sizeof(model->tcn_block_biases), 1, file);
-    size_t out_weights_read = fread(model->output_layer_weights, sizeof(model->output_layer_weights), 1, file);
-    size_t out_biases_read = fread(model->output_layer_biases, sizeof(model->output_layer_biases), 1, file);
+    size_t read = 0;
+    read += fread(&model->input_scale, sizeof(model->input_scale), 1, file);
+    read += fread(&model->activation_scale, sizeof(model->activation_scale), 1, file);
+    read += fread(model->tcn_weight_scales, sizeof(model->tcn_weight_scales), 1, file);
+    read += fread(model->output_weight_scales, NUM_CLASSES * sizeof(float), 1, file);
+    read += fread(model->tcn_block_weights, sizeof(model->tcn_block_weights), 1, file);
+    read += fread(model->tcn_block_biases, sizeof(model->tcn_block_biases), 1, file);
+    read += fread(model->tcn_multipliers, sizeof(model->tcn_multipliers), 1, file);
+    read += fread(model->tcn_shifts, sizeof(model->tcn_shifts), 1, file);
+    read += fread(model->tcn_negative_multipliers, sizeof(model->tcn_negative_multipliers), 1, file);
+    read += fread(model->tcn_negative_shifts, sizeof(model->tcn_negative_shifts), 1, file);
+    read += fread(model->output_layer_weights, NUM_CLASSES * TCN_CHANNELS * sizeof(int8_t), 1, file);
+    read += fread(model->output_layer_biases, NUM_CLASSES * sizeof(int32_t), 1, file);
+    int trailing = fgetc(file);
 
     fclose(file);
 
-    int success = (tcn_weights_read == 1 && tcn_biases_read == 1 && 
-                   out_weights_read == 1 && out_biases_read == 1);
+    int success = (read == 12 && trailing == EOF);
 
     if (!success) {
-        fprintf(stderr, "Error: Failed to read all components of the quantized model file.\n");
+        fprintf(stderr, "Error: Quantized model file has an unexpected layout. Re-run the quantize tool.\n");
+    } else {
+        set_class_names(&model->classes, NULL, 0, NUM_CLASSES);
+        prepare_quantized_model(model);
     }
 
     return success;
 }
 
+void quantize_multiplier(double real_multiplier, int32_t* multiplier, int32_t* shift) {
+    if (real_multiplier <= 0.0) {
+        *multiplier = 0;
+        *shift = 31;
+        return;
+    }
+    int exponent;
+    double fraction = frexp(real_multiplier, &exponent); // real = fraction * 2^exponent, fraction in [0.5, 1)
+    int64_t q = (int64_t)llround(fraction * (double)(1LL << 31));
+    if (q == (1LL << 31)) { // Rounded up to 1.0
+        q /= 2;
+        exponent++;
+    }
+    *multiplier = (int32_t)q;
+    *shift = 31 - exponent;
+    if (*shift < 1) *shift = 1;   // Multipliers >= 2^30 are not expected for this model
+    if (*shift > 62) *shift = 62; // Tiny multipliers underflow to zero anyway
+}
+
+int32_t requantize(int32_t acc, int32_t multiplier, int32_t shift) {
+    int64_t product = (int64_t)acc * multiplier;
+    return (int32_t)((product + ((int64_t)1 << (shift - 1))) >> shift);
+}
+
+void prepare_quantized_model(QuantizedModel* model) {
+    // Repack conv weights so each (c_out, k) tap is one contiguous, padded c_in row
+    memset(model->tcn_packed_weights, 0, sizeof(model->tcn_packed_weights));
+    for (int c_out = 0; c_out < TCN_CHANNELS; ++c_out) {
+        for (int k = 0; k < TCN_KERNEL_SIZE; ++k) {
+            for (int c_in = 0; c_in < INPUT_SIZE; ++c_in) {
+                model->tcn_packed_weights[(c_out * TCN_KERNEL_SIZE + k) * QUANT_INPUT_STRIDE + c_in] =
+                    model->tcn_block_weights[c_out * (INPUT_SIZE * TCN_KERNEL_SIZE) + c_in * TCN_KERNEL_SIZE + k];
+            }
+        }
+    }
+    for (int j = 0; j < model->classes.count; ++j) {
+        double logit_scale = (double)model->activation_scale * model->output_weight_scales[j] / SEQUENCE_LENGTH;
+        quantize_multiplier(logit_scale * (1 << SOFTMAX_FRAC_BITS), &model->output_multipliers[j], &model->output_shifts[j]);
+    }
+}
+
 // Activation Functions
 // Leaky ReLU to prevent dying ReLU problem
 float leaky_relu(float x) {
@@ -148,7 +293,7 @@ float leaky_relu_derivative(float x) {
     return x > 0 ? 1 : 0.01f;
 }
 
-static void softmax(float* input, float* output, size_t size) {
+void softmax(float* input, float* output, size_t size) {
     float max_val = input[0];
     for (size_t i = 1; i < size; ++i) if (input[i] > max_val) max_val = input[i];
     float sum_exp = 0.0f;
@@ -159,69 +304,209 @@ static void softmax(float* input, float* output, size_t size) {
     for (size_t i = 0; i < size; ++i) output[i] /= sum_exp;
 }
 
+// exp(-i / 16) in Q15 for i = 0..175; beyond that the term rounds to zero
+const uint16_t softmax_exp_lut[SOFTMAX_LUT_SIZE] = {
+    32767, 30782, 28917, 27165, 25519, 23973, 22520, 21156, 19874, 18670, 17539, 16476, 15478, 14540, 13659, 12832,
+    12054, 11324, 10638,  9993,  9388,  8819,  8285,  7783,  7311,  6868,  6452,  6061,  5694,  5349,  5025,  4721,
+     4435,  4166,  3913,  3676,  3454,  3244,  3048,  2863,  2690,  2527,  2374,  2230,  2095,  1968,  1849,  1737,
+     1631,  1533,  1440,  1352,  1271,  1194,  1121,  1053,   989,   930,   873,   820,   771,   724,   680,   639,
+      600,   564,   530,   498,   467,   439,   412,   387,   364,   342,   321,   302,   283,   266,   250,   235,
+      221,   207,   195,   183,   172,   162,   152,   143,   134,   126,   118,   111,   104,    98,    92,    86,
+       81,    76,    72,    67,    63,    59,    56,    52,    49,    46,    43,    41,    38,    36,    34,    32,
+       30,    28,    26,    25,    23,    22,    21,    19,    18,    17,    16,    15,    14,    13,    12,    12,
+       11,    10,    10,     9,     9,     8,     8,     7,     7,     6,     6,     6,     5,     5,     5,     4,
+        4,     4,     4,     3,     3,     3,     3,     3,     2,     2,     2,     2,     2,     2,     2,     2,
+        1,     1,     1,     1,     1,     1,     1,     1,     1,     1,     1,     1,     1,     1,     1,     1,
+};
+
+void softmax_fixed(const int32_t* logits, float* output, int size) {
+    int32_t max_logit = logits[0];
+    for (int i = 1; i < size; ++i) if (logits[i] > max_logit) max_logit = logits[i];
+
+    uint32_t exps[size];
+    uint32_t sum_exp = 0;
+    for (int i = 0; i < size; ++i) {
+        // Distance from the max in 1/16 steps
+        int32_t index = (max_logit - logits[i]) >> (SOFTMAX_FRAC_BITS - 4);
+        exps[i] = index < SOFTMAX_LUT_SIZE ? softmax_exp_lut[index] : 0;
+        sum_exp += exps[i];
+    }
+    // sum_exp >= 32767 because the max maps to LUT[0]
+    for (int i = 0; i < size; ++i) {
+        uint32_t probability_q15 = (exps[i] << 15) / sum_exp;
+        output[i] = (float)probability_q15 / 32768.0f;
+    }
+}
+
+// 4-wide int8 dot product over a padded row (length is a multiple of 4)
+static inline int32_t dot_s8x4(const int8_t* a, const int8_t* b, int length) {
+    int32_t sum = 0;
+    for (int i = 0; i < length; i += 4) {
+        sum += (int32_t)a[i] * b[i] + (int32_t)a[i + 1] * b[i + 1]
+             + (int32_t)a[i + 2] * b[i + 2] + (int32_t)a[i + 3] * b[i + 3];
+    }
+    return sum;
+}
+
 // Forward Pass (Quantized Inference)
+// Same graph as forward_pass_inference (causal dilated conv -> Leaky ReLU -> GAP
+// -> dense -> softmax), integer-only after the input is quantized.
+static void quantized_forward(const QuantizedModel* model, const float* input, int num_frames, float* output, LayerActivations* trace);
+
 void forward_pass_quantized(const QuantizedModel* model, const float* input, float* output) {
-    // This implementation mirrors the float forward pass but uses integer arithmetic.
+    quantized_forward(model, input, SEQUENCE_LENGTH, output, NULL);
+}
+
+void forward_pass_quantized_traced(const QuantizedModel* model, const float* input, float* output, LayerActivations* trace) {
+    quantized_forward(model, input, SEQUENCE_LENGTH, output, trace);
+}
 
-    // 1. Quantize the input float data to int8_t
-    int8_t quantized_input[SEQUENCE_LENGTH * INPUT_SIZE];
-    for (int i = 0; i < SEQUENCE_LENGTH * INPUT_SIZE; ++i) {
-        // Symmetric quantization for the input signal
-        quantized_input[i] = (int8_t)fmaxf(-128.0f, fminf(127.0f, input[i] * 127.0f));
+void forward_pass_quantized_prefix(const QuantizedModel* model, const float* input, int num_frames, float* output) {
+    quantized_forward(model, input, num_frames, output, NULL);
+}
+
+static void quantized_forward(const QuantizedModel* model, const float* input, int num_frames, float* output, LayerActivations* trace) {
+    if (trace) {
+        trace->input_saturated = 0;
+        trace->activation_saturated = 0;
     }
 
-    // 2. TCN Layer
-    // Accumulate in a wider type (int32_t) to prevent overflow during multiplication.
-    int32_t tcn_output_i32[TCN_CHANNELS] = {0};
+    // 1. Quantize the input with the calibrated scale into padded rows [t][QUANT_INPUT_STRIDE]
+    int8_t quantized_input[SEQUENCE_LENGTH * QUANT_INPUT_STRIDE] = {0};
+    const float inv_input_scale = 1.0f / model->input_scale;
+    for (int t = 0; t < num_frames; ++t) {
+        for (int c = 0; c < INPUT_SIZE; ++c) {
+            float q = roundf(input[t * INPUT_SIZE + c] * inv_input_scale);
+            quantized_input[t * QUANT_INPUT_STRIDE + c] = (int8_t)(q > 127.0f ? 127.0f : (q < -128.0f ? -128.0f : q));
+            if (trace) {
+                trace->input[t * INPUT_SIZE + c] = quantized_input[t * QUANT_INPUT_STRIDE + c] * model->input_scale;
+                trace->input_saturated += (q > 127.0f || q < -128.0f);
+            }
+        }
+    }
 
-    for (int c = 0; c < TCN_CHANNELS; ++c) {
-        int32_t accumulator = 0;
-        for (int i = 0; i < INPUT_SIZE; ++i) {
+    // 2. TCN Layer: int8 x int8 -> int32, requantized to int8 activations.
+    // Leaky ReLU is applied by picking the multiplier with the slope folded in.
+    // GAP keeps the int32 sum over time; the 1/SEQUENCE_LENGTH goes into the output scale.
+    int32_t pooled_sum[TCN_CHANNELS] = {0};
+    for (int c_out = 0; c_out < TCN_CHANNELS; ++c_out) {
+        const int8_t* channel_weights = &model->tcn_packed_weights[c_out * TCN_KERNEL_SIZE * QUANT_INPUT_STRIDE];
+        for (int t = 0; t < num_frames; ++t) {
+            int32_t accumulator = model->tcn_block_biases[c_out];
             for (int k = 0; k < TCN_KERNEL_SIZE; ++k) {
-                int input_idx = (i * TCN_KERNEL_SIZE + k) % (SEQUENCE_LENGTH * INPUT_SIZE); // Simplified indexing
-                int weight_idx = c * (INPUT_SIZE * TCN_KERNEL_SIZE) + i * TCN_KERNEL_SIZE + k;
-                accumulator += (int32_t)quantized_input[input_idx] * model->tcn_block_weights[weight_idx];
+                int t_in = t + (k - (TCN_KERNEL_SIZE - 1)) * TCN_DILATION;
+                if (t_in >= 0) {
+                    accumulator += dot_s8x4(&quantized_input[t_in * QUANT_INPUT_STRIDE],
+                                            &channel_weights[k * QUANT_INPUT_STRIDE], QUANT_INPUT_STRIDE);
+                }
             }
+            int32_t activation = (accumulator >= 0)
+                ? requantize(accumulator, model->tcn_multipliers[c_out], model->tcn_shifts[c_out])
+                : requantize(accumulator, model->tcn_negative_multipliers[c_out], model->tcn_negative_shifts[c_out]);
+            if (trace) trace->activation_saturated += (activation > 127 || activation < -128);
+            if (activation > 127) activation = 127;
+            if (activation < -128) activation = -128;
+            pooled_sum[c_out] += activation;
+            if (trace) trace->tcn_output[t * TCN_CHANNELS + c_out] = activation * model->activation_scale;
         }
-        // Add bias. Note: biases are int8. The accumulator is int32.
-        tcn_output_i32[c] = accumulator + model->tcn_block_biases[c];
     }
 
-    // 3. Leaky ReLU Activation
-    // We apply a simplified integer-based Leaky ReLU.
-    // For x < 0, y = x * 0.01. In integer math, we can approximate this by right-shifting.
-    // A shift by 7 is approx division by 128 (close to 1/100).
-    for (int i = 0; i < TCN_CHANNELS; ++i) {
-        if (tcn_output_i32[i] < 0) {
-            tcn_output_i32[i] = tcn_output_i32[i] >> 7; // Approximates multiplication by ~0.0078
+    // A partial window is scaled up to a full-window sum so the output scale still applies
+    if (num_frames < SEQUENCE_LENGTH) {
+        for (int c = 0; c < TCN_CHANNELS; ++c) {
+            pooled_sum[c] = (pooled_sum[c] * SEQUENCE_LENGTH + (pooled_sum[c] >= 0 ? num_frames : -num_frames) / 2) / num_frames;
         }
     }
 
-    // 4. Output Layer
-    int32_t final_output_i32[NUM_CLASSES] = {0};
-    for (int j = 0; j < NUM_CLASSES; ++j) {
-        int32_t accumulator = 0;
+    // 3. Output Layer (int32 accumulation), rescaled to fixed-point logits
+    int32_t logits[MAX_CLASSES];
+    for (int j = 0; j < model->classes.count; ++j) {
+        int32_t accumulator = model->output_layer_biases[j];
         for (int i = 0; i < TCN_CHANNELS; ++i) {
-            accumulator += tcn_output_i32[i] * model->output_layer_weights[j * TCN_CHANNELS + i];
+            accumulator += pooled_sum[i] * model->output_layer_weights[j * TCN_CHANNELS + i];
         }
-        final_output_i32[j] = accumulator + model->output_layer_biases[j];
+        logits[j] = requantize(accumulator, model->output_multipliers[j], model->output_shifts[j]);
     }
 
-    // 5. De-quantize the final output back to float
-    // The result is a combination of two int8 multiplications and one int32 accumulation.
-    // A simple scaling factor is used to bring it back to a float range for softmax.
-    const float dequant_scale = 1.0f / (127.0f * 127.0f); 
-    for (int i = 0; i < NUM_CLASSES; ++i) {
-        output[i] = (float)final_output_i32[i] * dequant_scale;
+    if (trace) {
+        for (int c = 0; c < TCN_CHANNELS; ++c) trace->pooled[c] = pooled_sum[c] * model->activation_scale / SEQUENCE_LENGTH;
+        for (int j = 0; j < model->classes.count; ++j) trace->logits[j] = (float)logits[j] / (1 << SOFTMAX_FRAC_BITS);
     }
 
-    // 6. Softmax (operates on the final float values)
-    softmax(output, output, NUM_CLASSES);
+    // 4. Softmax (fixed-point, LUT based)
+    softmax_fixed(logits, output, model->classes.count);
 }
 
 // Forward Pass (Inference)
+// Fused kernel: each conv output is activated and added straight into its
+// channel's pooled sum, so no [SEQUENCE_LENGTH x TCN_CHANNELS] buffer exists.
+
+// Mean over the first num_frames steps of one channel's activated conv output
+static inline float fused_channel_pool(const float* channel_weights, float bias, const float* input_data, int num_frames) {
+    float pooled = 0.0f;
+    for (int t = 0; t < num_frames; ++t) {
+        float sum = bias;
+        for (int k = 0; k < TCN_KERNEL_SIZE; ++k) {
+            int t_in = t + (k - (TCN_KERNEL_SIZE - 1)) * TCN_DILATION;
+            if (t_in < 0) continue;
+            const float* row = &input_data[t_in * INPUT_SIZE];
+            for (int c_in = 0; c_in < INPUT_SIZE; ++c_in) {
+                sum += row[c_in] * channel_weights[c_in * TCN_KERNEL_SIZE + k];
+            }
+        }
+        pooled += leaky_relu(sum);
+    }
+    return pooled / num_frames;
+}
+
+static void inference_output_head(const InferenceModel* model, const float* pooled_output, float* final_output) {
+    float output_logits[MAX_CLASSES];
+    for (int j = 0; j < model->classes.count; ++j) {
+        float sum = model->output_layer.biases[j];
+        for (int c = 0; c < TCN_CHANNELS; ++c) {
+            sum += pooled_output[c] * model->output_layer.weights[j * TCN_CHANNELS + c];
+        }
+        output_logits[j] = sum;
+    }
+    softmax(output_logits, final_output, model->classes.count);
+}
+
 void forward_pass_inference(const InferenceModel* model, const float* input_data, float* final_output) {
-    const int TCN_DILATION = 2; // TODO: This should be sourced from the header
+    forward_pass_inference_prefix(model, input_data, SEQUENCE_LENGTH, final_output);
+}
+
+void forward_pass_inference_prefix(const InferenceModel* model, const float* input_data, int num_frames, float* final_output) {
+    float pooled_output[TCN_CHANNELS];
+    for (int c_out = 0; c_out < TCN_CHANNELS; ++c_out) {
+        pooled_output[c_out] = fused_channel_pool(&model->tcn_block.weights[c_out * (INPUT_SIZE * TCN_KERNEL_SIZE)],
+                                                  model->tcn_block.biases[c_out], input_data, num_frames);
+    }
+    inference_output_head(model, pooled_output, final_output);
+}
+
+// Batched: the channel loop is outermost, so each channel's weights are read
+// once per batch and stay in cache while every window is convolved with them.
+void forward_pass_inference_batch(const InferenceModel* model, const float* input_data, const int* num_frames,
+                                  int batch_size, float* final_output) {
+    float pooled_output[MAX_INFERENCE_BATCH][TCN_CHANNELS];
+    for (int c_out = 0; c_out < TCN_CHANNELS; ++c_out) {
+        const float* channel_weights = &model->tcn_block.weights[c_out * (INPUT_SIZE * TCN_KERNEL_SIZE)];
+        const float bias = model->tcn_block.biases[c_out];
+        for (int b = 0; b < batch_size; ++b) {
+            pooled_output[b][c_out] = fused_channel_pool(channel_weights, bias, &input_data[b * SEQUENCE_LENGTH * INPUT_SIZE], num_frames[b]);
+        }
+    }
+    for (int b = 0; b < batch_size; ++b) {
+        inference_output_head(model, pooled_output[b], &final_output[b * MAX_CLASSES]);
+    }
+}
+
+// Unfused reference: materializes the activated conv output, then pools it.
+void forward_pass_inference_unfused(const InferenceModel* model, const float* input_data, float* final_output) {
+    forward_pass_inference_traced(model, input_data, final_output, NULL);
+}
+
+void forward_pass_inference_traced(const InferenceModel* model, const float* input_data, float* final_output, LayerActivations* trace) {
     // Note: This function is simplified and does not store intermediate values
     // needed for backpropagation. It's for inference only.
 
@@ -255,8 +540,8 @@ void forward_pass_inference(const InferenceModel* model, const float* input_data
     }
 
     // --- Output Layer --- 
-    float output_logits[NUM_CLASSES];
-    for (int j = 0; j < NUM_CLASSES; ++j) {
+    float output_logits[MAX_CLASSES] = {0};
+    for (int j = 0; j < model->classes.count; ++j) {
         output_logits[j] = 0;
         for (int i = 0; i < TCN_CHANNELS; ++i) {
             output_logits[j] += pooled_output[i] * model->output_layer.weights[j * TCN_CHANNELS + i];
@@ -264,8 +549,32 @@ void forward_pass_inference(const InferenceModel* model, const float* input_data
         output_logits[j] += model->output_layer.biases[j];
     }
 
+    if (trace) {
+        memcpy(trace->input, input_data, sizeof(trace->input));
+        memcpy(trace->tcn_output, dilated_conv_output, sizeof(trace->tcn_output));
+        memcpy(trace->pooled, pooled_output, sizeof(trace->pooled));
+        memcpy(trace->logits, output_logits, sizeof(trace->logits));
+        trace->input_saturated = 0;
+        trace->activation_saturated = 0;
+    }
+
     // --- Softmax --- 
-    softmax(output_logits, final_output, NUM_CLASSES);
+    softmax(output_logits, final_output, model->classes.count);
+}
+
+// Dense output layer + softmax on the pooled TCN features
+static void output_layer_forward(OutputLayer* layer, const float* pooled_output) {
+    float final_layer_output[MAX_CLASSES];
+    memset(final_layer_output, 0, sizeof(final_layer_output)); // CRITICAL: Initialize to zero
+    for (int i = 0; i < layer->num_classes; ++i) {
+        float sum = layer->biases[i];
+        for (int j = 0; j < TCN_CHANNELS; ++j) {
+            sum += pooled_output[j] * layer->weights[i * TCN_CHANNELS + j];
+        }
+        final_layer_output[i] = sum;
+    }
+
+    softmax(final_layer_output, layer->output, layer->num_classes);
 }
 
 // Forward Pass (Training)
@@ -276,7 +585,7 @@ void forward_pass(Model* model, const float* input_sequence, int epoch, int samp
             double sum = model->tcn_block.biases[out_c]; // Use double for accumulator
             for (int in_c = 0; in_c < INPUT_SIZE; ++in_c) {
                 for (int k = 0; k < TCN_KERNEL_SIZE; ++k) {
-                    int input_t = t - (TCN_KERNEL_SIZE - 1) + k; // Causal padding
+                    int input_t = t + (k - (TCN_KERNEL_SIZE - 1)) * TCN_DILATION; // Causal padding
                     if (input_t >= 0) {
                         sum += input_sequence[input_t * INPUT_SIZE + in_c] * 
                                model->tcn_block.weights[out_c * (INPUT_SIZE * TCN_KERNEL_SIZE) + in_c * TCN_KERNEL_SIZE + k];
@@ -296,19 +605,20 @@ void forward_pass(Model* model, const float* input_sequence, int epoch, int samp
         model->pooled_output[c] = sum / SEQUENCE_LENGTH;
     }
 
-    // 3. Output Layer (Dense)
-    float final_layer_output[NUM_CLASSES];
-    memset(final_layer_output, 0, sizeof(final_layer_output)); // CRITICAL: Initialize to zero
-    for (int i = 0; i < NUM_CLASSES; ++i) {
-        float sum = model->output_layer.biases[i];
-        for (int j = 0; j < TCN_CHANNELS; ++j) {
-            sum += model->pooled_output[j] * model->output_layer.weights[i * TCN_CHANNELS + j];
-        }
-        final_layer_output[i] = sum;
-    }
+    // 3. Output Layer (Dense) + 4. Softmax Activation
+    output_layer_forward(&model->output_layer, model->pooled_output);
+}
 
-    // 4. Softmax Activation
-    softmax(final_layer_output, model->output_layer.output, NUM_CLASSES);
+// Forward Pass (Head-Only Training)
+void forward_pass_head(Model* model, const float* pooled_features) {
+    // The frozen TCN block already ran; start from its cached pooled features.
+    memcpy(model->pooled_output, pooled_features, sizeof(model->pooled_output));
+    output_layer_forward(&model->output_layer, model->pooled_output);
+}
+
+void compute_pooled_features(Model* model, const float* input_sequence, float* pooled_features) {
+    forward_pass(model, input_sequence, 0, 0);
+    memcpy(pooled_features, model->pooled_output, sizeof(model->pooled_output));
 }
 
 // Backward Pass
@@ -325,15 +635,16 @@ void backward_pass(Model* model, const float* input_sequence, const int* target_
     int target_label = target_labels[0];
 
     // 1. Gradient of Loss w.r.t. Softmax Input (dL/dO)
-    float grad_loss[NUM_CLASSES];
-    for (int i = 0; i < NUM_CLASSES; ++i) {
+    const int num_classes = model->output_layer.num_classes;
+    float grad_loss[MAX_CLASSES];
+    for (int i = 0; i < num_classes; ++i) {
         float target = (i == target_label) ? 1.0f : 0.0f;
         grad_loss[i] = model->output_layer.output[i] - target;
     }
 
     // 2. Backprop through Output Layer (Dense)
     float grad_pooled_output[TCN_CHANNELS] = {0};
-    for (int i = 0; i < NUM_CLASSES; ++i) {
+    for (int i = 0; i < num_classes; ++i) {
         for (int j = 0; j < TCN_CHANNELS; ++j) {
             model->output_layer.grad_weights[i * TCN_CHANNELS + j] += grad_loss[i] * model->pooled_output[j];
             grad_pooled_output[j] += grad_loss[i] * model->output_layer.weights[i * TCN_CHANNELS + j];
@@ -362,7 +673,7 @@ void backward_pass(Model* model, const float* input_sequence, const int* target_
             for (int in_c = 0; in_c < INPUT_SIZE; ++in_c) {
                 float weight_grad = 0.0f;
                 for (int t = 0; t < SEQUENCE_LENGTH; ++t) {
-                    int input_t = t - (TCN_KERNEL_SIZE - 1) + k; // This logic is for 'valid' convolution padding
+                    int input_t = t + (k - (TCN_KERNEL_SIZE - 1)) * TCN_DILATION; // This logic is for 'valid' convolution padding
                     if (input_t >= 0 && input_t < SEQUENCE_LENGTH) {
                         weight_grad += grad_tcn_output[out_c * SEQUENCE_LENGTH + t] * input_sequence[input_t * INPUT_SIZE + in_c];
                     }
@@ -379,69 +690,307 @@ void backward_pass(Model* model, const float* input_sequence, const int* target_
     }
 }
 
+void backward_pass_head(Model* model, int target_label) {
+    // Only the output layer gets gradients; TCN gradients stay zero, so
+    // update_weights() leaves the frozen block untouched.
+    zero_gradients(model);
+
+    for (int i = 0; i < model->output_layer.num_classes; ++i) {
+        float target = (i == target_label) ? 1.0f : 0.0f;
+        float grad_loss = model->output_layer.output[i] - target;
+        for (int j = 0; j < TCN_CHANNELS; ++j) {
+            model->output_layer.grad_weights[i * TCN_CHANNELS + j] += grad_loss * model->pooled_output[j];
+        }
+        model->output_layer.grad_biases[i] += grad_loss;
+    }
+}
 
 // Optimizer
 void update_weights(Model* model, float learning_rate, float beta1, float beta2, float epsilon, int timestep) {
-    // Bias correction terms
+    TCNBlock* block = &model->tcn_block;
+    OutputLayer* out = &model->output_layer;
+    float lr_t = adam_learning_rate(learning_rate, beta1, beta2, timestep);
+
+    // Global-norm gradient clipping, applied through the Adam step's gradient scale
+    float scale = gradient_clip_scale(sum_squares(block->grad_weights, TCN_CHANNELS * INPUT_SIZE * TCN_KERNEL_SIZE)
+                                    + sum_squares(block->grad_biases, TCN_CHANNELS)
+                                    + sum_squares(out->grad_weights, (size_t)out->num_classes * TCN_CHANNELS)
+                                    + sum_squares(out->grad_biases, out->num_classes));
+
+    adam_step(block->weights, block->grad_weights, block->m_weights, block->v_weights, TCN_CHANNELS * INPUT_SIZE * TCN_KERNEL_SIZE, scale, lr_t, beta1, beta2, epsilon);
+    adam_step(block->biases, block->grad_biases, block->m_biases, block->v_biases, TCN_CHANNELS, scale, lr_t, beta1, beta2, epsilon);
+    adam_step(out->weights, out->grad_weights, out->m_weights, out->v_weights, (size_t)out->num_classes * TCN_CHANNELS, scale, lr_t, beta1, beta2, epsilon);
+    adam_step(out->biases, out->grad_biases, out->m_biases, out->v_biases, out->num_classes, scale, lr_t, beta1, beta2, epsilon);
+
+    // Zero gradients after updating
+    zero_gradients(model);
+}
+
+// Depthwise-Separable Variant
+
+void init_dws_model(DWSModel* model, int num_classes) {
+    srand(time(NULL));
+    memset(model, 0, sizeof(*model));
+    model->output_layer.num_classes = num_classes;
+    // The depthwise conv feeds the pointwise mix linearly, so it gets unit-gain init
+    float dw_std = sqrtf(1.0f / TCN_KERNEL_SIZE);
+    for (int i = 0; i < INPUT_SIZE * TCN_KERNEL_SIZE; ++i) {
+        float u1 = (float)rand() / RAND_MAX;
+        float u2 = (float)rand() / RAND_MAX;
+        model->dws_block.dw_weights[i] = sqrtf(-2.0f * logf(u1 + 1e-9f)) * cosf(2.0f * M_PI * u2) * dw_std;
+    }
+    initialize_weights(model->dws_block.pw_weights, TCN_CHANNELS * INPUT_SIZE, INPUT_SIZE);
+    initialize_weights(model->output_layer.weights, num_classes * TCN_CHANNELS, TCN_CHANNELS);
+}
+
+void save_dws_model(const DWSModel* model, const char** class_names, int num_classes, const char* file_path) {
+    ClassNames classes;
+    set_class_names(&classes, class_names, num_classes, num_classes);
+
+    ModelFileWriter writer;
+    model_file_writer_init(&writer, MODEL_KIND_DWS, &classes);
+    model_file_add_tensor(&writer, "dw_weights", MODEL_DTYPE_F32, model->dws_block.dw_weights, 2,
+                          (uint32_t[]){INPUT_SIZE, TCN_KERNEL_SIZE});
+    model_file_add_tensor(&writer, "pw_weights", MODEL_DTYPE_F32, model->dws_block.pw_weights, 2,
+                          (uint32_t[]){TCN_CHANNELS, INPUT_SIZE});
+    model_file_add_tensor(&writer, "pw_biases", MODEL_DTYPE_F32, model->dws_block.pw_biases, 1, (uint32_t[]){TCN_CHANNELS});
+    add_output_layer(&writer, model->output_layer.weights, model->output_layer.biases, num_classes);
+
+    if (model_file_write(&writer, file_path)) {
+        printf("Model saved to %s.\n", file_path);
+    }
+}
+
+int load_dws_inference_model(InferenceDWSModel* model, const char* file_path) {
+    if (detect_model_variant(file_path) != TCN_VARIANT_DWS) {
+        fprintf(stderr, "Error: %s is not a depthwise-separable model file.\n", file_path);
+        return 0;
+    }
+    memset(&model->output_layer, 0, sizeof(model->output_layer));
+    if (is_model_file(file_path)) {
+        ModelFile file;
+        if (!model_file_open_kind(&file, file_path, MODEL_KIND_DWS)) return 0;
+        const float* dw_weights = model_file_tensor(&file, "dw_weights", MODEL_DTYPE_F32, INPUT_SIZE * TCN_KERNEL_SIZE);
+        const float* pw_weights = model_file_tensor(&file, "pw_weights", MODEL_DTYPE_F32, TCN_CHANNELS * INPUT_SIZE);
+        const float* pw_biases = model_file_tensor(&file, "pw_biases", MODEL_DTYPE_F32, TCN_CHANNELS);
+        int success = dw_weights && pw_weights && pw_biases && read_output_layer(&file, &model->output_layer, &model->classes);
+        if (success) {
+            memcpy(model->dws_block.dw_weights, dw_weights, sizeof(model->dws_block.dw_weights));
+            memcpy(model->dws_block.pw_weights, pw_weights, sizeof(model->dws_block.pw_weights));
+            memcpy(model->dws_block.pw_biases, pw_biases, sizeof(model->dws_block.pw_biases));
+        }
+        model_file_close(&file);
+        return success;
+    }
+
+    FILE* fp = fopen(file_path, "rb");
+    if (!fp) {
+        perror("Failed to open model file");
+        return 0;
+    }
+
+    size_t read = 0;
+    read += fread(model->dws_block.dw_weights, sizeof(model->dws_block.dw_weights), 1, fp);
+    read += fread(model->dws_block.pw_weights, sizeof(model->dws_block.pw_weights), 1, fp);
+    read += fread(model->dws_block.pw_biases, sizeof(model->dws_block.pw_biases), 1, fp);
+    read += fread(model->output_layer.weights, NUM_CLASSES * TCN_CHANNELS * sizeof(float), 1, fp);
+    read += fread(model->output_layer.biases, NUM_CLASSES * sizeof(float), 1, fp);
+    fclose(fp);
+
+    if (read != 5) {
+        fprintf(stderr, "Error: Failed to read all components of the model file.\n");
+        return 0;
+    }
+    set_class_names(&model->classes, NULL, 0, NUM_CLASSES);
+    return 1;
+}
+
+TCNVariant detect_model_variant(const char* file_path) {
+    int kind = model_file_kind(file_path);
+    if (kind == MODEL_KIND_DENSE) return TCN_VARIANT_DENSE;
+    if (kind == MODEL_KIND_DWS) return TCN_VARIANT_DWS;
+    if (kind >= 0) return TCN_VARIANT_UNKNOWN; // INT8 container
+
+    struct stat st;
+    if (stat(file_path, &st) != 0) return TCN_VARIANT_UNKNOWN;
+    if ((size_t)st.st_size == DENSE_MODEL_FILE_SIZE) return TCN_VARIANT_DENSE;
+    if ((size_t)st.st_size == DWS_MODEL_FILE_SIZE) return TCN_VARIANT_DWS;
+    return TCN_VARIANT_UNKNOWN;
+}
+
+// Causal depthwise conv: dw_output[t][i]
+static void depthwise_conv(const float* dw_weights, const float* input_data, float* dw_output) {
+    for (int t = 0; t < SEQUENCE_LENGTH; ++t) {
+        for (int i = 0; i < INPUT_SIZE; ++i) {
+            float sum = 0.0f;
+            for (int k = 0; k < TCN_KERNEL_SIZE; ++k) {
+                int t_in = t + (k - (TCN_KERNEL_SIZE - 1)) * TCN_DILATION;
+                if (t_in >= 0) sum += input_data[t_in * INPUT_SIZE + i] * dw_weights[i * TCN_KERNEL_SIZE + k];
+            }
+            dw_output[t * INPUT_SIZE + i] = sum;
+        }
+    }
+}
+
+void forward_pass_dws(DWSModel* model, const float* input_data) {
+    DWSBlock* block = &model->dws_block;
+    depthwise_conv(block->dw_weights, input_data, block->dw_output);
+
+    // Pointwise mix -> Leaky ReLU -> Global Average Pooling
+    for (int c = 0; c < TCN_CHANNELS; ++c) {
+        float pooled = 0.0f;
+        for (int t = 0; t < SEQUENCE_LENGTH; ++t) {
+            float sum = block->pw_biases[c];
+            for (int i = 0; i < INPUT_SIZE; ++i) {
+                sum += block->pw_weights[c * INPUT_SIZE + i] * block->dw_output[t * INPUT_SIZE + i];
+            }
+            block->output[c * SEQUENCE_LENGTH + t] = leaky_relu(sum);
+            pooled += block->output[c * SEQUENCE_LENGTH + t];
+        }
+        model->pooled_output[c] = pooled / SEQUENCE_LENGTH;
+    }
+
+    output_layer_forward(&model->output_layer, model->pooled_output);
+}
+
+void backward_pass_dws(DWSModel* model, const float* input_data, int target_label) {
+    DWSBlock* block = &model->dws_block;
+    OutputLayer* out = &model->output_layer;
+    memset(block->grad_dw_weights, 0, sizeof(block->grad_dw_weights));
+    memset(block->grad_pw_weights, 0, sizeof(block->grad_pw_weights));
+    memset(block->grad_pw_biases, 0, sizeof(block->grad_pw_biases));
+    memset(out->grad_weights, 0, sizeof(out->grad_weights));
+    memset(out->grad_biases, 0, sizeof(out->grad_biases));
+
+    // 1. Output layer (softmax + cross-entropy)
+    float grad_pooled[TCN_CHANNELS] = {0};
+    for (int j = 0; j < out->num_classes; ++j) {
+        float grad_logit = out->output[j] - ((j == target_label) ? 1.0f : 0.0f);
+        for (int c = 0; c < TCN_CHANNELS; ++c) {
+            out->grad_weights[j * TCN_CHANNELS + c] += grad_logit * model->pooled_output[c];
+            grad_pooled[c] += grad_logit * out->weights[j * TCN_CHANNELS + c];
+        }
+        out->grad_biases[j] += grad_logit;
+    }
+
+    // 2. GAP + Leaky ReLU + pointwise mix
+    float grad_dw_output[SEQUENCE_LENGTH * INPUT_SIZE] = {0};
+    for (int c = 0; c < TCN_CHANNELS; ++c) {
+        for (int t = 0; t < SEQUENCE_LENGTH; ++t) {
+            float grad = grad_pooled[c] / SEQUENCE_LENGTH * leaky_relu_derivative(block->output[c * SEQUENCE_LENGTH + t]);
+            block->grad_pw_biases[c] += grad;
+            for (int i = 0; i < INPUT_SIZE; ++i) {
+                block->grad_pw_weights[c * INPUT_SIZE + i] += grad * block->dw_output[t * INPUT_SIZE + i];
+                grad_dw_output[t * INPUT_SIZE + i] += grad * block->pw_weights[c * INPUT_SIZE + i];
+            }
+        }
+    }
+
+    // 3. Depthwise conv
+    for (int t = 0; t < SEQUENCE_LENGTH; ++t) {
+        for (int k = 0; k < TCN_KERNEL_SIZE; ++k) {
+            int t_in = t + (k - (TCN_KERNEL_SIZE - 1)) * TCN_DILATION;
+            if (t_in < 0) continue;
+            for (int i = 0; i < INPUT_SIZE; ++i) {
+                block->grad_dw_weights[i * TCN_KERNEL_SIZE + k] += grad_dw_output[t * INPUT_SIZE + i] * input_data[t_in * INPUT_SIZE + i];
+            }
+        }
+    }
+}
+
+// Adam step over one parameter array with a shared gradient scale (for clipping)
+void adam_step(float* params, const float* grads, float* m, float* v, size_t n,
+               float scale, float lr_t, float beta1, float beta2, float epsilon) {
+    for (size_t i = 0; i < n; ++i) {
+        float grad = grads[i] * scale;
+        m[i] = beta1 * m[i] + (1 - beta1) * grad;
+        v[i] = beta2 * v[i] + (1 - beta2) * (grad * grad);
+        params[i] -= lr_t * m[i] / (sqrtf(v[i]) + epsilon);
+    }
+}
+
+float sum_squares(const float* values, size_t n) {
+    float sum = 0.0f;
+    for (size_t i = 0; i < n; ++i) sum += values[i] * values[i];
+    return sum;
+}
+
+float adam_learning_rate(float learning_rate, float beta1, float beta2, int timestep) {
     float beta1_t = powf(beta1, timestep);
     float beta2_t = powf(beta2, timestep);
     // Ensure denominators are not zero
-    if (1.0f - beta1_t == 0.0f) beta1_t -= 1e-9; 
+    if (1.0f - beta1_t == 0.0f) beta1_t -= 1e-9;
     if (1.0f - beta2_t == 0.0f) beta2_t -= 1e-9;
-    float lr_t = learning_rate * sqrtf(1.0f - beta2_t) / (1.0f - beta1_t);
+    return learning_rate * sqrtf(1.0f - beta2_t) / (1.0f - beta1_t);
+}
 
-    // --- Gradient Clipping ---
-    float grad_norm_sq = 0.0f;
-    const float clip_threshold = 1.0f; // A common value for clipping threshold
+float gradient_clip_scale(float grad_norm_sq) {
+    float grad_norm = sqrtf(grad_norm_sq);
+    return (grad_norm > GRAD_CLIP_NORM) ? GRAD_CLIP_NORM / grad_norm : 1.0f;
+}
 
-    // Calculate squared L2 norm for all gradients in the model
-    for (size_t i = 0; i < sizeof(model->tcn_block.grad_weights)/sizeof(float); ++i) grad_norm_sq += model->tcn_block.grad_weights[i] * model->tcn_block.grad_weights[i];
-    for (size_t i = 0; i < sizeof(model->tcn_block.grad_biases)/sizeof(float); ++i) grad_norm_sq += model->tcn_block.grad_biases[i] * model->tcn_block.grad_biases[i];
-    for (size_t i = 0; i < sizeof(model->output_layer.grad_weights)/sizeof(float); ++i) grad_norm_sq += model->output_layer.grad_weights[i] * model->output_layer.grad_weights[i];
-    for (size_t i = 0; i < sizeof(model->output_layer.grad_biases)/sizeof(float); ++i) grad_norm_sq += model->output_layer.grad_biases[i] * model->output_layer.grad_biases[i];
+void update_weights_dws(DWSModel* model, float learning_rate, float beta1, float beta2, float epsilon, int timestep) {
+    DWSBlock* block = &model->dws_block;
+    OutputLayer* out = &model->output_layer;
+    float lr_t = adam_learning_rate(learning_rate, beta1, beta2, timestep);
+
+    // Same global-norm clipping as update_weights()
+    float scale = gradient_clip_scale(sum_squares(block->grad_dw_weights, INPUT_SIZE * TCN_KERNEL_SIZE)
+                                    + sum_squares(block->grad_pw_weights, TCN_CHANNELS * INPUT_SIZE)
+                                    + sum_squares(block->grad_pw_biases, TCN_CHANNELS)
+                                    + sum_squares(out->grad_weights, (size_t)out->num_classes * TCN_CHANNELS)
+                                    + sum_squares(out->grad_biases, out->num_classes));
+
+    adam_step(block->dw_weights, block->grad_dw_weights, block->m_dw_weights, block->v_dw_weights, INPUT_SIZE * TCN_KERNEL_SIZE, scale, lr_t, beta1, beta2, epsilon);
+    adam_step(block->pw_weights, block->grad_pw_weights, block->m_pw_weights, block->v_pw_weights, TCN_CHANNELS * INPUT_SIZE, scale, lr_t, beta1, beta2, epsilon);
+    adam_step(block->pw_biases, block->grad_pw_biases, block->m_pw_biases, block->v_pw_biases, TCN_CHANNELS, scale, lr_t, beta1, beta2, epsilon);
+    adam_step(out->weights, out->grad_weights, out->m_weights, out->v_weights, (size_t)out->num_classes * TCN_CHANNELS, scale, lr_t, beta1, beta2, epsilon);
+    adam_step(out->biases, out->grad_biases, out->m_biases, out->v_biases, out->num_classes, scale, lr_t, beta1, beta2, epsilon);
+}
 
-    float grad_norm = sqrtf(grad_norm_sq);
+void forward_pass_dws_inference(const InferenceDWSModel* model, const float* input_data, float* final_output) {
+    float dw_output[SEQUENCE_LENGTH * INPUT_SIZE];
+    depthwise_conv(model->dws_block.dw_weights, input_data, dw_output);
 
-    // If the norm exceeds the threshold, scale all gradients
-    if (grad_norm > clip_threshold) {
-        float scale_factor = clip_threshold / grad_norm;
-        for (size_t i = 0; i < sizeof(model->tcn_block.grad_weights)/sizeof(float); ++i) model->tcn_block.grad_weights[i] *= scale_factor;
-        for (size_t i = 0; i < sizeof(model->tcn_block.grad_biases)/sizeof(float); ++i) model->tcn_block.grad_biases[i] *= scale_factor;
-        for (size_t i = 0; i < sizeof(model->output_layer.grad_weights)/sizeof(float); ++i) model->output_layer.grad_weights[i] *= scale_factor;
-        for (size_t i = 0; i < sizeof(model->output_layer.grad_biases)/sizeof(float); ++i) model->output_layer.grad_biases[i] *= scale_factor;
+    float pooled_output[TCN_CHANNELS];
+    for (int c = 0; c < TCN_CHANNELS; ++c) {
+        const float* pw_row = &model->dws_block.pw_weights[c * INPUT_SIZE];
+        float pooled = 0.0f;
+        for (int t = 0; t < SEQUENCE_LENGTH; ++t) {
+            float sum = model->dws_block.pw_biases[c];
+            for (int i = 0; i < INPUT_SIZE; ++i) sum += pw_row[i] * dw_output[t * INPUT_SIZE + i];
+            pooled += leaky_relu(sum);
+        }
+        pooled_output[c] = pooled / SEQUENCE_LENGTH;
     }
 
-    // --- Update Weights ---
-    // Update TCN block
-    for (size_t i = 0; i < sizeof(model->tcn_block.weights) / sizeof(float); ++i) {
-        float grad = model->tcn_block.grad_weights[i];
-        model->tcn_block.m_weights[i] = beta1 * model->tcn_block.m_weights[i] + (1 - beta1) * grad;
-        model->tcn_block.v_weights[i] = beta2 * model->tcn_block.v_weights[i] + (1 - beta2) * (grad * grad);
-        model->tcn_block.weights[i] -= lr_t * model->tcn_block.m_weights[i] / (sqrtf(model->tcn_block.v_weights[i]) + epsilon);
-    }
-    for (size_t i = 0; i < TCN_CHANNELS; ++i) {
-        float grad = model->tcn_block.grad_biases[i];
-        model->tcn_block.m_biases[i] = beta1 * model->tcn_block.m_biases[i] + (1 - beta1) * grad;
-        model->tcn_block.v_biases[i] = beta2 * model->tcn_block.v_biases[i] + (1 - beta2) * (grad * grad);
-        model->tcn_block.biases[i] -= lr_t * model->tcn_block.m_biases[i] / (sqrtf(model->tcn_block.v_biases[i]) + epsilon);
+    float output_logits[MAX_CLASSES];
+    for (int j = 0; j < model->classes.count; ++j) {
+        output_logits[j] = model->output_layer.biases[j];
+        for (int c = 0; c < TCN_CHANNELS; ++c) {
+            output_logits[j] += pooled_output[c] * model->output_layer.weights[j * TCN_CHANNELS + c];
+        }
     }
+    softmax(output_logits, final_output, model->classes.count);
+}
 
-    // Update output layer
-    for (size_t i = 0; i < sizeof(model->output_layer.weights) / sizeof(float); ++i) {
-        float grad = model->output_layer.grad_weights[i];
-        model->output_layer.m_weights[i] = beta1 * model->output_layer.m_weights[i] + (1 - beta1) * grad;
-        model->output_layer.v_weights[i] = beta2 * model->output_layer.v_weights[i] + (1 - beta2) * (grad * grad);
-        model->output_layer.weights[i] -= lr_t * model->output_layer.m_weights[i] / (sqrtf(model->output_layer.v_weights[i]) + epsilon);
-    }
-    for (size_t i = 0; i < NUM_CLASSES; ++i) {
-        float grad = model->output_layer.grad_biases[i];
-        model->output_layer.m_biases[i] = beta1 * model->output_layer.m_biases[i] + (1 - beta1) * grad;
-        model->output_layer.v_biases[i] = beta2 * model->output_layer.v_biases[i] + (1 - beta2) * (grad * grad);
-        model->output_layer.biases[i] -= lr_t * model->output_layer.m_biases[i] / (sqrtf(model->output_layer.v_biases[i]) + epsilon);
+long valid_causal_taps(void) {
+    long taps = 0;
+    for (int t = 0; t < SEQUENCE_LENGTH; ++t) {
+        for (int k = 0; k < TCN_KERNEL_SIZE; ++k) {
+            if (t + (k - (TCN_KERNEL_SIZE - 1)) * TCN_DILATION >= 0) taps++;
+        }
     }
+    return taps;
+}
 
-    // Zero gradients after updating
-    zero_gradients(model);
+long model_macs(TCNVariant variant) {
+    const long valid_taps = valid_causal_taps();
+    long head = (long)NUM_CLASSES * TCN_CHANNELS;
+    if (variant == TCN_VARIANT_DWS) {
+        return valid_taps * INPUT_SIZE + (long)SEQUENCE_LENGTH * INPUT_SIZE * TCN_CHANNELS + head;
+    }
+    return valid_taps * INPUT_SIZE * TCN_CHANNELS + head;
 }
 
 // Data Loading
@@ -552,6 +1101,86 @@ int load_temporal_data(const char* dir_path, const char** gestures, int num_gest
     return 0; // Success
 }
 
+// Feature Cache (head-only training)
+
+// 64-bit FNV-1a
+static uint64_t fnv1a_update(uint64_t hash, const void* data, size_t len) {
+    const unsigned char* bytes = (const unsigned char*)data;
+    for (size_t i = 0; i < len; ++i) {
+        hash ^= bytes[i];
+        hash *= 0x100000001b3ULL;
+    }
+    return hash;
+}
+
+uint64_t hash_feature_inputs(const Model* model, const char* dir_path, const char** gestures, int num_gestures) {
+    uint64_t hash = 0xcbf29ce484222325ULL;
+
+    // Frozen TCN block and windowing parameters
+    hash = fnv1a_update(hash, model->tcn_block.weights, sizeof(model->tcn_block.weights));
+    hash = fnv1a_update(hash, model->tcn_block.biases, sizeof(model->tcn_block.biases));
+    const int windowing[3] = {SEQUENCE_LENGTH, WINDOW_STRIDE, TCN_DILATION};
+    hash = fnv1a_update(hash, windowing, sizeof(windowing));
+
+    // Gesture order (labels) and raw CSV contents
+    char path[1024];
+    char buffer[65536];
+    for (int i = 0; i < num_gestures; i++) {
+        hash = fnv1a_update(hash, gestures[i], strlen(gestures[i]) + 1);
+        snprintf(path, sizeof(path), "%s/%s/%s.csv", dir_path, gestures[i], gestures[i]);
+        FILE* file = fopen(path, "rb");
+        if (!file) continue;
+        size_t n;
+        while ((n = fread(buffer, 1, sizeof(buffer), file)) > 0) {
+            hash = fnv1a_update(hash, buffer, n);
+        }
+        fclose(file);
+    }
+    return hash;
+}
+
+int save_feature_cache(const char* file_path, const float* features, const int* labels, int num_sequences) {
+    FILE* fp = fopen(file_path, "wb");
+    if (!fp) {
+        perror("Error opening feature cache for writing");
+        return 0;
+    }
+    const int header[2] = {num_sequences, TCN_CHANNELS};
+    fwrite(header, sizeof(header), 1, fp);
+    fwrite(features, sizeof(float) * TCN_CHANNELS, num_sequences, fp);
+    fwrite(labels, sizeof(int), num_sequences, fp);
+    fclose(fp);
+    return 1;
+}
+
+int load_feature_cache(const char* file_path, float** out_features, int** out_labels, int* out_num_sequences) {
+    FILE* fp = fopen(file_path, "rb");
+    if (!fp) return 0; // Cache miss
+
+    int header[2];
+    if (fread(header, sizeof(header), 1, fp) != 1 || header[0] <= 0 || header[1] != TCN_CHANNELS) {
+        fclose(fp);
+        return 0;
+    }
+    int num_sequences = header[0];
+    *out_features = (float*)malloc((size_t)num_sequences * TCN_CHANNELS * sizeof(float));
+    *out_labels = (int*)malloc((size_t)num_sequences * sizeof(int));
+    int success = *out_features && *out_labels &&
+                  fread(*out_features, sizeof(float) * TCN_CHANNELS, num_sequences, fp) == (size_t)num_sequences &&
+                  fread(*out_labels, sizeof(int), num_sequences, fp) == (size_t)num_sequences;
+    fclose(fp);
+
+    if (!success) {
+        free(*out_features);
+        free(*out_labels);
+        *out_features = NULL;
+        *out_labels = NULL;
+        return 0;
+    }
+    *out_num_sequences = num_sequences;
+    return 1;
+}
+
 // Data Preparation
 
 void shuffle_indices(int* indices, int num_samples) {
@@ -7,12 +7,22 @@
 // Temporal Model Constants
 #define NUM_LANDMARKS 21
 #define INPUT_SIZE (NUM_LANDMARKS * 3)     // 21 landmarks * 3 coords
-#define NUM_CLASSES 3           // Gestures
+#define NUM_CLASSES 3           // Default gesture set, and the class count of legacy raw model files
+#define MAX_CLASSES 16          // Capacity of every output head; each model sets its own class count
 #define SEQUENCE_LENGTH 20      // Frames per sequence
 
 // TCN Hyperparameters
 #define TCN_CHANNELS 8         // TCN channels
 #define TCN_KERNEL_SIZE 3
+#define TCN_DILATION 1         // Causal tap spacing, shared by training and inference
+#define MIN_PREFIX_FRAMES 5    // Shortest partial window accepted for early predictions
+
+// Class names stored in the model file, in output order
+#define CLASS_NAME_LEN 32
+typedef struct {
+    int count;
+    char names[MAX_CLASSES][CLASS_NAME_LEN];
+} ClassNames;
 
 // TCN Data Structures (Static)
 
@@ -36,19 +46,20 @@ typedef struct {
 
 // Classification layer
 typedef struct {
-    float weights[NUM_CLASSES * TCN_CHANNELS];
-    float biases[NUM_CLASSES];
-    float output[NUM_CLASSES]; // Output probabilities
+    int num_classes; // Rows in use (set by init_model / init_dws_model)
+    float weights[MAX_CLASSES * TCN_CHANNELS];
+    float biases[MAX_CLASSES];
+    float output[MAX_CLASSES]; // Output probabilities
 
     // Gradients
-    float grad_weights[NUM_CLASSES * TCN_CHANNELS];
-    float grad_biases[NUM_CLASSES];
+    float grad_weights[MAX_CLASSES * TCN_CHANNELS];
+    float grad_biases[MAX_CLASSES];
 
     // Adam Optimizer state
-    float m_weights[NUM_CLASSES * TCN_CHANNELS];
-    float v_weights[NUM_CLASSES * TCN_CHANNELS];
-    float m_biases[NUM_CLASSES];
-    float v_biases[NUM_CLASSES];
+    float m_weights[MAX_CLASSES * TCN_CHANNELS];
+    float v_weights[MAX_CLASSES * TCN_CHANNELS];
+    float m_biases[MAX_CLASSES];
+    float v_biases[MAX_CLASSES];
 } OutputLayer;
 
 // Complete TCN model
@@ -59,7 +70,7 @@ typedef struct {
     OutputLayer output_layer;
 
     // Loss gradient w.r.t. model output
-    float loss_grad[NUM_CLASSES]; 
+    float loss_grad[MAX_CLASSES];
 } Model;
 
 // Lean inference-only model
@@ -70,15 +81,73 @@ typedef struct {
 } InferenceTCNBlock;
 
 typedef struct {
-    float weights[NUM_CLASSES * TCN_CHANNELS];
-    float biases[NUM_CLASSES];
+    float weights[MAX_CLASSES * TCN_CHANNELS]; // First classes.count rows are used
+    float biases[MAX_CLASSES];
 } InferenceOutputLayer;
 
 typedef struct {
     InferenceTCNBlock tcn_block;
     InferenceOutputLayer output_layer;
+    ClassNames classes;
 } InferenceModel;
 
+// Depthwise-Separable TCN Variant
+// A K-tap causal depthwise conv per input feature, then a pointwise (1x1)
+// mix into TCN_CHANNELS, Leaky ReLU, GAP and the same output layer:
+//   dw[t][i]  = sum_k x[t - (K-1-k)*d][i] * dw_weights[i][k]
+//   out[t][c] = leaky_relu(pw_biases[c] + sum_i pw_weights[c][i] * dw[t][i])
+typedef struct {
+    float dw_weights[INPUT_SIZE * TCN_KERNEL_SIZE];     // [c_in][k]
+    float pw_weights[TCN_CHANNELS * INPUT_SIZE];        // [c_out][c_in]
+    float pw_biases[TCN_CHANNELS];
+    float dw_output[SEQUENCE_LENGTH * INPUT_SIZE];      // [t][c_in]
+    float output[TCN_CHANNELS * SEQUENCE_LENGTH];       // [c][t], after Leaky ReLU
+
+    // Gradients
+    float grad_dw_weights[INPUT_SIZE * TCN_KERNEL_SIZE];
+    float grad_pw_weights[TCN_CHANNELS * INPUT_SIZE];
+    float grad_pw_biases[TCN_CHANNELS];
+
+    // Adam Optimizer state
+    float m_dw_weights[INPUT_SIZE * TCN_KERNEL_SIZE];
+    float v_dw_weights[INPUT_SIZE * TCN_KERNEL_SIZE];
+    float m_pw_weights[TCN_CHANNELS * INPUT_SIZE];
+    float v_pw_weights[TCN_CHANNELS * INPUT_SIZE];
+    float m_pw_biases[TCN_CHANNELS];
+    float v_pw_biases[TCN_CHANNELS];
+} DWSBlock;
+
+typedef struct {
+    DWSBlock dws_block;
+    float pooled_output[TCN_CHANNELS];
+    OutputLayer output_layer;
+} DWSModel;
+
+typedef struct {
+    float dw_weights[INPUT_SIZE * TCN_KERNEL_SIZE];
+    float pw_weights[TCN_CHANNELS * INPUT_SIZE];
+    float pw_biases[TCN_CHANNELS];
+} InferenceDWSBlock;
+
+typedef struct {
+    InferenceDWSBlock dws_block;
+    InferenceOutputLayer output_layer;
+    ClassNames classes;
+} InferenceDWSModel;
+
+// Model files are containers (model_file.h) whose header names the variant.
+// Legacy raw float32 files hold NUM_CLASSES classes and are told apart by size.
+typedef enum {
+    TCN_VARIANT_UNKNOWN = -1,
+    TCN_VARIANT_DENSE = 0,
+    TCN_VARIANT_DWS = 1
+} TCNVariant;
+
+#define DENSE_MODEL_FILE_SIZE ((TCN_CHANNELS * INPUT_SIZE * TCN_KERNEL_SIZE + TCN_CHANNELS \
+                                + NUM_CLASSES * TCN_CHANNELS + NUM_CLASSES) * sizeof(float))
+#define DWS_MODEL_FILE_SIZE ((INPUT_SIZE * TCN_KERNEL_SIZE + TCN_CHANNELS * INPUT_SIZE + TCN_CHANNELS \
+                              + NUM_CLASSES * TCN_CHANNELS + NUM_CLASSES) * sizeof(float))
+
 // Compile-time SRAM check
 #include <assert.h>
 #include "mcu_constraints.h"
@@ -86,29 +155,78 @@ typedef struct {
 // Compile-time check for model size vs SRAM limit
 // Note: Checks model size only, not data buffers.
 static_assert(sizeof(Model) < APP_SRAM_LIMIT, "Error: Model size exceeds SRAM budget!");
+static_assert(sizeof(DWSModel) < APP_SRAM_LIMIT, "Error: DWS model size exceeds SRAM budget!");
+static_assert(DENSE_MODEL_FILE_SIZE != DWS_MODEL_FILE_SIZE, "Error: Model variants must differ in file size!");
 
 // Function Prototypes
 
 // Model Init/Cleanup
-void init_model(Model* model);
+// Fresh weights with a num_classes-row head (1 <= num_classes <= MAX_CLASSES)
+void init_model(Model* model, int num_classes);
 void free_model(Model* model);
-void save_model(const Model* model, const char* file_path);
+// Writes the first num_classes output rows with their names (num_classes <= output_layer.num_classes)
+void save_model(const Model* model, const char** class_names, int num_classes, const char* file_path);
+// Container or legacy raw file; legacy files get NUM_CLASSES classes named class_<j>
 int load_inference_model(InferenceModel* model, const char* file_path);
 
+// Activation Functions
+float leaky_relu(float x);
+float leaky_relu_derivative(float x);
+void softmax(float* input, float* output, size_t size);
+
 // Forward Pass
 // Training forward pass (full model)
 void forward_pass(Model* model, const float* input_data, int epoch, int sample_idx);
 
 // --- Quantization Structures and Functions ---
 
+// Integer kernels work on rows padded to a multiple of 4 so every dot product
+// splits into 4-wide int8 MACs (one SIMD lane group on Helium / SMLAD on DSP cores).
+#define QUANT_INPUT_STRIDE (((INPUT_SIZE) + 3) & ~3)
+#define SOFTMAX_FRAC_BITS 8 // Fixed-point logits fed to the softmax LUT
+
 // Struct for the quantized model
+// Symmetric INT8 with per-output-channel weight scales (real = q * scale).
+// Biases are int32 at the scale of the accumulator they are added to, and the
+// TCN accumulators are requantized to the calibrated activation scale with an
+// integer multiplier + right shift: q_out = (acc * multiplier) >> shift.
 typedef struct {
+    float input_scale;                          // Calibrated from dataset windows
+    float activation_scale;                     // TCN output after Leaky ReLU, calibrated
+    float tcn_weight_scales[TCN_CHANNELS];
+    float output_weight_scales[MAX_CLASSES];
+
     int8_t tcn_block_weights[TCN_CHANNELS * INPUT_SIZE * TCN_KERNEL_SIZE];
-    int8_t tcn_block_biases[TCN_CHANNELS];
-    int8_t output_layer_weights[NUM_CLASSES * TCN_CHANNELS];
-    int8_t output_layer_biases[NUM_CLASSES];
+    int32_t tcn_block_biases[TCN_CHANNELS];     // Scale: input_scale * tcn_weight_scales[c]
+    int32_t tcn_multipliers[TCN_CHANNELS];      // Q31 requantization, positive side
+    int32_t tcn_shifts[TCN_CHANNELS];
+    int32_t tcn_negative_multipliers[TCN_CHANNELS]; // Leaky ReLU slope folded in
+    int32_t tcn_negative_shifts[TCN_CHANNELS];
+
+    int8_t output_layer_weights[MAX_CLASSES * TCN_CHANNELS];
+    int32_t output_layer_biases[MAX_CLASSES];   // Scale: activation_scale * output_weight_scales[j] / SEQUENCE_LENGTH
+    ClassNames classes;
+
+    // Derived by prepare_quantized_model(), not stored in the file
+    int8_t tcn_packed_weights[TCN_CHANNELS * TCN_KERNEL_SIZE * QUANT_INPUT_STRIDE]; // [c_out][k][c_in], zero padded
+    int32_t output_multipliers[MAX_CLASSES];    // Accumulator -> Q(SOFTMAX_FRAC_BITS) logit
+    int32_t output_shifts[MAX_CLASSES];
 } QuantizedModel;
 
+// Fills the derived (packed/fixed-point) fields after quantizing or loading
+void prepare_quantized_model(QuantizedModel* model);
+
+// Fixed-point softmax on Q(SOFTMAX_FRAC_BITS) logits using an exp(-x) lookup table
+// (shared with the code generator, which copies it into generated kernels)
+#define SOFTMAX_LUT_SIZE 176
+extern const uint16_t softmax_exp_lut[SOFTMAX_LUT_SIZE];
+void softmax_fixed(const int32_t* logits, float* output, int size);
+
+// Splits a positive real multiplier into a Q31 integer and a right shift
+void quantize_multiplier(double real_multiplier, int32_t* multiplier, int32_t* shift);
+// Rounding fixed-point multiply: (acc * multiplier) >> shift
+int32_t requantize(int32_t acc, int32_t multiplier, int32_t shift);
+
 // Function to save the quantized model to a binary file
 void save_quantized_model(const QuantizedModel *model, const char *file_path);
 
@@ -118,18 +236,87 @@ int load_quantized_model(QuantizedModel* model, const char* file_path);
 // Function to run a forward pass with the quantized model
 void forward_pass_quantized(const QuantizedModel* model, const float* input, float* output);
 
-// Inference forward pass (lean model)
+// Per-layer activations of one window, in real units, for comparing the FP32
+// and INT8 paths. The quantized path reports dequantized values.
+typedef struct {
+    float input[SEQUENCE_LENGTH * INPUT_SIZE];
+    float tcn_output[SEQUENCE_LENGTH * TCN_CHANNELS]; // After Leaky ReLU, [t * TCN_CHANNELS + c]
+    float pooled[TCN_CHANNELS];
+    float logits[MAX_CLASSES];
+    int input_saturated;      // INT8 only: inputs clamped to [-128, 127]
+    int activation_saturated; // INT8 only: TCN activations clamped to [-128, 127]
+} LayerActivations;
+
+// Same as the plain forward passes; trace may be NULL.
+void forward_pass_quantized_traced(const QuantizedModel* model, const float* input, float* output, LayerActivations* trace);
+void forward_pass_inference_traced(const InferenceModel* model, const float* input_data, float* final_output, LayerActivations* trace);
+
+// Inference forward pass (lean model), fused conv + Leaky ReLU + GAP.
+// Inference outputs hold model->classes.count probabilities (at most MAX_CLASSES).
 void forward_pass_inference(const InferenceModel* model, const float* input_data, float* final_output);
+// Unfused reference that keeps the full TCN output tensor (same as the traced variant)
+void forward_pass_inference_unfused(const InferenceModel* model, const float* input_data, float* final_output);
+
+// Early (partial-window) predictions on the first num_frames frames of a window,
+// MIN_PREFIX_FRAMES <= num_frames <= SEQUENCE_LENGTH. The TCN is causal, so the
+// outputs at t < num_frames are exact and GAP averages over those steps only.
+void forward_pass_inference_prefix(const InferenceModel* model, const float* input_data, int num_frames, float* final_output);
+void forward_pass_quantized_prefix(const QuantizedModel* model, const float* input, int num_frames, float* output);
+
+// Batched inference over batch_size windows stored back to back ([b][t][c]),
+// each with its own frame count; outputs are [b][MAX_CLASSES].
+#define MAX_INFERENCE_BATCH 32
+void forward_pass_inference_batch(const InferenceModel* model, const float* input_data, const int* num_frames,
+                                  int batch_size, float* final_output);
 
 // Backward Pass
 void backward_pass(Model* model, const float* input_data, const int* target_labels, size_t batch_size, int epoch, int sample_idx);
 
+// Depthwise-Separable Variant
+void init_dws_model(DWSModel* model, int num_classes);
+void save_dws_model(const DWSModel* model, const char** class_names, int num_classes, const char* file_path);
+int load_dws_inference_model(InferenceDWSModel* model, const char* file_path);
+TCNVariant detect_model_variant(const char* file_path);
+void forward_pass_dws(DWSModel* model, const float* input_data);
+void backward_pass_dws(DWSModel* model, const float* input_data, int target_label);
+void update_weights_dws(DWSModel* model, float learning_rate, float beta1, float beta2, float epsilon, int timestep);
+void forward_pass_dws_inference(const InferenceDWSModel* model, const float* input_data, float* final_output);
+// Causal taps that fall inside the window, summed over every output step
+long valid_causal_taps(void);
+// Multiply-accumulates per window of each float variant
+long model_macs(TCNVariant variant);
+
+// Head-Only Training
+// Runs the frozen TCN block + GAP once and returns pooled_output[TCN_CHANNELS]
+void compute_pooled_features(Model* model, const float* input_data, float* pooled_features);
+// Output layer + softmax from cached pooled features
+void forward_pass_head(Model* model, const float* pooled_features);
+// Output-layer gradients only (TCN block stays frozen)
+void backward_pass_head(Model* model, int target_label);
+
 // Optimizer
 void update_weights(Model* model, float learning_rate, float beta1, float beta2, float epsilon, int timestep);
+// Adam step over one parameter array with a shared gradient scale (for clipping);
+// lr_t is the bias-corrected learning rate for this timestep
+void adam_step(float* params, const float* grads, float* m, float* v, size_t n,
+               float scale, float lr_t, float beta1, float beta2, float epsilon);
+// Sum of squared values, for global gradient-norm clipping
+float sum_squares(const float* values, size_t n);
+// Bias-corrected Adam learning rate (lr_t) for a 1-based timestep
+float adam_learning_rate(float learning_rate, float beta1, float beta2, int timestep);
+// Gradient scale that clips the global norm sqrt(grad_norm_sq) to GRAD_CLIP_NORM
+#define GRAD_CLIP_NORM 1.0f
+float gradient_clip_scale(float grad_norm_sq);
 
 // Data Loading/Preparation
 int load_temporal_data(const char* dir_path, const char** gestures, int num_gestures, float** out_data, int** out_labels, int* out_num_sequences);
 void split_data(int num_sequences, float train_split, int* train_indices, int* num_train, int* val_indices, int* num_val);
 void shuffle_indices(int* indices, int num_samples);
 
+// Feature Cache
+// Key over the TCN block, windowing and every gesture's CSV contents
+uint64_t hash_feature_inputs(const Model* model, const char* dir_path, const char** gestures, int num_gestures);
+int save_feature_cache(const char* file_path, const float* features, const int* labels, int num_sequences);
+int load_feature_cache(const char* file_path, float** out_features, int** out_labels, int* out_num_sequences);
+
 #endif // TRAINING_LOGIC_H
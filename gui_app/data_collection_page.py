@@ -1,7 +1,5 @@
 import cv2
 import numpy as np
-import cv2
-import numpy as np
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QComboBox, QStackedWidget, 
     QDialog, QLineEdit, QInputDialog, QListWidget, QListWidgetItem, QMessageBox
@@ -10,7 +8,7 @@ from PyQt6.QtGui import QFont, QImage, QPixmap
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, pyqtSlot
 import time
 
-from gui_app.logic import HandTracker
+from gui_app.logic import shared_hand_tracker, shared_camera, remove_stale_adapters
 from gui_app.config import load_gestures, save_gestures
 
 class CameraWorker(QThread):
@@ -19,9 +17,9 @@ class CameraWorker(QThread):
     collection_update = pyqtSignal(int)
     collection_finished = pyqtSignal(str, int)
 
-    def __init__(self, hand_tracker):
+    def __init__(self):
         super().__init__()
-        self.hand_tracker = hand_tracker
+        self.hand_tracker = None
         self._running = False
         self._collecting = False
         self.current_gesture = ""
@@ -29,13 +27,16 @@ class CameraWorker(QThread):
 
     def run(self):
         self._running = True
-        cap = cv2.VideoCapture(0)
+        # Created on first use, off the GUI thread
+        self.hand_tracker = shared_hand_tracker()
+        camera = shared_camera()
+        camera.acquire()
         collected_data = []
         last_capture_time = 0
         capture_interval = 0.0  # Capture as fast as possible
 
         while self._running:
-            ret, frame = cap.read()
+            ret, frame = camera.read()
             if not ret:
                 continue
 
@@ -57,7 +58,7 @@ class CameraWorker(QThread):
                 collected_data = []
 
             self.new_frame.emit(cv2.flip(annotated_frame, 1).copy())
-        cap.release()
+        camera.release()
 
     def start_collection(self, gesture, num_samples):
         self.current_gesture = gesture
@@ -133,8 +134,7 @@ class DataCollectionPage(QWidget):
     def __init__(self):
         super().__init__()
         self.is_setup_complete = False
-        self.hand_tracker = HandTracker()
-        self.worker = CameraWorker(self.hand_tracker)
+        self.worker = CameraWorker()
         self.gestures = load_gestures()
         self.data_counts = {gesture: 0 for gesture in self.gestures} # Initialize counts to 0
 
@@ -258,6 +258,8 @@ class DataCollectionPage(QWidget):
             if new_gestures != self.gestures:
                 self.gestures = new_gestures
                 save_gestures(self.gestures)
+                # Deleted gestures drop out of the LoRA model immediately
+                remove_stale_adapters(self.gestures)
                 self.update_gesture_ui()
 
     def update_gesture_ui(self):
@@ -0,0 +1,277 @@
+import sys
+import os
+
+# Add project root to the Python path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+import argparse
+import collections
+import json
+import resource
+import signal
+import socket
+import subprocess
+import threading
+import time
+import cv2
+import numpy as np
+
+from gui_app.logic import HandTracker, GesturePredictor, SIM_DIR
+from gui_app.tracing import FrameTracer, Span
+
+# --- Constants ---
+DEFAULT_STATS_INTERVAL_S = 10.0
+DEFAULT_VIDEO_FPS = 30.0 # When a file does not report its frame rate
+DRAIN_TIMEOUT_S = 0.5 # Wait for in-flight results after the last frame
+CAMERA_RETRY_S = 0.05 # First wait after a failed camera read, doubled per consecutive failure
+CAMERA_RETRY_MAX_S = 1.0
+CAMERA_REOPEN_FAILURES = 10 # Consecutive failed reads before the camera is reopened
+CAMERA_MAX_REOPENS = 3 # Reopens without a good frame before giving up
+
+
+class StreamSink:
+    """Writes JSON lines to a stream (stdout by default)."""
+    def __init__(self, stream):
+        self.stream = stream
+        self.lock = threading.Lock()
+
+    def send(self, event):
+        line = json.dumps(event) + "\n"
+        with self.lock:
+            self.stream.write(line)
+            self.stream.flush()
+
+    def close(self):
+        pass
+
+
+class UnixSocketSink:
+    """Broadcasts JSON lines to every client connected to a Unix socket."""
+    def __init__(self, path):
+        self.path = path
+        if os.path.exists(path):
+            os.remove(path)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(path)
+        self.server.listen()
+        self.clients = []
+        self.lock = threading.Lock()
+        threading.Thread(target=self._accept_loop, name="UnixSocketSink", daemon=True).start()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                client, _ = self.server.accept()
+            except OSError:
+                return # Closed
+            with self.lock:
+                self.clients.append(client)
+
+    def send(self, event):
+        data = (json.dumps(event) + "\n").encode()
+        with self.lock:
+            for client in list(self.clients):
+                try:
+                    client.sendall(data)
+                except OSError:
+                    client.close()
+                    self.clients.remove(client) # Disconnected reader
+
+    def close(self):
+        self.server.close()
+        with self.lock:
+            for client in self.clients:
+                client.close()
+            self.clients.clear()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class InferenceDaemon:
+    """Camera or video -> HandTracker -> GesturePredictor, with results as JSON events.
+
+    A gesture event is sent whenever the recognized gesture changes (or for every
+    server result with all_results). Stats events report the frame rate, this
+    process's CPU use and per-stage latency percentiles.
+    """
+    def __init__(self, sink, early_predictions=False, motion_gating=True, all_results=False):
+        self.sink = sink
+        self.all_results = all_results
+        self.hand_tracker = HandTracker()
+        self.tracer = FrameTracer()
+        self.predictor = GesturePredictor(early_predictions=early_predictions, motion_gating=motion_gating,
+                                          on_result=self.on_result, tracer=self.tracer)
+        self.capture_times = collections.OrderedDict() # frame_id -> capture start, for end-to-end latency
+        self.end_to_end = collections.deque(maxlen=300)
+        self.last_gesture = None
+        self.lock = threading.Lock()
+        self.running = False
+        self.frames = 0
+        self.source_failed = False
+
+    def emit_gesture(self, gesture, confidence, latency_s=None):
+        with self.lock:
+            if gesture == self.last_gesture and not self.all_results:
+                return
+            self.last_gesture = gesture
+        self.sink.send({"event": "gesture", "time": time.time(), "gesture": gesture, "confidence": round(confidence, 4),
+                        "latency_ms": None if latency_s is None else round(latency_s * 1000, 2)})
+
+    def on_result(self, gesture, confidence, handoff_mark):
+        """Called on the predictor's I/O thread for every accepted server result."""
+        latency_s = None
+        if handoff_mark is not None:
+            with self.lock:
+                capture_time = self.capture_times.get(handoff_mark[0])
+            if capture_time is not None:
+                latency_s = handoff_mark[2] - capture_time
+                self.end_to_end.append(latency_s)
+        self.emit_gesture(gesture, confidence, latency_s)
+
+    def stats_event(self, elapsed_s, cpu_s, frames):
+        latency_ms = {stage: {"p50": round(p50 * 1000, 3), "p95": round(p95 * 1000, 3), "p99": round(p99 * 1000, 3)}
+                      for stage, (p50, p95, p99) in self.tracer.percentiles().items()}
+        if self.end_to_end:
+            p50, p95, p99 = np.percentile(list(self.end_to_end), [50, 95, 99])
+            latency_ms["end_to_end"] = {"p50": round(p50 * 1000, 3), "p95": round(p95 * 1000, 3), "p99": round(p99 * 1000, 3)}
+        return {"event": "stats", "time": time.time(), "frames": frames,
+                "fps": round(frames / elapsed_s, 2) if elapsed_s > 0 else 0.0,
+                "cpu_percent": round(100.0 * cpu_s / elapsed_s, 1) if elapsed_s > 0 else 0.0,
+                "inferences": self.predictor.executed_inferences, "skipped": self.predictor.skipped_inferences,
+                "dropped": self.predictor.dropped_requests, "stride": self.predictor.prediction_stride,
+                "latency_ms": latency_ms}
+
+    def error_event(self, message, failures):
+        return {"event": "error", "time": time.time(), "error": message, "consecutive_failures": failures}
+
+    def run(self, capture, is_file=False, pace_fps=None, stats_interval_s=DEFAULT_STATS_INTERVAL_S, max_frames=None,
+            camera=None):
+        """
+        Processes frames until stopped, the source ends or max_frames; returns the final stats event.
+        A failed read ends a file source. A camera read is retried with backoff; after
+        CAMERA_REOPEN_FAILURES failures in a row the camera index is reopened (if given),
+        and after CAMERA_MAX_REOPENS fruitless reopens the run stops with source_failed set.
+        Both are reported as error events.
+        """
+        self.running = True
+        start_time = interval_start = time.perf_counter()
+        start_cpu = interval_cpu = cpu_seconds()
+        interval_frames = 0
+        next_frame_time = start_time
+        failures = 0
+        while self.running and (max_frames is None or self.frames < max_frames):
+            frame_id = self.tracer.new_frame()
+            capture_time = time.perf_counter()
+            with Span(self.tracer, frame_id, "camera_read"):
+                ret, frame = capture.read()
+            if not ret:
+                if is_file:
+                    break # End of the video file
+                failures += 1
+                if failures % CAMERA_REOPEN_FAILURES == 0:
+                    if camera is None or failures // CAMERA_REOPEN_FAILURES > CAMERA_MAX_REOPENS:
+                        self.sink.send(self.error_event("camera read failed, giving up", failures))
+                        self.source_failed = True
+                        break
+                    self.sink.send(self.error_event(f"camera read failed, reopening camera {camera}", failures))
+                    capture.release()
+                    capture.open(camera)
+                time.sleep(min(CAMERA_RETRY_MAX_S, CAMERA_RETRY_S * 2 ** (failures - 1)))
+                continue
+            failures = 0
+            with self.lock:
+                self.capture_times[frame_id] = capture_time
+                while len(self.capture_times) > 1000:
+                    self.capture_times.popitem(last=False)
+
+            # No preview: landmarks are not drawn on the frame
+            with Span(self.tracer, frame_id, "hand_tracking"):
+                hand_landmarks, _ = self.hand_tracker.process_frame(frame, draw=False)
+            with Span(self.tracer, frame_id, "landmarks"):
+                landmark_data = self.hand_tracker.get_landmark_data(hand_landmarks)
+            gesture, confidence = self.predictor.predict(landmark_data, frame_id)
+            if gesture == "No Hand Present":
+                self.emit_gesture(gesture, confidence)
+            self.frames += 1
+            interval_frames += 1
+
+            now = time.perf_counter()
+            if stats_interval_s and now - interval_start >= stats_interval_s:
+                cpu = cpu_seconds()
+                self.sink.send(self.stats_event(now - interval_start, cpu - interval_cpu, interval_frames))
+                interval_start, interval_cpu, interval_frames = now, cpu, 0
+            if pace_fps:
+                next_frame_time = max(next_frame_time + 1.0 / pace_fps, now - 1.0 / pace_fps)
+                time.sleep(max(0.0, next_frame_time - now))
+
+        time.sleep(DRAIN_TIMEOUT_S if self.predictor.in_flight else 0.0)
+        return self.stats_event(time.perf_counter() - start_time, cpu_seconds() - start_cpu, self.frames)
+
+    def stop(self, *_):
+        self.running = False
+
+
+def cpu_seconds():
+    """User + system CPU time of this process (the inference server is separate)."""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def start_server(model_path, server_args):
+    """Starts ra8d1_sim without per-request logging; server_args follow the model path (e.g. --lora)."""
+    process = subprocess.Popen([os.path.join(SIM_DIR, "ra8d1_sim"), "--log-level", "quiet", os.path.abspath(model_path)]
+                               + server_args, cwd=SIM_DIR, stdout=subprocess.DEVNULL, stderr=sys.stderr)
+    time.sleep(0.5) # Let it bind before the predictor connects (it also keeps retrying)
+    return process
+
+
+# --- Main Execution ---
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Headless gesture recognition: camera or video in, JSON-line gesture events out.')
+    parser.add_argument('--camera', type=int, default=0, help='Camera index (default: 0).')
+    parser.add_argument('--video', help='Read frames from a video file instead of the camera, paced at its frame rate.')
+    parser.add_argument('--no-pacing', action='store_true', help='Process video frames as fast as possible.')
+    parser.add_argument('--socket', help='Serve events on this Unix socket path instead of stdout.')
+    parser.add_argument('--model', help='Start ra8d1_sim with this model (otherwise connect to a running server).')
+    parser.add_argument('--server-args', nargs=argparse.REMAINDER, default=[],
+                        help='Extra ra8d1_sim arguments, e.g. --server-args --lora ../models/adapters wave circle.')
+    parser.add_argument('--early', action='store_true', help='Early predictions from partial windows.')
+    parser.add_argument('--no-motion-gating', action='store_true', help='Query the server even when the hand is still.')
+    parser.add_argument('--all-results', action='store_true', help='Emit every server result, not only gesture changes.')
+    parser.add_argument('--stats-interval', type=float, default=DEFAULT_STATS_INTERVAL_S,
+                        help='Seconds between stats events (0 disables them; a final one is always sent).')
+    parser.add_argument('--max-frames', type=int, help='Stop after this many frames.')
+    args = parser.parse_args()
+
+    # stdout carries the events; route the library's diagnostics to stderr
+    events_stream = sys.stdout
+    sys.stdout = sys.stderr
+    sink = UnixSocketSink(args.socket) if args.socket else StreamSink(events_stream)
+
+    server = start_server(args.model, args.server_args) if args.model else None
+    capture = cv2.VideoCapture(args.video if args.video else args.camera)
+    if not capture.isOpened():
+        print(f"Error: Cannot open {args.video or f'camera {args.camera}'}.")
+        raise SystemExit(1)
+    pace_fps = None
+    if args.video and not args.no_pacing:
+        pace_fps = capture.get(cv2.CAP_PROP_FPS) or DEFAULT_VIDEO_FPS
+
+    daemon = InferenceDaemon(sink, early_predictions=args.early, motion_gating=not args.no_motion_gating,
+                             all_results=args.all_results)
+    signal.signal(signal.SIGINT, daemon.stop)
+    signal.signal(signal.SIGTERM, daemon.stop)
+    try:
+        final_stats = daemon.run(capture, is_file=args.video is not None, pace_fps=pace_fps, stats_interval_s=args.stats_interval,
+                                 max_frames=args.max_frames, camera=None if args.video else args.camera)
+        sink.send(final_stats)
+    finally:
+        capture.release()
+        daemon.predictor.cleanup()
+        sink.close()
+        if server:
+            server.terminate()
+            server.wait()
+    if daemon.source_failed:
+        raise SystemExit(1)
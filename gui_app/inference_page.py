@@ -2,45 +2,58 @@ import cv2
 import numpy as np
 import os
 import time
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QComboBox, QTextEdit
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QComboBox, QTextEdit, QCheckBox
 from PyQt6.QtGui import QFont, QImage, QPixmap
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, pyqtSlot, QProcess, QTimer
 
-from gui_app.logic import HandTracker, GesturePredictor, SIM_DIR, MODELS_DIR
+from gui_app.logic import shared_hand_tracker, shared_camera, GesturePredictor, SIM_DIR, MODELS_DIR, ADAPTERS_DIR, PROJECT_ROOT, adapter_path
+from gui_app.config import load_gestures
+from gui_app.tracing import FrameTracer, Span, STAGES, handoff
+
+TRACES_DIR = os.path.join(PROJECT_ROOT, "traces")
 
 class InferenceWorker(QThread):
     """Worker for camera input and gesture prediction."""
     new_frame = pyqtSignal(np.ndarray)
-    new_prediction = pyqtSignal(str, float)
+    new_prediction = pyqtSignal(str, float, object) # gesture, confidence, tracing handoff mark
 
-    def __init__(self, hand_tracker, gesture_predictor):
+    def __init__(self, gesture_predictor, tracer=None):
         super().__init__()
-        self.hand_tracker = hand_tracker
         self.gesture_predictor = gesture_predictor
+        self.tracer = tracer
+        # Server results arrive on the predictor's I/O thread; the signal hands them to the GUI thread
+        self.gesture_predictor.on_result = self.new_prediction.emit
         self._running = False
 
     def run(self):
         self._running = True
-        cap = cv2.VideoCapture(0)
+        # Created on first use, off the GUI thread
+        hand_tracker = shared_hand_tracker()
+        camera = shared_camera()
+        camera.acquire()
 
         while self._running:
-            ret, frame = cap.read()
+            frame_id = self.tracer.new_frame() if self.tracer else None
+            with Span(self.tracer, frame_id, "camera_read"):
+                ret, frame = camera.read()
             if not ret:
                 continue
 
             # Get hand landmarks and annotated frame
-            hand_landmarks, annotated_frame = self.hand_tracker.process_frame(frame)
+            with Span(self.tracer, frame_id, "hand_tracking"):
+                hand_landmarks, annotated_frame = hand_tracker.process_frame(frame)
 
-            # Get landmark data (None if no hand)
-            landmark_data = self.hand_tracker.get_landmark_data(hand_landmarks)
+            # Get normalized landmark data (None if no hand)
+            with Span(self.tracer, frame_id, "landmarks"):
+                landmark_data = hand_tracker.get_landmark_data(hand_landmarks)
 
-            # Predictor handles None case
-            predicted_gesture, confidence = self.gesture_predictor.predict(landmark_data)
-            self.new_prediction.emit(predicted_gesture, confidence)
+            # Predictor handles None case and never waits for the server
+            predicted_gesture, confidence = self.gesture_predictor.predict(landmark_data, frame_id)
+            self.new_prediction.emit(predicted_gesture, confidence, handoff(frame_id, "qt_delivery"))
 
             # Update video feed
             self.new_frame.emit(cv2.flip(annotated_frame, 1).copy())
-        cap.release()
+        camera.release()
 
     def stop(self):
         self._running = False
@@ -51,10 +64,10 @@ class InferencePage(QWidget):
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.hand_tracker = HandTracker()
         self.worker = None
         self.gesture_predictor = None
         self.inference_process = None
+        self.tracer = None
         self.setup_ui()
 
     def setup_ui(self):
@@ -79,8 +92,12 @@ class InferencePage(QWidget):
         # Model Selector
         info_layout.addWidget(QLabel("Select Model:"))
         self.model_selector = QComboBox()
-        self.model_selector.addItems(["Base FP32 Model", "Quantized INT8 Model"])
+        self.model_selector.addItems(["Base FP32 Model", "Quantized INT8 Model", "Per-Class LoRA Model"])
         info_layout.addWidget(self.model_selector)
+
+        self.early_checkbox = QCheckBox("Early predictions (partial windows)")
+        self.early_checkbox.setToolTip("Predict from the first frames of a new hand (FP32 and INT8 models only).")
+        info_layout.addWidget(self.early_checkbox)
         
         self.prediction_label = QLabel("Prediction: --")
         self.prediction_label.setFont(QFont("Arial", 18))
@@ -90,6 +107,29 @@ class InferencePage(QWidget):
         self.confidence_label.setFont(QFont("Arial", 18))
         info_layout.addWidget(self.confidence_label)
 
+        self.inference_stats_label = QLabel("Inferences: --")
+        info_layout.addWidget(self.inference_stats_label)
+
+        self.stride_label = QLabel("Stride: --")
+        info_layout.addWidget(self.stride_label)
+
+        self.server_stats_label = QLabel("Server: --")
+        info_layout.addWidget(self.server_stats_label)
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setInterval(1000)
+        self.stats_timer.timeout.connect(self.refresh_server_stats)
+        self.stats_timer.timeout.connect(self.refresh_trace_panel)
+
+        # Per-stage latency of the traced frames
+        self.trace_label = QLabel("Stage latency: --")
+        self.trace_label.setFont(QFont("Courier New", 9))
+        info_layout.addWidget(self.trace_label)
+        self.save_trace_button = QPushButton("Save Chrome Trace")
+        self.save_trace_button.setToolTip("Write the recent stage spans as trace-event JSON for chrome://tracing or Perfetto.")
+        self.save_trace_button.clicked.connect(self.save_trace)
+        self.save_trace_button.setEnabled(False)
+        info_layout.addWidget(self.save_trace_button)
+
         self.start_button = QPushButton("Start Inference")
         self.start_button.clicked.connect(self.toggle_inference)
         info_layout.addWidget(self.start_button)
@@ -109,9 +149,19 @@ class InferencePage(QWidget):
         self.server_output.clear()
         selected_model_text = self.model_selector.currentText()
 
+        server_args = []
         if selected_model_text == "Base FP32 Model":
             model_file = "c_model.bin"
             model_path = os.path.join(MODELS_DIR, model_file)
+        elif selected_model_text == "Per-Class LoRA Model":
+            model_file = "c_model.bin + adapters"
+            model_path = os.path.join(MODELS_DIR, "c_model.bin")
+            gestures = load_gestures()
+            missing = [g for g in gestures if not os.path.exists(adapter_path(g))]
+            if missing:
+                self.server_output.setText(f"Error: No adapter for {', '.join(missing)}. Train them in LoRA mode first.")
+                return
+            server_args = ["--lora", ADAPTERS_DIR] + gestures
         else:  # Quantized INT8 Model
             model_file = "c_model_quantized.bin"
             model_path = os.path.join(SIM_DIR, model_file)
@@ -127,32 +177,37 @@ class InferencePage(QWidget):
 
         executable = os.path.join(SIM_DIR, "ra8d1_sim")
         self.server_output.append(f"Starting server with {model_file}...\n")
-        self.inference_process.start(executable, [model_path])
+        self.inference_process.start(executable, [model_path] + server_args)
 
         # Give server time to start before connecting
         QTimer.singleShot(1000, self.connect_to_server)
 
     def connect_to_server(self):
         try:
-            self.gesture_predictor = GesturePredictor()
+            self.tracer = FrameTracer()
+            self.gesture_predictor = GesturePredictor(early_predictions=self.early_checkbox.isChecked(), tracer=self.tracer)
             # Check if connection was successful in GesturePredictor's __init__
             if not self.gesture_predictor.client_socket:
                 raise ConnectionRefusedError("Failed to connect to the C server.")
 
-            self.worker = InferenceWorker(self.hand_tracker, self.gesture_predictor)
+            self.worker = InferenceWorker(self.gesture_predictor, self.tracer)
             self.worker.new_frame.connect(self.update_video_feed)
             self.worker.new_prediction.connect(self.update_prediction)
             self.worker.start()
+            self.stats_timer.start()
+            self.save_trace_button.setEnabled(True)
 
             self.start_button.setText("Stop Inference")
             self.set_navigation_enabled.emit(False)
             self.model_selector.setEnabled(False)
+            self.early_checkbox.setEnabled(False)
 
         except Exception as e:
             self.server_output.append(f"\nError starting inference client: {e}")
             self._stop_inference() # Clean up if connection fails
 
     def _stop_inference(self):
+        self.stats_timer.stop()
         if self.worker and self.worker.isRunning():
             self.worker.stop()
         
@@ -170,9 +225,48 @@ class InferencePage(QWidget):
         self.start_button.setText("Start Inference")
         self.set_navigation_enabled.emit(True)
         self.model_selector.setEnabled(True)
+        self.early_checkbox.setEnabled(True)
         self.video_feed.setText("Camera Stopped")
         self.prediction_label.setText("Prediction: --")
         self.confidence_label.setText("Confidence: --")
+        self.inference_stats_label.setText("Inferences: --")
+        self.stride_label.setText("Stride: --")
+        self.server_stats_label.setText("Server: --")
+        self.trace_label.setText("Stage latency: --")
+        self.save_trace_button.setEnabled(False)
+
+    def refresh_server_stats(self):
+        """Show the last server metrics and ask for fresh ones."""
+        if not self.gesture_predictor:
+            return
+        stats = self.gesture_predictor.server_stats
+        if stats:
+            def stage_us(name):
+                return f"{stats[f'{name}_ns_p50'] / 1000:.0f}/{stats[f'{name}_ns_p99'] / 1000:.0f}"
+            self.server_stats_label.setText(
+                f"Server: {stats['requests']} windows in {stats['batches']} batches, {stats['rejected']} rejected\n"
+                f"p50/p99 us: read {stage_us('read')} | decode {stage_us('decode')} | "
+                f"forward {stage_us('forward')} | write {stage_us('write')}")
+        self.gesture_predictor.request_server_stats()
+
+    def refresh_trace_panel(self):
+        """Show rolling p50/p95/p99 per pipeline stage."""
+        if not self.tracer:
+            return
+        percentiles = self.tracer.percentiles()
+        lines = ["Stage latency ms   p50    p95    p99"]
+        for stage in STAGES:
+            if stage in percentiles:
+                p50, p95, p99 = (value * 1000 for value in percentiles[stage])
+                lines.append(f"{stage:<16} {p50:>6.2f} {p95:>6.2f} {p99:>6.2f}")
+        self.trace_label.setText("\n".join(lines))
+
+    def save_trace(self):
+        if not self.tracer:
+            return
+        path = os.path.join(TRACES_DIR, time.strftime("inference_%Y%m%d_%H%M%S.json"))
+        num_spans = self.tracer.dump_chrome_trace(path)
+        self.server_output.append(f"Saved {num_spans} spans to {path}")
 
     def on_server_output(self):
         output = self.inference_process.readAllStandardOutput().data().decode().strip()
@@ -200,8 +294,20 @@ class InferencePage(QWidget):
         scaled_pixmap = pixmap.scaled(self.video_feed.size(), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
         self.video_feed.setPixmap(scaled_pixmap)
 
-    @pyqtSlot(str, float)
-    def update_prediction(self, gesture, confidence):
+    @pyqtSlot(str, float, object)
+    def update_prediction(self, gesture, confidence, handoff_mark=None):
+        if self.tracer:
+            self.tracer.record_handoff(handoff_mark)
+        if self.gesture_predictor:
+            executed = self.gesture_predictor.executed_inferences
+            skipped = self.gesture_predictor.skipped_inferences
+            dropped = self.gesture_predictor.dropped_requests
+            self.inference_stats_label.setText(f"Inferences: {executed} run / {skipped} skipped (hand still) / {dropped} dropped (stale)")
+            predictor = self.gesture_predictor
+            if predictor.latency_ema is not None and predictor.frame_interval_ema:
+                self.stride_label.setText(f"Stride: {predictor.prediction_stride} frames | "
+                                          f"round trip {predictor.latency_ema * 1000:.1f} ms | "
+                                          f"frame {predictor.frame_interval_ema * 1000:.1f} ms")
         if gesture == "No Hand Present":
             self.prediction_label.setText("Prediction: No Hand")
             self.confidence_label.setText("Confidence: --")
@@ -0,0 +1,171 @@
+import sys
+import os
+
+# Add project root to the Python path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+import argparse
+import multiprocessing
+import time
+import cv2
+
+from gui_app.config import load_gestures
+from gui_app.logic import HandTracker, MODELS_DIR
+
+# --- Constants ---
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi', '.mkv', '.webm', '.m4v')
+DEFAULT_CHUNK_FRAMES = 300 # ~10 s at 30 FPS; small enough to balance uneven video lengths
+
+_tracker = None # One HandTracker (MediaPipe Hands graph) per worker process
+
+
+def _init_worker(ready):
+    global _tracker
+    _tracker = HandTracker()
+    ready.put(os.getpid()) # Lets the parent start timing once every worker has MediaPipe running
+
+
+def find_videos(video_dir, gestures):
+    """[(gesture, path)] from <video_dir>/<gesture>/*.<video extension>, for configured gestures only."""
+    videos = []
+    for name in sorted(os.listdir(video_dir)):
+        gesture_dir = os.path.join(video_dir, name)
+        if not os.path.isdir(gesture_dir):
+            continue
+        if name not in gestures:
+            print(f"Skipping {gesture_dir}: '{name}' is not a configured gesture {gestures}.")
+            continue
+        videos.extend((name, os.path.join(gesture_dir, f)) for f in sorted(os.listdir(gesture_dir))
+                      if f.lower().endswith(VIDEO_EXTENSIONS))
+    return videos
+
+
+def make_chunks(videos, chunk_frames):
+    """Splits every video into (video_index, path, start, end) frame ranges; end None reads to the end."""
+    chunks = []
+    for video_index, (_, path) in enumerate(videos):
+        capture = cv2.VideoCapture(path)
+        num_frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT)) # An estimate for some containers
+        capture.release()
+        starts = list(range(0, max(num_frames, 1), chunk_frames))
+        for i, start in enumerate(starts):
+            end = starts[i + 1] if i + 1 < len(starts) else None
+            chunks.append((video_index, path, start, end))
+    return chunks
+
+
+def open_at_frame(path, start):
+    """A capture whose next read() returns frame `start`.
+
+    Seeking by CAP_PROP_POS_FRAMES is not frame-exact for every codec and container,
+    so the position is checked after the seek; if it is off, the video is reopened
+    and the first `start` frames are skipped with grab().
+    """
+    capture = cv2.VideoCapture(path)
+    if not start:
+        return capture
+    if capture.set(cv2.CAP_PROP_POS_FRAMES, start) and int(capture.get(cv2.CAP_PROP_POS_FRAMES)) == start:
+        return capture
+    capture.release()
+    capture = cv2.VideoCapture(path)
+    for _ in range(start):
+        if not capture.grab():
+            break
+    return capture
+
+
+def extract_chunk(chunk):
+    """Runs in a worker: returns (video_index, start, frames read, normalized landmark rows)."""
+    video_index, path, start, end = chunk
+    _tracker.hands.reset() # Don't track a hand from the previous chunk into this one
+    capture = open_at_frame(path, start)
+    rows = []
+    frames = 0
+    while end is None or start + frames < end:
+        ret, frame = capture.read()
+        if not ret:
+            break
+        frames += 1
+        hand_landmarks, _ = _tracker.process_frame(frame, draw=False)
+        landmark_data = _tracker.get_landmark_data(hand_landmarks)
+        if landmark_data:
+            rows.append(landmark_data)
+    capture.release()
+    return video_index, start, frames, rows
+
+
+def extract_landmarks(videos, num_workers, chunk_frames=DEFAULT_CHUNK_FRAMES):
+    """Returns ({video_index: rows in frame order}, frames read, seconds) using a pool of num_workers.
+
+    The seconds cover extraction only: timing starts once every worker has started MediaPipe.
+    """
+    chunks = make_chunks(videos, chunk_frames)
+    results = {}
+    total_frames = 0
+    # spawn: MediaPipe and OpenCV start threads that a forked child would not inherit safely
+    context = multiprocessing.get_context("spawn")
+    ready = context.SimpleQueue()
+    with context.Pool(num_workers, initializer=_init_worker, initargs=(ready,)) as pool:
+        for _ in range(num_workers):
+            ready.get()
+        start_time = time.perf_counter()
+        for done, (video_index, start, frames, rows) in enumerate(pool.imap_unordered(extract_chunk, chunks), start=1):
+            results.setdefault(video_index, []).append((start, rows))
+            total_frames += frames
+            print(f"\r[INGEST] {done}/{len(chunks)} chunks, {total_frames} frames", end="", flush=True)
+    elapsed = time.perf_counter() - start_time
+    print()
+    sessions = {video_index: [row for _, rows in sorted(parts, key=lambda part: part[0]) for row in rows]
+                for video_index, parts in results.items()}
+    return sessions, total_frames, elapsed
+
+
+def save_sessions(videos, sessions):
+    """Appends each video's landmarks as one session to models/data/<gesture>/<gesture>.csv."""
+    for video_index, (gesture, path) in enumerate(videos):
+        rows = sessions.get(video_index, [])
+        if not rows:
+            print(f"No hand found in {path}; nothing saved.")
+            continue
+        HandTracker.save_data(gesture, rows)
+
+
+def run_benchmark(videos, worker_counts, chunk_frames):
+    """Extracts every video once per worker count and prints the frames/s scaling (nothing is saved)."""
+    print(f"{'workers':>8} {'frames':>8} {'seconds':>8} {'frames/s':>9} {'speedup':>8}")
+    baseline = None
+    for num_workers in worker_counts:
+        _, frames, elapsed = extract_landmarks(videos, num_workers, chunk_frames)
+        fps = frames / elapsed if elapsed > 0 else 0.0
+        baseline = baseline or fps
+        print(f"{num_workers:>8} {frames:>8} {elapsed:>8.2f} {fps:>9.1f} {fps / baseline:>7.2f}x")
+
+
+# --- Main Execution ---
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Extract normalized hand landmarks from recorded videos into models/data.')
+    parser.add_argument('video_dir', help='Directory with one subdirectory of videos per gesture, e.g. videos/wave/*.mp4.')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes (default: CPU count).')
+    parser.add_argument('--chunk-frames', type=int, default=DEFAULT_CHUNK_FRAMES,
+                        help=f'Frames per work item (default: {DEFAULT_CHUNK_FRAMES}).')
+    parser.add_argument('--benchmark', metavar='COUNTS',
+                        help='Comma-separated worker counts, e.g. 1,2,4,8: report frames/s per count without saving.')
+    args = parser.parse_args()
+
+    gestures = load_gestures()
+    videos = find_videos(args.video_dir, gestures)
+    if not videos:
+        print(f"Error: No videos found under {args.video_dir}/<gesture>/ for gestures {gestures}.")
+        raise SystemExit(1)
+    print(f"[INGEST] {len(videos)} videos for {len({gesture for gesture, _ in videos})} gestures")
+
+    if args.benchmark:
+        run_benchmark(videos, [int(count) for count in args.benchmark.split(',')], args.chunk_frames)
+    else:
+        sessions, frames, elapsed = extract_landmarks(videos, args.workers, args.chunk_frames)
+        save_sessions(videos, sessions)
+        hand_frames = sum(len(rows) for rows in sessions.values())
+        print(f"[INGEST] {frames} frames ({hand_frames} with a hand) in {elapsed:.2f} s with {args.workers} workers: "
+              f"{frames / elapsed:.1f} frames/s")
+        print(f"[INGEST] Data saved to {os.path.join(MODELS_DIR, 'data')}")
@@ -2,21 +2,28 @@ import subprocess
 import os
 import sys
 import cv2
-import mediapipe as mp
 import csv
 import time
+import math
 import numpy as np
 import socket
 import struct
-from PyQt6.QtCore import QObject, pyqtSignal, QProcess, QTimer
+import select
+import threading
+import collections
+import hashlib
+import queue
+import urllib.parse
 
 from gui_app.config import load_gestures
+from gui_app.tracing import handoff
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 MODELS_DIR = os.path.join(PROJECT_ROOT, 'models')
 TRACKER_VENV = os.path.join(PROJECT_ROOT, "Python_Hand_Tracker", "venv_tracker")
 TRAINING_VENV = os.path.join(PROJECT_ROOT, "Python_Hand_Tracker", "venv_training")
 SIM_DIR = os.path.join(PROJECT_ROOT, "RA8D1_Simulation")
+ADAPTERS_DIR = os.path.join(MODELS_DIR, 'adapters')
 
 def run_command(command, cwd=PROJECT_ROOT):
     """Run a command and yield its output."""
@@ -35,54 +42,147 @@ def run_command(command, cwd=PROJECT_ROOT):
     if return_code:
         raise subprocess.CalledProcessError(return_code, command)
 
-def run_setup():
-    """Run the full project setup."""
+WHEELHOUSE_DIR = os.path.join(PROJECT_ROOT, ".wheelhouse") # Local wheel cache, so repeat setups work offline
+BUILD_STAMP = os.path.join(SIM_DIR, ".build_stamp")
+REQUIREMENTS_STAMP = ".requirements_sha256" # Inside each venv
+SIM_EXECUTABLES = ["ra8d1_sim", "train_c", "quantize"]
+
+def hash_files(paths):
+    """SHA-256 over the names and contents of the given files."""
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(os.path.relpath(path, PROJECT_ROOT).encode())
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def _read_stamp(path):
     try:
-        yield "Starting project setup...\n"
-        
-        # Check for Python 3.11
-        yield "Checking for Python 3.11...\n"
-        if "3.11" not in sys.version:
-             yield f"Warning: Running Python {sys.version}, not 3.11. Errors may occur.\n"
-        else:
-            yield "Python 3.11 found.\n"
-
-        # Create Training Venv
-        yield "\nCreating training venv...\n"
-        yield from run_command(f'python3.11 -m venv "{TRAINING_VENV}"')
-        yield "Training venv created.\n"
-
-        # Install Training Dependencies
-        yield "\nInstalling training dependencies...\n"
-        pip_executable = os.path.join(TRAINING_VENV, 'bin', 'pip')
-        req_file = os.path.join(PROJECT_ROOT, 'Python_Hand_Tracker', 'requirements_training.txt')
-        yield from run_command(f'"{pip_executable}" install -r "{req_file}"')
-        yield "Training dependencies installed.\n"
-
-        # Create Tracker Venv
-        yield "\nCreating tracking venv...\n"
-        yield from run_command(f'python3.11 -m venv "{TRACKER_VENV}"')
-        yield "Tracking venv created.\n"
-
-        # Install Tracker Dependencies
-        yield "\nInstalling tracking dependencies...\n"
-        pip_executable = os.path.join(TRACKER_VENV, 'bin', 'pip')
-        req_file = os.path.join(PROJECT_ROOT, 'Python_Hand_Tracker', 'requirements_tracker.txt')
-        yield from run_command(f'"{pip_executable}" install -r "{req_file}"')
-        yield "Tracking dependencies installed.\n"
-
-        # Build C Simulation
-        yield "\nBuilding C simulation...\n"
-        yield from run_command('make clean && make', cwd=SIM_DIR)
-        yield "C simulation built.\n"
-
-        yield "\nSetup complete!\n"
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def _write_stamp(path, value):
+    with open(path, 'w') as f:
+        f.write(value + "\n")
+
+def _venv_step(venv, requirements_file, force):
+    """Create a venv and install its requirements, from the local wheelhouse when possible."""
+    stamp_path = os.path.join(venv, REQUIREMENTS_STAMP)
+    requirements_hash = hash_files([requirements_file])
+    python_executable = os.path.join(venv, 'bin', 'python')
+    if not force and os.path.exists(python_executable) and _read_stamp(stamp_path) == requirements_hash:
+        yield "Up to date (requirements unchanged), skipped.\n"
+        return False
+    if not os.path.exists(python_executable):
+        yield from run_command(f'python3.11 -m venv "{venv}"')
+    pip_executable = os.path.join(venv, 'bin', 'pip')
+    wheel_dir = os.path.join(WHEELHOUSE_DIR, os.path.basename(venv))
+    offline_install = f'"{pip_executable}" install --no-index --find-links "{wheel_dir}" -r "{requirements_file}"'
+    try:
+        yield from run_command(offline_install)
+    except subprocess.CalledProcessError:
+        yield "Wheelhouse incomplete, downloading missing wheels...\n"
+        yield from run_command(f'"{pip_executable}" wheel --wheel-dir "{wheel_dir}" --find-links "{wheel_dir}" -r "{requirements_file}"')
+        yield from run_command(offline_install)
+    _write_stamp(stamp_path, requirements_hash)
+    return True
+
+def _build_step(force):
+    """Rebuild the C simulation when any source, header or the Makefile changed."""
+    sources = [os.path.join(SIM_DIR, name) for name in os.listdir(SIM_DIR)
+               if name.endswith(('.c', '.h')) or name == 'Makefile']
+    sources_hash = hash_files(sources)
+    built = all(os.path.exists(os.path.join(SIM_DIR, name)) for name in SIM_EXECUTABLES)
+    if not force and built and _read_stamp(BUILD_STAMP) == sources_hash:
+        yield "Up to date (C sources unchanged), skipped.\n"
+        return False
+    # The object rules do not track headers, so a change rebuilds from clean
+    yield from run_command(f'make clean && make -j{os.cpu_count() or 1}', cwd=SIM_DIR)
+    _write_stamp(BUILD_STAMP, sources_hash)
+    return True
+
+def _drain_step(name, step, output):
+    """Forwards a step generator's lines to the queue and returns its return value."""
+    while True:
+        try:
+            output.put((name, next(step), None))
+        except StopIteration as stop:
+            return stop.value
 
+def _run_step(name, step, output):
+    """Thread body: forwards a step's lines to the output queue, then its result."""
+    start = time.perf_counter()
+    try:
+        ran = _drain_step(name, step, output)
+        output.put((name, None, ("ran" if ran else "skipped", time.perf_counter() - start)))
     except subprocess.CalledProcessError as e:
-        yield f"\nError: Command failed (exit code {e.returncode}).\n"
-        yield str(e)
+        output.put((name, f"[ERROR] Command failed (exit code {e.returncode}): {e.cmd}\n", None))
+        output.put((name, None, ("failed", time.perf_counter() - start)))
     except Exception as e:
-        yield f"\nError: An unexpected error occurred: {e}\n"
+        output.put((name, f"[ERROR] Unexpected error: {e}\n", None))
+        output.put((name, None, ("failed", time.perf_counter() - start)))
+
+def run_setup(force=False):
+    """Run the project setup. The two venvs and the C build are independent and run
+    concurrently; each step is skipped when its inputs are unchanged (unless force)."""
+    yield "Starting project setup...\n"
+
+    # Check for Python 3.11
+    if "3.11" not in sys.version:
+        yield f"Warning: Running Python {sys.version}, not 3.11. Errors may occur.\n"
+    else:
+        yield "Python 3.11 found.\n"
+
+    requirements_dir = os.path.join(PROJECT_ROOT, 'Python_Hand_Tracker')
+    steps = {
+        "training venv": _venv_step(TRAINING_VENV, os.path.join(requirements_dir, 'requirements_training.txt'), force),
+        "tracking venv": _venv_step(TRACKER_VENV, os.path.join(requirements_dir, 'requirements_tracker.txt'), force),
+        "C build": _build_step(force),
+    }
+    setup_start = time.perf_counter()
+    output = queue.Queue()
+    for name, step in steps.items():
+        threading.Thread(target=_run_step, args=(name, step, output), name=f"setup: {name}", daemon=True).start()
+
+    results = {}
+    while len(results) < len(steps):
+        name, line, result = output.get()
+        if line is not None:
+            yield f"[{name}] {line}"
+        else:
+            results[name] = result
+            yield f"[{name}] {result[0]} in {result[1]:.1f} s\n"
+
+    yield "\nStep timings:\n"
+    for name in steps:
+        status, seconds = results[name]
+        yield f"  {name:<14} {status:<8} {seconds:7.1f} s\n"
+    yield f"  {'total':<14} {'':<8} {time.perf_counter() - setup_start:7.1f} s\n"
+    if any(status == "failed" for status, _ in results.values()):
+        yield "\n[ERROR] Setup failed.\n"
+    else:
+        yield "\nSetup complete!\n"
+
+
+# Per-Class Adapters
+
+def adapter_path(gesture):
+    """Path of the LoRA adapter file for a gesture."""
+    return os.path.join(ADAPTERS_DIR, f'{gesture}.bin')
+
+def remove_stale_adapters(gestures):
+    """Delete adapter files of gestures that are no longer configured."""
+    if not os.path.isdir(ADAPTERS_DIR):
+        return []
+    removed = []
+    for file_name in os.listdir(ADAPTERS_DIR):
+        name, ext = os.path.splitext(file_name)
+        if ext == '.bin' and name not in gestures:
+            os.remove(os.path.join(ADAPTERS_DIR, file_name))
+            removed.append(name)
+    return removed
 
 
 # Data Normalization
@@ -111,6 +211,7 @@ class HandTracker:
     """Manage camera, hand detection, and data collection."""
 
     def __init__(self):
+        import mediapipe as mp # Deferred: importing MediaPipe is the slowest part of GUI startup
         self.mp_hands = mp.solutions.hands
         self.hands = self.mp_hands.Hands(
             static_image_mode=False, 
@@ -119,6 +220,7 @@ class HandTracker:
             min_tracking_confidence=0.5
         )
         self.mp_drawing = mp.solutions.drawing_utils
+        self.lock = threading.Lock() # The graph tracks across frames; one caller at a time
 
         self.DATA_DIR = os.path.join(PROJECT_ROOT, 'models', 'data')
         os.makedirs(self.DATA_DIR, exist_ok=True)
@@ -136,17 +238,19 @@ class HandTracker:
         # Normalize and exclude wrist (returns 60 floats)
         return normalize_landmarks(landmarks_np)
 
-    def process_frame(self, frame):
-        """Process a video frame to find and draw hand landmarks."""
+    def process_frame(self, frame, draw=True):
+        """Process a video frame to find (and by default draw) hand landmarks."""
         frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(frame_rgb)
+        with self.lock:
+            results = self.hands.process(frame_rgb)
 
         hand_landmarks = None
         if results.multi_hand_landmarks:
             # Get the first detected hand
             hand_landmarks = results.multi_hand_landmarks[0]
             # Draw the landmarks on the original frame
-            self.draw_landmarks(frame, hand_landmarks)
+            if draw:
+                self.draw_landmarks(frame, hand_landmarks)
 
         return hand_landmarks, frame # Return landmarks and the (possibly annotated) frame
 
@@ -154,8 +258,9 @@ class HandTracker:
         """Draw landmarks and connections on the frame."""
         self.mp_drawing.draw_landmarks(frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
 
-    def save_data(self, gesture, data):
-        """Save a gesture sequence to a single CSV file."""
+    @staticmethod
+    def save_data(gesture, data):
+        """Save a gesture sequence to a single CSV file (needs no MediaPipe instance)."""
         data_dir = os.path.join(MODELS_DIR, 'data', gesture)
         os.makedirs(data_dir, exist_ok=True)
         file_path = os.path.join(data_dir, f'{gesture}.csv')
@@ -180,203 +285,431 @@ class HandTracker:
         return len(data)
 
 
+# Shared Camera and Hand Tracker
+
+CAMERA_IDLE_CLOSE_S = 5.0 # Keeps the device open while switching between camera pages
+
+class SharedCamera:
+    """Process-wide owner of the camera device.
+
+    Workers acquire() it for their capture loop and release() it when they stop.
+    The device is opened on first use and closed once nobody has used it for
+    CAMERA_IDLE_CLOSE_S seconds.
+    """
+    def __init__(self, index=0):
+        self.index = index
+        self.capture = None
+        self.users = 0
+        self.idle_timer = None
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            self.users += 1
+            if self.idle_timer:
+                self.idle_timer.cancel()
+                self.idle_timer = None
+            if self.capture is None or not self.capture.isOpened():
+                self.capture = cv2.VideoCapture(self.index)
+
+    def read(self):
+        with self.lock:
+            return self.capture.read()
+
+    def release(self):
+        with self.lock:
+            self.users -= 1
+            if self.users == 0:
+                self.idle_timer = threading.Timer(CAMERA_IDLE_CLOSE_S, self.close, kwargs={"only_if_idle": True})
+                self.idle_timer.daemon = True
+                self.idle_timer.start()
+
+    def close(self, only_if_idle=False):
+        with self.lock:
+            if only_if_idle and self.users:
+                return
+            if self.capture is not None:
+                self.capture.release()
+                self.capture = None
+
+_shared_instances = {}
+_shared_lock = threading.Lock()
+
+def _shared(factory):
+    with _shared_lock:
+        if factory not in _shared_instances:
+            _shared_instances[factory] = factory()
+        return _shared_instances[factory]
+
+def shared_hand_tracker():
+    """The process-wide HandTracker (a single MediaPipe Hands graph), created on first use."""
+    return _shared(HandTracker)
+
+def shared_camera():
+    """The process-wide SharedCamera."""
+    return _shared(SharedCamera)
+
+
 # Gesture Prediction
 
 class GesturePredictor:
-    """Get temporal gesture predictions from the C inference server."""
-    def __init__(self):
+    """Get temporal gesture predictions from the C inference server.
+
+    predict() never waits for the server: windows are queued for a dedicated I/O
+    thread that pipelines them over the persistent connection. Results are applied
+    as they arrive and reported through on_result(prediction, confidence, mark),
+    which is called from the I/O thread. With a tracer (gui_app.tracing.FrameTracer),
+    frames passed to predict() with a frame id get their client and server stages
+    recorded, and mark is a handoff() for timing the delivery of the result.
+    """
+    STATS_REQUEST_ID = 0 # Never used for windows; an empty request with this id asks for server metrics
+
+    def __init__(self, early_predictions=False, motion_gating=True, on_result=None, tracer=None):
         self.host = 'localhost'
         self.port = 65432
         self.client_socket = None
-        self.rfile = None # For buffered reading
         self.last_confidence = 0.0
         self.confidence_threshold = 0.5
-        self.classes = load_gestures() + ["No Hand Present"] # Load custom gestures
-        self.connection_timer = QTimer()
+        self.classes = load_gestures() + ["No Hand Present"] # Replaced by the server's class names once it reports them
         self.sequence_length = 20 # Must match SEQUENCE_LENGTH in C backend
         self.window_stride = 5 # Must match WINDOW_STRIDE in C training code
         self.num_features = 60 # We receive 60 features per frame (20 landmarks × 3 coords)
         self.sequence_buffer = [] # Buffer will store normalized landmarks
-        self.frame_counter = 0  # Track frames for stride-based prediction
+        self.frames_since_prediction = None # Frames since the last full-window prediction point (None = none yet)
+        # Adaptive stride: predict less often when round trips eat too much of the camera frame time
+        self.min_stride = self.window_stride
+        self.max_stride = 20
+        self.prediction_stride = self.window_stride
+        self.latency_budget = 0.5 # Fraction of the frame time that inference round trips may use
+        self.ema_alpha = 0.2
+        self.latency_ema = None # Seconds per server round trip
+        self.frame_interval_ema = None # Seconds between predict() calls
+        self.last_frame_time = None
+        # Early mode sends partial windows while the buffer fills; shorter windows need more confidence
+        self.early_predictions = early_predictions
+        self.min_prefix_frames = 5 # Must match MIN_PREFIX_FRAMES in C backend
+        self.early_confidence_threshold = 0.9 # Threshold at min_prefix_frames, relaxed linearly to confidence_threshold
+        # Motion gating: reuse the last result while the hand has not moved since the last inference
+        self.motion_gating = motion_gating
+        self.motion_threshold = 0.05 # Max abs landmark delta (normalized units) that still counts as stationary
+        self.max_result_age = 30 # Frames before a reused result is refreshed anyway
+        self.reference_frame = None # Newest frame of the last inferred window
+        self.motion_since_inference = 0.0
+        self.result_age = 0
+        self.executed_inferences = 0
+        self.skipped_inferences = 0
+        # Pipelining: requests carry an id that the server echoes in its framed response
+        self.on_result = on_result
+        self.tracer = tracer
+        self.max_in_flight = 2 # Sent but unanswered requests
+        self.pending_requests = collections.deque(maxlen=self.max_in_flight) # Not sent yet; when full the oldest is dropped
+        self.in_flight = {} # request_id -> (num_frames, hand_session, send_time, frame_id)
+        self.next_request_id = 1
+        self.dropped_requests = 0
+        self.stats_requested = False
+        self.server_stats = {} # Latest server metrics (counters and <stage>_<unit>_p50/_p99/_max)
+        self.hand_session = 0 # Bumped when the hand is lost so late results for the old hand are ignored
+        self.result_session = -1 # hand_session of last_prediction
+        self.lock = threading.Lock()
+        self._wake_reader, self._wake_writer = socket.socketpair() # Wakes the I/O thread when a window is queued
+        self._running = True
         self.last_prediction = "Collecting data..."
         self.last_confidence = 0.0
         self._connect() # Establish initial connection
+        self.io_thread = threading.Thread(target=self._io_loop, daemon=True)
+        self.io_thread.start()
 
     def _connect(self):
         """Connect (or reconnect) to the C server."""
         self.cleanup(is_reconnecting=True)
         try:
             print("[GesturePredictor] Attempting to connect to C inference server...")
-            self.client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.client_socket.connect((self.host, self.port))
-            self.rfile = self.client_socket.makefile('r') # Create buffered reader
+            client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            client_socket.connect((self.host, self.port))
+            client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.client_socket = client_socket
             print("[GesturePredictor] Connection to C server successful.")
-        except ConnectionRefusedError:
+            with self.lock:
+                self.stats_requested = True # The stats reply carries the loaded model's class names
+        except OSError:
             print("[GesturePredictor] Connection refused. Is the C server running?")
             self.client_socket = None
-            self.rfile = None
 
-    def predict(self, landmark_data):
+    def predict(self, landmark_data, frame_id=None):
         """
-        Buffers landmark data, sends it over the persistent connection for inference,
-        and handles reconnections if necessary.
+        Buffers landmark data and queues windows for inference without waiting for
+        the server. Returns the latest available prediction for the current hand.
         Uses stride-based prediction to match training temporal sampling.
+        frame_id (from the tracer) traces the window this frame sends, if any.
         """
+        now = time.perf_counter()
+        if self.last_frame_time is not None:
+            self.frame_interval_ema = self._ema(self.frame_interval_ema, now - self.last_frame_time)
+        self.last_frame_time = now
+
         # If no hand is detected, clear the buffer and reset frame counter
         if landmark_data is None:
             self.sequence_buffer.clear()
-            self.frame_counter = 0
-            self.last_prediction = "No Hand Present"
-            self.last_confidence = 0.0
+            self.frames_since_prediction = None
+            self.reference_frame = None
+            with self.lock:
+                self.hand_session += 1
+                self.pending_requests.clear()
+                self.last_prediction = "No Hand Present"
+                self.last_confidence = 0.0
             return self.last_prediction, self.last_confidence
 
         # A hand is present, so add the new data to our buffer.
         # landmark_data is already normalized and contains 63 floats (21 landmarks × 3 coords)
         self.sequence_buffer.append(landmark_data)
-        self.frame_counter += 1
+        if self.frames_since_prediction is not None:
+            self.frames_since_prediction += 1
+        if self.reference_frame is not None:
+            delta = np.max(np.abs(np.asarray(landmark_data) - self.reference_frame))
+            self.motion_since_inference = max(self.motion_since_inference, delta)
+            self.result_age += 1
         
         # If buffer is full, remove the oldest frame
         if len(self.sequence_buffer) > self.sequence_length:
             self.sequence_buffer.pop(0)
 
-        # Ensure full sequence at a stride boundary
-        if len(self.sequence_buffer) < self.sequence_length:
-            return "Collecting data...", 0.0
-        
-        # Predict every WINDOW_STRIDE frames to match training
-        if (self.frame_counter - self.sequence_length) % self.window_stride != 0:
+        num_frames = len(self.sequence_buffer)
+        if num_frames < self.sequence_length:
+            # Early mode: predict on every frame of the partial window until it is full
+            if not self.early_predictions or num_frames < self.min_prefix_frames:
+                return "Collecting data...", 0.0
+            # ...or every prediction_stride frames once round trips are too slow for that
+            if self.prediction_stride > self.min_stride and (num_frames - self.min_prefix_frames) % self.prediction_stride != 0:
+                return self._current_result()
+        # Predict every prediction_stride frames (WINDOW_STRIDE unless the machine is too slow)
+        elif self.frames_since_prediction is not None and self.frames_since_prediction < self.prediction_stride:
             # Return last prediction to keep UI stable
-            return self.last_prediction, self.last_confidence
-
-        if not self.client_socket or not self.rfile:
-            self._connect()
-            if not self.client_socket:
-                return "Connecting...", 0.0
-
-        try:
-            # Flatten sequence buffer (20 frames * 60 floats = 1200 floats)
-            normalized_sequence = []
-            for frame_landmarks in self.sequence_buffer:
-                normalized_sequence.extend(frame_landmarks)
-
-            # Verify data size
-            expected_size = self.sequence_length * 63  # 20 frames × 63 floats per frame
-            if len(normalized_sequence) != expected_size:
-                print(f"[GesturePredictor] Data size mismatch: got {len(normalized_sequence)}, expected {expected_size}")
-                return "Data Error", 0.0
-
-            # Pack data as binary stream of floats (network byte order)
-            format_string = '!' + 'f' * len(normalized_sequence)
-            data_bytes = struct.pack(format_string, *normalized_sequence)
-
-            # Prepend message length and send
-            msg_len = len(data_bytes)
-            len_prefix = struct.pack('!I', msg_len) # Pack as 4-byte unsigned int, network byte order
-            self.client_socket.sendall(len_prefix + data_bytes)
-
-            # Read response
-            response = self.client_socket.recv(1024).decode('utf-8').strip()
-
-            # Parse and return prediction
-            if not response:
-                # Server closed connection
-                print("[GesturePredictor] Empty response from server. Reconnecting...")
+            return self._current_result()
+        else:
+            self.frames_since_prediction = 0
+            if self.is_stationary():
+                self.skipped_inferences += 1
+                return self._current_result()
+
+        if not self.client_socket:
+            return "Connecting...", 0.0 # The I/O thread keeps reconnecting
+
+        # Flatten sequence buffer (up to 20 frames * 63 floats = 1260 floats)
+        pack_start = time.perf_counter()
+        normalized_sequence = []
+        for frame_landmarks in self.sequence_buffer:
+            normalized_sequence.extend(frame_landmarks)
+
+        # Verify data size
+        expected_size = num_frames * 63  # Frames × 63 floats per frame
+        if len(normalized_sequence) != expected_size:
+            print(f"[GesturePredictor] Data size mismatch: got {len(normalized_sequence)}, expected {expected_size}")
+            return "Data Error", 0.0
+
+        # Pack data as binary stream of floats (network byte order) and queue it
+        format_string = '!' + 'f' * len(normalized_sequence)
+        data_bytes = struct.pack(format_string, *normalized_sequence)
+        if self.tracer and frame_id is not None:
+            self.tracer.record(frame_id, "pack", pack_start, time.perf_counter())
+        else:
+            frame_id = None
+        self._submit(data_bytes, num_frames, frame_id)
+        if num_frames == self.sequence_length:
+            # Only full-window results are reused by motion gating
+            self.reference_frame = np.asarray(self.sequence_buffer[-1])
+            self.motion_since_inference = 0.0
+            self.result_age = 0
+        return self._current_result()
+
+    def _current_result(self):
+        """Latest accepted prediction for the current hand."""
+        with self.lock:
+            if self.result_session == self.hand_session:
+                return self.last_prediction, self.last_confidence
+        return "Collecting data...", 0.0
+
+    def _submit(self, data_bytes, num_frames, frame_id=None):
+        """Queue a packed window for the I/O thread."""
+        with self.lock:
+            request_id = self.next_request_id
+            self.next_request_id = self.next_request_id % 0xFFFFFFFF + 1
+            if len(self.pending_requests) == self.pending_requests.maxlen:
+                self.dropped_requests += 1
+            self.pending_requests.append((request_id, num_frames, self.hand_session, data_bytes, frame_id, time.perf_counter()))
+        self._wake_writer.send(b'\0')
+
+    def request_server_stats(self):
+        """Ask the server for its metrics; the reply updates server_stats."""
+        with self.lock:
+            self.stats_requested = True
+        self._wake_writer.send(b'\0')
+
+    def _io_loop(self):
+        """Send queued windows and read framed responses (I/O thread)."""
+        receive_buffer = b''
+        while self._running:
+            client_socket = self.client_socket
+            if client_socket is None:
+                select.select([self._wake_reader], [], [], 1.0) # Retry about once a second
+                if self._running:
+                    self._connect()
+                receive_buffer = b''
+                continue
+            try:
+                readable, _, _ = select.select([client_socket, self._wake_reader], [], [], 0.5)
+                if self._wake_reader in readable:
+                    self._wake_reader.recv(4096)
+                if client_socket in readable:
+                    data = client_socket.recv(4096)
+                    if not data:
+                        raise ConnectionResetError("server closed the connection")
+                    receive_buffer = self._handle_responses(receive_buffer + data)
+                self._send_pending(client_socket)
+            except (OSError, ValueError) as e:
+                if not self._running:
+                    break
+                print(f"[GesturePredictor] Connection lost: {e}. Reconnecting...")
+                with self.lock:
+                    self.in_flight.clear()
                 self._connect()
-                return "Connecting...", 0.0
-            
-            parts = response.split(',')
-            prediction_index = int(parts[0])
-            confidence = float(parts[1])
-
-            if confidence < self.confidence_threshold:
-                self.last_prediction = self.classes[-1]
-                self.last_confidence = confidence
+                receive_buffer = b''
+
+    def _send_pending(self, client_socket):
+        """Send queued windows while fewer than max_in_flight are unanswered."""
+        with self.lock:
+            send_stats, self.stats_requested = self.stats_requested, False
+        if send_stats:
+            # Stats queries are answered at once and don't count against max_in_flight
+            client_socket.sendall(struct.pack('!II', 0, self.STATS_REQUEST_ID))
+        while True:
+            with self.lock:
+                if not self.pending_requests or len(self.in_flight) >= self.max_in_flight:
+                    return
+                request_id, num_frames, session, data_bytes, frame_id, submit_time = self.pending_requests.popleft()
+                send_time = time.perf_counter()
+                self.in_flight[request_id] = (num_frames, session, send_time, frame_id)
+                self.executed_inferences += 1
+            if frame_id is not None:
+                self.tracer.record(frame_id, "client_queue", submit_time, send_time)
+            # Request: [u32 payload length][u32 request id][payload], network byte order
+            client_socket.sendall(struct.pack('!II', len(data_bytes), request_id) + data_bytes)
+
+    def _handle_responses(self, buffer):
+        """Apply every complete [u32 length][u32 request id][text] response; returns the remainder."""
+        header_size = struct.calcsize('!II')
+        while len(buffer) >= header_size:
+            length, request_id = struct.unpack('!II', buffer[:header_size])
+            if len(buffer) < header_size + length:
+                break
+            text = buffer[header_size:header_size + length].decode('utf-8')
+            if request_id == self.STATS_REQUEST_ID:
+                self._apply_stats(text)
             else:
-                self.last_prediction = self.classes[prediction_index]
-                self.last_confidence = confidence
-            return self.last_prediction, self.last_confidence
-
-        except (BrokenPipeError, ConnectionResetError) as e:
-            print(f"[GesturePredictor] Connection lost: {e}. Reconnecting...")
-            self._connect()
-            return "Connecting...", 0.0
-        except Exception as e:
-            print(f"[GesturePredictor] An error occurred during prediction: {e}")
-            # Don't reconnect on general errors (could be data issue)
-            return "Error", 0.0
+                self._apply_response(request_id, text)
+            buffer = buffer[header_size + length:]
+        return buffer
+
+    def _apply_stats(self, text):
+        """Store the server metrics and adopt the class names of the model it loaded."""
+        stats = dict(item.split('=', 1) for item in text.split())
+        class_names = stats.pop('classes', '')
+        self.server_stats = {key: int(value) for key, value in stats.items()}
+        if class_names:
+            with self.lock:
+                self.classes = [urllib.parse.unquote(name) for name in class_names.split(',')] + ["No Hand Present"]
+
+    def _class_name(self, index):
+        """Label for a class index, even if it is outside the known class names."""
+        return self.classes[index] if 0 <= index < len(self.classes) - 1 else f"class_{index}"
+
+    def _apply_response(self, request_id, response):
+        """Turn a "<class>,<confidence>" response into the current prediction."""
+        with self.lock:
+            request = self.in_flight.pop(request_id, None)
+        if request is None:
+            return # Sent on a connection that has since been replaced
+        num_frames, session, send_time, frame_id = request
+        receive_time = time.perf_counter()
+        self.latency_ema = self._ema(self.latency_ema, receive_time - send_time)
+        self._update_stride()
+
+        # "<class>,<confidence>[,<read>,<decode>,<queue>,<forward> ns]"
+        parts = response.split(',')
+        prediction_index = int(parts[0])
+        confidence = float(parts[1])
+        if frame_id is not None:
+            self._record_round_trip(frame_id, send_time, receive_time, parts[2:])
+
+        with self.lock:
+            if session != self.hand_session:
+                return # The hand was lost after this window was queued
+            if num_frames < self.sequence_length:
+                # Partial window: only accept confident early predictions
+                if prediction_index < 0 or confidence < self.threshold_for_length(num_frames):
+                    return
+                prediction = self._class_name(prediction_index)
+            elif confidence < self.confidence_threshold:
+                prediction = self.classes[-1]
+            else:
+                prediction = self._class_name(prediction_index)
+            self.last_prediction = prediction
+            self.last_confidence = confidence
+            self.result_session = session
+        if self.on_result:
+            self.on_result(prediction, confidence, handoff(frame_id, "result_delivery"))
+
+    def _record_round_trip(self, frame_id, send_time, receive_time, server_ns):
+        """Trace the round trip, with the server stages laid out back to back from the send time."""
+        self.tracer.record(frame_id, "round_trip", send_time, receive_time)
+        start = send_time
+        for stage, duration_ns in zip(("server_read", "server_decode", "server_queue", "server_forward"), server_ns):
+            end = start + int(duration_ns) / 1e9
+            self.tracer.record(frame_id, stage, start, end)
+            start = end
+
+    def _ema(self, average, sample):
+        return sample if average is None else average + self.ema_alpha * (sample - average)
+
+    def _update_stride(self):
+        """Smallest stride in [min_stride, max_stride] that keeps round trips within the latency budget."""
+        if self.latency_ema is None or not self.frame_interval_ema:
+            return
+        needed = self.latency_ema / (self.latency_budget * self.frame_interval_ema)
+        self.prediction_stride = min(self.max_stride, max(self.min_stride, math.ceil(needed)))
+
+    def is_stationary(self):
+        """True if the last result can be reused because the hand has not moved."""
+        return (self.motion_gating and self.reference_frame is not None
+                and self.motion_since_inference < self.motion_threshold
+                and self.result_age < self.max_result_age)
+
+    def threshold_for_length(self, num_frames):
+        """Confidence needed to accept a prediction on a window of num_frames frames."""
+        if num_frames >= self.sequence_length:
+            return self.confidence_threshold
+        progress = (num_frames - self.min_prefix_frames) / (self.sequence_length - self.min_prefix_frames)
+        return self.early_confidence_threshold + progress * (self.confidence_threshold - self.early_confidence_threshold)
 
     def cleanup(self, is_reconnecting=False):
         """Close the socket and clean up resources."""
         if not is_reconnecting:
+            if not self._running:
+                return # Already cleaned up
             print("Cleaning up GesturePredictor...")
-        
-        if self.rfile:
-            try: self.rfile.close()
-            except Exception as e: print(f"Error closing reader file: {e}")
-        
+            # Stop the I/O thread before closing the socket it selects on
+            self._running = False
+            self._wake_writer.send(b'\0')
+            if threading.current_thread() is not self.io_thread:
+                self.io_thread.join(timeout=2.0)
+
         if self.client_socket:
             try: self.client_socket.close()
             except Exception as e: print(f"Error closing client socket: {e}")
 
-        self.rfile = None
         self.client_socket = None
         
         if not is_reconnecting:
+            self._wake_reader.close()
+            self._wake_writer.close()
             self.sequence_buffer.clear()
             print("GesturePredictor cleanup complete.")
-
-class Quantizer(QObject):
-    """Manages the C model quantization process."""
-    output_received = pyqtSignal(str)
-    quantization_finished = pyqtSignal(int)
-
-    def __init__(self):
-        super().__init__()
-        self.process = None
-
-    def run_quantization(self):
-        """Runs the C quantization executable as a separate process."""
-        if self.process and self.process.state() == QProcess.ProcessState.Running:
-            self.output_received.emit("Quantization is already in progress.")
-            return
-
-        self.process = QProcess()
-        self.process.setProcessChannelMode(QProcess.ProcessChannelMode.MergedChannels)
-        self.process.readyReadStandardOutput.connect(self.on_ready_read)
-        self.process.finished.connect(self.on_process_finished)
-
-        # Define paths
-        quantize_executable = os.path.join(SIM_DIR, "quantize")
-        input_model_path = os.path.join(MODELS_DIR, "c_model.bin")
-        output_model_path = os.path.join(SIM_DIR, "c_model_quantized.bin")
-
-        # Check for executable
-        if not os.path.exists(quantize_executable):
-            self.output_received.emit(f"Error: Quantize executable not found at {quantize_executable}. Please compile the C code first.")
-            self.quantization_finished.emit(-1)
-            return
-        
-        # Check for input model
-        if not os.path.exists(input_model_path):
-            self.output_received.emit(f"Error: Base model not found at {input_model_path}. Please train a model first.")
-            self.quantization_finished.emit(-1)
-            return
-
-        # Run the quantization process
-        self.output_received.emit("Starting quantization process...\n")
-        self.process.start(quantize_executable, [input_model_path, output_model_path])
-
-    def on_ready_read(self):
-        """Emits the output from the C executable."""
-        data = self.process.readAllStandardOutput().data().decode().strip()
-        if data:
-            self.output_received.emit(data)
-
-    def on_process_finished(self, exit_code, exit_status):
-        """Handles the completion of the quantization process."""
-        if exit_status == QProcess.ExitStatus.CrashExit:
-            self.output_received.emit("\nError: The quantization process crashed.")
-        self.quantization_finished.emit(exit_code)
-        self.process = None
-
-
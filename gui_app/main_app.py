@@ -1,5 +1,11 @@
+import time
+LAUNCH_TIME = time.perf_counter() # Before the heavy imports, for the startup measurement
+
 import sys
 import os
+import argparse
+import importlib
+import resource
 
 # Add project root to the Python path
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -7,26 +13,65 @@ sys.path.insert(0, PROJECT_ROOT)
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QStackedWidget, QLabel, QFrame, QButtonGroup
+    QPushButton, QStackedWidget, QLabel, QFrame, QButtonGroup,
+    QDialog, QTableWidget, QTableWidgetItem, QHeaderView
 )
-from PyQt6.QtGui import QFont
-from PyQt6.QtCore import Qt
-
-from gui_app.setup_page import SetupPage
-from gui_app.data_collection_page import DataCollectionPage
-from gui_app.training_page import TrainingPage
-from gui_app.quantize_page import QuantizePage
-from gui_app.inference_page import InferencePage
+from PyQt6.QtGui import QAction
+from PyQt6.QtCore import Qt, QTimer
+
+from gui_app.profiler import SamplingProfiler, DEFAULT_RATE_HZ
+
+PROFILES_DIR = os.path.join(PROJECT_ROOT, "profiles")
+PROFILE_ENV = "GESTURE_PROFILE"         # Set to 1 to profile from launch
+PROFILE_RATE_ENV = "GESTURE_PROFILE_HZ" # Sampling rate (default 200 Hz)
+
+# Navigation order -> (module, class). Pages are imported and built on first navigation.
+PAGES = {
+    "Setup": ("gui_app.setup_page", "SetupPage"),
+    "Data Collection": ("gui_app.data_collection_page", "DataCollectionPage"),
+    "Training": ("gui_app.training_page", "TrainingPage"),
+    "Quantize": ("gui_app.quantize_page", "QuantizePage"),
+    "Inference": ("gui_app.inference_page", "InferencePage"),
+}
+
+def peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024 # bytes on macOS, KB on Linux
+
+class ProfileDialog(QDialog):
+    """Per-function self/total time of a finished profiling run."""
+    def __init__(self, profiler, paths, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Sampling Profile")
+        self.resize(900, 500)
+        layout = QVBoxLayout(self)
+        summary = QLabel(f"{profiler.num_samples} samples over {profiler.duration:.1f} s "
+                         f"at {1.0 / profiler.interval:.0f} Hz. Saved to:\n" + "\n".join(paths))
+        summary.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        layout.addWidget(summary)
+
+        rows = profiler.function_totals()
+        table = QTableWidget(len(rows), 4)
+        table.setHorizontalHeaderLabels(["Function", "Thread", "Self (s)", "Total (s)"])
+        for row, (function, thread_name, self_time, total_time) in enumerate(rows):
+            for column, text in enumerate([function, thread_name, f"{self_time:.2f}", f"{total_time:.2f}"]):
+                table.setItem(row, column, QTableWidgetItem(text))
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(table)
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, quit_after_first_paint=False):
         super().__init__()
         self.is_setup_complete = False
+        self.first_paint_s = None
+        self.quit_after_first_paint = quit_after_first_paint
 
         self.setWindowTitle("Hand Gesture Recognition System")
         self.setGeometry(100, 100, 1200, 800)
         self.setStyleSheet("""
             QMainWindow { background-color: #1e1e1e; }
+            QMenuBar { background-color: #252526; color: #ccc; }
             QFrame#sidebar { background-color: #252526; }
             QLabel { color: #f0f0f0; font-size: 16px; }
             QPushButton {
@@ -63,31 +108,13 @@ class MainWindow(QMainWindow):
         nav_layout.setSpacing(5)
 
         self.page_container = QStackedWidget()
-
-        self.pages = {
-            "Setup": SetupPage(),
-            "Data Collection": DataCollectionPage(),
-            "Training": TrainingPage(),
-            "Quantize": QuantizePage(),
-            "Inference": InferencePage()
-        }
-        for name, page in self.pages.items():
-            if isinstance(page, QLabel):
-                page.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                page.setFont(QFont("Arial", 24))
-        
-        self.pages["Setup"].setup_completed.connect(self.on_setup_completed)
-        self.pages["Data Collection"].set_navigation_enabled.connect(self.set_navigation_enabled)
-        self.pages["Training"].set_navigation_enabled.connect(self.set_navigation_enabled)
-        self.pages["Inference"].set_navigation_enabled.connect(self.set_navigation_enabled)
-        self.pages["Quantize"].set_navigation_enabled.connect(self.set_navigation_enabled)
+        self.pages = {} # Built by get_page() on first navigation
 
         self.nav_button_group = QButtonGroup(self)
         self.nav_button_group.setExclusive(True)
         self.nav_button_group.buttonClicked.connect(self.switch_page)
 
-        for name, page in self.pages.items():
-            self.page_container.addWidget(page)
+        for name in PAGES:
             button = QPushButton(name)
             button.setCheckable(True)
             nav_layout.addWidget(button)
@@ -96,26 +123,76 @@ class MainWindow(QMainWindow):
         main_layout.addWidget(nav_panel)
         main_layout.addWidget(self.page_container)
 
+        # Tools > Sampling Profiler samples every thread until unchecked, then shows the hot functions
+        self.profiler = SamplingProfiler(float(os.environ.get(PROFILE_RATE_ENV, DEFAULT_RATE_HZ)))
+        self.profile_action = QAction("Sampling Profiler", self, checkable=True)
+        self.profile_action.toggled.connect(self.toggle_profiler)
+        self.menuBar().addMenu("Tools").addAction(self.profile_action)
+        if os.environ.get(PROFILE_ENV, "0") not in ("", "0"):
+            self.profile_action.setChecked(True)
+
         initial_button = self.nav_button_group.buttons()[0]
         initial_button.setChecked(True)
-        self.page_container.setCurrentWidget(self.pages[initial_button.text()])
+        self.page_container.setCurrentWidget(self.get_page(initial_button.text()))
+
+    def get_page(self, name):
+        """Imports, builds and wires up a page the first time it is needed."""
+        if name not in self.pages:
+            module_name, class_name = PAGES[name]
+            page = getattr(importlib.import_module(module_name), class_name)()
+            if hasattr(page, "setup_completed"):
+                page.setup_completed.connect(self.on_setup_completed)
+            if hasattr(page, "set_navigation_enabled"):
+                page.set_navigation_enabled.connect(self.set_navigation_enabled)
+            if hasattr(page, "set_setup_status"):
+                page.set_setup_status(self.is_setup_complete)
+            self.page_container.addWidget(page)
+            self.pages[name] = page
+        return self.pages[name]
 
     def switch_page(self, button):
         page_name = button.text()
-        if page_name in self.pages:
-            self.page_container.setCurrentWidget(self.pages[page_name])
+        if page_name in PAGES:
+            self.page_container.setCurrentWidget(self.get_page(page_name))
 
     def set_navigation_enabled(self, enabled):
         for button in self.nav_button_group.buttons():
             button.setEnabled(enabled)
 
+    def toggle_profiler(self, enabled):
+        if enabled:
+            self.profiler.start()
+            return
+        self.profiler.stop()
+        paths = self.profiler.save(PROFILES_DIR)
+        ProfileDialog(self.profiler, paths, self).exec()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.first_paint_s is None:
+            self.first_paint_s = time.perf_counter() - LAUNCH_TIME
+            print(f"[STARTUP] First paint {self.first_paint_s * 1000:.0f} ms after launch, peak RSS {peak_rss_mb():.0f} MB")
+            if self.quit_after_first_paint:
+                QTimer.singleShot(0, self.close)
+
+    def closeEvent(self, event):
+        if self.profiler.running:
+            self.profiler.stop()
+            print(f"Profile written to {', '.join(self.profiler.save(PROFILES_DIR))}")
+        super().closeEvent(event)
+
     def on_setup_completed(self, success):
         self.is_setup_complete = success
-        self.pages["Data Collection"].set_setup_status(success)
-        self.pages["Training"].set_setup_status(success)
+        for page in self.pages.values():
+            if hasattr(page, "set_setup_status"):
+                page.set_setup_status(success)
 
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    window = MainWindow()
+    parser = argparse.ArgumentParser(description='Hand gesture recognition GUI.')
+    parser.add_argument('--measure-startup', action='store_true',
+                        help='Quit after the first paint (its time and memory are always printed).')
+    args, qt_args = parser.parse_known_args()
+    app = QApplication(sys.argv[:1] + qt_args)
+    window = MainWindow(quit_after_first_paint=args.measure_startup)
     window.show()
     sys.exit(app.exec())
@@ -0,0 +1,120 @@
+import collections
+import json
+import os
+import sys
+import threading
+import time
+
+DEFAULT_RATE_HZ = 200
+
+
+def _qualname(code):
+    return getattr(code, "co_qualname", code.co_name) # co_qualname is Python 3.11+
+
+
+class SamplingProfiler:
+    """Samples the Python stacks of every thread at a fixed rate from a background thread.
+
+    Only identical stacks are counted, so the overhead is one sys._current_frames()
+    walk per sample. QThreads are unknown to the threading module and are named
+    after their outermost frame (e.g. InferenceWorker.run).
+    """
+    def __init__(self, rate_hz=DEFAULT_RATE_HZ):
+        self.interval = 1.0 / rate_hz
+        self.stacks = collections.Counter() # (thread name, root-first frames) -> samples
+        self.num_samples = 0
+        self.duration = 0.0
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._start_time = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self):
+        if self._thread:
+            return
+        self.stacks.clear()
+        self.num_samples = 0
+        self._stop_event.clear()
+        self._start_time = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="SamplingProfiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if not self._thread:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        self.duration = time.perf_counter() - self._start_time
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        next_sample = time.perf_counter()
+        while not self._stop_event.is_set():
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((_qualname(code), code.co_filename, code.co_firstlineno))
+                    frame = frame.f_back
+                stack.reverse()
+                self.stacks[(names.get(ident) or stack[0][0], tuple(stack))] += 1
+            self.num_samples += 1
+            # Fixed rate; after a stall, resume from now instead of bursting
+            next_sample = max(next_sample + self.interval, time.perf_counter())
+            self._stop_event.wait(next_sample - time.perf_counter())
+
+    @staticmethod
+    def _frame_label(frame):
+        name, filename, line = frame
+        return f"{name} ({os.path.basename(filename)}:{line})"
+
+    def function_totals(self, limit=30):
+        """[(function, thread, self seconds, total seconds)], hottest self time first."""
+        self_samples = collections.Counter()
+        total_samples = collections.Counter()
+        for (thread_name, stack), count in self.stacks.items():
+            self_samples[(stack[-1], thread_name)] += count
+            for frame in set(stack): # Recursion counts once per sample
+                total_samples[(frame, thread_name)] += count
+        rows = [(self._frame_label(frame), thread_name, self_samples[(frame, thread_name)] * self.interval,
+                 count * self.interval) for (frame, thread_name), count in total_samples.items()]
+        rows.sort(key=lambda row: (row[2], row[3]), reverse=True)
+        return rows[:limit]
+
+    def write_collapsed(self, path):
+        """One 'thread;root;...;leaf count' line per stack (flamegraph.pl, speedscope)."""
+        with open(path, "w") as f:
+            for (thread_name, stack), count in self.stacks.most_common():
+                f.write(";".join([thread_name] + [self._frame_label(frame) for frame in stack]) + f" {count}\n")
+
+    def write_speedscope(self, path):
+        """One sampled profile per thread in the speedscope JSON format."""
+        frame_index = {}
+        profiles = {}
+        for (thread_name, stack), count in self.stacks.items():
+            indices = [frame_index.setdefault(frame, len(frame_index)) for frame in stack]
+            profile = profiles.setdefault(thread_name, {"type": "sampled", "name": thread_name, "unit": "seconds",
+                                                        "startValue": 0, "endValue": self.duration,
+                                                        "samples": [], "weights": []})
+            profile["samples"].append(indices)
+            profile["weights"].append(count * self.interval)
+        frames = [{"name": name, "file": filename, "line": line} for name, filename, line in frame_index]
+        with open(path, "w") as f:
+            json.dump({"$schema": "https://www.speedscope.app/file-format-schema.json",
+                       "shared": {"frames": frames}, "profiles": list(profiles.values()),
+                       "name": "Hand Gesture Recognition GUI", "exporter": "gui_app.profiler"}, f)
+
+    def save(self, directory):
+        """Writes both formats with a timestamped name; returns their paths."""
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, time.strftime("gui_%Y%m%d_%H%M%S"))
+        self.write_collapsed(base + ".collapsed.txt")
+        self.write_speedscope(base + ".speedscope.json")
+        return [base + ".collapsed.txt", base + ".speedscope.json"]
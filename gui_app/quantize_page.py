@@ -1,6 +1,104 @@
+import os
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QTextEdit, QScrollArea
-from PyQt6.QtCore import pyqtSignal
-from .logic import Quantizer
+from PyQt6.QtCore import QObject, pyqtSignal, QProcess
+from .logic import MODELS_DIR, SIM_DIR
+from .config import load_gestures
+
+class Quantizer(QObject):
+    """Manages the C model quantization process and the follow-up error analysis."""
+    output_received = pyqtSignal(str)
+    analysis_summary = pyqtSignal(list)
+    budget_report = pyqtSignal(list)
+    quantization_finished = pyqtSignal(int)
+
+    def __init__(self):
+        super().__init__()
+        self.process = None
+        self.analysis_output = ""
+        self.input_model_path = os.path.join(MODELS_DIR, "c_model.bin")
+        self.output_model_path = os.path.join(SIM_DIR, "c_model_quantized.bin")
+
+    def _start_process(self, executable, args, on_finished):
+        self.process = QProcess()
+        self.process.setProcessChannelMode(QProcess.ProcessChannelMode.MergedChannels)
+        self.process.readyReadStandardOutput.connect(self.on_ready_read)
+        self.process.finished.connect(on_finished)
+        # Both tools read the recorded gesture windows relative to SIM_DIR
+        self.process.setWorkingDirectory(SIM_DIR)
+        self.process.start(executable, args)
+
+    def run_quantization(self):
+        """Runs the C quantization executable as a separate process."""
+        if self.process and self.process.state() == QProcess.ProcessState.Running:
+            self.output_received.emit("Quantization is already in progress.")
+            return
+
+        quantize_executable = os.path.join(SIM_DIR, "quantize")
+
+        # Check for executable
+        if not os.path.exists(quantize_executable):
+            self.output_received.emit(f"Error: Quantize executable not found at {quantize_executable}. Please compile the C code first.")
+            self.quantization_finished.emit(-1)
+            return
+        
+        # Check for input model
+        if not os.path.exists(self.input_model_path):
+            self.output_received.emit(f"Error: Base model not found at {self.input_model_path}. Please train a model first.")
+            self.quantization_finished.emit(-1)
+            return
+
+        # Run the quantization process
+        self.output_received.emit("Starting quantization process...\n")
+        self.analysis_output = ""
+        self._start_process(quantize_executable,
+                            [self.input_model_path, self.output_model_path] + load_gestures(),
+                            self.on_process_finished)
+
+    def run_analysis(self):
+        """Runs the layer-by-layer FP32 vs INT8 analyzer on the fresh quantized model."""
+        analyzer_executable = os.path.join(SIM_DIR, "quant_analyzer")
+        if not os.path.exists(analyzer_executable):
+            self.output_received.emit(f"\nSkipping analysis: {analyzer_executable} not found. Run 'make' in RA8D1_Simulation.")
+            self.quantization_finished.emit(0)
+            return
+
+        self.output_received.emit("\nAnalyzing quantization error...")
+        self.analysis_output = ""
+        self._start_process(analyzer_executable,
+                            [self.input_model_path, self.output_model_path] + load_gestures(),
+                            self.on_analysis_finished)
+
+    def on_ready_read(self):
+        """Emits the output from the C executable."""
+        data = self.process.readAllStandardOutput().data().decode()
+        self.analysis_output += data
+        data = data.strip()
+        if data:
+            self.output_received.emit(data)
+
+    def on_process_finished(self, exit_code, exit_status):
+        """Handles the completion of the quantization process and publishes its [BUDGET] lines."""
+        if exit_status == QProcess.ExitStatus.CrashExit:
+            self.output_received.emit("\nError: The quantization process crashed.")
+        self.process = None
+        if exit_status == QProcess.ExitStatus.NormalExit and exit_code == 0:
+            self.budget_report.emit([line[len("[BUDGET] "):]
+                                     for line in self.analysis_output.splitlines() if line.startswith("[BUDGET]")])
+            self.run_analysis()
+        else:
+            self.quantization_finished.emit(exit_code)
+
+    def on_analysis_finished(self, exit_code, exit_status):
+        """Publishes the analyzer's [SUMMARY] lines. Analysis failures do not fail the quantization."""
+        self.process = None
+        if exit_status == QProcess.ExitStatus.NormalExit and exit_code == 0:
+            summary = [line.split("]", 1)[1].strip()
+                       for line in self.analysis_output.splitlines() if line.startswith("[SUMMARY]")]
+            self.analysis_summary.emit(summary)
+        else:
+            self.output_received.emit("\nWarning: The quantization analysis failed.")
+        self.quantization_finished.emit(0)
+
 
 class QuantizePage(QWidget):
     set_navigation_enabled = pyqtSignal(bool)
@@ -27,6 +125,15 @@ class QuantizePage(QWidget):
         self.quantize_button = QPushButton("Quantize Trained Model")
         self.quantize_button.clicked.connect(self.run_quantization)
 
+        # --- Analysis Summary ---
+        self.summary_label = QLabel("Run a quantization to see the FP32 vs INT8 comparison.")
+        self.summary_label.setWordWrap(True)
+        self.summary_label.setStyleSheet("background-color: #2E2E2E; color: #F2F2F2; padding: 8px; font-family: 'Courier New';")
+
+        # --- RA8D1 Budget ---
+        self.budget_label = QLabel("Run a quantization to see the RA8D1 flash, SRAM and compute budget.")
+        self.budget_label.setStyleSheet("background-color: #2E2E2E; color: #F2F2F2; padding: 8px; font-family: 'Courier New';")
+
         # --- Output Console ---
         self.output_console = QTextEdit()
         self.output_console.setReadOnly(True)
@@ -36,15 +143,22 @@ class QuantizePage(QWidget):
         layout.addWidget(title_label)
         layout.addWidget(description)
         layout.addWidget(self.quantize_button)
+        layout.addWidget(QLabel("Analysis Summary:"))
+        layout.addWidget(self.summary_label)
+        layout.addWidget(QLabel("RA8D1 Budget:"))
+        layout.addWidget(self.budget_label)
         layout.addWidget(QLabel("Output:"))
         layout.addWidget(self.output_console)
 
         # Connect signals from the quantizer logic
         self.quantizer.output_received.connect(self.append_output)
+        self.quantizer.analysis_summary.connect(self.show_summary)
+        self.quantizer.budget_report.connect(self.show_budget)
         self.quantizer.quantization_finished.connect(self.on_finished)
 
     def run_quantization(self):
         self.output_console.clear()
+        self.summary_label.setText("Quantizing...")
         self.append_output("Starting quantization process...")
         self.quantize_button.setEnabled(False)
         self.quantizer.run_quantization()
@@ -53,9 +167,16 @@ class QuantizePage(QWidget):
         self.output_console.append(text)
         self.output_console.verticalScrollBar().setValue(self.output_console.verticalScrollBar().maximum())
 
+    def show_summary(self, lines):
+        self.summary_label.setText("\n".join(lines) if lines else "The analyzer produced no summary.")
+
+    def show_budget(self, lines):
+        self.budget_label.setText("\n".join(lines) if lines else "The quantizer printed no budget report.")
+
     def on_finished(self, exit_code):
         if exit_code == 0:
             self.append_output("\nQuantization completed successfully!")
         else:
             self.append_output(f"\nQuantization failed with exit code: {exit_code}")
+            self.summary_label.setText("Quantization failed. See the output below.")
         self.quantize_button.setEnabled(True)
@@ -1,4 +1,4 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QPushButton, QTextEdit, QLabel
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QPushButton, QTextEdit, QLabel, QCheckBox
 from PyQt6.QtGui import QFont
 from PyQt6.QtCore import QThread, pyqtSignal
 
@@ -9,13 +9,18 @@ class SetupWorker(QThread):
     progress = pyqtSignal(str)
     finished = pyqtSignal(bool)
 
+    def __init__(self, force=False):
+        super().__init__()
+        self.force = force
+
     def run(self):
         try:
-            for line in run_setup():
+            # Steps run concurrently, so keep reading after an error until all of them end
+            failed = False
+            for line in run_setup(self.force):
                 self.progress.emit(line)
-                if "[ERROR]" in line:
-                    raise RuntimeError("Setup script encountered an error.")
-            self.finished.emit(True)
+                failed = failed or "[ERROR]" in line
+            self.finished.emit(not failed)
         except Exception:
             self.finished.emit(False)
 
@@ -34,7 +39,8 @@ class SetupPage(QWidget):
         title.setFont(QFont("Arial", 24, QFont.Weight.Bold))
         layout.addWidget(title)
 
-        description = QLabel("Run the initial setup to create virtual environments, install dependencies, and compile the C simulation. This only needs to be run once.")
+        description = QLabel("Run the initial setup to create virtual environments, install dependencies, and compile the C simulation. "
+                             "Steps whose requirements or C sources are unchanged are skipped, so running it again is quick.")
         description.setWordWrap(True)
         layout.addWidget(description)
 
@@ -43,6 +49,10 @@ class SetupPage(QWidget):
         self.run_button.clicked.connect(self.start_setup)
         layout.addWidget(self.run_button)
 
+        self.force_checkbox = QCheckBox("Force full rebuild")
+        self.force_checkbox.setToolTip("Reinstall both venvs and rebuild the C simulation even if nothing changed.")
+        layout.addWidget(self.force_checkbox)
+
         self.log_console = QTextEdit()
         self.log_console.setReadOnly(True)
         self.log_console.setFont(QFont("Courier New", 10))
@@ -54,7 +64,7 @@ class SetupPage(QWidget):
         self.log_console.clear()
         self.log_console.append("Starting setup...\n")
         
-        self.worker = SetupWorker()
+        self.worker = SetupWorker(force=self.force_checkbox.isChecked())
         self.worker.progress.connect(self.update_console)
         self.worker.finished.connect(self.setup_finished)
         self.worker.start()
@@ -0,0 +1,91 @@
+import collections
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+# Stages in pipeline order, for display
+STAGES = [
+    "camera_read", "hand_tracking", "landmarks", "pack", "client_queue", "round_trip",
+    "server_read", "server_decode", "server_queue", "server_forward", "qt_delivery", "result_delivery",
+]
+
+
+def handoff(frame_id, stage):
+    """Mark a frame as handed to another thread (e.g. in a Qt signal); pass the result to record_handoff()."""
+    return None if frame_id is None else (frame_id, stage, time.perf_counter())
+
+
+class FrameTracer:
+    """Collect per-stage durations from every pipeline thread.
+
+    Frames are identified by the int from new_frame(); None means untraced.
+    Each span is kept in a rolling window per stage for percentiles and in a
+    bounded event list for a Chrome trace-event dump. Times are
+    time.perf_counter() seconds.
+    """
+    def __init__(self, window=300, max_events=20000):
+        self.durations = {stage: collections.deque(maxlen=window) for stage in STAGES}
+        self.events = collections.deque(maxlen=max_events)
+        self.next_frame_id = 0
+        self.lock = threading.Lock()
+
+    def new_frame(self):
+        with self.lock:
+            self.next_frame_id += 1
+            return self.next_frame_id
+
+    def record(self, frame_id, stage, start, end):
+        """Record one span of a frame's trace."""
+        with self.lock:
+            self.durations[stage].append(end - start)
+            self.events.append((stage, start, end, threading.current_thread().name, frame_id))
+
+    def record_handoff(self, handoff_mark):
+        """Record the time from handoff() until now, on the receiving thread."""
+        if handoff_mark is not None:
+            frame_id, stage, start = handoff_mark
+            self.record(frame_id, stage, start, time.perf_counter())
+
+    def percentiles(self):
+        """{stage: (p50, p95, p99) in seconds} for stages with samples."""
+        with self.lock:
+            samples = {stage: list(values) for stage, values in self.durations.items() if values}
+        return {stage: tuple(np.percentile(values, [50, 95, 99])) for stage, values in samples.items()}
+
+    def dump_chrome_trace(self, path):
+        """Write the recorded spans as Chrome trace-event JSON (chrome://tracing, Perfetto)."""
+        with self.lock:
+            events = list(self.events)
+        threads = {name: tid for tid, name in enumerate(sorted({event[3] for event in events}), start=1)}
+        trace_events = [{"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name}}
+                        for name, tid in threads.items()]
+        for stage, start, end, thread_name, frame_id in events:
+            trace_events.append({"name": stage, "cat": "server" if stage.startswith("server_") else "client",
+                                 "ph": "X", "ts": start * 1e6, "dur": (end - start) * 1e6,
+                                 "pid": 1, "tid": threads[thread_name], "args": {"frame": frame_id}})
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f)
+        return len(events)
+
+
+class Span:
+    """Context manager that records the enclosed block as one stage of a frame (no-op if frame_id is None)."""
+    __slots__ = ("tracer", "frame_id", "stage", "start")
+
+    def __init__(self, tracer, frame_id, stage):
+        self.tracer = tracer
+        self.frame_id = frame_id
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.frame_id is not None:
+            self.tracer.record(self.frame_id, self.stage, self.start, time.perf_counter())
+        return False
@@ -1,56 +1,79 @@
 import sys
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QTextEdit, QFrame, QStackedWidget
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QTextEdit, QFrame, QStackedWidget, QComboBox
 from PyQt6.QtGui import QFont
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, pyqtSlot, QTimer
 import subprocess
 import os
+import shutil
 import signal
-import pandas as pd
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
 
 from gui_app.config import load_gestures
-
-class MplCanvas(FigureCanvas):
-    """Matplotlib widget for PyQt."""
-    def __init__(self, parent=None, width=5, height=4, dpi=100):
-        fig = Figure(figsize=(width, height), dpi=dpi, facecolor='#1e1e1e')
-        self.axes = fig.add_subplot(111)
-        self.axes.set_facecolor('#1e1e1e')
-        self.axes.spines['bottom'].set_color('white')
-        self.axes.spines['top'].set_color('white') 
-        self.axes.spines['right'].set_color('white')
-        self.axes.spines['left'].set_color('white')
-        self.axes.tick_params(axis='x', colors='white')
-        self.axes.tick_params(axis='y', colors='white')
-        self.axes.yaxis.label.set_color('white')
-        self.axes.xaxis.label.set_color('white')
-        self.axes.title.set_color('white')
-        super(MplCanvas, self).__init__(fig)
+from gui_app.logic import ADAPTERS_DIR, adapter_path, remove_stale_adapters
 
 class TrainingWorker(QThread):
-    """Run the C training executable."""
+    """Run the C training executables."""
     new_log_message = pyqtSignal(str)
 
+    MODE_FULL = "full"
+    MODE_FULL_DWS = "full_dws"
+    MODE_LORA = "lora"
+    MODE_HEAD = "head"
+
     def __init__(self):
         super().__init__()
         self.gestures = []
+        self.mode = self.MODE_FULL
 
     def set_gestures(self, gestures):
         self.gestures = gestures
 
+    def set_mode(self, mode):
+        self.mode = mode
+
     def run(self):
-        self.new_log_message.emit("Initializing C training...")
         project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
         c_executable_dir = os.path.join(project_root, "RA8D1_Simulation")
-        c_executable_path = os.path.join(c_executable_dir, "train_c")
+
+        if self.mode == self.MODE_LORA:
+            self.run_lora_training(c_executable_dir)
+        elif self.mode == self.MODE_HEAD:
+            # The TCN block is reused as-is, so existing adapters stay valid
+            self.new_log_message.emit("Initializing output-layer retraining on cached features...")
+            self.run_executable(c_executable_dir, "train_c", ["--head-only"] + self.gestures)
+        else:
+            self.new_log_message.emit("Initializing C training...")
+            args = (["--dws"] if self.mode == self.MODE_FULL_DWS else []) + self.gestures
+            if self.run_executable(c_executable_dir, "train_c", args) == 0:
+                # Adapters were trained against the old base model
+                if os.path.isdir(ADAPTERS_DIR):
+                    shutil.rmtree(ADAPTERS_DIR)
+                    self.new_log_message.emit("Cleared per-class adapters of the previous base model.")
+
+    def run_lora_training(self, c_executable_dir):
+        """Train adapters only for gestures that do not have one yet."""
+        self.new_log_message.emit("Initializing per-class adapter (LoRA) training...")
+        for removed in remove_stale_adapters(self.gestures):
+            self.new_log_message.emit(f"Removed adapter for deleted gesture '{removed}'.")
+
+        missing = [g for g in self.gestures if not os.path.exists(adapter_path(g))]
+        if not missing:
+            self.new_log_message.emit("All gestures already have adapters. Nothing to train.")
+            return
+        for gesture in missing:
+            if self.run_executable(c_executable_dir, "train_lora", [gesture] + self.gestures) != 0:
+                self.new_log_message.emit(f"Adapter training for '{gesture}' failed.")
+                return
+
+    def run_executable(self, c_executable_dir, name, args):
+        """Run one C executable, streaming its output. Returns the exit code."""
+        c_executable_path = os.path.join(c_executable_dir, name)
 
         if not os.path.exists(c_executable_path):
             self.new_log_message.emit(f"Error: C training executable not found at {c_executable_path}")
             self.new_log_message.emit("Please run 'make' in the RA8D1_Simulation directory.")
-            return
+            return -1
 
-        command = [c_executable_path] + self.gestures
+        command = [c_executable_path] + args
         self.new_log_message.emit(f"Running command: {' '.join(command)}")
 
         try:
@@ -68,10 +91,11 @@ class TrainingWorker(QThread):
                 self.new_log_message.emit(line.strip())
             
             process.stdout.close()
-            process.wait()
+            return process.wait()
 
         except Exception as e:
             self.new_log_message.emit(f"\nError: Failed to run training: {e}")
+            return -1
 
 class TrainingPage(QWidget):
     set_navigation_enabled = pyqtSignal(bool)
@@ -113,6 +137,16 @@ class TrainingPage(QWidget):
         main_content_layout = QVBoxLayout()
         layout.addLayout(main_content_layout)
 
+        mode_layout = QHBoxLayout()
+        mode_layout.addWidget(QLabel("Training Mode:"))
+        self.mode_selector = QComboBox()
+        self.mode_selector.addItem("Full Retrain (all classes)", TrainingWorker.MODE_FULL)
+        self.mode_selector.addItem("Full Retrain, Depthwise-Separable TCN (fewer MACs)", TrainingWorker.MODE_FULL_DWS)
+        self.mode_selector.addItem("Per-Class Adapters (LoRA, new gestures only)", TrainingWorker.MODE_LORA)
+        self.mode_selector.addItem("Quick Retrain (output layer only)", TrainingWorker.MODE_HEAD)
+        mode_layout.addWidget(self.mode_selector, 1)
+        main_content_layout.addLayout(mode_layout)
+
         self.run_button = QPushButton("Start Training")
         self.run_button.setFont(QFont("Arial", 12))
         self.run_button.setMinimumHeight(40)
@@ -141,6 +175,8 @@ class TrainingPage(QWidget):
             return
             
         self.training_worker.set_gestures(gestures)
+        self.training_worker.set_mode(self.mode_selector.currentData())
+        self.mode_selector.setEnabled(False)
         self.training_worker.start()
 
     @pyqtSlot(str)
@@ -151,6 +187,7 @@ class TrainingPage(QWidget):
     def on_training_finished(self):
         self.run_button.setEnabled(True)
         self.run_button.setText("Start Training")
+        self.mode_selector.setEnabled(True)
         self.set_navigation_enabled.emit(True)
         self.append_log_message("\nC training finished.")
 